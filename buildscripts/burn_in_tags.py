@@ -172,7 +172,8 @@ def main(evergreen_api, repo):
     expansions_file_data = read_config.read_config_file(cmd_line_options.expansion_file)
 
     shrub_config = Configuration()
-    evg_conf = evergreen.parse_evergreen_file(EVERGREEN_FILE)
+    evg_conf = evergreen.parse_evergreen_file(EVERGREEN_FILE,
+                                              cache_dir=evergreen.DEFAULT_CACHE_DIR)
     build_variant_map = _create_evg_build_variant_map(expansions_file_data, evg_conf)
     _generate_evg_tasks(evergreen_api, shrub_config, expansions_file_data, build_variant_map, repo,
                         evg_conf)
@@ -38,8 +38,9 @@ from buildscripts.resmokelib.suitesconfig import create_test_membership_map, get
     get_named_suites_with_root_level_key
 from buildscripts.resmokelib.utils import default_if_none, globstar
 from buildscripts.ciconfig.evergreen import parse_evergreen_file, ResmokeArgs, \
-    EvergreenProjectConfig, VariantTask
+    EvergreenProjectConfig, VariantTask, DEFAULT_CACHE_DIR
 from buildscripts.util.teststats import TestStats
+import buildscripts.util.runtime_history as runtime_history
 from buildscripts.util.taskname import name_generated_task
 from buildscripts.patch_builds.task_generation import resmoke_commands, TimeoutInfo, TaskList
 
@@ -156,7 +157,7 @@ class GenerateConfig(object):
 
     def __init__(self, build_variant: str, project: str, run_build_variant: Optional[str] = None,
                  distro: Optional[str] = None, task_id: Optional[str] = None,
-                 use_multiversion: bool = False):
+                 use_multiversion: bool = False, runtime_history_file: Optional[str] = None):
         # pylint: disable=too-many-arguments,too-many-locals
         """
         Create a GenerateConfig.
@@ -167,6 +168,7 @@ class GenerateConfig(object):
         :param distro: Distro to run tasks on.
         :param task_id: Evergreen task being run under.
         :param use_multiversion: Should multiversion tests be generated.
+        :param runtime_history_file: File to keep the test runtime history of tasks in.
         """
         self.build_variant = build_variant
         self._run_build_variant = run_build_variant
@@ -174,6 +176,7 @@ class GenerateConfig(object):
         self.project = project
         self.task_id = task_id
         self.use_multiversion = use_multiversion
+        self.runtime_history_file = runtime_history_file
 
     @property
     def run_build_variant(self):
@@ -525,7 +528,7 @@ def _generate_timeouts(repeat_config: RepeatConfig, test: str,
 
 
 def _get_task_runtime_history(evg_api: Optional[EvergreenApi], project: str, task: str,
-                              variant: str):
+                              variant: str, runtime_history_file: Optional[str] = None):
     """
     Fetch historical average runtime for all tests in a task from Evergreen API.
 
@@ -533,13 +536,20 @@ def _get_task_runtime_history(evg_api: Optional[EvergreenApi], project: str, tas
     :param project: Project name.
     :param task: Task name.
     :param variant: Variant name.
+    :param runtime_history_file: File to keep the test runtime history in, which is used without
+        the Evergreen API if it isn't available.
     :return: Test historical runtimes, parsed into teststat objects.
     """
-    if not evg_api:
+    if not evg_api and not runtime_history_file:
         return []
 
     try:
         end_date = datetime.datetime.utcnow().replace(microsecond=0)
+        if runtime_history_file:
+            data = runtime_history.get_test_stats(evg_api, runtime_history_file, project, task,
+                                                  variant, end_date, AVG_TEST_RUNTIME_ANALYSIS_DAYS)
+            return TestStats(data).get_tests_runtimes()
+
         start_date = end_date - datetime.timedelta(days=AVG_TEST_RUNTIME_ANALYSIS_DAYS)
         data = evg_api.test_stats_by_project(project, after_date=start_date.strftime("%Y-%m-%d"),
                                              before_date=end_date.strftime("%Y-%m-%d"),
@@ -576,10 +586,14 @@ def create_generate_tasks_config(
     """
     task_list = TaskList(evg_config)
     resmoke_options = repeat_config.generate_resmoke_options()
+    random_multiversion_tasks = None
     for task in sorted(tests_by_task):
+        if random_multiversion_tasks is None:
+            random_multiversion_tasks = set(
+                evg_project_config.get_task_names_by_tag(RANDOM_MULTIVERSION_REPLSETS_TAG))
         test_list = tests_by_task[task]["tests"]
         for index, test in enumerate(test_list):
-            if task in evg_project_config.get_task_names_by_tag(RANDOM_MULTIVERSION_REPLSETS_TAG):
+            if task in random_multiversion_tasks:
                 # Exclude files that should be blacklisted from multiversion testing.
                 files_to_exclude = gen_multiversion.get_exclude_files(task, TASK_PATH_SUFFIX)
                 if test in files_to_exclude:
@@ -588,7 +602,8 @@ def create_generate_tasks_config(
                     continue
             multiversion_path = tests_by_task[task].get("use_multiversion")
             task_runtime_stats = _get_task_runtime_history(evg_api, generate_config.project, task,
-                                                           generate_config.build_variant)
+                                                           generate_config.build_variant,
+                                                           generate_config.runtime_history_file)
             resmoke_args = tests_by_task[task]["resmoke_args"]
             distro = tests_by_task[task].get("distro", generate_config.distro)
             # Evergreen always uses a unix shell, even on Windows, so instead of using os.path.join
@@ -701,20 +716,26 @@ def create_task_list_for_tests(
     return create_task_list(evg_conf, build_variant, tests_by_executor, exclude_tasks)
 
 
-def create_tests_by_task(build_variant: str, repo: Repo, evg_conf: EvergreenProjectConfig) -> Dict:
+def create_tests_by_task(build_variant: str, repo: Repo, evg_conf: EvergreenProjectConfig,
+                         suite_index_file: Optional[str] = None) -> Dict:
     """
     Create a list of tests by task.
 
     :param build_variant: Build variant to collect tasks from.
     :param repo: Git repo being tracked.
     :param evg_conf: Evergreen configuration.
+    :param suite_index_file: File to look up the suites that run each test in, see resmoke.py's
+        --testSuiteIndexFile.
     :return: Tests by task.
     """
     changed_tests = find_changed_tests(repo)
     exclude_suites, exclude_tasks, exclude_tests = find_excludes(SELECTOR_FILE)
     changed_tests = filter_tests(changed_tests, exclude_tests)
 
-    buildscripts.resmokelib.parser.set_options()
+    resmoke_options = ""
+    if suite_index_file:
+        resmoke_options = "--testSuiteIndexFile={}".format(shlex.quote(suite_index_file))
+    buildscripts.resmokelib.parser.set_options(resmoke_options)
     if changed_tests:
         return create_task_list_for_tests(changed_tests, build_variant, evg_conf, exclude_suites,
                                           exclude_tasks)
@@ -810,7 +831,7 @@ def _get_evg_api(evg_api_config: str, local_mode: bool) -> Optional[EvergreenApi
 
 def burn_in(repeat_config: RepeatConfig, generate_config: GenerateConfig, resmoke_args: str,
             generate_tasks_file: str, no_exec: bool, evg_conf: EvergreenProjectConfig, repo: Repo,
-            evg_api: EvergreenApi):
+            evg_api: EvergreenApi, suite_index_file: Optional[str] = None):
     """
     Run burn_in_tests with the given configuration.
 
@@ -822,11 +843,13 @@ def burn_in(repeat_config: RepeatConfig, generate_config: GenerateConfig, resmok
     :param evg_conf: Evergreen configuration.
     :param repo: Git repository.
     :param evg_api: Evergreen API client.
+    :param suite_index_file: File to look up the suites that run each test in.
     """
     # Populate the config values in order to use the helpers from resmokelib.suitesconfig.
     resmoke_cmd = _set_resmoke_cmd(repeat_config, list(resmoke_args))
 
-    tests_by_task = create_tests_by_task(generate_config.build_variant, repo, evg_conf)
+    tests_by_task = create_tests_by_task(generate_config.build_variant, repo, evg_conf,
+                                         suite_index_file)
     LOGGER.debug("tests and tasks found", tests_by_task=tests_by_task)
 
     if generate_tasks_file:
@@ -878,11 +901,19 @@ def burn_in(repeat_config: RepeatConfig, generate_config: GenerateConfig, resmok
               help="Generate burn in tests for multiversion passthrough suites only.")
 @click.option("--task_id", "task_id", default=None, metavar='TASK_ID',
               help="The evergreen task id.")
+@click.option("--suite-index-file", "suite_index_file", default=None, metavar="FILE",
+              help="Look up the suites that run the changed tests in this index, which is updated"
+              " for the suites and tests that changed since it was written.")
+@click.option("--runtime-history-file", "runtime_history_file", default=None, metavar="FILE",
+              help="Keep the test runtime history of the tasks in this file, so only the days"
+              " since the last run are fetched from Evergreen and it is used when Evergreen is"
+              " unavailable.")
 @click.argument("resmoke_args", nargs=-1, type=click.UNPROCESSED)
 # pylint: disable=too-many-arguments,too-many-locals
 def main(build_variant, run_build_variant, distro, project, generate_tasks_file, no_exec,
          repeat_tests_num, repeat_tests_min, repeat_tests_max, repeat_tests_secs, resmoke_args,
-         local_mode, evg_api_config, verbose, use_multiversion, task_id):
+         local_mode, evg_api_config, verbose, use_multiversion, task_id, suite_index_file,
+         runtime_history_file):
     """
     Run new or changed tests in repeated mode to validate their stability.
 
@@ -930,10 +961,12 @@ def main(build_variant, run_build_variant, distro, project, generate_tasks_file,
     :param local_mode: Don't call out to the evergreen API (used for testing).
     :param evg_api_config: Location of configuration file to connect to evergreen.
     :param verbose: Log extra debug information.
+    :param suite_index_file: Index of the suites that run each test.
+    :param runtime_history_file: Local store of the test runtime history of tasks.
     """
     _configure_logging(verbose)
 
-    evg_conf = parse_evergreen_file(EVERGREEN_FILE)
+    evg_conf = parse_evergreen_file(EVERGREEN_FILE, cache_dir=DEFAULT_CACHE_DIR)
     repeat_config = RepeatConfig(repeat_tests_secs=repeat_tests_secs,
                                  repeat_tests_min=repeat_tests_min,
                                  repeat_tests_max=repeat_tests_max,
@@ -944,14 +977,15 @@ def main(build_variant, run_build_variant, distro, project, generate_tasks_file,
                                      distro=distro,
                                      project=project,
                                      task_id=task_id,
-                                     use_multiversion=use_multiversion)  # yapf: disable
+                                     use_multiversion=use_multiversion,
+                                     runtime_history_file=runtime_history_file)  # yapf: disable
     generate_config.validate(evg_conf, local_mode)
 
     evg_api = _get_evg_api(evg_api_config, local_mode)
     repo = Repo(".")
 
     burn_in(repeat_config, generate_config, resmoke_args, generate_tasks_file, no_exec, evg_conf,
-            repo, evg_api)
+            repo, evg_api, suite_index_file)
 
 
 if __name__ == "__main__":
@@ -6,15 +6,40 @@ configuration file.
 
 import datetime
 import distutils.spawn  # pylint: disable=no-name-in-module
+import hashlib
+import json
+import os
 import re
+import tempfile
 
 import yaml
 
 import buildscripts.util.runcommand as runcommand
 
+# Directory the evaluated project configurations can be cached in, keyed by the hash of their file.
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "build",
+    "evergreen_config_cache")
+# Bumped whenever the evaluation or the indexes change so that older cache entries are ignored.
+_CACHE_VERSION = 1
 
-def parse_evergreen_file(path, evergreen_binary="evergreen"):
-    """Read an Evergreen file and return EvergreenProjectConfig instance."""
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def parse_evergreen_file(path, evergreen_binary=None, cache_dir=None):
+    """
+    Read an Evergreen file and return EvergreenProjectConfig instance.
+
+    The file is evaluated in-process by default, see evaluate_project_config(). If 'cache_dir' is
+    given, e.g. DEFAULT_CACHE_DIR, the result is cached in it so that later calls for the same file
+    contents only load the cache.
+
+    :param path: Path to the project configuration file.
+    :param evergreen_binary: Evergreen binary to evaluate the file with 'evergreen evaluate'
+        instead, or None to evaluate it in-process.
+    :param cache_dir: Directory to cache the in-process evaluation in, or None to not cache it.
+    :return: EvergreenProjectConfig of the file.
+    """
     if evergreen_binary:
         if not distutils.spawn.find_executable(evergreen_binary):
             raise EnvironmentError(
@@ -27,19 +52,185 @@ def parse_evergreen_file(path, evergreen_binary="evergreen"):
         error_code, output = cmd.execute()
         if error_code:
             raise RuntimeError("Unable to evaluate {}: {}".format(path, output))
-        config = yaml.safe_load(output)
-    else:
-        with open(path, "r") as fstream:
-            config = yaml.safe_load(fstream)
+        return EvergreenProjectConfig(yaml.load(output, Loader=_YAML_LOADER))
+
+    with open(path, "rb") as fstream:
+        contents = fstream.read()
+
+    cache_file = None
+    if cache_dir:
+        digest = hashlib.sha1(contents).hexdigest()
+        cache_file = os.path.join(cache_dir, "{}.v{}.json".format(digest, _CACHE_VERSION))
+        cached = _read_cache_file(cache_file)
+        if cached is not None:
+            return EvergreenProjectConfig(cached["config"], cached["indexes"])
+
+    config = EvergreenProjectConfig(
+        evaluate_project_config(yaml.load(contents, Loader=_YAML_LOADER)))
+    if cache_file:
+        _write_cache_file(cache_file, {"config": config.raw, "indexes": config.indexes})
+    return config
+
+
+def _read_cache_file(cache_file):
+    """Return the contents of the cache file, or None if it doesn't exist or can't be read."""
+    try:
+        with open(cache_file, "r") as fstream:
+            return json.load(fstream)
+    except (IOError, ValueError):
+        return None
 
-    return EvergreenProjectConfig(config)
+
+def _write_cache_file(cache_file, contents):
+    """Write the cache file atomically, ignoring errors since the cache is only an optimization."""
+    try:
+        cache_dir = os.path.dirname(cache_file)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+        (fd, tmp_file) = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "w") as fstream:
+            json.dump(contents, fstream)
+        os.replace(tmp_file, cache_file)
+    except (OSError, TypeError, ValueError):
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def _matches_criterion(task, criterion):
+    """Return whether the task meets a criterion of a task selector, ignoring its negation."""
+    if criterion == "*":
+        return True
+    if criterion.startswith("."):
+        return criterion[1:] in task.tags
+    return criterion == task.name
+
+
+def _match_selector(selector, tasks):
+    """
+    Return the names of the tasks matched by an Evergreen task selector.
+
+    A selector is a list of criteria separated by spaces, each being a task name, a tag prefixed by
+    '.', or '*' for all tasks, optionally negated by a '!' prefix. A task is matched if it meets all
+    the criteria.
+
+    :param selector: Task selector, e.g. '.jscore .common !.compat'.
+    :param tasks: List of Task instances of the project.
+    :return: List of the matched task names, in the order the tasks are defined.
+    """
+    matched = tasks
+    for criterion in selector.split():
+        negated = criterion.startswith("!")
+        if negated:
+            criterion = criterion[1:]
+        matched = [task for task in matched if _matches_criterion(task, criterion) != negated]
+    return [task.name for task in matched]
+
+
+def _is_selector(name):
+    """Return whether 'name' is a task selector rather than the name of a task or task group."""
+    return name == "*" or name.startswith((".", "!")) or " " in name.strip()
+
+
+def _expand_selectors(names, tasks):
+    """Return 'names' with the task selectors replaced by the tasks they match, without repeats."""
+    expanded = []
+    for name in names:
+        new_names = _match_selector(name, tasks) if _is_selector(name) else [name]
+        expanded.extend(new_name for new_name in new_names if new_name not in expanded)
+    return expanded
+
+
+def evaluate_project_config(config):
+    """
+    Evaluate the project configuration the way 'evergreen evaluate' does for what the repo uses.
+
+    YAML anchors and aliases are resolved when the file is loaded. The task selectors in the task
+    lists of the build variants and of their display tasks are replaced by the tasks they match.
+    Functions and task groups are kept as is, like 'evergreen evaluate' does, since Task and Variant
+    look them up by name. Matrix variants aren't used by the project and aren't supported.
+
+    :param config: Project configuration as loaded from the YAML file.
+    :return: Evaluated project configuration.
+    """
+    if "axes" in config or any("matrix_name" in variant for variant in config["buildvariants"]):
+        raise RuntimeError("Matrix build variants can only be evaluated by the evergreen binary")
+
+    tasks = [Task(task_dict) for task_dict in config["tasks"]]
+    variants = []
+    for variant_dict in config["buildvariants"]:
+        variant_dict = dict(variant_dict)
+        variant_tasks = []
+        for task in variant_dict["tasks"]:
+            if _is_selector(task["name"]):
+                variant_tasks.extend(
+                    dict(task, name=task_name)
+                    for task_name in _match_selector(task["name"], tasks))
+            else:
+                variant_tasks.append(task)
+        task_names = set()
+        variant_dict["tasks"] = []
+        for task in variant_tasks:
+            if task["name"] not in task_names:
+                task_names.add(task["name"])
+                variant_dict["tasks"].append(task)
+
+        if "display_tasks" in variant_dict:
+            variant_dict["display_tasks"] = [
+                dict(
+                    display_task, execution_tasks=_expand_selectors(
+                        display_task.get("execution_tasks", []), tasks))
+                for display_task in variant_dict["display_tasks"]
+            ]
+        variants.append(variant_dict)
+
+    return dict(config, buildvariants=variants)
+
+
+def _build_indexes(tasks):
+    """
+    Build the indexes of an EvergreenProjectConfig.
+
+    :param tasks: List of Task instances of the project.
+    :return: Dict of the task names by tag, of the task names by generated task name, and of the
+        task names by resmoke suite.
+    """
+    tasks_by_tag = {}
+    tasks_by_generated_name = {}
+    tasks_by_suite = {}
+    for task in tasks:
+        for tag in sorted(task.tags):
+            tasks_by_tag.setdefault(tag, []).append(task.name)
+        if task.is_generate_resmoke_task:
+            tasks_by_generated_name.setdefault(task.generated_task_name, task.name)
+        try:
+            suite = task.resmoke_suite
+        except RuntimeError:
+            suite = None
+        if suite:
+            tasks_by_suite.setdefault(suite, []).append(task.name)
+    return {
+        "tasks_by_tag": tasks_by_tag,
+        "tasks_by_generated_name": tasks_by_generated_name,
+        "tasks_by_suite": tasks_by_suite,
+    }
 
 
 class EvergreenProjectConfig(object):  # pylint: disable=too-many-instance-attributes
     """Represent an Evergreen project configuration file."""
 
-    def __init__(self, conf):
-        """Initialize the EvergreenProjectConfig from a YML dictionary."""
+    def __init__(self, conf, indexes=None):
+        """
+        Initialize the EvergreenProjectConfig from a YML dictionary.
+
+        :param conf: Evaluated project configuration.
+        :param indexes: Indexes of the tasks built by a previous instance, or None to build them.
+        """
         self._conf = conf
         self.tasks = [Task(task_dict) for task_dict in self._conf["tasks"]]
         self._tasks_by_name = {task.name: task for task in self.tasks}
@@ -55,6 +246,17 @@ class EvergreenProjectConfig(object):  # pylint: disable=too-many-instance-attri
         self.distro_names = set()
         for variant in self.variants:
             self.distro_names.update(variant.distro_names)
+        self._indexes = indexes if indexes is not None else _build_indexes(self.tasks)
+
+    @property
+    def raw(self):
+        """Get the evaluated project configuration."""
+        return self._conf
+
+    @property
+    def indexes(self):
+        """Get the indexes of the tasks, as cached by parse_evergreen_file()."""
+        return self._indexes
 
     @property
     def task_names(self):
@@ -85,7 +287,16 @@ class EvergreenProjectConfig(object):  # pylint: disable=too-many-instance-attri
 
     def get_task_names_by_tag(self, tag):
         """Return the list of tasks that have the given tag."""
-        return list(task.name for task in self.tasks if tag in task.tags)
+        return list(self._indexes["tasks_by_tag"].get(tag, []))
+
+    def get_task_by_generated_name(self, generated_task_name):
+        """Return the _gen task generating the tasks of the given name, or None."""
+        task_name = self._indexes["tasks_by_generated_name"].get(generated_task_name)
+        return self._tasks_by_name.get(task_name)
+
+    def get_task_names_by_suite(self, suite_name):
+        """Return the list of tasks that run the given resmoke suite."""
+        return list(self._indexes["tasks_by_suite"].get(suite_name, []))
 
 
 class Task(object):
@@ -94,6 +305,7 @@ class Task(object):
     def __init__(self, conf_dict):
         """Initialize a Task from a dictionary containing its configuration."""
         self.raw = conf_dict
+        self._func_commands = None
 
     @property
     def name(self):
@@ -107,10 +319,11 @@ class Task(object):
 
     def _find_func_command(self, func_command):
         """Return the 'func_command' if found, or None."""
-        for command in self.raw.get("commands", []):
-            if command.get("func") == func_command:
-                return command
-        return None
+        if self._func_commands is None:
+            self._func_commands = {}
+            for command in self.raw.get("commands", []):
+                self._func_commands.setdefault(command.get("func"), command)
+        return self._func_commands.get(func_command)
 
     @property
     def generate_resmoke_tasks_command(self):
@@ -260,8 +473,10 @@ class Variant(object):
                 self.tasks.append(
                     VariantTask(task_map.get(task["name"]), task.get("distros", run_on), self))
         self.distro_names = set(run_on)
+        self._tasks_by_name = {}
         for task in self.tasks:
             self.distro_names.update(task.run_on)
+            self._tasks_by_name.setdefault(task.name, task)
 
     def __repr__(self):
         """Create a string version of object for debugging."""
@@ -308,10 +523,7 @@ class Variant(object):
 
         Return None if this variant does not run the task.
         """
-        for task in self.tasks:
-            if task.name == task_name:
-                return task
-        return None
+        return self._tasks_by_name.get(task_name)
 
     def __str__(self):
         return self.name
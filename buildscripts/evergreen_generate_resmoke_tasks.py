@@ -35,6 +35,7 @@ if __name__ == "__main__" and __package__ is None:
 import buildscripts.resmokelib.parser as _parser  # pylint: disable=wrong-import-position
 import buildscripts.resmokelib.suitesconfig as suitesconfig  # pylint: disable=wrong-import-position
 import buildscripts.util.read_config as read_config  # pylint: disable=wrong-import-position
+import buildscripts.util.runtime_history as runtime_history  # pylint: disable=wrong-import-position
 import buildscripts.util.taskname as taskname  # pylint: disable=wrong-import-position
 import buildscripts.util.teststats as teststats  # pylint: disable=wrong-import-position
 
@@ -50,6 +51,11 @@ CONFIG_FILE = "./.evergreen.yml"
 MIN_TIMEOUT_SECONDS = int(timedelta(minutes=5).total_seconds())
 MAX_EXPECTED_TIMEOUT = int(timedelta(hours=48).total_seconds())
 LOOKBACK_DURATION_DAYS = 14
+# Maximum number of moves or swaps of tests applied to shorten the longest sub-suite.
+MAX_REFINEMENT_ITERATIONS = 1000
+# Number of standard deviations of its daily runtimes added to the runtime of each test when
+# dividing the tests into suites, so that suites of tests with unsteady runtimes have room to spare.
+RUNTIME_STDDEV_MARGIN = 1
 GEN_SUFFIX = "_gen"
 
 HEADER_TEMPLATE = """# DO NOT EDIT THIS FILE. All manual edits will be lost.
@@ -249,48 +255,149 @@ def string_contains_any_of_args(string, args):
     return any(arg in string for arg in args)
 
 
-def divide_remaining_tests_among_suites(remaining_tests_runtimes, suites):
-    """Divide the list of tests given among the suites given."""
-    suite_idx = 0
-    for test_file, runtime in remaining_tests_runtimes:
-        current_suite = suites[suite_idx]
-        current_suite.add_test(test_file, runtime)
-        suite_idx += 1
-        if suite_idx >= len(suites):
-            suite_idx = 0
+def _place_tests(tests_runtimes, num_suites, max_tests_per_suite):
+    """
+    Place the tests into 'num_suites' groups with the longest processing time first rule.
 
+    Each test, from the longest to the shortest, goes to the group with the least runtime that
+    still has room for it.
 
-def _new_suite_needed(current_suite, test_runtime, max_suite_runtime, max_tests_per_suite):
+    :param tests_runtimes: List of tuples containing test names and test runtimes, ordered by
+        decreasing runtime.
+    :param num_suites: Number of groups to place the tests into.
+    :param max_tests_per_suite: Maximum number of tests in a group, or None.
+    :return: List of the lists of tests and runtimes in each group.
     """
-    Check if a new suite should be created for the given suite.
+    groups = [[] for _ in range(num_suites)]
+    runtimes = [0] * num_suites
+    for test_file, runtime in tests_runtimes:
+        candidates = [
+            idx for idx in range(num_suites)
+            if not max_tests_per_suite or len(groups[idx]) < max_tests_per_suite
+        ]
+        idx = min(candidates, key=lambda idx: (runtimes[idx], len(groups[idx]), idx))
+        groups[idx].append((test_file, runtime))
+        runtimes[idx] += runtime
+    return groups
+
+
+def _find_improving_exchange(longest, other, max_tests_per_suite):
+    """
+    Find the move or swap of tests between 2 groups that most reduces the longer runtime of the two.
+
+    :param longest: Tests and runtimes of the group with the longest runtime.
+    :param other: Tests and runtimes of another group.
+    :param max_tests_per_suite: Maximum number of tests in a group, or None.
+    :return: Tuple of the new longer runtime of the two groups, the index of the test to take from
+        'longest', and the index of the test to give back from 'other' or None; or None if no
+        exchange reduces the runtime of 'longest' without making 'other' as long.
+    """
+    longest_runtime = sum(runtime for _, runtime in longest)
+    other_runtime = sum(runtime for _, runtime in other)
+    best = None
+
+    def consider(delta, longest_idx, other_idx):
+        nonlocal best
+        if delta <= 0 or other_runtime + delta >= longest_runtime:
+            return
+        new_runtime = max(longest_runtime - delta, other_runtime + delta)
+        if best is None or new_runtime < best[0]:
+            best = (new_runtime, longest_idx, other_idx)
+
+    can_move = not max_tests_per_suite or len(other) < max_tests_per_suite
+    for longest_idx, (_, longest_test_runtime) in enumerate(longest):
+        if can_move and len(longest) > 1:
+            consider(longest_test_runtime, longest_idx, None)
+        for other_idx, (_, other_test_runtime) in enumerate(other):
+            consider(longest_test_runtime - other_test_runtime, longest_idx, other_idx)
+    return best
 
-    :param current_suite: Suite currently being added to.
-    :param test_runtime: Runtime of test being added.
-    :param max_suite_runtime: Max runtime of a single suite.
-    :param max_tests_per_suite: Max number of tests in a suite.
-    :return: True if a new test suite should be created.
+
+def _refine_placement(groups, max_tests_per_suite, max_iterations=MAX_REFINEMENT_ITERATIONS):
     """
-    if current_suite.get_runtime() + test_runtime > max_suite_runtime:
-        # Will adding this test put us over the target runtime?
-        return True
+    Shorten the longest group by moving or swapping its tests with the other groups.
 
-    if max_tests_per_suite and current_suite.get_test_count() + 1 > max_tests_per_suite:
-        # Will adding this test put us over the max number of tests?
-        return True
+    Each iteration applies the exchange between the longest group and another group that leaves the
+    shortest runtime for the longer of the two. The refinement stops once no exchange shortens the
+    longest group.
 
-    return False
+    :param groups: List of the lists of tests and runtimes in each group, updated in place.
+    :param max_tests_per_suite: Maximum number of tests in a group, or None.
+    :param max_iterations: Maximum number of exchanges to apply.
+    """
+    for _ in range(max_iterations):
+        runtimes = [sum(runtime for _, runtime in group) for group in groups]
+        longest_idx = max(range(len(groups)), key=lambda idx: runtimes[idx])
+        best = None
+        for other_idx, other in enumerate(groups):
+            if other_idx == longest_idx:
+                continue
+            exchange = _find_improving_exchange(groups[longest_idx], other, max_tests_per_suite)
+            if exchange and (best is None or exchange[0] < best[1][0]):
+                best = (other_idx, exchange)
+
+        if best is None:
+            return
+
+        other_idx, (_, taken_idx, given_idx) = best
+        longest, other = groups[longest_idx], groups[other_idx]
+        taken = longest.pop(taken_idx)
+        if given_idx is not None:
+            longest.append(other.pop(given_idx))
+        other.append(taken)
+
+
+def _balance_tests(tests_runtimes, num_suites, max_tests_per_suite):
+    """
+    Divide the tests into 'num_suites' groups so the longest group has as short a runtime as we can.
+
+    :param tests_runtimes: List of tuples containing test names and test runtimes, ordered by
+        decreasing runtime.
+    :param num_suites: Number of groups to divide the tests into.
+    :param max_tests_per_suite: Maximum number of tests in a group, or None.
+    :return: List of the lists of tests and runtimes in each group, ordered by decreasing runtime
+        within each group.
+    """
+    groups = _place_tests(tests_runtimes, num_suites, max_tests_per_suite)
+    _refine_placement(groups, max_tests_per_suite)
+    return [
+        sorted(group, key=lambda test: test[1], reverse=True) for group in groups if group
+    ]
+
+
+def _min_suites_needed(tests_runtimes, max_suite_runtime, max_tests_per_suite):
+    """
+    Determine a lower bound on the number of suites needed to run the tests within the runtime.
+
+    Tests longer than `max_suite_runtime` will run in a suite on their own.
+
+    :param tests_runtimes: List of tuples containing test names and test runtimes.
+    :param max_suite_runtime: Max runtime of the tests of a single suite.
+    :param max_tests_per_suite: Max number of tests in a suite, or None.
+    :return: Minimum number of suites to divide the tests into.
+    """
+    long_tests = [runtime for _, runtime in tests_runtimes if runtime >= max_suite_runtime]
+    remaining_runtime = sum(runtime for _, runtime in tests_runtimes) - sum(long_tests)
+    num_suites = len(long_tests)
+    if max_suite_runtime > 0:
+        num_suites += int(math.ceil(remaining_runtime / max_suite_runtime))
+    if max_tests_per_suite:
+        num_suites = max(num_suites, int(math.ceil(len(tests_runtimes) / max_tests_per_suite)))
+    return max(num_suites, 1)
 
 
 def divide_tests_into_suites(suite_name, tests_runtimes, max_time_seconds, max_suites=None,
-                             max_tests_per_suite=None):
+                             max_tests_per_suite=None, suite_overhead_seconds=0):
     """
     Divide the given tests into suites.
 
     Each suite should be able to execute in less than the max time specified. If a single
     test has a runtime greater than `max_time_seconds`, it will be run in a suite on its own.
 
-    If max_suites is reached before assigning all tests to a suite, the remaining tests will be
-    divided up among the created suites.
+    The fewest suites the tests could fit in are tried first, adding suites until the longest one
+    fits in the max time. For a given number of suites, the tests are placed longest first into the
+    suite with the least runtime, then tests are moved or swapped out of the longest suite while
+    that makes it shorter.
 
     Note: If `max_suites` is hit, suites may have more tests than `max_tests_per_suite` and may have
     runtimes longer than `max_time_seconds`.
@@ -300,34 +407,52 @@ def divide_tests_into_suites(suite_name, tests_runtimes, max_time_seconds, max_s
     :param max_time_seconds: Maximum runtime to add to a single bucket.
     :param max_suites: Maximum number of suites to create.
     :param max_tests_per_suite: Maximum number of tests to add to a single suite.
+    :param suite_overhead_seconds: Runtime every suite spends outside of its tests, such as setting
+        up and tearing down its fixture.
     :return: List of Suite objects representing grouping of tests.
     """
-    suites = []
-    current_suite = Suite(suite_name)
-    last_test_processed = len(tests_runtimes)
     LOGGER.debug("Determines suites for runtime", max_runtime_seconds=max_time_seconds,
-                 max_suites=max_suites, max_tests_per_suite=max_tests_per_suite)
-    for idx, (test_file, runtime) in enumerate(tests_runtimes):
-        LOGGER.debug("Adding test", test=test_file, test_runtime=runtime)
-        if _new_suite_needed(current_suite, runtime, max_time_seconds, max_tests_per_suite):
-            LOGGER.debug("Finished suite", suite_runtime=current_suite.get_runtime(),
-                         test_runtime=runtime, max_time=max_time_seconds)
-            if current_suite.get_test_count() > 0:
-                suites.append(current_suite)
-                current_suite = Suite(suite_name)
-                if max_suites and len(suites) >= max_suites:
-                    last_test_processed = idx
-                    break
-
-        current_suite.add_test(test_file, runtime)
-
-    if current_suite.get_test_count() > 0:
-        suites.append(current_suite)
-
-    if max_suites and last_test_processed < len(tests_runtimes):
-        # We must have hit the max suite limit, just randomly add the remaining tests to suites.
-        divide_remaining_tests_among_suites(tests_runtimes[last_test_processed:], suites)
+                 max_suites=max_suites, max_tests_per_suite=max_tests_per_suite,
+                 suite_overhead_seconds=suite_overhead_seconds)
+    if not tests_runtimes:
+        return []
+
+    tests_runtimes = sorted(tests_runtimes, key=lambda test: test[1], reverse=True)
+    max_tests_runtime = max_time_seconds - suite_overhead_seconds
+    longest_test_runtime = tests_runtimes[0][1]
+
+    max_num_suites = len(tests_runtimes)
+    if max_suites:
+        max_num_suites = min(max_num_suites, max_suites)
+    num_suites = min(
+        _min_suites_needed(tests_runtimes, max_tests_runtime, max_tests_per_suite), max_num_suites)
+
+    # Once `max_suites` is hit the tests can't all fit in `max_tests_per_suite`, so they are spread
+    # as evenly as possible instead.
+    tests_per_suite_limit = max_tests_per_suite
+    if max_tests_per_suite and num_suites * max_tests_per_suite < len(tests_runtimes):
+        tests_per_suite_limit = int(math.ceil(len(tests_runtimes) / num_suites))
+
+    while True:
+        groups = _balance_tests(tests_runtimes, num_suites, tests_per_suite_limit)
+        makespan = max(sum(runtime for _, runtime in group) for group in groups)
+        LOGGER.debug("Balanced tests among suites", num_suites=num_suites,
+                     tests_runtime=makespan)
+        if (makespan <= max_tests_runtime or makespan <= longest_test_runtime
+                or num_suites >= max_num_suites):
+            break
+        num_suites += 1
 
+    suites = []
+    for group in sorted(groups, key=lambda group: group[0][1], reverse=True):
+        suite = Suite(suite_name)
+        for test_file, runtime in group:
+            suite.add_test(test_file, runtime)
+        suites.append(suite)
+
+    LOGGER.info("Divided tests into suites", suite=suite_name, num_suites=len(suites),
+                predicted_makespan_seconds=makespan + suite_overhead_seconds,
+                max_time_seconds=max_time_seconds)
     return suites
 
 
@@ -710,6 +835,11 @@ class GenerateSubSuites(object):
         # pylint: disable=too-many-arguments
 
         days = (end_date - start_date).days
+        if self.config_options.test_runtime_history_file:
+            # The daily statistics are kept locally, and weighted by how recent they are.
+            return runtime_history.get_test_stats(self.evergreen_api,
+                                                  self.config_options.test_runtime_history_file,
+                                                  project, task, variant, end_date, days)
         return self.evergreen_api.test_stats_by_project(
             project, after_date=start_date.strftime("%Y-%m-%d"),
             before_date=end_date.strftime("%Y-%m-%d"), tasks=[task], variants=[variant],
@@ -722,10 +852,18 @@ class GenerateSubSuites(object):
         if not tests_runtimes:
             LOGGER.debug("No test runtimes after filter, using fallback")
             return self.calculate_fallback_suites()
+        variances = test_stats.get_tests_runtime_variances()
+        tests_runtimes = [
+            teststats.TestRuntime(
+                test_name=info.test_name, runtime=info.runtime +
+                RUNTIME_STDDEV_MARGIN * math.sqrt(variances.get(info.test_name, 0)))
+            for info in tests_runtimes
+        ]
         self.test_list = [info.test_name for info in tests_runtimes]
         return divide_tests_into_suites(self.config_options.suite, tests_runtimes,
                                         execution_time_secs, self.config_options.max_sub_suites,
-                                        self.config_options.max_tests_per_suite)
+                                        self.config_options.max_tests_per_suite,
+                                        test_stats.get_fixture_runtime())
 
     def filter_existing_tests(self, tests_runtimes):
         """Filter out tests that do not exist in the filesystem."""
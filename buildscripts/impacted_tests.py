@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Command line utility for determining the tests impacted by changes to the C++ source files."""
+
+import json
+import logging
+import os
+import sys
+from typing import Dict, List
+
+import click
+import structlog
+from git import Repo
+
+# Get relative imports to work when the package is not installed on the PYTHONPATH.
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+import buildscripts.resmokelib.parser as _parser
+from buildscripts.resmokelib import suitesconfig
+from buildscripts.patch_builds.change_data import find_changed_files
+from buildscripts.patch_builds.change_impact import BINARY_TEST_KINDS, CoverageMap, \
+    DependencyGraph, find_impacted_tests
+# pylint: enable=wrong-import-position
+
+LOGGER = structlog.getLogger(__name__)
+EXTERNAL_LOGGERS = {
+    "git",
+}
+
+
+def _configure_logging(verbose: bool):
+    """
+    Configure logging for the application.
+
+    :param verbose: If True set log level to DEBUG.
+    """
+    level = logging.DEBUG if verbose else logging.INFO
+    logging.basicConfig(
+        format="[%(asctime)s - %(name)s - %(levelname)s] %(message)s",
+        level=level,
+        stream=sys.stderr,
+    )
+    for log_name in EXTERNAL_LOGGERS:
+        logging.getLogger(log_name).setLevel(logging.WARNING)
+
+
+def _get_binaries_by_suite() -> Dict[str, List[str]]:
+    """Get the C++ test binaries run by each suite whose list of binaries was built."""
+    binaries_by_suite = {}
+    test_membership = suitesconfig.create_test_membership_map(test_kind=BINARY_TEST_KINDS)
+    for (binary, suites) in sorted(test_membership.items()):
+        for suite in suites:
+            binaries_by_suite.setdefault(suite, []).append(binary)
+    return binaries_by_suite
+
+
+@click.command()
+@click.option("--dependency-graph", "dependency_graph_file", default=None, metavar="FILE",
+              help="Dependency graph of the build written by 'scons dagger'.")
+@click.option("--coverage", "tracefiles", multiple=True, metavar="FILE",
+              help="lcov tracefile with the coverage of the suites or C++ test binaries named by"
+              " its test names. Can be specified multiple times.")
+@click.option("--output", "output_file", default=None, metavar="FILE",
+              help="Write the impacted tests to this file instead of to stdout.")
+@click.option("--verbose", "verbose", default=False, is_flag=True, help="Enable extra logging.")
+@click.argument("changed_files", nargs=-1)
+def main(dependency_graph_file, tracefiles, output_file, verbose, changed_files):
+    """
+    Find the resmoke.py suites and C++ test binaries impacted by changes to the C++ source files.
+
+    The changed files default to the ones changed in the working tree, the index, and the untracked
+    files. The impacted tests are written as a JSON object of the names of the impacted suites to
+    the list of their impacted C++ test binaries, or to null if the entire suite is impacted, e.g.
+
+      resmoke.py run --suites=unittests <binaries>
+
+    runs the impacted binaries of the unittests suite. Changes to files other than C++ sources don't
+    impact any tests according to this script.
+    \f
+
+    :param dependency_graph_file: Dependency graph of the build.
+    :param tracefiles: lcov tracefiles of the suites or C++ test binaries.
+    :param output_file: File to write the impacted tests to.
+    :param verbose: Log extra debug information.
+    :param changed_files: Files changed by the patch.
+    """
+    _configure_logging(verbose)
+
+    if not changed_files:
+        changed_files = find_changed_files(Repo("."))
+
+    dependency_graph = None
+    if dependency_graph_file:
+        dependency_graph = DependencyGraph.from_file(dependency_graph_file)
+    coverage_map = CoverageMap.from_tracefiles(tracefiles) if tracefiles else None
+
+    _parser.set_options()
+    binaries_by_suite = _get_binaries_by_suite()
+    other_suites = [
+        suite for (test_kind, suites) in suitesconfig.get_named_suites_by_test_kind().items()
+        if test_kind not in BINARY_TEST_KINDS for suite in suites
+    ]
+
+    impacted_tests = find_impacted_tests(changed_files, binaries_by_suite, other_suites,
+                                         dependency_graph, coverage_map)
+    num_binaries = sum(len(binaries or []) for binaries in impacted_tests.values())
+    LOGGER.info("Found impacted tests", num_suites=len(impacted_tests), num_binaries=num_binaries)
+
+    contents = json.dumps(impacted_tests, indent=4, sort_keys=True)
+    if output_file:
+        with open(output_file, "w") as fh:
+            fh.write(contents + "\n")
+    else:
+        print(contents)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,295 @@
+"""Tools for finding the tests affected by changes to the C++ source files."""
+from collections import defaultdict, deque
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+import structlog
+
+LOGGER = structlog.get_logger(__name__)
+
+# Node and relationship types of the graph written by the dagger SCons tool, see
+# site_scons/site_tools/dagger/graph_consts.py.
+NODE_LIB = 1
+NODE_FILE = 3
+NODE_EXE = 4
+LIB_LIB = 1
+FIL_FIL = 4
+EXE_LIB = 8
+
+CPP_SOURCE_EXTENSIONS = (".c", ".cc", ".cpp", ".h", ".hpp", ".idl", ".inl")
+CPP_HEADER_EXTENSIONS = (".h", ".hpp", ".inl")
+BINARY_TEST_KINDS = ("cpp_integration_test", "cpp_unit_test")
+
+
+def is_cpp_source_file(path: str) -> bool:
+    """Return whether 'path' is a file compiled into the binaries."""
+    return os.path.splitext(path)[1] in CPP_SOURCE_EXTENSIONS
+
+
+def is_cpp_header_file(path: str) -> bool:
+    """Return whether 'path' is a header, which is compiled into the objects including it."""
+    return os.path.splitext(path)[1] in CPP_HEADER_EXTENSIONS
+
+
+def _relative_source_path(path: str) -> str:
+    """
+    Get the path of a source or object file relative to the source or build variant directory.
+
+    'src/mongo/db/foo.cpp' and 'build/opt/mongo/db/foo.o' both become 'mongo/db/foo.*', and
+    absolute paths, e.g. of lcov tracefiles, are relative to their last 'src' directory.
+
+    :param path: Path to a source or object file.
+    :return: Relative path in POSIX form.
+    """
+    parts = os.path.normpath(path).replace("\\", "/").split("/")
+    if "src" in parts:
+        return "/".join(parts[len(parts) - parts[::-1].index("src"):])
+    if parts[0] == "build":
+        return "/".join(parts[2:])
+    return "/".join(parts)
+
+
+def _object_stem(source_file: str) -> str:
+    """
+    Get the path, without extension, of the object file a source file is compiled into.
+
+    IDL files are compiled from the '_gen' source file generated for them.
+    """
+    (stem, ext) = os.path.splitext(_relative_source_path(source_file))
+    if ext == ".idl":
+        stem += "_gen"
+    return stem
+
+
+def _binary_name(path: str) -> str:
+    """Get the name of a binary, which is the same whether built or installed."""
+    name = os.path.basename(path.replace("\\", "/"))
+    if name.endswith(".exe"):
+        name = name[:-len(".exe")]
+    return name
+
+
+def _reachable(start: Iterable[str], edges: Dict[str, Set[str]]) -> Set[str]:
+    """Return the nodes reachable from 'start' by following 'edges', including 'start'."""
+    reached = set(start)
+    queue = deque(reached)
+    while queue:
+        node = queue.popleft()
+        for next_node in edges.get(node, ()):
+            if next_node not in reached:
+                reached.add(next_node)
+                queue.append(next_node)
+    return reached
+
+
+class DependencyGraph(object):
+    """The object files, libraries, and binaries of the build and their dependencies."""
+
+    def __init__(self, graph_data: Dict):
+        """
+        Create a DependencyGraph.
+
+        :param graph_data: Contents of the JSON graph written by 'scons dagger'.
+        """
+        self._objects_by_stem = defaultdict(set)
+        self._library_by_object = {}
+        self._binaries_by_object = defaultdict(set)
+        # The reverse of the dependency edges of the graph, e.g. from a library to the libraries
+        # linking against it.
+        self._dependent_objects = defaultdict(set)
+        self._dependent_libraries = defaultdict(set)
+        self._binaries_by_library = defaultdict(set)
+
+        for node_info in graph_data["nodes"]:
+            node = node_info["node"]
+            node_id = node_info["id"]
+            if node["type"] == NODE_FILE:
+                self._objects_by_stem[os.path.splitext(
+                    _relative_source_path(node_id))[0]].add(node_id)
+                if node.get("_lib"):
+                    self._library_by_object[node_id] = node["_lib"]
+            elif node["type"] == NODE_EXE:
+                for object_file in node.get("contained_files", []):
+                    self._binaries_by_object[object_file].add(_binary_name(node_id))
+
+        for edge in graph_data["edges"]:
+            from_node = edge["from_node"]["id"]
+            for to_node in (to_node["id"] for to_node in edge["to_node"]):
+                if edge["type"] == FIL_FIL:
+                    self._dependent_objects[to_node].add(from_node)
+                elif edge["type"] == LIB_LIB:
+                    self._dependent_libraries[to_node].add(from_node)
+                elif edge["type"] == EXE_LIB:
+                    self._binaries_by_library[to_node].add(_binary_name(from_node))
+
+    @classmethod
+    def from_file(cls, filename: str) -> "DependencyGraph":
+        """
+        Read the graph written by 'scons dagger'.
+
+        :param filename: Path to the graph, e.g. 'library_dependency_graph.json'.
+        :return: DependencyGraph of the build.
+        """
+        with open(filename) as fh:
+            return cls(json.load(fh))
+
+    def find_objects(self, source_file: str) -> Set[str]:
+        """
+        Get the object files built from 'source_file'.
+
+        The graph doesn't record which objects include a header, so none are found for headers.
+        """
+        if is_cpp_header_file(source_file):
+            return set()
+        return set(self._objects_by_stem.get(_object_stem(source_file), ()))
+
+    def find_impacted_binaries(self, source_files: Iterable[str]) -> Set[str]:
+        """
+        Find the binaries linking in code from the given source files.
+
+        The object files using the symbols of the changed object files, the libraries containing
+        any of them, and the libraries depending on those libraries are followed to the binaries.
+
+        :param source_files: Changed source files.
+        :return: Names of the impacted binaries.
+        """
+        objects = set()
+        for source_file in source_files:
+            objects.update(self.find_objects(source_file))
+        objects = _reachable(objects, self._dependent_objects)
+
+        libraries = {
+            self._library_by_object[obj]
+            for obj in objects if obj in self._library_by_object
+        }
+        libraries = _reachable(libraries, self._dependent_libraries)
+
+        binaries = set()
+        for obj in objects:
+            binaries.update(self._binaries_by_object.get(obj, ()))
+        for library in libraries:
+            binaries.update(self._binaries_by_library.get(library, ()))
+        return binaries
+
+
+class CoverageMap(object):
+    """The tests whose runs executed each source file, read from lcov tracefiles."""
+
+    def __init__(self):
+        """Create an empty CoverageMap."""
+        # Mapping from source file to the names of the tests that executed any of its lines. Files
+        # that were instrumented but never executed map to an empty set.
+        self._tests_by_source_file = defaultdict(set)
+
+    @classmethod
+    def from_tracefiles(cls, filenames: Iterable[str]) -> "CoverageMap":
+        """
+        Read the coverage of lcov tracefiles.
+
+        The test name ('TN:') of the records is the name of the resmoke.py suite or of the C++ test
+        binary that was run, e.g. as given to 'lcov --test-name'. Tracefiles without test names,
+        such as the ones combined by aggregate_tracefiles.py, are named after their file.
+
+        :param filenames: Paths to the tracefiles.
+        :return: CoverageMap of the tracefiles.
+        """
+        coverage_map = cls()
+        for filename in filenames:
+            with open(filename) as fh:
+                coverage_map.add_tracefile(fh, os.path.splitext(os.path.basename(filename))[0])
+        return coverage_map
+
+    def add_tracefile(self, lines: Iterable[str], default_test_name: str):
+        """
+        Add the coverage of the lines of a tracefile.
+
+        :param lines: Lines of the tracefile.
+        :param default_test_name: Name of the test for records without one.
+        """
+        test_name = default_test_name
+        source_file = None
+        executed = False
+        for line in lines:
+            line = line.strip()
+            if line.startswith("TN:"):
+                test_name = line[len("TN:"):] or default_test_name
+            elif line.startswith("SF:"):
+                source_file = _relative_source_path(line[len("SF:"):])
+                executed = False
+            elif line.startswith("DA:") and not executed:
+                # DA:<line number>,<execution count>[,<checksum>]
+                fields = line[len("DA:"):].split(",")
+                executed = len(fields) > 1 and fields[1] not in ("0", "-")
+            elif line == "end_of_record" and source_file is not None:
+                tests = self._tests_by_source_file[source_file]
+                if executed:
+                    tests.add(test_name)
+                source_file = None
+
+    def get_tests(self, source_file: str) -> Optional[Set[str]]:
+        """
+        Get the tests that executed the given source file.
+
+        :param source_file: Source file to query.
+        :return: Names of the tests, or None if the file wasn't instrumented (e.g. a new file).
+        """
+        tests = self._tests_by_source_file.get(_relative_source_path(source_file))
+        return set(tests) if tests is not None else None
+
+
+def find_impacted_tests(changed_files: Iterable[str], binaries_by_suite: Dict[str, List[str]],
+                        other_suites: Iterable[str],
+                        dependency_graph: Optional[DependencyGraph] = None,
+                        coverage_map: Optional[CoverageMap] = None) -> Dict[str, Optional[List]]:
+    """
+    Find the tests impacted by the changed C++ source files.
+
+    A C++ test binary is impacted if the dependency graph links code from a changed file into it
+    or if it executed a changed file according to the coverage map. Other suites, which run the
+    server binaries, are impacted if they executed a changed file according to the coverage map.
+
+    Changes whose impact can't be determined impact everything they could: all the test binaries
+    for files found in neither the dependency graph nor the coverage map, and all the other suites
+    for files missing from the coverage map. Since the dependency graph doesn't know which files
+    include a header, headers missing from the coverage map impact all the tests.
+
+    :param changed_files: Files changed by the patch. Files other than C++ sources are ignored.
+    :param binaries_by_suite: Dict of the suites running C++ test binaries to their binaries.
+    :param other_suites: Names of the other suites.
+    :param dependency_graph: Dependency graph of the build.
+    :param coverage_map: Coverage of the suites and test binaries.
+    :return: Dict of the impacted suites to their impacted binaries, or to None if the entire suite
+        is impacted.
+    """
+    # pylint: disable=too-many-branches
+    impacted_binaries = set()
+    impacted_suites = set()
+    all_binaries_impacted = False
+    all_suites_impacted = False
+
+    source_files = sorted(path for path in changed_files if is_cpp_source_file(path))
+    if dependency_graph is not None:
+        impacted_binaries.update(dependency_graph.find_impacted_binaries(source_files))
+
+    for source_file in source_files:
+        tests = coverage_map.get_tests(source_file) if coverage_map is not None else None
+        if tests is None:
+            LOGGER.info("No coverage for changed file", file=source_file)
+            all_suites_impacted = True
+            if dependency_graph is None or not dependency_graph.find_objects(source_file):
+                all_binaries_impacted = True
+            continue
+        impacted_binaries.update(tests)
+        impacted_suites.update(tests)
+
+    result = {}
+    for (suite, binaries) in binaries_by_suite.items():
+        if not all_binaries_impacted:
+            binaries = [binary for binary in binaries if _binary_name(binary) in impacted_binaries]
+        if binaries:
+            result[suite] = binaries
+    for suite in other_suites:
+        if all_suites_impacted or suite in impacted_suites:
+            result[suite] = None
+    return result
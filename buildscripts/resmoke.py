@@ -31,10 +31,14 @@ from buildscripts.resmokelib import reportfile
 from buildscripts.resmokelib import sighandler
 from buildscripts.resmokelib import suitesconfig
 from buildscripts.resmokelib import testing
+from buildscripts.resmokelib import testruntimes
+from buildscripts.resmokelib import tracing
 from buildscripts.resmokelib import utils
 
 from buildscripts.resmokelib.core import process
+from buildscripts.resmokelib.core import dbpaths
 from buildscripts.resmokelib.core import jasper_process
+from buildscripts.resmokelib.core import resourcemonitor
 
 
 class Resmoke(object):  # pylint: disable=too-many-instance-attributes
@@ -75,6 +79,12 @@ class Resmoke(object):  # pylint: disable=too-many-instance-attributes
             self._exit_on_incomplete_logging()
             return
 
+        flush_stats = logging.flush.get_stats()
+        self._resmoke_logger.debug(
+            "Flushed or closed logging handlers %d times, %0.2f seconds late on average and at most"
+            " %0.2f seconds late. %d are still queued.", flush_stats.num_actions,
+            flush_stats.total_delay_secs / max(flush_stats.num_actions, 1),
+            flush_stats.max_delay_secs, flush_stats.queue_depth)
         logging.flush.stop_thread()
 
         if logging.buildlogger.is_log_output_incomplete():
@@ -165,7 +175,12 @@ class Resmoke(object):  # pylint: disable=too-many-instance-attributes
 
         suites = None
         try:
-            suites = self._get_suites()
+            tracing.start()
+            resourcemonitor.start()
+            with tracing.span("select tests", "selector"):
+                suites = self._get_suites()
+            if config.STREAM_REPORT_FILE:
+                reportfile.remove_streams()
             self._setup_archival()
             if config.SPAWN_USING == "jasper":
                 self._setup_jasper()
@@ -186,16 +201,23 @@ class Resmoke(object):  # pylint: disable=too-many-instance-attributes
             if config.SPAWN_USING == "jasper":
                 self._exit_jasper()
             self._exit_archival()
+            if not testing.fixtures.pool.teardown_all(self._exec_logger):
+                self._exec_logger.error("Teardown of the fixtures reused between suites failed")
+            dbpaths.wait_for_removals()
             if suites:
                 reportfile.write(suites)
+                testruntimes.write(suites)
+            tracing.write()
+            resourcemonitor.write()
 
     def _run_suite(self, suite):
         """Run a test suite."""
         self._log_suite_config(suite)
         suite.record_suite_start()
-        interrupted = self._execute_suite(suite)
+        with tracing.span(suite.get_display_name(), "suite") as suite_span:
+            interrupted = self._execute_suite(suite)
         suite.record_suite_end()
-        self._log_suite_summary(suite)
+        self._log_suite_summary(suite, suite_span)
         return interrupted
 
     def _log_resmoke_summary(self, suites):
@@ -204,11 +226,15 @@ class Resmoke(object):  # pylint: disable=too-many-instance-attributes
         if len(self._config.suite_files) > 1:
             testing.suite.Suite.log_summaries(self._resmoke_logger, suites, time_taken)
 
-    def _log_suite_summary(self, suite):
+    def _log_suite_summary(self, suite, suite_span=None):
         """Log a summary of the suite run."""
         self._resmoke_logger.info("=" * 80)
         self._resmoke_logger.info("Summary of %s suite: %s", suite.get_display_name(),
                                   self._get_suite_summary(suite))
+        if suite_span is not None:
+            sb = []
+            tracing.summarize(sb, suite_span)
+            self._resmoke_logger.info("\n".join(sb))
 
     def _execute_suite(self, suite):
         """Execute a suite and return True if interrupted, False otherwise."""
@@ -281,7 +307,8 @@ class Resmoke(object):  # pylint: disable=too-many-instance-attributes
         if config.ARCHIVE_FILE:
             self._archive = utils.archival.Archival(
                 archival_json_file=config.ARCHIVE_FILE, limit_size_mb=config.ARCHIVE_LIMIT_MB,
-                limit_files=config.ARCHIVE_LIMIT_TESTS, logger=self._exec_logger)
+                limit_files=config.ARCHIVE_LIMIT_TESTS, logger=self._exec_logger,
+                endpoint_url=config.ARCHIVE_ENDPOINT_URL, stream=config.STREAM_ARCHIVES)
 
     def _exit_archival(self):
         """Finish up archival tasks before exit if enabled in the cli options."""
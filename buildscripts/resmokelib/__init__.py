@@ -8,5 +8,7 @@ from . import reportfile
 from . import sighandler
 from . import suitesconfig
 from . import testing
+from . import testruntimes
+from . import tracing
 from . import utils
 from . import multiversionconstants
@@ -0,0 +1,190 @@
+"""Keep the history of Google Benchmark results and detect regressions against it.
+
+Every run of a benchmark is recorded in a SQLite database keyed by git revision, benchmark name,
+and thread count. The results of the current run are compared with those of the most recent
+revisions before it using the median, the median absolute deviation, and a one-sided
+Mann-Whitney U test, which make no assumption about the distribution of the timings and aren't
+thrown off by a few outliers.
+"""
+
+import collections
+import math
+import sqlite3
+import subprocess
+import threading
+import time
+
+from . import config
+
+# The significance level below which a slowdown is considered a regression rather than noise.
+_SIGNIFICANCE_LEVEL = 0.05
+
+# The smallest relative slowdown of the median reported as a regression. Statistically significant
+# but smaller changes are typically caused by the machine rather than the code.
+_MIN_RELATIVE_CHANGE = 0.05
+
+# The Mann-Whitney U test has no power with fewer samples than this on either side.
+_MIN_SAMPLES = 3
+
+# The MAD is scaled by this factor to estimate the standard deviation of normally distributed data.
+_MAD_TO_STDDEV = 1.4826
+
+# 'baseline_sigma' is the standard deviation of the baseline timings, estimated from their MAD so
+# that outliers don't inflate it.
+Comparison = collections.namedtuple("Comparison", [
+    "benchmark", "thread_count", "baseline_median", "current_median", "relative_change",
+    "baseline_sigma", "p_value", "is_regression"
+])
+
+
+def median(values):
+    """Return the median of 'values'."""
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2 == 1:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2.0
+
+
+def median_absolute_deviation(values):
+    """Return the median absolute deviation of 'values' from their median."""
+    center = median(values)
+    return median([abs(value - center) for value in values])
+
+
+def mann_whitney_p_value(current, baseline):
+    """Return the p-value of 'current' being stochastically greater than 'baseline'.
+
+    The normal approximation of the U statistic with a continuity and tie correction is used.
+    """
+
+    combined = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+    num_values = len(combined)
+
+    # Tied values are all given the average of the ranks they span.
+    current_rank_sum = 0.0
+    tie_correction = 0.0
+    start = 0
+    while start < num_values:
+        end = start
+        while end + 1 < num_values and combined[end + 1][0] == combined[start][0]:
+            end += 1
+        rank = (start + end) / 2.0 + 1
+        num_tied = end - start + 1
+        tie_correction += num_tied**3 - num_tied
+        current_rank_sum += rank * sum(1 for (_, side) in combined[start:end + 1] if side == 0)
+        start = end + 1
+
+    (num_current, num_baseline) = (len(current), len(baseline))
+    u_statistic = current_rank_sum - num_current * (num_current + 1) / 2.0
+    mean = num_current * num_baseline / 2.0
+    variance = (num_current * num_baseline / 12.0) * (
+        (num_values + 1) - tie_correction / (num_values * (num_values - 1)))
+    if variance <= 0:
+        return 1.0
+
+    z_score = (u_statistic - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z_score / math.sqrt(2))
+
+
+def compare(benchmark, thread_count, current, baseline):
+    """Return a Comparison of the 'current' timings of a benchmark with its 'baseline' timings.
+
+    Lower timings are better, so a regression is a significant increase of the median.
+    """
+
+    baseline_median = median(baseline)
+    current_median = median(current)
+    relative_change = ((current_median - baseline_median) / baseline_median
+                       if baseline_median else 0.0)
+    p_value = mann_whitney_p_value(current, baseline)
+    is_regression = p_value < _SIGNIFICANCE_LEVEL and relative_change >= _MIN_RELATIVE_CHANGE
+    baseline_sigma = median_absolute_deviation(baseline) * _MAD_TO_STDDEV
+    return Comparison(benchmark, thread_count, baseline_median, current_median, relative_change,
+                      baseline_sigma, p_value, is_regression)
+
+
+def get_revision():
+    """Return the revision the results are recorded for.
+
+    It is the Evergreen revision when running in Evergreen and the checked out git commit
+    otherwise.
+    """
+
+    if config.EVERGREEN_REVISION:
+        return config.EVERGREEN_REVISION
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class BenchmarkStore(object):
+    """The timings of every recorded run of each benchmark."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            revision TEXT NOT NULL,
+            benchmark TEXT NOT NULL,
+            thread_count TEXT NOT NULL,
+            recorded REAL NOT NULL,
+            cpu_time REAL NOT NULL,
+            real_time REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS results_benchmark
+            ON results (benchmark, thread_count, revision);
+    """
+
+    def __init__(self, filename):
+        """Open the store in 'filename', creating it if it doesn't exist."""
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(self._SCHEMA)
+
+    def close(self):
+        """Close the store."""
+        with self._lock:
+            self._connection.close()
+
+    def record(self, revision, benchmark, thread_count, timings):
+        """Record the (cpu_time, real_time) pairs of 'timings' for a run of 'benchmark'."""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                [(revision, benchmark, thread_count, now, cpu_time, real_time)
+                 for (cpu_time, real_time) in timings])
+
+    def get_baseline(self, benchmark, thread_count, revision, num_revisions):
+        """Return the cpu times recorded for the 'num_revisions' most recently recorded revisions.
+
+        The results of 'revision' itself are excluded.
+        """
+        with self._lock:
+            return [
+                row[0] for row in self._connection.execute(
+                    """
+                    SELECT cpu_time FROM results
+                    WHERE benchmark = ? AND thread_count = ? AND revision IN (
+                        SELECT revision FROM results
+                        WHERE benchmark = ? AND thread_count = ? AND revision != ?
+                        GROUP BY revision ORDER BY MAX(rowid) DESC LIMIT ?)
+                    """, (benchmark, thread_count, benchmark, thread_count, revision,
+                          num_revisions))
+            ]
+
+    def record_and_compare(self, revision, benchmark, thread_count, timings, num_revisions):
+        """Record 'timings' and return their Comparison with the baseline.
+
+        None is returned if there aren't enough timings on either side to compare them.
+        """
+
+        baseline = self.get_baseline(benchmark, thread_count, revision, num_revisions)
+        self.record(revision, benchmark, thread_count, timings)
+
+        current = [cpu_time for (cpu_time, _) in timings]
+        if len(current) < _MIN_SAMPLES or len(baseline) < _MIN_SAMPLES:
+            return None
+        return compare(benchmark, thread_count, current, baseline)
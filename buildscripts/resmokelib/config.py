@@ -30,11 +30,15 @@ DEFAULT_MONGOS_EXECUTABLE = "mongos"
 
 DEFAULT_BENCHMARK_REPETITIONS = 3
 DEFAULT_BENCHMARK_MIN_TIME = datetime.timedelta(seconds=5)
+DEFAULT_BENCHMARK_MAX_TIME = datetime.timedelta(minutes=10)
 
 # Default root directory for where resmoke.py puts directories containing data files of mongod's it
 # starts, as well as those started by individual tests.
 DEFAULT_DBPATH_PREFIX = os.path.normpath("/data/db")
 
+# Root directory for the data files when they are kept in memory with --tmpfsDbpath.
+DEFAULT_TMPFS_DBPATH_PREFIX = "/dev/shm/resmoke"
+
 # Default directory that we expect to contain binaries for multiversion testing. This directory is
 # added to the PATH when calling programs.make_process().
 DEFAULT_MULTIVERSION_DIR = os.path.normpath("/data/multiversion")
@@ -46,13 +50,17 @@ DEFAULT_GENNY_EXECUTABLE = os.path.normpath("genny/build/src/driver/genny")
 # Names below correspond to how they are specified via the command line or in the options YAML file.
 DEFAULTS = {
     "always_use_log_files": False,
+    "archive_endpoint_url": None,
     "archive_file": None,
     "archive_limit_mb": 5000,
     "archive_limit_tests": 10,
     "base_port": 20000,
+    "buildlogger_gzip": False,
     "buildlogger_url": "https://logkeeper.mongodb.org",
     "continue_on_failure": False,
+    "cpus_per_job": None,
     "dbpath_prefix": None,
+    "dbpath_quota_mb": None,
     "dbtest_executable": None,
     "dry_run": None,
     "exclude_with_any_tags": None,
@@ -62,6 +70,7 @@ DEFAULTS = {
     "include_with_any_tags": None,
     "install_dir": None,
     "jobs": 1,
+    "lease_ports": False,
     "log_format": None,
     "mongo_executable": None,
     "mongod_executable": None,
@@ -70,7 +79,10 @@ DEFAULTS = {
     "mongos_set_parameters": None,
     "no_journal": False,
     "num_clients_per_fixture": 1,
+    "output_buffer_mb": 16,
+    "output_overflow_policy": "block",
     "perf_report_file": None,
+    "pin_jobs": False,
     "repeat_suites": 1,
     "repeat_tests": 1,
     "repeat_tests_max": None,
@@ -78,10 +90,15 @@ DEFAULTS = {
     "repeat_tests_secs": None,
     "report_failure_status": "fail",
     "report_file": None,
+    "resource_sample_interval_ms": None,
+    "reuse_fixtures": False,
     "seed": int(time.time() * 256),  # Taken from random.py code in Python 2.7.
     "service_executor": None,
     "shell_conn_string": None,
+    "shell_pool": False,
     "shell_port": None,
+    "stream_archives": False,
+    "stream_report_file": False,
     "shell_read_mode": None,
     "shell_write_mode": None,
     "shuffle": None,
@@ -91,7 +108,14 @@ DEFAULTS = {
     "storage_engine": None,
     "storage_engine_cache_size_gb": None,
     "tag_file": None,
+    "tags_cache_file": None,
+    "test_runtimes_file": None,
+    "test_suite_index_file": None,
+    "tmpfs_dbpath": False,
+    "trace_file": None,
+    "trace_sampling_interval_ms": None,
     "transport_layer": None,
+    "use_event_loop": False,
     "mixed_bin_versions": None,
     "linear_chain": None,
     "num_replset_nodes": None,
@@ -116,10 +140,15 @@ DEFAULTS = {
     "wt_index_config": None,
 
     # Benchmark options.
+    "benchmark_baseline_revisions": 5,
     "benchmark_filter": None,
     "benchmark_list_tests": None,
+    "benchmark_max_time_secs": None,
     "benchmark_min_time_secs": None,
+    "benchmark_regression_action": "warn",
     "benchmark_repetitions": None,
+    "benchmark_store": None,
+    "benchmark_target_ci_pct": None,
 
     # Config Dir
     "config_dir": "buildscripts/resmokeconfig"
@@ -223,6 +252,10 @@ SuiteOptions.ALL_INHERITED = SuiteOptions(  # type: ignore
 # Log to files located in the db path and don't clean dbpaths after tests.
 ALWAYS_USE_LOG_FILES = False
 
+# The URL of the S3-compatible endpoint archive files are uploaded to. If unset, then the files are
+# uploaded to AWS S3.
+ARCHIVE_ENDPOINT_URL = None
+
 # The name of the archive JSON file used to associate S3 archives to an Evergreen task.
 ARCHIVE_FILE = None
 
@@ -236,6 +269,9 @@ ARCHIVE_LIMIT_TESTS = None
 # mongo shell.
 BASE_PORT = None
 
+# If true, then the log lines sent to the buildlogger server are gzipped.
+BUILDLOGGER_GZIP = None
+
 # The root url of the buildlogger server.
 BUILDLOGGER_URL = None
 
@@ -243,6 +279,13 @@ BUILDLOGGER_URL = None
 # as well as those started by individual tests.
 DBPATH_PREFIX = None
 
+# If set, then a test fails, and its job stops running tests, if the directories under
+# DBPATH_PREFIX of the job use more than this many megabytes afterwards.
+DBPATH_QUOTA_MB = None
+
+# If true, then DBPATH_PREFIX is DEFAULT_TMPFS_DBPATH_PREFIX, so the data files are kept in memory.
+TMPFS_DBPATH = None
+
 # The path to the dbtest executable used by resmoke.py.
 DBTEST_EXECUTABLE = None
 
@@ -305,9 +348,21 @@ INCLUDE_WITH_ANY_TAGS = None
 # If set, then resmoke.py starts the specified number of Job instances to run tests.
 JOBS = None
 
+# If true, then the processes of each Job are pinned to their own slice of the host's CPUs, split
+# along NUMA node boundaries.
+PIN_JOBS = None
+
+# If set, then Jobs are pinned to their CPUs and, unless JOBS was specified, resmoke.py starts one
+# Job for every CPUS_PER_JOB CPUs it is allowed to run on.
+CPUS_PER_JOB = None
+
 # Where to find the MONGO*_EXECUTABLE binaries
 INSTALL_DIR = None
 
+# If true, then ports are leased to each job on demand instead of each job being allocated a fixed
+# range of ports.
+LEASE_PORTS = None
+
 # The path to the mongo executable used by resmoke.py.
 MONGO_EXECUTABLE = None
 
@@ -334,9 +389,21 @@ NO_JOURNAL = None
 # If set, then each fixture runs tests with the specified number of clients.
 NUM_CLIENTS_PER_FIXTURE = None
 
+# The maximum number of megabytes of output from each of a process's stdout and stderr that are
+# buffered while waiting to be logged.
+OUTPUT_BUFFER_MB = None
+
+# Whether output from a process is dropped ("drop") or not read ("block") while its buffer of output
+# waiting to be logged is full.
+OUTPUT_OVERFLOW_POLICY = None
+
 # Report file for the Evergreen performance plugin.
 PERF_REPORT_FILE = None
 
+# If set, then the CPU, memory, and I/O usage of the processes started by resmoke.py is sampled at
+# this interval and written next to REPORT_FILE.
+RESOURCE_SAMPLE_INTERVAL_MS = None
+
 # If set, then the RNG is seeded with the specified value. Otherwise uses a seed based on the time
 # this module was loaded.
 RANDOM_SEED = None
@@ -364,6 +431,10 @@ REPORT_FAILURE_STATUS = None
 # If set, then resmoke.py will write out a report file with the status of each test that ran.
 REPORT_FILE = None
 
+# If true, then fixtures are kept running at the end of a suite and reused, after dropping their
+# data, by the next suite or repetition with the same fixture configuration.
+REUSE_FIXTURES = None
+
 # IF set, then mongod/mongos's started by resmoke.py will use the specified service executor
 SERVICE_EXECUTOR = None
 
@@ -371,6 +442,10 @@ SERVICE_EXECUTOR = None
 # connection string instead.
 SHELL_CONN_STRING = None
 
+# If true, then the mongo shells running JS tests and hooks are started ahead of time, while the
+# previous test is still running.
+SHELL_POOL = None
+
 # If set, then mongo shells started by resmoke.py will use the specified read mode.
 SHELL_READ_MODE = None
 
@@ -388,6 +463,14 @@ SPAWN_USING = None
 # If true, the launching of jobs is staggered in resmoke.py.
 STAGGER_JOBS = None
 
+# If true, then archives are compressed on several threads and streamed to S3 in a multipart upload,
+# and WiredTiger files that were already archived aren't archived again.
+STREAM_ARCHIVES = None
+
+# If true, then the result of each test is appended to a file for its job as soon as it finishes,
+# and the files are merged into the report file at exit.
+STREAM_REPORT_FILE = None
+
 # If set to true, it enables read concern majority. Else, read concern majority is disabled.
 MAJORITY_READ_CONCERN = None
 
@@ -421,9 +504,32 @@ STORAGE_ENGINE_CACHE_SIZE = None
 # The tag file to use that associates tests with tags.
 TAG_FILE = None
 
+# If set, then the tags parsed from the comments of JS tests are cached in this file and only parsed
+# again for the tests that changed.
+TAGS_CACHE_FILE = None
+
+# If set, then tests are queued in decreasing order of their historical runtimes read from this
+# file, and the file is updated with the runtimes of the tests that ran.
+TEST_RUNTIMES_FILE = None
+
+# If set, then the suites that run each test are recorded in this file and only the suites and tests
+# that changed since it was last updated are selected again when looking up which suites run a test.
+TEST_SUITE_INDEX_FILE = None
+
+# If set, then the spans of resmoke.py's own work are written to this file as Chrome trace events.
+TRACE_FILE = None
+
+# If set along with TRACE_FILE, then the stacks of resmoke.py's threads are sampled at this interval
+# and written to TRACE_FILE.folded.
+TRACE_SAMPLING_INTERVAL_MS = None
+
 # If set, then mongod/mongos's started by resmoke.py will use the specified transport layer.
 TRANSPORT_LAYER = None
 
+# If true, then the output of the processes started by resmoke.py is read from a single asyncio
+# event loop thread.
+USE_EVENT_LOOP = None
+
 # If set, then all mongod's started by resmoke.py and by the mongo shell will use the specified
 # WiredTiger collection configuration settings.
 WT_COLL_CONFIG = None
@@ -442,6 +548,19 @@ BENCHMARK_LIST_TESTS = None
 BENCHMARK_MIN_TIME = None
 BENCHMARK_REPETITIONS = None
 
+# If set, then the benchmarks of each benchmark test are run in batches of BENCHMARK_REPETITIONS
+# repetitions until the 95% confidence interval of their mean is within this percentage of the
+# mean, or BENCHMARK_MAX_TIME has passed.
+BENCHMARK_TARGET_CI_PCT = None
+BENCHMARK_MAX_TIME = None
+
+# If set, then the results of benchmarks are recorded in this SQLite database and compared with
+# those of the BENCHMARK_BASELINE_REVISIONS most recent revisions previously recorded. Regressions
+# are logged, or fail the benchmark if BENCHMARK_REGRESSION_ACTION is "fail".
+BENCHMARK_STORE = None
+BENCHMARK_BASELINE_REVISIONS = None
+BENCHMARK_REGRESSION_ACTION = None
+
 ##
 # Internally used configuration options that aren't exposed to the user
 ##
@@ -1,5 +1,10 @@
 """Resmokelib core module."""
 
+from . import dbpaths
+from . import eventloop
 from . import process
 from . import programs
 from . import network
+from . import placement
+from . import resourcemonitor
+from . import shellpool
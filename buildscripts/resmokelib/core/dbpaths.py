@@ -0,0 +1,136 @@
+"""Provision the data directories of the fixtures and tests of each job.
+
+Clearing a data directory moves it to a trash directory, which is a single metadata operation, and
+deletes it from a background thread. Fixture restarts and tests therefore don't wait for the files
+of the previous run to be deleted.
+"""
+
+import itertools
+import os
+import os.path
+import queue
+import shutil
+import threading
+
+from buildscripts.resmokelib import config
+from buildscripts.resmokelib import utils
+
+# The suffix of the name of the directory the data directories being deleted are moved to.
+_TRASH_SUFFIX = ".resmoke-trash"
+
+_REMOVAL_COUNTER = itertools.count()
+_REMOVAL_THREAD = None
+_REMOVAL_THREAD_LOCK = threading.Lock()
+
+
+class _RemovalThread(threading.Thread):
+    """Delete the directories queued for removal one at a time."""
+
+    def __init__(self):
+        """Initialize the _RemovalThread."""
+        threading.Thread.__init__(self, name="DbpathRemoval")
+        self.daemon = True
+        self.paths = queue.Queue()
+
+    def run(self):
+        """Delete the queued directories forever."""
+        while True:
+            path = self.paths.get()
+            try:
+                shutil.rmtree(path, ignore_errors=True)
+            finally:
+                self.paths.task_done()
+
+
+def _queue_removal(path):
+    global _REMOVAL_THREAD  # pylint: disable=global-statement
+    with _REMOVAL_THREAD_LOCK:
+        if _REMOVAL_THREAD is None:
+            _REMOVAL_THREAD = _RemovalThread()
+            _REMOVAL_THREAD.start()
+    _REMOVAL_THREAD.paths.put(path)
+
+
+def _get_trash_dir(path):
+    """Return the directory 'path' is moved to while it is being deleted.
+
+    It is next to the data directories of the job 'path' belongs to rather than in them, so that
+    archiving the data files of the job leaves it out. A path that doesn't belong to a job uses the
+    one next to its parent directory.
+    """
+
+    path = os.path.abspath(path)
+    dbpath_prefix = os.path.abspath(
+        utils.default_if_none(config.DBPATH_PREFIX, config.DEFAULT_DBPATH_PREFIX))
+    if path != dbpath_prefix and path.startswith(os.path.join(dbpath_prefix, "")):
+        job_dir = os.path.relpath(path, dbpath_prefix).split(os.sep)[0]
+        return os.path.join(dbpath_prefix, job_dir) + _TRASH_SUFFIX
+    return os.path.dirname(path) + _TRASH_SUFFIX
+
+
+def clear(path, ignore_errors=False):
+    """Remove the directory 'path' without waiting for its files to be deleted.
+
+    The directory is moved to the trash directory of its job and deleted in the background. If it
+    can't be moved, it is deleted before returning, and errors are raised unless 'ignore_errors' is
+    true. The directories left in the trash by a previous resmoke.py invocation that was killed are
+    deleted too.
+    """
+
+    path = os.path.normpath(path)
+    trash_dir = _get_trash_dir(path)
+    own_prefix = "%d." % os.getpid()
+    if os.path.isdir(trash_dir):
+        for name in os.listdir(trash_dir):
+            if not name.startswith(own_prefix):
+                _queue_removal(os.path.join(trash_dir, name))
+
+    if not os.path.lexists(path):
+        return
+
+    # The pid keeps concurrent resmoke.py invocations sharing a --dbpathPrefix from colliding.
+    removal_path = os.path.join(
+        trash_dir, "%d.%d.%s" % (os.getpid(), next(_REMOVAL_COUNTER), os.path.basename(path)))
+    try:
+        os.makedirs(trash_dir, exist_ok=True)
+        os.rename(path, removal_path)
+    except OSError:
+        utils.rmtree(path, ignore_errors=ignore_errors)
+        return
+    _queue_removal(removal_path)
+
+
+def wait_for_removals():
+    """Block until the directories passed to clear() have been deleted."""
+    if _REMOVAL_THREAD is not None:
+        _REMOVAL_THREAD.paths.join()
+
+
+def get_job_dbpath_prefix(job_num):
+    """Return the directory the data directories of job 'job_num' are created in."""
+    dbpath_prefix = utils.default_if_none(config.DBPATH_PREFIX, config.DEFAULT_DBPATH_PREFIX)
+    return os.path.join(dbpath_prefix, "job%d" % job_num)
+
+
+def get_usage_mb(path):
+    """Return the disk space used by the files under 'path' in megabytes.
+
+    The directories of 'path' that are being deleted in the background are counted too, since they
+    use the disk space until they are deleted.
+    """
+
+    usage_bytes = 0
+    for top_dir in (path, os.path.normpath(path) + _TRASH_SUFFIX):
+        for (dirpath, _, filenames) in os.walk(top_dir):
+            for name in filenames:
+                try:
+                    stat = os.lstat(os.path.join(dirpath, name))
+                except OSError:
+                    # The file was deleted while walking the directory.
+                    continue
+                # st_blocks counts the space actually allocated to sparse files, such as the
+                # preallocated journal files. It isn't available on Windows.
+                blocks = getattr(stat, "st_blocks", None)
+                usage_bytes += blocks * 512 if blocks is not None else stat.st_size
+    return usage_bytes / (1024.0 * 1024.0)
+
@@ -0,0 +1,32 @@
+"""Manage a thread running the asyncio event loop shared by the processes started by resmoke.py.
+
+With --useEventLoop, the output of every process is read by this one thread rather than by threads
+started for each process.
+"""
+
+import asyncio
+import threading
+
+_LOOP_LOCK = threading.Lock()
+_LOOP = None
+
+
+def get_loop():
+    """Return the shared event loop, starting the thread that runs it if it isn't running yet."""
+
+    global _LOOP  # pylint: disable=global-statement
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="EventLoopThread")
+            # Do not wait for the event loop if interrupted by the user.
+            thread.daemon = True
+            thread.start()
+            _LOOP = loop
+
+        return _LOOP
+
+
+def run_coroutine(coro):
+    """Schedule 'coro' on the shared event loop and return a concurrent.futures.Future for it."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
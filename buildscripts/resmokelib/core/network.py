@@ -2,6 +2,8 @@
 
 import collections
 import functools
+import socket
+import sys
 import threading
 
 from .. import config
@@ -31,6 +33,24 @@ def _check_port(func):
     return wrapper
 
 
+def _is_port_free(port):
+    """Return True if nothing is listening on 'port' on the local host."""
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        # The mongod and mongos processes set SO_REUSEADDR, so we do the same in order to not treat
+        # ports with connections in the TIME_WAIT state as being in use. On Windows, SO_REUSEADDR
+        # allows binding to a port someone else is listening on so it must not be set there.
+        if sys.platform != "win32":
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", port))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
 class PortAllocator(object):
     """Class responsible for allocating ranges of ports.
 
@@ -38,6 +58,13 @@ class PortAllocator(object):
     that range used for the fixture started by that job, and the second
     part of the range used for mongod and mongos processes started by
     tests run by that job.
+
+    If --leasePorts was specified, then ports are instead leased to
+    jobs on demand from the ports between --basePort and MAX_PORT. Each
+    leased port is checked to be free and is returned to the pool when
+    the job's fixture is torn down by release_ports(). Fixtures leasing
+    ports aren't limited to _PORTS_PER_FIXTURE ports, and jobs don't
+    reserve ports they don't use.
     """
 
     # A PortAllocator will not return any port greater than this number.
@@ -56,6 +83,11 @@ class PortAllocator(object):
     # Used to keep track of how many ports a fixture has allocated.
     _NUM_USED_PORTS = collections.defaultdict(int)  # type: ignore
 
+    # Used with --leasePorts to keep track of which job each leased port belongs to, and the range
+    # of ports leased to each job for its tests.
+    _LEASED_PORTS = {}  # type: ignore
+    _TEST_PORT_RANGES = {}  # type: ignore
+
     @classmethod
     @_check_port
     def next_fixture_port(cls, job_num):
@@ -65,6 +97,9 @@ class PortAllocator(object):
         ports than are reserved per job, or if the next port is not a
         valid port number.
         """
+        if config.LEASE_PORTS:
+            return cls._lease_fixture_port(job_num)
+
         with cls._NUM_USED_PORTS_LOCK:
             start_port = config.BASE_PORT + (job_num * cls._PORTS_PER_JOB)
             num_used_ports = cls._NUM_USED_PORTS[job_num]
@@ -87,6 +122,9 @@ class PortAllocator(object):
         Raises a PortAllocationError if that port is higher than the
         maximum port.
         """
+        if config.LEASE_PORTS:
+            return cls._lease_test_ports(job_num)[0]
+
         return config.BASE_PORT + (job_num * cls._PORTS_PER_JOB) + cls._PORTS_PER_FIXTURE
 
     @classmethod
@@ -97,6 +135,9 @@ class PortAllocator(object):
         Raises a PortAllocationError if that port is higher than the
         maximum port.
         """
+        if config.LEASE_PORTS:
+            return cls._lease_test_ports(job_num)[1]
+
         next_range_start = config.BASE_PORT + ((job_num + 1) * cls._PORTS_PER_JOB)
         return next_range_start - 1
 
@@ -105,8 +146,71 @@ class PortAllocator(object):
         """Reset the internal state of the PortAllocator.
 
         This method is intended to be called each time resmoke.py starts
-        a new test suite.
+        a new test suite. It has no effect with --leasePorts because
+        leased ports are returned by release_ports() instead, and a
+        fixture reused from an earlier suite must keep its ports.
         """
 
         with cls._NUM_USED_PORTS_LOCK:
             cls._NUM_USED_PORTS = collections.defaultdict(int)
+
+    @classmethod
+    def release_ports(cls, job_num):
+        """Return the ports leased to the specified job to the pool.
+
+        This method is intended to be called once the job's fixture
+        has been torn down for the last time. It has no effect unless
+        --leasePorts was specified.
+        """
+
+        with cls._NUM_USED_PORTS_LOCK:
+            cls._LEASED_PORTS = {
+                port: owner
+                for (port, owner) in cls._LEASED_PORTS.items() if owner != job_num
+            }
+            cls._TEST_PORT_RANGES.pop(job_num, None)
+
+    @classmethod
+    def _lease_fixture_port(cls, job_num):
+        """Lease the lowest free port to the specified job."""
+
+        with cls._NUM_USED_PORTS_LOCK:
+            for port in range(config.BASE_PORT, cls.MAX_PORT + 1):
+                if port not in cls._LEASED_PORTS and _is_port_free(port):
+                    cls._LEASED_PORTS[port] = job_num
+                    return port
+
+        raise errors.PortAllocationError("Exhausted all available ports. Consider decreasing the"
+                                         " number of jobs, or using a lower base port")
+
+    @classmethod
+    def _lease_test_ports(cls, job_num):
+        """Return the (min, max) range of ports leased to the specified job for its tests.
+
+        The range is leased the first time it is requested, from the
+        highest free ports so that it doesn't fragment the ports leased
+        to fixtures from the bottom of the pool.
+        """
+
+        num_test_ports = cls._PORTS_PER_JOB - cls._PORTS_PER_FIXTURE
+
+        with cls._NUM_USED_PORTS_LOCK:
+            if job_num in cls._TEST_PORT_RANGES:
+                return cls._TEST_PORT_RANGES[job_num]
+
+            max_port = cls.MAX_PORT
+            while max_port - num_test_ports + 1 >= config.BASE_PORT:
+                min_port = max_port - num_test_ports + 1
+                # Scan the range from the bottom and stop at the first port that is in use, so the
+                # next range tried is the highest one below it.
+                in_use = next((port for port in range(min_port, max_port + 1)
+                               if port in cls._LEASED_PORTS or not _is_port_free(port)), None)
+                if in_use is None:
+                    for port in range(min_port, max_port + 1):
+                        cls._LEASED_PORTS[port] = job_num
+                    cls._TEST_PORT_RANGES[job_num] = (min_port, max_port)
+                    return (min_port, max_port)
+                max_port = in_use - 1
+
+        raise errors.PortAllocationError("Exhausted all available ports. Consider decreasing the"
+                                         " number of jobs, or using a lower base port")
@@ -5,8 +5,119 @@ Used to avoid deadlocks from the pipe buffer filling up and blocking the subproc
 being waited on.
 """
 
+import asyncio
+import collections
+import concurrent.futures
 import threading
 
+from . import eventloop
+from ..logging import loggers
+
+# The maximum number of bytes read from the pipe at once.
+_READ_SIZE = 64 * 1024
+
+# Placed in the buffer in place of output that was dropped because the buffer was full.
+_DROPPED = object()
+
+# The maximum number of pipes whose output is logged at the same time.
+_MAX_LOG_WORKERS = 32
+
+_LOG_WORKERS_LOCK = threading.Lock()
+_LOG_WORKERS = None
+
+PipeCounters = collections.namedtuple("PipeCounters",
+                                      ["bytes_read", "lines_logged", "bytes_dropped"])
+
+
+def _get_log_workers():
+    """Return the pool of threads that log the output read by every LoggerPipe."""
+
+    global _LOG_WORKERS  # pylint: disable=global-statement
+    with _LOG_WORKERS_LOCK:
+        if _LOG_WORKERS is None:
+            _LOG_WORKERS = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_MAX_LOG_WORKERS, thread_name_prefix="LoggerPipeWorker")
+        return _LOG_WORKERS
+
+
+class _OutputLogger(object):
+    """Split chunks of output from a subprocess into lines and send them to a logger."""
+
+    def __init__(self, logger, level, output_events):
+        """Initialize the _OutputLogger with the arguments of the pipe reading the output."""
+        self.__logger = logger
+        self.__level = level
+        self.__output_events = list(output_events) if output_events is not None else []
+
+        # The incomplete last line of the output logged so far.
+        self.__partial_line = b""
+        self.lines_logged = 0
+
+    def log_chunks(self, chunks):
+        """Log the complete lines in 'chunks', a list of bytestrings or _DROPPED markers."""
+
+        # Split all of the output read since the last call into lines at once, rather than reading
+        # and decoding the output line by line.
+        data = [self.__partial_line]
+        for chunk in chunks:
+            if chunk is not _DROPPED:
+                data.append(chunk)
+                continue
+
+            # Log the incomplete line preceding the dropped output as its own line.
+            lines = b"".join(data).split(b"\n")
+            if not lines[-1]:
+                lines.pop()
+            self.__log_lines(lines)
+            self.__logger.warning("[LoggerPipe] Output was dropped because the buffer of output"
+                                  " waiting to be logged was full.")
+            data = []
+
+        lines = b"".join(data).split(b"\n")
+        self.__partial_line = lines.pop()
+        self.__log_lines(lines)
+
+    def flush(self):
+        """Log the incomplete last line of the output, if any."""
+        if self.__partial_line:
+            self.__log_lines([self.__partial_line])
+            self.__partial_line = b""
+
+    def __log_lines(self, lines):
+        """Log each of 'lines', a list of bytestrings without their trailing newlines."""
+
+        if not lines:
+            return
+
+        # Replace null bytes in the output of the subprocess with a literal backslash ('\') followed
+        # by a literal zero ('0') so tools like grep don't treat resmoke.py's output as binary data.
+        data = b"\n".join(lines).replace(b"\0", b"\\0")
+
+        # Convert the output of the process from a bytestring to a UTF-8 string, and replace any
+        # characters that cannot be decoded with the official Unicode replacement character,
+        # U+FFFD. The log messages of MongoDB processes are not always valid UTF-8 sequences. See
+        # SERVER-7506.
+        decoded_lines = data.decode("utf-8", "replace").split("\n")
+
+        # The lines are handed to the logging handlers as one batch rather than one at a time.
+        loggers.log_batch(self.__logger, self.__level, [line.rstrip() for line in decoded_lines])
+
+        if self.__output_events:
+            for line in decoded_lines:
+                self.__check_output_events(line)
+
+        self.lines_logged += len(lines)
+
+    def __check_output_events(self, line):
+        """Set the events waiting on any text in 'line' and stop watching for them."""
+        remaining = []
+        for (texts, event) in self.__output_events:
+            if any(text in line for text in texts):
+                event.set()
+            else:
+                remaining.append((texts, event))
+        self.__output_events = remaining
+
 
 class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attributes
     """Asynchronously reads the output of a subprocess and sends it to a logger."""
@@ -16,16 +127,30 @@ class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attribu
     __start = threading.Thread.start
     __join = threading.Thread.join
 
-    def __init__(self, logger, level, pipe_out):
-        """Initialize the LoggerPipe with the specified arguments."""
+    def __init__(  # pylint: disable=too-many-arguments
+            self, logger, level, pipe_out, output_events=None, buffer_size=None,
+            drop_on_overflow=False):
+        """Initialize the LoggerPipe with the specified arguments.
+
+        'output_events' is a list of (texts, threading.Event) pairs. Each event is set the first
+        time a line containing any of its texts is read from 'pipe_out'.
+
+        The output is read in chunks by the LoggerPipe's own thread and logged from a pool of
+        worker threads shared by all of the pipes, so reading from 'pipe_out' doesn't wait on the
+        logging handlers. A pipe's output is logged by one worker at a time, in the order it was
+        read. At most 'buffer_size' bytes of output wait to be logged, if specified. Once the buffer
+        is full, further output is dropped if 'drop_on_overflow' is true, and otherwise isn't read
+        until the buffer has room for it.
+        """
 
         threading.Thread.__init__(self)
         # Main thread should not call join() when exiting
         self.daemon = True
 
-        self.__logger = logger
-        self.__level = level
+        self.__output = _OutputLogger(logger, level, output_events)
         self.__pipe_out = pipe_out
+        self.__buffer_size = buffer_size
+        self.__drop_on_overflow = drop_on_overflow
 
         self.__lock = threading.Lock()
         self.__condition = threading.Condition(self.__lock)
@@ -33,6 +158,16 @@ class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attribu
         self.__started = False
         self.__finished = False
 
+        # Chunks of output read from 'pipe_out' that haven't been logged yet.
+        self.__buffer = collections.deque()
+        self.__num_buffered_bytes = 0
+        self.__eof = False
+        # Whether a worker is logging the output in the buffer or has been asked to.
+        self.__logging = False
+
+        self.__bytes_read = 0
+        self.__bytes_dropped = 0
+
         LoggerPipe.__start(self)
 
     def start(self):
@@ -48,24 +183,80 @@ class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attribu
 
         # Close the pipe when finished reading all of the output.
         with self.__pipe_out:
-            # Avoid buffering the output from the pipe.
-            for line in iter(self.__pipe_out.readline, b""):
-                # Replace null bytes in the output of the subprocess with a literal backslash ('\')
-                # followed by a literal zero ('0') so tools like grep don't treat resmoke.py's
-                # output as binary data.
-                line = line.replace(b"\0", b"\\0")
-
-                # Convert the output of the process from a bytestring to a UTF-8 string, and replace
-                # any characters that cannot be decoded with the official Unicode replacement
-                # character, U+FFFD. The log messages of MongoDB processes are not always valid
-                # UTF-8 sequences. See SERVER-7506.
-                line = line.decode("utf-8", "replace")
-                self.__logger.log(self.__level, line.rstrip())
+            # Use read1() where available to log whatever output is available rather than waiting
+            # for a full chunk.
+            read = getattr(self.__pipe_out, "read1", self.__pipe_out.read)
+            for chunk in iter(lambda: read(_READ_SIZE), b""):
+                self.__buffer_chunk(chunk)
+
+        with self.__lock:
+            self.__eof = True
+            self.__schedule_logging()
+
+    def __buffer_chunk(self, chunk):
+        """Add 'chunk' to the output waiting to be logged, waiting for or dropping it if full."""
+        with self.__lock:
+            self.__bytes_read += len(chunk)
+
+            while self.__is_buffer_full(len(chunk)):
+                if self.__drop_on_overflow:
+                    self.__bytes_dropped += len(chunk)
+                    if self.__buffer[-1] is not _DROPPED:
+                        self.__buffer.append(_DROPPED)
+                    return
+                self.__condition.wait()
+
+            self.__buffer.append(chunk)
+            self.__num_buffered_bytes += len(chunk)
+            self.__schedule_logging()
+
+    def __schedule_logging(self):
+        """Have a worker log the output in the buffer unless one is already doing so.
+
+        The caller must hold 'self.__lock'.
+        """
+        if not self.__logging:
+            self.__logging = True
+            _get_log_workers().submit(self.__log_output)
+
+    def __is_buffer_full(self, num_bytes):
+        """Return True if adding 'num_bytes' to a non-empty buffer would exceed its size."""
+        return (self.__buffer_size is not None and self.__num_buffered_bytes > 0
+                and self.__num_buffered_bytes + num_bytes > self.__buffer_size)
+
+    def __log_output(self):
+        """Log the chunks of output in the buffer until it is empty.
+
+        Once the end of 'pipe_out' has been reached, the incomplete last line is logged too and the
+        pipe is marked as finished.
+        """
+
+        while True:
+            with self.__lock:
+                if not self.__buffer:
+                    if not self.__eof:
+                        self.__logging = False
+                        return
+                    break
+
+                chunks = list(self.__buffer)
+                self.__buffer.clear()
+                self.__num_buffered_bytes = 0
+                self.__condition.notify_all()
+
+            self.__output.log_chunks(chunks)
+
+        self.__output.flush()
 
         with self.__lock:
             self.__finished = True
             self.__condition.notify_all()
 
+    def get_counters(self):
+        """Return the PipeCounters of the output read from 'pipe_out' so far."""
+        with self.__lock:
+            return PipeCounters(self.__bytes_read, self.__output.lines_logged, self.__bytes_dropped)
+
     def join(self, timeout=None):
         """Join not implemented."""
         raise NotImplementedError("join should not be called directly")
@@ -85,3 +276,62 @@ class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attribu
         # No need to pass a timeout to join() because the thread should already be done after
         # notifying us it has finished reading output from the pipe.
         LoggerPipe.__join(self)  # Tidy up the started thread.
+
+
+class AsyncLoggerPipe(asyncio.Protocol):
+    """Reads the output of a subprocess from the shared event loop and sends it to a logger.
+
+    It has the same interface as LoggerPipe but doesn't start any threads of its own. The output is
+    logged from the event loop's thread as soon as it is read, so there is no buffer to bound. It
+    isn't supported on Windows because the pipes of a subprocess can't be read asynchronously there.
+    """
+
+    def __init__(self, logger, level, pipe_out, output_events=None):
+        """Initialize the AsyncLoggerPipe and start reading from 'pipe_out'."""
+
+        asyncio.Protocol.__init__(self)
+
+        self.__output = _OutputLogger(logger, level, output_events)
+        self.__bytes_read = 0
+
+        self.__started = threading.Event()
+        self.__finished = threading.Event()
+        self.__error = None
+
+        eventloop.run_coroutine(self.__connect(pipe_out))
+
+    async def __connect(self, pipe_out):
+        try:
+            await asyncio.get_event_loop().connect_read_pipe(lambda: self, pipe_out)
+        except Exception as err:  # pylint: disable=broad-except
+            self.__error = err
+            self.__started.set()
+            self.__finished.set()
+
+    def connection_made(self, transport):
+        """Signal that the pipe is being read."""
+        self.__started.set()
+
+    def data_received(self, data):
+        """Log the complete lines of output read from the pipe."""
+        self.__bytes_read += len(data)
+        self.__output.log_chunks([data])
+
+    def connection_lost(self, exc):
+        """Log the incomplete last line of output and signal that the pipe was closed."""
+        self.__output.flush()
+        self.__finished.set()
+
+    def get_counters(self):
+        """Return the PipeCounters of the output read from 'pipe_out' so far."""
+        return PipeCounters(self.__bytes_read, self.__output.lines_logged, 0)
+
+    def wait_until_started(self):
+        """Wait until started."""
+        self.__started.wait()
+        if self.__error is not None:
+            raise self.__error
+
+    def wait_until_finished(self):
+        """Wait until finished."""
+        self.__finished.wait()
@@ -0,0 +1,146 @@
+"""Split the CPUs of the host among the jobs of resmoke.py and pin the jobs' processes to them.
+
+The CPUs are split along NUMA node boundaries so that the fixture and the tests of a job don't
+straddle nodes and, since Linux allocates memory on the node of the CPU that first touches it,
+mostly use the memory local to their CPUs.
+"""
+
+import contextlib
+import glob
+import os
+import os.path
+
+from buildscripts.resmokelib import config
+
+# Mapping of a job number to the CPUs its processes are pinned to. Empty if --pinJobs wasn't
+# specified.
+_JOB_CPUS = {}
+
+
+def _parse_cpu_list(cpu_list):
+    """Return the set of CPUs of a list formatted like "0-3,8,10-11"."""
+    cpus = set()
+    for cpu_range in cpu_list.strip().split(","):
+        if not cpu_range:
+            continue
+        (first, _, last) = cpu_range.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def get_numa_nodes():
+    """Return a list of the sorted CPUs of each NUMA node that resmoke.py is allowed to run on."""
+    allowed_cpus = os.sched_getaffinity(0)
+
+    nodes = []
+    node_dirs = glob.glob("/sys/devices/system/node/node[0-9]*")
+    for node_dir in sorted(node_dirs, key=lambda node_dir: int(node_dir.rsplit("node", 1)[1])):
+        with open(os.path.join(node_dir, "cpulist"), "r") as fp:
+            cpus = _parse_cpu_list(fp.read()) & allowed_cpus
+        if cpus:
+            nodes.append(sorted(cpus))
+
+    # Kernels built without NUMA support don't expose any nodes.
+    return nodes or [sorted(allowed_cpus)]
+
+
+def _split_evenly(items, num_slices):
+    return [
+        items[i * len(items) // num_slices:(i + 1) * len(items) // num_slices]
+        for i in range(num_slices)
+    ]
+
+
+def split_cpus(nodes, num_jobs):
+    """Return a list of the CPUs each of 'num_jobs' jobs is pinned to.
+
+    With fewer jobs than NUMA nodes, each job gets whole nodes. Otherwise the jobs are distributed
+    among the nodes in proportion to their number of CPUs, and each node's CPUs are split evenly
+    among its jobs. Jobs share CPUs only if there are more jobs than CPUs on their node.
+    """
+
+    if num_jobs <= len(nodes):
+        return [[cpu for node in node_group for cpu in node]
+                for node_group in _split_evenly(nodes, num_jobs)]
+
+    # Give each node one job, then hand out the remaining jobs by largest remainder.
+    num_cpus = sum(len(node) for node in nodes)
+    shares = [float(num_jobs) * len(node) / num_cpus for node in nodes]
+    jobs_per_node = [max(1, int(share)) for share in shares]
+    by_remainder = sorted(
+        range(len(nodes)), key=lambda i: shares[i] - jobs_per_node[i], reverse=True)
+    for i in by_remainder[:max(0, num_jobs - sum(jobs_per_node))]:
+        jobs_per_node[i] += 1
+    # Giving small nodes a job may have handed out too many, which the largest nodes give back.
+    while sum(jobs_per_node) > num_jobs:
+        jobs_per_node[jobs_per_node.index(max(jobs_per_node))] -= 1
+
+    job_cpus = []
+    for (node, num_node_jobs) in zip(nodes, jobs_per_node):
+        if num_node_jobs <= len(node):
+            job_cpus.extend(_split_evenly(node, num_node_jobs))
+        else:
+            job_cpus.extend([node[i % len(node)]] for i in range(num_node_jobs))
+    return job_cpus
+
+
+def assign(num_jobs, logger):
+    """Split the CPUs among 'num_jobs' jobs if --pinJobs was specified."""
+    _JOB_CPUS.clear()
+    if not config.PIN_JOBS:
+        return
+
+    nodes = get_numa_nodes()
+    for (job_num, cpus) in enumerate(split_cpus(nodes, num_jobs)):
+        _JOB_CPUS[job_num] = cpus
+        cpu_list = ",".join(str(cpu) for cpu in cpus)
+        logger.info("Pinning the processes of job #%d to CPUs %s.", job_num, cpu_list)
+
+
+def get_cpus(job_num):
+    """Return the CPUs the processes of job 'job_num' are pinned to, or None if they aren't."""
+    return _JOB_CPUS.get(job_num)
+
+
+@contextlib.contextmanager
+def pin_children(job_num):
+    """Pin the processes started by the calling thread in the 'with' block to job_num's CPUs.
+
+    Linux applies the CPU affinity per thread and child processes inherit it from the thread that
+    forked them, so the calling thread's affinity is set for the duration of the block. Setting
+    the child's affinity after it started would race with the threads it starts.
+    """
+
+    cpus = get_cpus(job_num)
+    if cpus is None:
+        yield
+        return
+
+    original_cpus = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cpus)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, original_cpus)
+
+
+def pin_processes(pids, job_num):
+    """Pin the running processes 'pids', and every thread they have started, to job_num's CPUs.
+
+    This is for the processes of a fixture reused from an earlier suite, which were pinned to the
+    CPUs of the job that started them. The CPUs of a job change if the suites run different numbers
+    of jobs.
+    """
+
+    cpus = get_cpus(job_num)
+    if cpus is None:
+        return
+
+    # The affinity of each thread is set separately since it is applied per thread.
+    for pid in pids:
+        for task_dir in glob.glob("/proc/{}/task/[0-9]*".format(pid)):
+            try:
+                os.sched_setaffinity(int(os.path.basename(task_dir)), cpus)
+            except ProcessLookupError:
+                # The thread exited after the tasks of the process were listed.
+                pass
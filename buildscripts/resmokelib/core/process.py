@@ -13,8 +13,12 @@ import threading
 import subprocess
 
 from buildscripts.resmokelib.testing.fixtures import interface as fixture_interface
+from buildscripts.resmokelib import config
 from buildscripts.resmokelib import errors
+from buildscripts.resmokelib import tracing
 from . import pipe  # pylint: disable=wrong-import-position
+from . import placement  # pylint: disable=wrong-import-position
+from . import resourcemonitor  # pylint: disable=wrong-import-position
 from .. import utils  # pylint: disable=wrong-import-position
 
 # Attempt to avoid race conditions (e.g. hangs caused by a file descriptor being left open) when
@@ -31,6 +35,9 @@ from .. import utils  # pylint: disable=wrong-import-position
 # See https://bugs.python.org/issue7213 for more details.
 _POPEN_LOCK = threading.Lock()
 
+# The number of the job each thread starts processes for. See set_thread_job().
+_THREAD_STATE = threading.local()
+
 # Job objects are the only reliable way to ensure that processes are terminated on Windows.
 if sys.platform == "win32":
     import win32api
@@ -66,6 +73,22 @@ if sys.platform == "win32":
         atexit.register(win32api.CloseHandle, _JOB_OBJECT)
 
 
+def set_thread_job(job_num):
+    """Attribute the processes started by the calling thread to job 'job_num'.
+
+    The processes of fixture nodes are attributed to the job of their logger instead, so that the
+    nodes restarted by a hook's background thread are attributed correctly.
+    """
+    _THREAD_STATE.job_num = job_num
+
+
+def _get_job_num(logger):
+    job_num = getattr(logger, "job_num", None)
+    if job_num is None:
+        job_num = getattr(_THREAD_STATE, "job_num", None)
+    return job_num
+
+
 class Process(object):
     """Wrapper around subprocess.Popen class."""
 
@@ -86,10 +109,27 @@ class Process(object):
             self.env.update(env_vars)
 
         self.pid = None
+        self.job_num = None
 
         self._process = None
         self._stdout_pipe = None
         self._stderr_pipe = None
+        self._output_events = []
+
+    def watch_output(self, *texts):
+        """Return an Event that is set once the process logs a line containing any of 'texts'.
+
+        Only the stdout of the process is watched. This method must be called before start(). The
+        event is never set for process implementations that don't read the output of the process
+        themselves.
+        """
+
+        if self._process is not None:
+            raise ValueError("watch_output() must be called before the process is started")
+
+        event = threading.Event()
+        self._output_events.append((texts, event))
+        return event
 
     def start(self):
         """Start the process and the logger pipes for its stdout and stderr."""
@@ -109,14 +149,29 @@ class Process(object):
         # isn't supported on Windows when stdout and stderr are redirected.
         close_fds = (sys.platform != "win32")
 
-        with _POPEN_LOCK:
+        self.job_num = _get_job_num(self.logger)
+        with _POPEN_LOCK, placement.pin_children(self.job_num):
             self._process = subprocess.Popen(self.args, bufsize=buffer_size, stdout=subprocess.PIPE,
                                              stderr=subprocess.PIPE, close_fds=close_fds,
                                              env=self.env, creationflags=creation_flags)
             self.pid = self._process.pid
+        tracing.process_started()
+        resourcemonitor.process_started(self)
+
+        # The pipes of a subprocess can't be read asynchronously on Windows.
+        if config.USE_EVENT_LOOP and sys.platform != "win32":
+            pipe_cls = pipe.AsyncLoggerPipe
+            pipe_kwargs = {}
+        else:
+            pipe_cls = pipe.LoggerPipe
+            pipe_kwargs = {"drop_on_overflow": config.OUTPUT_OVERFLOW_POLICY == "drop"}
+            if config.OUTPUT_BUFFER_MB is not None:
+                pipe_kwargs["buffer_size"] = config.OUTPUT_BUFFER_MB * 1024 * 1024
 
-        self._stdout_pipe = pipe.LoggerPipe(self.logger, logging.INFO, self._process.stdout)
-        self._stderr_pipe = pipe.LoggerPipe(self.logger, logging.ERROR, self._process.stderr)
+        self._stdout_pipe = pipe_cls(self.logger, logging.INFO, self._process.stdout,
+                                     output_events=self._output_events, **pipe_kwargs)
+        self._stderr_pipe = pipe_cls(self.logger, logging.ERROR, self._process.stderr,
+                                     **pipe_kwargs)
 
         self._stdout_pipe.wait_until_started()
         self._stderr_pipe.wait_until_started()
@@ -208,15 +263,35 @@ class Process(object):
     def wait(self, timeout=None):
         """Wait until process has terminated and all output has been consumed by the logger pipes."""
 
+        if timeout is None:
+            resourcemonitor.process_exiting(self)
         return_code = self._process.wait(timeout)
+        resourcemonitor.process_exited(self)
 
         if self._stdout_pipe:
             self._stdout_pipe.wait_until_finished()
         if self._stderr_pipe:
             self._stderr_pipe.wait_until_finished()
 
+        self._log_output_counters()
         return return_code
 
+    def get_output_counters(self):
+        """Return a dict of the pipe.PipeCounters for the "stdout" and "stderr" of the process."""
+
+        counters = {}
+        if self._stdout_pipe:
+            counters["stdout"] = self._stdout_pipe.get_counters()
+        if self._stderr_pipe:
+            counters["stderr"] = self._stderr_pipe.get_counters()
+        return counters
+
+    def _log_output_counters(self):
+        for (name, counters) in self.get_output_counters().items():
+            log = self.logger.warning if counters.bytes_dropped else self.logger.debug
+            log("Process %d read %d bytes and logged %d lines from its %s, dropping %d bytes.",
+                self.pid, counters.bytes_read, counters.lines_logged, name, counters.bytes_dropped)
+
     def as_command(self):
         """Return an equivalent command line invocation of the process."""
 
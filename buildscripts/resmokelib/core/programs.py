@@ -10,6 +10,7 @@ import stat
 
 from . import jasper_process
 from . import process
+from . import shellpool
 from .. import config
 from .. import utils
 
@@ -226,13 +227,16 @@ def mongos_program(logger, executable=None, process_kwargs=None, **kwargs):
     return make_process(logger, args, **process_kwargs)
 
 
-def mongo_shell_program(  # pylint: disable=too-many-branches,too-many-locals,too-many-statements
+def mongo_shell_program(  # pylint: disable=too-many-arguments,too-many-branches,too-many-locals
         logger, executable=None, connection_string=None, filename=None, process_kwargs=None,
-        **kwargs):
+        job_num=None, **kwargs):
     """Return a Process instance that starts a mongo shell.
 
     The shell is started with the given connection string and arguments constructed from 'kwargs'.
+    If --shellPool was specified and 'job_num' is given, then the returned shellpool.PooledShell
+    runs 'filename' in a mongo shell that was started ahead of time for the job.
     """
+    # pylint: disable=too-many-statements
 
     executable = utils.default_if_none(
         utils.default_if_none(executable, config.MONGO_EXECUTABLE), config.DEFAULT_MONGO_EXECUTABLE)
@@ -369,7 +373,13 @@ def mongo_shell_program(  # pylint: disable=too-many-branches,too-many-locals,to
     # Apply the rest of the command line arguments.
     _apply_kwargs(args, kwargs)
 
+    # The arguments of a pooled shell leave out the --eval argument and the connection string. The
+    # pooled shell only connects once it is given the test to run.
+    eval_index = next(
+        i for i in range(len(args) - 1) if args[i] == "--eval" and args[i + 1] == eval_str)
+    shell_args = args[:eval_index] + args[eval_index + 2:]
     if connection_string is not None:
+        shell_args.append("--nodb")
         args.append(connection_string)
 
     # Have the mongo shell run the specified file.
@@ -379,7 +389,15 @@ def mongo_shell_program(  # pylint: disable=too-many-branches,too-many-locals,to
     _set_keyfile_permissions(test_data)
 
     process_kwargs = utils.default_if_none(process_kwargs, {})
-    return make_process(logger, args, **process_kwargs)
+    mongo_shell = make_process(logger, args, **process_kwargs)
+
+    if (config.SHELL_POOL and job_num is not None and filename is not None
+            and config.SPAWN_USING != "jasper" and shellpool.is_poolable(shell_args)):
+        control_script = shellpool.make_control_script(shell_args, eval_str, connection_string,
+                                                       filename)
+        return shellpool.PooledShell(mongo_shell, job_num, shell_args, control_script)
+
+    return mongo_shell
 
 
 def _format_shell_vars(sb, paths, value):
@@ -0,0 +1,338 @@
+"""Sample the CPU, memory, and I/O usage of the processes started by resmoke.py.
+
+A single thread reads /proc/<pid>/stat, /proc/<pid>/status, and /proc/<pid>/io of every running
+process at the --resourceSampleIntervalMs rate. Each sample is attributed to the process's logger
+(i.e. the fixture node or the test that started it) and to the test running on its job at the
+time. The samples are written next to the --reportFile as columns of a JSON document so that the
+tests driving memory spikes or I/O stalls can be found after the fact. Long runs append their
+samples to a spill file in chunks rather than holding every sample in memory until the end.
+"""
+
+import json
+import os
+import os.path
+import threading
+import time
+
+from buildscripts.resmokelib import config
+
+# The ResourceMonitor sampling processes, or None if --resourceSampleIntervalMs wasn't specified.
+_MONITOR = None
+
+_CLOCK_TICKS_PER_SEC = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+# The number of samples held in memory before they are appended to the spill file.
+_SAMPLES_PER_CHUNK = 10000
+
+
+def _read_proc_file(pid, name):
+    with open("/proc/%d/%s" % (pid, name)) as fp:
+        return fp.read()
+
+
+def read_proc_usage(pid):
+    """Return a dict of the CPU, memory, and I/O usage of 'pid' read from /proc.
+
+    The CPU time is in milliseconds and the other fields are in kilobytes. The I/O counters are
+    zero if they can't be read, e.g. because the process has already exited.
+    """
+
+    # The command name in /proc/<pid>/stat is in parentheses and may itself contain spaces.
+    stat_fields = _read_proc_file(pid, "stat").rsplit(")", 1)[1].split()
+    cpu_ticks = int(stat_fields[11]) + int(stat_fields[12])  # utime + stime
+
+    status = {}
+    for line in _read_proc_file(pid, "status").splitlines():
+        (key, _, value) = line.partition(":")
+        status[key] = value
+
+    io_counters = {}
+    try:
+        for line in _read_proc_file(pid, "io").splitlines():
+            (key, _, value) = line.partition(":")
+            io_counters[key] = int(value)
+    except (IOError, OSError):
+        pass
+
+    return {
+        "cpu_ms": cpu_ticks * 1000 // _CLOCK_TICKS_PER_SEC,
+        "rss_kb": int(status.get("VmRSS", "0 kB").split()[0]),
+        "hwm_kb": int(status.get("VmHWM", "0 kB").split()[0]),
+        "read_kb": io_counters.get("read_bytes", 0) // 1024,
+        "write_kb": io_counters.get("write_bytes", 0) // 1024,
+    }
+
+
+class _Column(object):
+    """Dictionary-encode repeated strings as indexes into a list of the distinct strings."""
+
+    def __init__(self):
+        self.values = []
+        self._indexes = {}
+
+    def index(self, value):
+        """Return the index of 'value', adding it to the list if it hasn't been seen before."""
+        if value is None:
+            return -1
+        if value not in self._indexes:
+            self._indexes[value] = len(self.values)
+            self.values.append(value)
+        return self._indexes[value]
+
+
+class ResourceMonitor(threading.Thread):
+    """Sample the resource usage of the registered processes at a fixed interval."""
+
+    # The usage fields recorded for each sample, in addition to its time, process, and test.
+    FIELDS = ("cpu_ms", "rss_kb", "hwm_kb", "read_kb", "write_kb")
+
+    def __init__(self, interval_secs, read_usage=read_proc_usage, spill_filename=None):
+        """Initialize the ResourceMonitor.
+
+        If 'spill_filename' is specified, every _SAMPLES_PER_CHUNK samples are appended to it as a
+        line of JSON and dropped from memory.
+        """
+        threading.Thread.__init__(self, name="ResourceMonitor")
+        self.daemon = True
+        self._interval_secs = interval_secs
+        self._read_usage = read_usage
+        self._spill_filename = spill_filename
+        self._num_spilled_chunks = 0
+        self._stop_event = threading.Event()
+        self._start_time = time.time()
+
+        self._lock = threading.Lock()
+        # Mapping of the process objects being sampled to their index in the "processes" list.
+        self._processes = {}
+        self._process_info = []
+        # Mapping of a job number to the name of the test running on it.
+        self._tests = {}
+        # Mapping of a process index to its previous sample, used to attribute its usage to tests.
+        self._previous_usage = {}
+
+        self._test_names = _Column()
+        self._columns = self._new_columns()
+        self._test_totals = {}
+
+    @classmethod
+    def _new_columns(cls):
+        return {name: [] for name in ("time_ms", "process", "test") + cls.FIELDS}
+
+    def register(self, process, job_num):
+        """Start sampling 'process', which is running on behalf of job 'job_num'."""
+        with self._lock:
+            self._processes[process] = len(self._process_info)
+            self._process_info.append({
+                "pid": process.pid,
+                "job": job_num,
+                "name": process.logger.name,
+                "program": os.path.basename(process.args[0]),
+                "start_ms": self._elapsed_ms(),
+            })
+
+    def unregister(self, process):
+        """Stop sampling 'process'."""
+        with self._lock:
+            index = self._processes.pop(process, None)
+            if index is not None:
+                self._process_info[index]["end_ms"] = self._elapsed_ms()
+                self._previous_usage.pop(index, None)
+
+    def set_test(self, job_num, test_name):
+        """Attribute the samples of the processes of job 'job_num' to 'test_name' from now on."""
+        with self._lock:
+            self._tests[job_num] = test_name
+
+    def run(self):
+        """Sample the processes until stop() is called."""
+        while not self._stop_event.wait(self._interval_secs):
+            self.sample()
+
+    def sample(self):
+        """Record a sample of each registered process."""
+        with self._lock:
+            processes = list(self._processes.items())
+        self._sample_processes(processes)
+
+    def sample_process(self, process):
+        """Record a final sample of 'process', which has exited but hasn't been waited on yet.
+
+        Processes that exit within one sampling interval would otherwise not be sampled at all.
+        """
+        with self._lock:
+            index = self._processes.get(process)
+        if index is not None:
+            self._sample_processes([(process, index)])
+
+    def _sample_processes(self, processes):
+        usages = []
+        for (process, index) in processes:
+            try:
+                usages.append((process, index, self._read_usage(process.pid)))
+            except (IOError, OSError, IndexError, ValueError):
+                # The process exited between being listed and being read.
+                pass
+
+        now_ms = self._elapsed_ms()
+        with self._lock:
+            for (process, index, usage) in usages:
+                # The process may have been waited on, and its pid reused, while it was being read.
+                if self._processes.get(process) != index:
+                    continue
+                test_name = self._tests.get(self._process_info[index]["job"])
+                self._add_sample(now_ms, index, test_name, usage)
+
+            if self._spill_filename is not None and len(
+                    self._columns["time_ms"]) >= _SAMPLES_PER_CHUNK:
+                self._spill()
+
+    def _add_sample(self, now_ms, index, test_name, usage):
+        self._columns["time_ms"].append(now_ms)
+        self._columns["process"].append(index)
+        self._columns["test"].append(self._test_names.index(test_name))
+        for field in self.FIELDS:
+            self._columns[field].append(usage[field])
+
+        # Counters accumulated since the previous sample are charged to the test running now. The
+        # counters start at zero when the process does, so all of them count for its first sample.
+        previous = self._previous_usage.get(index)
+        self._previous_usage[index] = usage
+        if previous is None:
+            previous = dict.fromkeys(self.FIELDS, 0)
+        if test_name is None:
+            return
+
+        totals = self._test_totals.setdefault(
+            test_name, {"cpu_ms": 0, "max_rss_kb": 0, "read_kb": 0, "write_kb": 0})
+        for field in ("cpu_ms", "read_kb", "write_kb"):
+            totals[field] += max(usage[field] - previous[field], 0)
+        totals["max_rss_kb"] = max(totals["max_rss_kb"], usage["rss_kb"])
+
+    def _spill(self):
+        with open(self._spill_filename, "w" if self._num_spilled_chunks == 0 else "a") as fp:
+            json.dump(self._columns, fp, separators=(",", ":"))
+            fp.write("\n")
+        self._num_spilled_chunks += 1
+        self._columns = self._new_columns()
+
+    def _iter_chunks(self):
+        """Yield the spilled chunks of samples followed by the samples still held in memory."""
+        if self._num_spilled_chunks > 0:
+            with open(self._spill_filename) as fp:
+                for line in fp:
+                    yield json.loads(line)
+        yield self._columns
+
+    def _elapsed_ms(self):
+        return int((time.time() - self._start_time) * 1000)
+
+    def stop(self):
+        """Stop sampling and wait for the monitor to exit."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def to_dict(self):
+        """Return the samples as a dict of columns of equal length.
+
+        The "process" column holds indexes into the "processes" list and the "test" column holds
+        indexes into the "tests" list, or -1 if no test was running on the process's job.
+        """
+
+        with self._lock:
+            report = self._summary_dict()
+            report["samples"] = self._new_columns()
+            for chunk in self._iter_chunks():
+                for (name, column) in chunk.items():
+                    report["samples"][name].extend(column)
+            return report
+
+    def _summary_dict(self):
+        return {
+            "start": self._start_time,
+            "interval_ms": int(self._interval_secs * 1000),
+            "processes": [dict(info) for info in self._process_info],
+            "tests": list(self._test_names.values),
+            "totals": {name: dict(totals)
+                       for (name, totals) in self._test_totals.items()},
+        }
+
+    def write(self, filename):
+        """Stop sampling and write the samples to 'filename'.
+
+        The "samples" columns are written one at a time, reading a single chunk of the spill file
+        at a time, so that the whole run never has to be held in memory at once.
+        """
+        self.stop()
+        with self._lock, open(filename, "w") as fp:
+            # Every sampled value is an integer, so the columns can be written without json.dump().
+            summary = json.dumps(self._summary_dict(), separators=(",", ":"))
+            fp.write(summary[:-1] + ',"samples":{')
+            for (i, name) in enumerate(self._columns):
+                fp.write('%s"%s":[' % ("," if i > 0 else "", name))
+                separator = ""
+                for chunk in self._iter_chunks():
+                    if chunk[name]:
+                        fp.write(separator + ",".join(str(value) for value in chunk[name]))
+                        separator = ","
+                fp.write("]")
+            fp.write("}}")
+
+        if self._num_spilled_chunks > 0:
+            os.remove(self._spill_filename)
+
+
+def get_filename():
+    """Return the name of the file the samples are written to, next to the --reportFile."""
+    return os.path.splitext(config.REPORT_FILE)[0] + ".resources.json"
+
+
+def start():
+    """Start sampling processes if --resourceSampleIntervalMs was specified."""
+    global _MONITOR  # pylint: disable=global-statement
+    if config.RESOURCE_SAMPLE_INTERVAL_MS and _MONITOR is None and os.path.isdir("/proc"):
+        _MONITOR = ResourceMonitor(config.RESOURCE_SAMPLE_INTERVAL_MS / 1000.0,
+                                   spill_filename=get_filename() + ".partial")
+        _MONITOR.start()
+
+
+def set_test(job_num, test_name):
+    """Attribute the samples of the processes of job 'job_num' to 'test_name'."""
+    monitor = _MONITOR
+    if monitor is not None:
+        monitor.set_test(job_num, test_name)
+
+
+def process_started(process):
+    """Start sampling 'process'."""
+    monitor = _MONITOR
+    if monitor is not None:
+        monitor.register(process, process.job_num)
+
+
+def process_exiting(process):
+    """Wait for 'process' to exit without reaping it, and then record a final sample of it."""
+    monitor = _MONITOR
+    if monitor is None or not hasattr(os, "waitid"):
+        return
+
+    try:
+        # WNOWAIT leaves the process a zombie, so its /proc entries can still be read.
+        os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+    except OSError:
+        # The process was already waited on, e.g. by a call to poll().
+        return
+    monitor.sample_process(process)
+
+
+def process_exited(process):
+    """Stop sampling 'process'."""
+    monitor = _MONITOR
+    if monitor is not None:
+        monitor.unregister(process)
+
+
+def write():
+    """Write the samples next to the --reportFile."""
+    if _MONITOR is not None:
+        _MONITOR.write(get_filename())
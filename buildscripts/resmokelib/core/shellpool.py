@@ -0,0 +1,326 @@
+"""Pool of mongo shells that are started ahead of the JS tests and hooks they run.
+
+A mongo shell can't be reused to run another test once a test has run in it: tests leave behind
+global variables, overridden methods, and the processes they spawned. The pool instead starts the
+mongo shell for the next test of each job while the current test is still running. The shell waits
+for its control file to be written, then connects to the fixture, sets the same global variables as
+the --eval argument built by mongo_shell_program() would, and loads the test. The exit code of the
+shell is the return code of the test.
+"""
+
+import atexit
+import collections
+import errno
+import json
+import os
+import os.path
+import shutil
+import tempfile
+import threading
+import time
+import urllib.parse
+
+from . import process as _process
+from ..logging import loggers
+
+# The options that make the mongo shell authenticate when it connects on startup. The connection
+# made by the control file doesn't authenticate, so shells with these options aren't pooled.
+_AUTH_OPTIONS = frozenset([
+    "-u", "--username", "-p", "--password", "--authenticationDatabase", "--authenticationMechanism",
+    "--gssapiServiceName"
+])
+
+# The JavaScript evaluated by an idle shell. It blocks reading its signal file, a named pipe that
+# is opened once the control file has been written, and then loads the control file.
+_WAIT_SCRIPT = "cat({signal_file}); load({control_file});"
+
+# The JavaScript evaluated by an idle shell on platforms without named pipes. It polls for the
+# control file to be written and then loads it. The shell exits without running anything if the
+# control directory is removed.
+_POLL_SCRIPT = ("(function() {{"
+                " while (!fileExists({control_file})) {{"
+                " if (!fileExists({control_dir})) {{ quit(0); }}"
+                " sleep(10); }} }})();"
+                " load({control_file});")
+
+# The number of seconds to wait between attempts to open the signal file of a shell that is still
+# starting up.
+_SIGNAL_INTERVAL_SECS = 0.01
+
+_IdleShell = collections.namedtuple("_IdleShell",
+                                    ["key", "process", "logger", "control_file", "signal_file"])
+
+
+def is_poolable(shell_args):
+    """Return True if a mongo shell started with 'shell_args' can be started ahead of time."""
+    # Options are passed as '--name=value' by programs.mongo_shell_program().
+    return not any(arg.split("=", 1)[0] in _AUTH_OPTIONS for arg in shell_args)
+
+
+def make_control_script(shell_args, eval_str, connection_string, filename):
+    """Return the JavaScript that runs 'filename' like a mongo shell started with the arguments.
+
+    'shell_args' are the other arguments the mongo shell was started with. The connection to
+    'connection_string', if any, is made the same way the mongo shell would have made it on startup.
+    """
+
+    sb = []  # String builder.
+    if connection_string is not None:
+        if "--quiet" in shell_args:
+            sb.append("__quiet = true;")
+        sb.append("db = connect({});".format(json.dumps(connection_string)))
+        if "--retryWrites" in shell_args or _uri_retries_writes(connection_string):
+            sb.append("db = db.getMongo().startSession().getDatabase(db.getName());")
+
+    sb.append(eval_str)
+    sb.append("load({});".format(json.dumps(filename)))
+    return "\n".join(sb) + "\n"
+
+
+def _uri_retries_writes(connection_string):
+    """Return True if 'connection_string' sets the retryWrites option to true."""
+    query = urllib.parse.urlsplit(connection_string).query
+    options = {name.lower(): value for (name, value) in urllib.parse.parse_qsl(query)}
+    return options.get("retrywrites", "").lower() == "true"
+
+
+class _RedirectableLogger(object):
+    """Logger that holds on to the output of an idle shell until the test it runs is known."""
+
+    def __init__(self, logger):
+        """Initialize the _RedirectableLogger, which logs to 'logger' until it is redirected."""
+        self._logger = logger
+        self._target = None
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def redirect(self, logger):
+        """Send the output held so far, and all of the output after it, to 'logger'."""
+        with self._lock:
+            for (level, msg, args, kwargs) in self._pending:
+                logger.log(level, msg, *args, **kwargs)
+            self._pending = []
+            self._target = logger
+
+    def log(self, level, msg, *args, **kwargs):
+        """Log 'msg' to the test's logger, or hold on to it if the test isn't known yet."""
+        with self._lock:
+            if self._target is None:
+                self._pending.append((level, msg, args, kwargs))
+                return
+        self._target.log(level, msg, *args, **kwargs)
+
+    def log_batch(self, level, msgs):
+        """Log each of 'msgs' like log() does, as one batch once the test's logger is known."""
+        with self._lock:
+            if self._target is None:
+                self._pending.extend((level, msg, (), {}) for msg in msgs)
+                return
+        loggers.log_batch(self._target, level, msgs)
+
+    def __getattr__(self, name):
+        # Messages about the process itself, rather than its output, are never held.
+        if self._target is not None:
+            return getattr(self._target, name)
+        return getattr(self._logger, name)
+
+
+class ShellPool(object):
+    """The idle mongo shells of each job.
+
+    Each shell is keyed by the arguments and environment it was started with. Taking a shell from
+    the pool starts another one with the same key in its place, so there is always an idle shell
+    ready for the next test with the same shell options as the current one.
+    """
+
+    _LOCK = threading.Lock()
+
+    # Mapping of job number to the list of _IdleShell instances of the job.
+    _IDLE_SHELLS = collections.defaultdict(list)
+
+    # The directory holding the control files of the shells, created on first use.
+    _CONTROL_DIR = None
+
+    _NUM_SHELLS_STARTED = 0
+
+    @classmethod
+    def take_shell(cls, logger, job_num, shell_args, env):
+        """Return an idle _IdleShell started with 'shell_args' and 'env', and replace it.
+
+        A shell is started if the job doesn't have an idle one with the same key.
+        """
+
+        key = (tuple(shell_args), tuple(sorted(env.items())))
+        idle_shell = None
+        dead_shells = []
+        with cls._LOCK:
+            idle_shells = cls._IDLE_SHELLS[job_num]
+            for shell in list(idle_shells):
+                if shell.key != key:
+                    continue
+                idle_shells.remove(shell)
+                if shell.process.poll() is not None:
+                    dead_shells.append(shell)
+                    continue
+                idle_shell = shell
+                break
+
+        for shell in dead_shells:
+            logger.warning(
+                "Idle mongo shell with pid %d exited with code %d before running a test.",
+                shell.process.pid, shell.process.wait())
+
+        if idle_shell is None:
+            idle_shell = cls._start_shell(logger, key, shell_args, env)
+
+        replacement = cls._start_shell(logger, key, shell_args, env)
+        with cls._LOCK:
+            cls._IDLE_SHELLS[job_num].append(replacement)
+
+        return idle_shell
+
+    @classmethod
+    def stop_shells(cls, job_num):
+        """Stop the idle shells of the job."""
+
+        with cls._LOCK:
+            idle_shells = cls._IDLE_SHELLS.pop(job_num, [])
+
+        for shell in idle_shells:
+            shell.process.stop()
+        for shell in idle_shells:
+            shell.process.wait()
+
+    @classmethod
+    def _start_shell(cls, logger, key, shell_args, env):
+        """Start a shell that waits for its control file to be written."""
+
+        with cls._LOCK:
+            if cls._CONTROL_DIR is None:
+                cls._CONTROL_DIR = tempfile.mkdtemp(prefix="resmoke_shell_pool_")
+                atexit.register(cls._stop_all)
+            filename = os.path.join(cls._CONTROL_DIR, "shell{}".format(cls._NUM_SHELLS_STARTED))
+            cls._NUM_SHELLS_STARTED += 1
+
+        control_file = filename + ".js"
+        if hasattr(os, "mkfifo"):
+            signal_file = filename + ".fifo"
+            os.mkfifo(signal_file)
+            wait_script = _WAIT_SCRIPT.format(
+                control_file=json.dumps(control_file), signal_file=json.dumps(signal_file))
+        else:
+            signal_file = None
+            wait_script = _POLL_SCRIPT.format(
+                control_file=json.dumps(control_file), control_dir=json.dumps(cls._CONTROL_DIR))
+
+        args = shell_args[:1] + ["--eval", wait_script] + shell_args[1:]
+        shell_logger = _RedirectableLogger(logger)
+        shell = _process.Process(shell_logger, args, env=env)
+        shell.start()
+        return _IdleShell(key, shell, shell_logger, control_file, signal_file)
+
+    @classmethod
+    def _stop_all(cls):
+        """Stop the idle shells of every job and remove the control directory."""
+        for job_num in list(cls._IDLE_SHELLS):
+            cls.stop_shells(job_num)
+        shutil.rmtree(cls._CONTROL_DIR, ignore_errors=True)
+
+
+class PooledShell(object):
+    """A mongo shell that runs a JS test in a shell taken from the job's ShellPool.
+
+    It can be used in place of the Process it is created from.
+    """
+
+    def __init__(self, mongo_shell, job_num, shell_args, control_script):
+        """Initialize the PooledShell.
+
+        'mongo_shell' is the Process that would otherwise run the test, and 'shell_args' are the
+        arguments of the idle shell to run 'control_script' in.
+        """
+
+        self.logger = mongo_shell.logger
+        self.args = mongo_shell.args
+        self.env = mongo_shell.env
+        self.pid = None
+
+        self._mongo_shell = mongo_shell
+        self._job_num = job_num
+        self._shell_args = shell_args
+        self._control_script = control_script
+        self._shell = None
+
+    def start(self):
+        """Have an idle shell of the job run the test."""
+
+        self._shell = ShellPool.take_shell(self.logger, self._job_num, self._shell_args, self.env)
+        self._shell.logger.redirect(self.logger)
+
+        # The shell loads the control file as soon as it exists, so it must never observe a
+        # partially written one.
+        tmp_filename = self._shell.control_file + ".tmp"
+        with open(tmp_filename, "w") as fp:
+            fp.write(self._control_script)
+        os.replace(tmp_filename, self._shell.control_file)
+        self._signal()
+
+        self.pid = self._shell.process.pid
+
+    def _signal(self):
+        """Wake up the shell blocked reading its signal file."""
+
+        if self._shell.signal_file is None:
+            return
+
+        # Opening the named pipe without blocking fails until the shell has opened it for reading,
+        # which it only does once it has started up. Closing the pipe right away has the shell read
+        # an empty file.
+        while True:
+            try:
+                fd = os.open(self._shell.signal_file, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as err:
+                if err.errno != errno.ENXIO:
+                    raise
+                # The shell exited before running the test, and wait() returns its exit code.
+                if self._shell.process.poll() is not None:
+                    return
+                time.sleep(_SIGNAL_INTERVAL_SECS)
+                continue
+
+            os.close(fd)
+            return
+
+    def stop(self, mode=None):
+        """Terminate the shell."""
+        self._shell.process.stop(mode)
+
+    def poll(self):
+        """Poll."""
+        return self._shell.process.poll()
+
+    def wait(self, timeout=None):
+        """Wait until the shell has terminated and all of its output has been logged."""
+
+        return_code = self._shell.process.wait(timeout)
+        for filename in (self._shell.control_file, self._shell.signal_file):
+            if filename is None:
+                continue
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+        return return_code
+
+    def get_output_counters(self):
+        """Return a dict of the pipe.PipeCounters for the "stdout" and "stderr" of the shell."""
+        return self._shell.process.get_output_counters()
+
+    def as_command(self):
+        """Return the command line invocation of a mongo shell equivalent to the pooled one."""
+        return self._mongo_shell.as_command()
+
+    def __str__(self):
+        if self.pid is None:
+            return self.as_command()
+        return "%s (%d)" % (self.as_command(), self.pid)
@@ -20,6 +20,10 @@ _BUILDLOGGER_CONFIG = os.getenv("BUILDLOGGER_CREDENTIALS", "mci.buildlogger")
 _SEND_AFTER_LINES = 2000
 _SEND_AFTER_SECS = 10
 
+# The number of times a request appending log lines is retried before the log lines are kept for
+# the next flush.
+_APPEND_RETRY_ATTEMPTS = 3
+
 # Initialized by resmokelib.logging.loggers.configure_loggers()
 BUILDLOGGER_FALLBACK = None
 
@@ -111,7 +115,9 @@ class _BaseBuildloggerHandler(handlers.BufferedHandler):
 
         username = build_config["username"]
         password = build_config["password"]
-        self.http_handler = handlers.HTTPHandler(_config.BUILDLOGGER_URL, username, password)
+        self.http_handler = handlers.HTTPHandler(_config.BUILDLOGGER_URL, username, password,
+                                                 compress=_config.BUILDLOGGER_GZIP,
+                                                 retry_attempts=_APPEND_RETRY_ATTEMPTS)
 
         self.endpoint = endpoint
         self.retry_buffer = []
@@ -130,6 +136,16 @@ class _BaseBuildloggerHandler(handlers.BufferedHandler):
         msg = self.format(record)
         return (record.created, msg)
 
+    def process_records(self, records):
+        """Return the tuples of the time each log record was created, and the message.
+
+        The records are formatted together if the formatter supports it.
+        """
+        format_batch = getattr(self.formatter, "format_batch", None)
+        if format_batch is None:
+            return handlers.BufferedHandler.process_records(self, records)
+        return [(record.created, msg) for (record, msg) in zip(records, format_batch(records))]
+
     def post(self, *args, **kwargs):
         """Provide convenience method for subclasses to use when making POST requests."""
         return self.http_handler.post(*args, **kwargs)
@@ -3,15 +3,25 @@
 These instances are used to send logs to buildlogger.
 """
 
+import collections
+import concurrent.futures
 import logging
 import threading
 import time
 
+from .. import tracing
 from ..utils import scheduler
 
 _FLUSH_THREAD_LOCK = threading.Lock()
 _FLUSH_THREAD = None
 
+# The maximum number of logging handlers flushed or closed at the same time.
+_MAX_FLUSH_WORKERS = 32
+
+FlushStats = collections.namedtuple("FlushStats",
+                                    ["num_actions", "total_delay_secs", "max_delay_secs",
+                                     "queue_depth"])
+
 
 def start_thread():
     """Start the flush thread."""
@@ -65,6 +75,15 @@ def close_later(handler):
     return _FLUSH_THREAD.submit(handler.close, no_delay)
 
 
+def get_stats():
+    """Return the FlushStats of the flush thread.
+
+    The delay of an action is how long after it was scheduled for it started running. The queue
+    depth is the number of actions that are scheduled or running.
+    """
+    return _FLUSH_THREAD.get_stats()
+
+
 def cancel(event):
     """Attempt to cancel the specified event.
 
@@ -73,8 +92,14 @@ def cancel(event):
     return _FLUSH_THREAD.cancel_event(event)
 
 
-class _FlushThread(threading.Thread):
-    """Asynchronously flush and close logging handlers."""
+class _FlushThread(threading.Thread):  # pylint: disable=too-many-instance-attributes
+    """Asynchronously flush and close logging handlers.
+
+    The flush thread only runs the scheduler. The flush() and close() actions themselves run on a
+    pool of worker threads, so a handler that is slow to flush doesn't delay the others. The pool
+    starts a worker thread only when none are idle, and a handler is flushed by one worker at a
+    time, so it never has more workers than there are handlers being flushed.
+    """
 
     _TIMEOUT = 24 * 60 * 60  # =1 day (a long time to have tests run)
 
@@ -99,27 +124,44 @@ class _FlushThread(threading.Thread):
         self.__should_stop = threading.Event()
         self.__terminated = threading.Event()
 
+        self.__workers = concurrent.futures.ThreadPoolExecutor(
+            max_workers=_MAX_FLUSH_WORKERS, thread_name_prefix="FlushWorker")
+
+        # self.__stats_lock prohibits concurrent access to the number of actions running and the
+        # statistics of the actions that started running.
+        self.__stats_lock = threading.Lock()
+        self.__num_running = 0
+        self.__num_actions = 0
+        self.__total_delay_secs = 0.0
+        self.__max_delay_secs = 0.0
+
     def run(self):
         """Continuously flush and close logging handlers."""
 
         try:
-            while not (self.__should_stop.is_set() and self.__scheduler.empty()):
+            while True:
                 self.__scheduler.run()
 
                 # Reset 'self.__schedule_updated' here since we've processed all the events
                 # thought to exist. Either the queue won't be empty or 'self.__schedule_updated'
-                # will get set again later.
+                # will get set again later, either by submit() or by an action finishing.
                 self.__schedule_updated.clear()
 
-                if self.__should_stop.is_set():
-                    # If the main thread has asked the flush thread to stop, then either run
-                    # whatever has been added to the queue since the scheduler last ran, or exit.
-                    continue
+                # The number of running actions is read before checking whether the queue is empty
+                # since an action may schedule another event before it finishes.
+                with self.__stats_lock:
+                    num_running = self.__num_running
 
-                # Otherwise, wait for a new event to be scheduled.
                 if self.__scheduler.empty():
+                    # If the main thread has asked the flush thread to stop, then exit once the
+                    # running actions are done and didn't schedule anything else.
+                    if self.__should_stop.is_set() and num_running == 0:
+                        break
+
+                    # Otherwise, wait for a new event to be scheduled or an action to finish.
                     self.__schedule_updated.wait()
         finally:
+            self.__workers.shutdown(wait=False)
             self.__terminated.set()
 
     def signal_shutdown(self):
@@ -147,10 +189,44 @@ class _FlushThread(threading.Thread):
         Return the scheduled event which may be used for later cancelation (see cancel_event()).
         """
 
-        event = self.__scheduler.enter(delay, 0, action, ())
+        scheduled_time = time.monotonic() + delay
+        event = self.__scheduler.enter(delay, 0, self.__dispatch, (action, scheduled_time))
         self.__schedule_updated.set()
         return event
 
+    def __dispatch(self, action, scheduled_time):
+        """Run 'action' on a worker thread."""
+
+        with self.__stats_lock:
+            self.__num_running += 1
+        self.__workers.submit(self.__run_action, action, scheduled_time)
+
+    def __run_action(self, action, scheduled_time):
+        """Run 'action' and record how long after 'scheduled_time' it started."""
+
+        delay_secs = max(0.0, time.monotonic() - scheduled_time)
+        try:
+            with tracing.span(action.__qualname__, "log_flush"):
+                action()
+        finally:
+            with self.__stats_lock:
+                self.__num_running -= 1
+                self.__num_actions += 1
+                self.__total_delay_secs += delay_secs
+                self.__max_delay_secs = max(self.__max_delay_secs, delay_secs)
+
+            # Wake up the flush thread in case it is waiting for the running actions to finish.
+            self.__schedule_updated.set()
+
+    def get_stats(self):
+        """Return the FlushStats of the actions run so far."""
+
+        with self.__stats_lock:
+            return FlushStats(num_actions=self.__num_actions,
+                              total_delay_secs=self.__total_delay_secs,
+                              max_delay_secs=self.__max_delay_secs,
+                              queue_depth=len(self.__scheduler.queue) + self.__num_running)
+
     def cancel_event(self, event):
         """Attempt to cancel the specified event.
 
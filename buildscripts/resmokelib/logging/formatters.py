@@ -22,6 +22,39 @@ class ISO8601Formatter(logging.Formatter):
         timezone = ISO8601Formatter._format_timezone_offset(converted_time)
         return "%s.%03d%s" % (formatted_time, record.msecs, timezone)
 
+    def format_batch(self, records):
+        """Return the formatted messages of 'records'.
+
+        This is equivalent to calling format() on each of the records, except that the time of the
+        records is only converted once per second and their messages are computed ahead of time if
+        the handler already did so.
+        """
+
+        uses_time = self.usesTime()
+        # Mapping of the second the records were created in to their formatted time and timezone.
+        formatted_times = {}
+        messages = []
+        for record in records:
+            if record.exc_info or record.exc_text or record.stack_info or self.datefmt is not None:
+                messages.append(self.format(record))
+                continue
+
+            if not hasattr(record, "message"):
+                record.message = record.getMessage()
+
+            if uses_time:
+                second = int(record.created)
+                if second not in formatted_times:
+                    converted_time = self.converter(record.created)
+                    formatted_times[second] = (time.strftime("%Y-%m-%dT%H:%M:%S", converted_time),
+                                               ISO8601Formatter._format_timezone_offset(
+                                                   converted_time))
+                (formatted_time, timezone) = formatted_times[second]
+                record.asctime = "%s.%03d%s" % (formatted_time, record.msecs, timezone)
+
+            messages.append(self.formatMessage(record))
+        return messages
+
     @staticmethod
     def _format_timezone_offset(converted_time):
         """Return the timezone as an hour/minute offset in the form "+HHMM" or "-HHMM"."""
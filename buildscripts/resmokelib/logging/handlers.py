@@ -1,10 +1,16 @@
 """Additional handlers that are used as the base classes of the buildlogger handler."""
 
+import gzip
+import itertools
 import json
 import logging
+import operator
+import random
 import sys
 import threading
+import time
 import warnings
+import weakref
 
 import requests
 import requests.adapters
@@ -23,12 +29,52 @@ from .. import utils
 
 _TIMEOUT_SECS = 10
 
+# The maximum number of POST requests sent by HTTPHandler instances at the same time. It is also the
+# number of connections to the server that are kept alive.
+_MAX_IN_FLIGHT_REQUESTS = 8
+_IN_FLIGHT_REQUESTS = threading.BoundedSemaphore(_MAX_IN_FLIGHT_REQUESTS)
+
+# The longest time to wait before retrying a request. The time waited before the first retry is at
+# most _BACKOFF_SECS, and doubles after each retry. A random fraction of it is waited so that the
+# handlers whose requests failed at the same time don't all retry at the same time.
+_BACKOFF_SECS = 0.5
+_MAX_BACKOFF_SECS = 10
+
+_RETRY_STATUSES = frozenset([500, 502, 503, 504])
+
+# Mapping of 'should_retry' to the requests.Session shared by the HTTPHandler instances.
+_SESSIONS_LOCK = threading.Lock()
+_SESSIONS = {}
+
+
+class _ThreadBuffer(object):
+    """The records a single thread has added to a BufferedHandler since it was last flushed."""
+
+    __slots__ = ("lock", "records", "thread")
+
+    def __init__(self):
+        """Initialize the _ThreadBuffer of the calling thread."""
+        # 'self.lock' is only ever contended by flush(), when it swaps out 'self.records'.
+        self.lock = threading.Lock()
+        self.records = []
+        self.thread = weakref.ref(threading.current_thread())
+
+    def is_thread_alive(self):
+        """Return True if the thread the buffer belongs to may still add records to it."""
+        thread = self.thread()
+        return thread is not None and thread.is_alive()
+
 
 class BufferedHandler(logging.Handler):
     """A handler class that buffers logging records in memory.
 
     Whenever each record is added to the buffer, a check is made to see if the buffer
     should be flushed. If it should, then flush() is expected to do what's needed.
+
+    Each thread adds records to a buffer of its own, so threads logging to the same handler don't
+    wait on each other. The buffers are swapped out when the handler is flushed, and their records
+    are merged in the order they were created. The buffers of the threads that have exited are
+    discarded once they are flushed, and the capacity applies to the records of all the threads.
     """
 
     # pylint: disable=too-many-instance-attributes
@@ -54,19 +100,30 @@ class BufferedHandler(logging.Handler):
         self.capacity = capacity
         self.interval_secs = interval_secs
 
-        # self.__emit_lock prohibits concurrent access to 'self.__emit_buffer',
-        # 'self.__flush_event', and self.__flush_scheduled_by_emit.
-        self.__emit_lock = threading.Lock()
-        self.__emit_buffer = []
+        # self.__buffers_lock prohibits concurrent access to 'self.__thread_buffers'.
+        self.__buffers_lock = threading.Lock()
+        self.__thread_buffers = []
+        self.__thread_local = threading.local()
+
+        # The number of records buffered by all the threads is the number of values taken from
+        # 'self.__record_counter' since the one taken when the buffers were last swapped out. It
+        # is only approximate since the records added while the buffers are swapped out are counted
+        # for the next flush too, but doesn't require the threads to share a lock.
+        self.__record_counter = itertools.count(1)
+        self.__swapped_counter = 0
+
+        # self.__schedule_lock prohibits concurrent access to 'self.__flush_event',
+        # self.__flush_scheduled_by_emit, and 'self.__close_called'.
+        self.__schedule_lock = threading.Lock()
         self.__flush_event = None  # A handle to the event that calls self.flush().
         self.__flush_scheduled_by_emit = False
         self.__close_called = False
 
-        self.__flush_lock = threading.Lock()  # Serializes callers of self.flush().
+        self.__flush_lock = threading.Lock()  # Serializes callers of self.__flush().
 
     # We override createLock(), acquire(), and release() to be no-ops since emit(), flush(), and
-    # close() serialize accesses to 'self.__emit_buffer' in a more granular way via
-    # 'self.__emit_lock'.
+    # close() serialize accesses to the buffers in a more granular way via the lock of each
+    # _ThreadBuffer.
     def createLock(self):
         """Create lock."""
         pass
@@ -80,26 +137,71 @@ class BufferedHandler(logging.Handler):
         pass
 
     def process_record(self, record):  # pylint: disable=no-self-use
-        """Apply a transformation to the record before it gets added to the buffer.
+        """Apply a transformation to the record before it gets flushed.
 
         The default implementation returns 'record' unmodified.
         """
 
         return record
 
+    def process_records(self, records):
+        """Apply a transformation to the records of the buffer before they get flushed.
+
+        The default implementation calls process_record() on each of the records.
+        """
+
+        return [self.process_record(record) for record in records]
+
     def emit(self, record):
         """Emit a record.
 
-        Append the record to the buffer after it has been transformed by
-        process_record(). If the length of the buffer is greater than or
-        equal to its capacity, then the flush() event is rescheduled to
-        immediately process the buffer.
+        Append the record to the calling thread's buffer. The message of the record is
+        computed right away, in case its arguments are modified before the buffer is flushed. If
+        the number of records buffered by all the threads is greater than or equal to the capacity,
+        then the flush() event is rescheduled to immediately process the buffers.
+        """
+
+        self.emit_batch([record])
+
+    def emit_batch(self, records):
+        """Emit each of 'records', in order, the same way emit() does.
+
+        The records are appended to the calling thread's buffer at once, and the flush() event is
+        only rescheduled once for all of them.
         """
 
-        processed_record = self.process_record(record)
+        for record in records:
+            record.message = record.getMessage()
+
+        thread_buffer = self.__get_thread_buffer()
+        with thread_buffer.lock:
+            thread_buffer.records.extend(records)
+        for _ in records:
+            num_records = next(self.__record_counter) - self.__swapped_counter
+
+        # The flush event is checked without holding 'self.__schedule_lock' first, since it only
+        # needs to be scheduled when the first record is added or when the buffer becomes full.
+        if self.__flush_event is None or (num_records >= self.capacity
+                                          and not self.__flush_scheduled_by_emit):
+            self.__schedule_flush(num_records)
+
+    def __get_thread_buffer(self):
+        """Return the _ThreadBuffer of the calling thread, creating it if needed."""
+
+        thread_buffer = getattr(self.__thread_local, "buffer", None)
+        if thread_buffer is None:
+            thread_buffer = _ThreadBuffer()
+            self.__thread_local.buffer = thread_buffer
+            with self.__buffers_lock:
+                self.__thread_buffers.append(thread_buffer)
+        return thread_buffer
+
+    def __schedule_flush(self, num_records):
+        """Schedule the first call to flush(), or reschedule it if the buffer is full."""
 
-        with self.__emit_lock:
-            self.__emit_buffer.append(processed_record)
+        with self.__schedule_lock:
+            if self.__close_called:
+                return
 
             if self.__flush_event is None:
                 # Now that we've added our first record to the buffer, we schedule a call to flush()
@@ -107,7 +209,7 @@ class BufferedHandler(logging.Handler):
                 # be None after this point.
                 self.__flush_event = flush.flush_after(self, delay=self.interval_secs)
 
-            if not self.__flush_scheduled_by_emit and len(self.__emit_buffer) >= self.capacity:
+            if not self.__flush_scheduled_by_emit and num_records >= self.capacity:
                 # Attempt to flush the buffer early if we haven't already done so. We don't bother
                 # calling flush.cancel() and flush.flush_after() when 'self.__flush_event' is
                 # already scheduled to happen as soon as possible to avoid introducing unnecessary
@@ -121,7 +223,7 @@ class BufferedHandler(logging.Handler):
 
         self.__flush(close_called=False)
 
-        with self.__emit_lock:
+        with self.__schedule_lock:
             if self.__flush_event is not None and not self.__close_called:
                 # We cancel 'self.__flush_event' in case flush() was called by someone other than
                 # the flush thread to avoid having multiple flush() events scheduled.
@@ -129,17 +231,51 @@ class BufferedHandler(logging.Handler):
                 self.__flush_event = flush.flush_after(self, delay=self.interval_secs)
                 self.__flush_scheduled_by_emit = False
 
+    def __swap_buffers(self):
+        """Return the records of all of the thread buffers, in the order they were created."""
+
+        self.__swapped_counter = next(self.__record_counter)
+        with self.__buffers_lock:
+            thread_buffers = list(self.__thread_buffers)
+
+        buffers = []
+        exited_buffers = []
+        for thread_buffer in thread_buffers:
+            # The thread is checked before its records are swapped out so that an exited thread's
+            # buffer is known to remain empty afterwards.
+            if not thread_buffer.is_thread_alive():
+                exited_buffers.append(thread_buffer)
+            with thread_buffer.lock:
+                if thread_buffer.records:
+                    buffers.append(thread_buffer.records)
+                    thread_buffer.records = []
+
+        if exited_buffers:
+            with self.__buffers_lock:
+                self.__thread_buffers = [
+                    thread_buffer for thread_buffer in self.__thread_buffers
+                    if thread_buffer not in exited_buffers
+                ]
+
+        if len(buffers) == 1:
+            return buffers[0]
+
+        # The records of each thread are already in order, so this merges the sorted runs.
+        records = [record for records in buffers for record in records]
+        records.sort(key=operator.attrgetter("created"))
+        return records
+
     def __flush(self, close_called):
         """Ensure all logging output has been flushed."""
 
-        with self.__emit_lock:
-            buf = self.__emit_buffer
-            self.__emit_buffer = []
-
-        # The buffer 'buf' is flushed without holding 'self.__emit_lock' to avoid causing callers of
+        # The buffers are swapped out while holding 'self.__flush_lock' so that concurrent calls to
+        # flush() and close() post their records in the order they were swapped out. The buffer is
+        # flushed without holding the lock of any thread buffer to avoid causing callers of
         # self.emit() to block behind the completion of a potentially long-running flush operation.
-        if buf:
-            with self.__flush_lock:
+        with self.__flush_lock:
+            records = self.__swap_buffers()
+            if records:
+                buf = self.process_records(records)
                 self._flush_buffer_with_lock(buf, close_called)
 
     def _flush_buffer_with_lock(self, buf, close_called):
@@ -151,7 +287,7 @@ class BufferedHandler(logging.Handler):
     def close(self):
         """Flush the buffer and tidies up any resources used by this handler."""
 
-        with self.__emit_lock:
+        with self.__schedule_lock:
             self.__close_called = True
 
             if self.__flush_event is not None:
@@ -162,28 +298,98 @@ class BufferedHandler(logging.Handler):
         logging.Handler.close(self)
 
 
+def handle_batch(handler, records):
+    """Have 'handler' handle each of 'records', in order, as logging.Handler.handle() would.
+
+    BufferedHandler instances buffer all of the records at once, and stream handlers write all of
+    them with a single write. Other handlers handle the records one at a time.
+    """
+
+    if not isinstance(handler, (BufferedHandler, logging.StreamHandler)) or getattr(
+            handler, "stream", True) is None:
+        for record in records:
+            handler.handle(record)
+        return
+
+    records = [
+        record for record in records if record.levelno >= handler.level and handler.filter(record)
+    ]
+    if not records:
+        return
+
+    if isinstance(handler, BufferedHandler):
+        handler.emit_batch(records)
+        return
+
+    format_batch = getattr(handler.formatter, "format_batch", None)
+    handler.acquire()
+    try:
+        if format_batch is not None:
+            msgs = format_batch(records)
+        else:
+            msgs = [handler.format(record) for record in records]
+        handler.stream.write("".join(msg + handler.terminator for msg in msgs))
+        handler.flush()
+    except Exception:  # pylint: disable=broad-except
+        handler.handleError(records[0])
+    finally:
+        handler.release()
+
+
+def _get_session(should_retry):
+    """Return the requests.Session shared by the HTTPHandler instances with 'should_retry'.
+
+    Sharing the session lets the handlers reuse its keep-alive connections to the server.
+    """
+
+    with _SESSIONS_LOCK:
+        if should_retry not in _SESSIONS:
+            session = requests.Session()
+
+            retry = requests.adapters.DEFAULT_RETRIES
+            if should_retry:
+                retry = urllib3_retry.Retry(
+                    backoff_factor=0.1,  # Enable backoff starting at 0.1s.
+                    method_whitelist=False,  # Support all HTTP verbs.
+                    status_forcelist=sorted(_RETRY_STATUSES))
+
+            adapter = requests.adapters.HTTPAdapter(max_retries=retry,
+                                                    pool_maxsize=_MAX_IN_FLIGHT_REQUESTS)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _SESSIONS[should_retry] = session
+
+        return _SESSIONS[should_retry]
+
+
+def _is_retryable(err):
+    """Return true if the request that raised 'err' may succeed when it is sent again."""
+
+    if isinstance(err, requests.HTTPError):
+        return err.response is not None and err.response.status_code in _RETRY_STATUSES
+    return isinstance(err, (requests.ConnectionError, requests.Timeout))
+
+
 class HTTPHandler(object):
     """A class which sends data to a web server using POST requests."""
 
-    def __init__(self, url_root, username, password, should_retry=False):
-        """Initialize the handler with the necessary authentication credentials."""
-
-        self.auth_handler = requests.auth.HTTPBasicAuth(username, password)
+    def __init__(  # pylint: disable=too-many-arguments
+            self, url_root, username, password, should_retry=False, compress=False,
+            retry_attempts=0):
+        """Initialize the handler with the necessary authentication credentials.
 
-        self.session = requests.Session()
+        If 'compress' is true, then the request bodies are gzipped. A request that fails with a
+        network error or a server error is sent again up to 'retry_attempts' times, backing off
+        between each attempt.
+        """
 
-        if should_retry:
-            retry_status = [500, 502, 503, 504]  # Retry for these statuses.
-            retry = urllib3_retry.Retry(
-                backoff_factor=0.1,  # Enable backoff starting at 0.1s.
-                method_whitelist=False,  # Support all HTTP verbs.
-                status_forcelist=retry_status)
+        self.auth_handler = requests.auth.HTTPBasicAuth(username, password)
 
-            adapter = requests.adapters.HTTPAdapter(max_retries=retry)
-            self.session.mount('http://', adapter)
-            self.session.mount('https://', adapter)
+        self.session = _get_session(should_retry)
 
         self.url_root = url_root
+        self.compress = compress
+        self.retry_attempts = retry_attempts
 
     def _make_url(self, endpoint):
         return "%s/%s/" % (self.url_root.rstrip("/"), endpoint.strip("/"))
@@ -201,6 +407,10 @@ class HTTPHandler(object):
         headers = utils.default_if_none(headers, {})
         headers["Content-Type"] = "application/json; charset=utf-8"
 
+        if self.compress:
+            data = gzip.compress(data.encode("utf-8"))
+            headers["Content-Encoding"] = "gzip"
+
         url = self._make_url(endpoint)
 
         with warnings.catch_warnings():
@@ -221,10 +431,7 @@ class HTTPHandler(object):
                     # that defined InsecureRequestWarning.
                     pass
 
-            response = self.session.post(url, data=data, headers=headers, timeout=timeout_secs,
-                                         auth=self.auth_handler, verify=True)
-
-        response.raise_for_status()
+            response = self._post_with_retries(url, data, headers, timeout_secs)
 
         if not response.encoding:
             response.encoding = "utf-8"
@@ -235,3 +442,22 @@ class HTTPHandler(object):
             return response.json()
 
         return response.text
+
+    def _post_with_retries(self, url, data, headers, timeout_secs):
+        """Send the POST request, retrying it up to 'self.retry_attempts' times."""
+
+        attempt = 0
+        while True:
+            try:
+                with _IN_FLIGHT_REQUESTS:
+                    response = self.session.post(url, data=data, headers=headers,
+                                                 timeout=timeout_secs, auth=self.auth_handler,
+                                                 verify=True)
+                response.raise_for_status()
+                return response
+            except requests.RequestException as err:
+                if attempt >= self.retry_attempts or not _is_retryable(err):
+                    raise
+
+            time.sleep(random.uniform(0, min(_MAX_BACKOFF_SECS, _BACKOFF_SECS * 2**attempt)))
+            attempt += 1
@@ -5,6 +5,7 @@ import sys
 
 from . import buildlogger
 from . import formatters
+from . import handlers
 from .. import errors
 
 _DEFAULT_FORMAT = "[%(name)s] %(message)s"
@@ -16,6 +17,19 @@ TESTS_LOGGER_NAME = "tests"
 EXECUTOR_LOGGER = None
 
 
+def log_batch(logger, level, msgs):
+    """Log each of 'msgs' at 'level' to 'logger', as one batch if the logger supports it.
+
+    The method is looked up on the class so that wrappers forwarding their attributes to another
+    logger don't log the batch past the wrapper.
+    """
+    if hasattr(type(logger), "log_batch"):
+        logger.log_batch(level, msgs)
+        return
+    for msg in msgs:
+        logger.log(level, msg)
+
+
 def _build_logger_server(logging_config):
     """Create and return a new BuildloggerServer.
 
@@ -87,6 +101,35 @@ class BaseLogger(logging.Logger):
             return getattr(self.parent, "logging_config", None)
         return None
 
+    def log_batch(self, level, msgs):
+        """Log each of 'msgs' at 'level'.
+
+        This is equivalent to calling log() on each of the messages, except that the handlers are
+        given all of the records at once, see handlers.handle_batch().
+        """
+        if not msgs or not self.isEnabledFor(level):
+            return
+
+        records = [
+            self.makeRecord(self.name, level, "(unknown file)", 0, msg, (), None) for msg in msgs
+        ]
+        records = [record for record in records if self.filter(record)]
+        if not records:
+            return
+
+        found_handler = False
+        logger = self
+        while logger:
+            for handler in logger.handlers:
+                found_handler = True
+                handlers.handle_batch(handler, records)
+            if not logger.propagate:
+                break
+            logger = logger.parent
+
+        if not found_handler and logging.lastResort is not None:
+            handlers.handle_batch(logging.lastResort, records)
+
     @staticmethod
     def get_formatter(logger_info):
         """Return formatter."""
@@ -59,6 +59,11 @@ def _make_parser():  # pylint: disable=too-many-statements
               " will be archived in S3. Tests can be designated for archival in the"
               " task suite configuration file."))
 
+    parser.add_option(
+        "--archiveEndpointUrl", dest="archive_endpoint_url", metavar="URL",
+        help=("Uploads the archive files to the specified S3-compatible endpoint instead of to"
+              " AWS S3."))
+
     parser.add_option(
         "--archiveLimitMb", type="int", dest="archive_limit_mb", metavar="ARCHIVE_LIMIT_MB",
         help=("Sets the limit (in MB) for archived files to S3. A value of 0"
@@ -70,12 +75,22 @@ def _make_parser():  # pylint: disable=too-many-statements
         help=("Sets the maximum number of tests to archive to S3. A value"
               " of 0 indicates there is no limit."))
 
+    parser.add_option(
+        "--streamArchives", action="store_true", dest="stream_archives",
+        help=("Compresses the archive files on several threads and streams them to S3 in a"
+              " multipart upload, rather than writing each one to a temporary file first."
+              " WiredTiger files with the same contents as a file that was already archived"
+              " are listed in the archive instead of being archived again."))
+
     parser.add_option(
         "--basePort", dest="base_port", metavar="PORT",
         help=("The starting port number to use for mongod and mongos processes"
               " spawned by resmoke.py or the tests themselves. Each fixture and Job"
               " allocates a contiguous range of ports."))
 
+    parser.add_option("--buildloggerGzip", action="store_true", dest="buildlogger_gzip",
+                      help="Gzips the log lines sent to the buildlogger server.")
+
     parser.add_option("--buildloggerUrl", action="store", dest="buildlogger_url", metavar="URL",
                       help="The root url of the buildlogger server.")
 
@@ -87,6 +102,18 @@ def _make_parser():  # pylint: disable=too-many-statements
         help=("The directory which will contain the dbpaths of any mongod's started"
               " by resmoke.py or the tests themselves."))
 
+    parser.add_option(
+        "--dbpathQuotaMB", type="int", dest="dbpath_quota_mb", metavar="MB",
+        help=("Fails the test after which the dbpaths of a job use more than MB megabytes, and"
+              " stops running tests on that job."))
+
+    parser.add_option(
+        "--tmpfsDbpath", action="store_true", dest="tmpfs_dbpath",
+        help=("Puts the dbpaths in the RAM-backed %s directory instead of on disk. Use it for"
+              " suites that don't depend on data surviving a machine crash, along with"
+              " --dbpathQuotaMB to bound their memory usage." %
+              (_config.DEFAULT_TMPFS_DBPATH_PREFIX)))
+
     parser.add_option("--dbtest", dest="dbtest_executable", metavar="PATH",
                       help="The path to the dbtest executable for resmoke to use.")
 
@@ -127,6 +154,24 @@ def _make_parser():  # pylint: disable=too-many-statements
         help=("The number of Job instances to use. Each instance will receive its"
               " own MongoDB deployment to dispatch tests to."))
 
+    parser.add_option(
+        "--pinJobs", action="store_true", dest="pin_jobs",
+        help=("Splits the CPUs resmoke.py is allowed to run on among the jobs along NUMA node"
+              " boundaries, and pins the fixture and test processes of each job to its CPUs."
+              " Only supported on Linux."))
+
+    parser.add_option(
+        "--cpusPerJob", type="int", dest="cpus_per_job", metavar="N",
+        help=("Implies --pinJobs and, unless --jobs is specified, starts one job for every N CPUs"
+              " resmoke.py is allowed to run on."))
+
+    parser.add_option(
+        "--leasePorts", action="store_true", dest="lease_ports",
+        help=("Leases ports to each job on demand, after checking that they are free, instead of"
+              " allocating a fixed range of ports to each job. Leased ports are returned when the"
+              " job's fixture is torn down. This allows fixtures with many nodes and a large"
+              " number of jobs to share the ports above --basePort."))
+
     parser.add_option("-l", "--listSuites", action="store_true", dest="list_suites",
                       help="Lists the names of the suites available to execute.")
 
@@ -162,6 +207,19 @@ def _make_parser():  # pylint: disable=too-many-statements
     parser.add_option("--numClientsPerFixture", type="int", dest="num_clients_per_fixture",
                       help="Number of clients running tests per fixture.")
 
+    parser.add_option(
+        "--outputBufferMb", type="int", dest="output_buffer_mb", metavar="MB",
+        help=("The maximum number of megabytes of output from each of a process's stdout and"
+              " stderr that are buffered while waiting to be logged. Defaults to %default."))
+
+    parser.add_option(
+        "--outputOverflowPolicy", type="choice", dest="output_overflow_policy",
+        choices=("block", "drop"), metavar="POLICY",
+        help=("Controls what happens to the output of a process while its buffer of output waiting"
+              " to be logged is full. If POLICY=block, the output isn't read until the buffer has"
+              " room for it, which may slow down the process. If POLICY=drop, the output is"
+              " dropped. Defaults to POLICY=%default."))
+
     parser.add_option("--perfReportFile", dest="perf_report_file", metavar="PERF_REPORT",
                       help="Writes a JSON file with performance test results.")
 
@@ -216,6 +274,27 @@ def _make_parser():  # pylint: disable=too-many-statements
     parser.add_option("--reportFile", dest="report_file", metavar="REPORT",
                       help="Writes a JSON file with test status and timing information.")
 
+    parser.add_option(
+        "--resourceSampleIntervalMs", type="int", dest="resource_sample_interval_ms",
+        metavar="MS",
+        help=("Samples the CPU, memory, and I/O usage of every process started by resmoke.py"
+              " from /proc every MS milliseconds, attributes the samples to the running test and"
+              " fixture node, and writes them to REPORT.resources.json next to the --reportFile."
+              " Only supported on Linux."))
+
+    parser.add_option(
+        "--streamReportFile", action="store_true", dest="stream_report_file",
+        help=("Appends the result of each test to a per-job REPORT.job<N>.jsonl file as soon as"
+              " the test finishes, and merges those files into the --reportFile at exit. The"
+              " results of the tests that finished survive resmoke.py being killed."))
+
+    parser.add_option(
+        "--reuseFixtures", action="store_true", dest="reuse_fixtures",
+        help=("Keeps the fixtures running at the end of a suite and hands them to the next suite"
+              " with the same fixture configuration, or the next --repeatSuites repetition, after"
+              " dropping all of their non-system databases. This avoids setting up a new fixture"
+              " for each suite."))
+
     parser.add_option(
         "--seed", type="int", dest="seed", metavar="SEED",
         help=("Seed for the random number generator. Useful in combination with the"
@@ -227,6 +306,13 @@ def _make_parser():  # pylint: disable=too-many-statements
     parser.add_option("--transportLayer", dest="transport_layer", metavar="TRANSPORT",
                       help="The transport layer used by jstests")
 
+    parser.add_option(
+        "--shellPool", action="store_true", dest="shell_pool",
+        help=("Starts the mongo shell for the next JS test or hook of each job while the current one"
+              " is still running, so that tests don't wait on the mongo shell starting up. Each"
+              " test still runs in a new mongo shell. Tests using a mongo shell that authenticates"
+              " on startup start their mongo shell as usual."))
+
     parser.add_option("--shellReadMode", type="choice", action="store", dest="shell_read_mode",
                       choices=("commands", "compatibility", "legacy"), metavar="READ_MODE",
                       help="The read mode used by the mongo shell.")
@@ -286,6 +372,45 @@ def _make_parser():  # pylint: disable=too-many-statements
     parser.add_option("--tagFile", dest="tag_file", metavar="OPTIONS",
                       help="A YAML file that associates tests and tags.")
 
+    parser.add_option(
+        "--tagsCacheFile", dest="tags_cache_file", metavar="PATH",
+        help=("A JSON file in which the tags parsed from the comments of JS tests are cached. The"
+              " tags of a test are only parsed again if its modification time or size changed,"
+              " which makes selecting the tests of a suite much faster."))
+
+    parser.add_option(
+        "--testSuiteIndexFile", dest="test_suite_index_file", metavar="PATH",
+        help=("A JSON file in which the tests selected by every suite are recorded along with the"
+              " git revision. When looking up which suites run a test, e.g. with --findSuites,"
+              " only the suites whose YAML file changed are selected again and only the test"
+              " files changed since the recorded revision are checked against the other suites."))
+
+    parser.add_option(
+        "--traceFile", dest="trace_file", metavar="PATH",
+        help=("Writes the time resmoke.py spends on each suite, job, fixture setup and teardown,"
+              " hook and test to the specified file as Chrome trace events, which can be loaded"
+              " in chrome://tracing. A summary of the time spent is logged after each suite."))
+
+    parser.add_option(
+        "--traceSamplingIntervalMs", type="int", dest="trace_sampling_interval_ms",
+        metavar="MS",
+        help=("Samples the stacks of resmoke.py's threads every MS milliseconds when --traceFile"
+              " is specified, and writes them to the trace file with a .folded suffix in the"
+              " format read by flamegraph.pl."))
+
+    parser.add_option(
+        "--testRuntimesFile", dest="test_runtimes_file", metavar="PATH",
+        help=("A JSON file with the historical runtimes of tests, or the report.json file of a"
+              " previous run. When specified, tests are queued longest-first so that a slow test"
+              " isn't left to run by itself at the end of the suite, and the file is updated with"
+              " the runtimes of the tests that ran. A report.json file is only read."))
+
+    parser.add_option(
+        "--useEventLoop", action="store_true", dest="use_event_loop",
+        help=("Reads the output of all of the processes started by resmoke.py from a single asyncio"
+              " event loop thread instead of starting threads to read the output of each process."
+              " This has no effect on Windows."))
+
     parser.add_option("--wiredTigerCollectionConfigString", dest="wt_coll_config", metavar="CONFIG",
                       help="Sets the WiredTiger collection configuration setting for all mongod's.")
 
@@ -401,6 +526,40 @@ def _make_parser():  # pylint: disable=too-many-statements
     benchmark_options.add_option("--benchmarkRepetitions", type="int", dest="benchmark_repetitions",
                                  metavar="BENCHMARK_REPETITIONS", help=benchmark_repetitions_help)
 
+    benchmark_options.add_option(
+        "--benchmarkTargetCiPct", type="float", dest="benchmark_target_ci_pct", metavar="PCT",
+        help=("Runs the repetitions of each benchmark in batches of --benchmarkRepetitions, and"
+              " only runs the benchmarks whose 95% confidence interval of the mean cpu_time is"
+              " wider than PCT percent of the mean again. Stops once every benchmark has"
+              " converged or --benchmarkMaxTimeSecs has passed."))
+
+    benchmark_options.add_option(
+        "--benchmarkMaxTimeSecs", type="int", dest="benchmark_max_time_secs", metavar="SECS",
+        help=("The time after which a benchmark test stops starting new batches of repetitions"
+              " when --benchmarkTargetCiPct is specified. Defaults to %d seconds." %
+              _config.DEFAULT_BENCHMARK_MAX_TIME.total_seconds()))
+
+    benchmark_options.add_option(
+        "--benchmarkStore", dest="benchmark_store", metavar="PATH",
+        help=("Records the results of benchmarks in the specified SQLite database, keyed by git"
+              " revision, benchmark name and thread count, and compares them with the results of"
+              " previous revisions. A benchmark has regressed if its median cpu_time increased"
+              " by at least 5% and a Mann-Whitney U test finds the increase significant."))
+
+    benchmark_options.add_option(
+        "--benchmarkBaselineRevisions", type="int", dest="benchmark_baseline_revisions",
+        metavar="N",
+        help=("The number of most recent revisions in the --benchmarkStore whose results are"
+              " compared with the current results. Defaults to %d." %
+              _config.DEFAULTS["benchmark_baseline_revisions"]))
+
+    benchmark_options.add_option(
+        "--benchmarkRegressionAction", type="choice", dest="benchmark_regression_action",
+        choices=("warn", "fail"), metavar="ACTION",
+        help=("Whether a regression found using the --benchmarkStore is only logged (warn) or"
+              " also fails the benchmark (fail). Defaults to ACTION=%s." %
+              _config.DEFAULTS["benchmark_regression_action"]))
+
     parser.set_defaults(dry_run="off", find_suites=False, list_suites=False, logger_file="console",
                         shuffle="auto", stagger_jobs="off", suite_files="with_server",
                         majority_read_concern="on")
@@ -447,16 +606,27 @@ def to_local_args(args=None):  # pylint: disable=too-many-branches,too-many-loca
     other_local_args = []
 
     options_to_ignore = {
+        "--archiveEndpointUrl",
         "--archiveFile",
         "--archiveLimitMb",
         "--archiveLimitTests",
+        "--benchmarkStore",
+        "--buildloggerGzip",
         "--buildloggerUrl",
         "--log",
         "--perfReportFile",
         "--reportFailureStatus",
         "--reportFile",
+        "--resourceSampleIntervalMs",
         "--staggerJobs",
+        "--streamArchives",
+        "--streamReportFile",
         "--tagFile",
+        "--tagsCacheFile",
+        "--testRuntimesFile",
+        "--testSuiteIndexFile",
+        "--traceFile",
+        "--traceSamplingIntervalMs",
     }
 
     def format_option(option_name, option_value):
@@ -527,6 +697,30 @@ def _validate_options(parser, options, args):
                          options.executor_file, " ".join(args)))
 
 
+def _is_on_tmpfs(path):
+    """Return True if 'path' is on a tmpfs filesystem, according to /proc/mounts."""
+
+    try:
+        with open("/proc/mounts", "r") as fp:
+            mounts = [line.split() for line in fp]
+    except IOError:
+        return False
+
+    # The filesystem of 'path' is the one mounted last at its longest mount point.
+    path = os.path.realpath(path)
+    fstype = None
+    longest_mount_point = ""
+    for fields in mounts:
+        if len(fields) < 3:
+            continue
+        (mount_point, mount_fstype) = (fields[1], fields[2])
+        if path != mount_point and not path.startswith(os.path.join(mount_point, "")):
+            continue
+        if len(mount_point) >= len(longest_mount_point):
+            (longest_mount_point, fstype) = (mount_point, mount_fstype)
+    return fstype == "tmpfs"
+
+
 def _validate_config(parser):
     """Do validation on the config settings."""
 
@@ -543,6 +737,26 @@ def _validate_config(parser):
     if _config.REPEAT_TESTS > 1 and _config.REPEAT_TESTS_SECS:
         parser.error("Cannot specify --repeatTests and --repeatTestsSecs")
 
+    if _config.STREAM_REPORT_FILE and _config.REPORT_FILE is None:
+        parser.error("Must specify --reportFile with --streamReportFile")
+
+    if _config.TMPFS_DBPATH and _config.DBPATH_PREFIX != _config.DEFAULT_TMPFS_DBPATH_PREFIX:
+        parser.error("Cannot specify both --tmpfsDbpath and --dbpathPrefix")
+
+    if _config.TMPFS_DBPATH and not _is_on_tmpfs(
+            os.path.dirname(_config.DEFAULT_TMPFS_DBPATH_PREFIX)):
+        parser.error("--tmpfsDbpath requires a tmpfs filesystem mounted at {}".format(
+            os.path.dirname(_config.DEFAULT_TMPFS_DBPATH_PREFIX)))
+
+    if _config.PIN_JOBS and not hasattr(os, "sched_setaffinity"):
+        parser.error("--pinJobs and --cpusPerJob are only supported on Linux")
+
+    if _config.CPUS_PER_JOB is not None and _config.CPUS_PER_JOB < 1:
+        parser.error("--cpusPerJob must be positive")
+
+    if _config.RESOURCE_SAMPLE_INTERVAL_MS and _config.REPORT_FILE is None:
+        parser.error("Must specify --reportFile with --resourceSampleIntervalMs")
+
     if _config.MIXED_BIN_VERSIONS is not None:
         for version in _config.MIXED_BIN_VERSIONS:
             if version not in set(['old', 'new']):
@@ -591,12 +805,18 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
             config.update(user_config)
 
     _config.ALWAYS_USE_LOG_FILES = config.pop("always_use_log_files")
+    _config.ARCHIVE_ENDPOINT_URL = config.pop("archive_endpoint_url")
     _config.ARCHIVE_FILE = config.pop("archive_file")
     _config.ARCHIVE_LIMIT_MB = config.pop("archive_limit_mb")
     _config.ARCHIVE_LIMIT_TESTS = config.pop("archive_limit_tests")
     _config.BASE_PORT = int(config.pop("base_port"))
+    _config.BUILDLOGGER_GZIP = config.pop("buildlogger_gzip")
     _config.BUILDLOGGER_URL = config.pop("buildlogger_url")
     _config.DBPATH_PREFIX = _expand_user(config.pop("dbpath_prefix"))
+    _config.DBPATH_QUOTA_MB = config.pop("dbpath_quota_mb")
+    _config.TMPFS_DBPATH = config.pop("tmpfs_dbpath")
+    if _config.TMPFS_DBPATH and _config.DBPATH_PREFIX is None:
+        _config.DBPATH_PREFIX = _config.DEFAULT_TMPFS_DBPATH_PREFIX
     _config.DRY_RUN = config.pop("dry_run")
     # EXCLUDE_WITH_ANY_TAGS will always contain the implicitly defined EXCLUDED_TAG.
     _config.EXCLUDE_WITH_ANY_TAGS = [_config.EXCLUDED_TAG]
@@ -608,6 +828,11 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.INCLUDE_WITH_ANY_TAGS = _tags_from_list(config.pop("include_with_any_tags"))
     _config.GENNY_EXECUTABLE = _expand_user(config.pop("genny_executable"))
     _config.JOBS = config.pop("jobs")
+    _config.CPUS_PER_JOB = config.pop("cpus_per_job")
+    _config.PIN_JOBS = config.pop("pin_jobs") or _config.CPUS_PER_JOB is not None
+    if _config.CPUS_PER_JOB and values.jobs is None and hasattr(os, "sched_getaffinity"):
+        _config.JOBS = max(1, len(os.sched_getaffinity(0)) // _config.CPUS_PER_JOB)
+    _config.LEASE_PORTS = config.pop("lease_ports")
     _config.LINEAR_CHAIN = config.pop("linear_chain") == "on"
     _config.LOG_FORMAT = config.pop("log_format")
     _config.MAJORITY_READ_CONCERN = config.pop("majority_read_concern") == "on"
@@ -635,6 +860,8 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.MONGOS_SET_PARAMETERS = config.pop("mongos_set_parameters")
     _config.NO_JOURNAL = config.pop("no_journal")
     _config.NUM_CLIENTS_PER_FIXTURE = config.pop("num_clients_per_fixture")
+    _config.OUTPUT_BUFFER_MB = config.pop("output_buffer_mb")
+    _config.OUTPUT_OVERFLOW_POLICY = config.pop("output_overflow_policy")
     _config.NUM_REPLSET_NODES = config.pop("num_replset_nodes")
     _config.NUM_SHARDS = config.pop("num_shards")
     _config.PERF_REPORT_FILE = config.pop("perf_report_file")
@@ -646,15 +873,26 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.REPEAT_TESTS_SECS = config.pop("repeat_tests_secs")
     _config.REPORT_FAILURE_STATUS = config.pop("report_failure_status")
     _config.REPORT_FILE = config.pop("report_file")
+    _config.RESOURCE_SAMPLE_INTERVAL_MS = config.pop("resource_sample_interval_ms")
+    _config.REUSE_FIXTURES = config.pop("reuse_fixtures")
     _config.SERVICE_EXECUTOR = config.pop("service_executor")
+    _config.SHELL_POOL = config.pop("shell_pool")
     _config.SHELL_READ_MODE = config.pop("shell_read_mode")
     _config.SHELL_WRITE_MODE = config.pop("shell_write_mode")
     _config.SPAWN_USING = config.pop("spawn_using")
     _config.STAGGER_JOBS = config.pop("stagger_jobs") == "on"
+    _config.STREAM_ARCHIVES = config.pop("stream_archives")
+    _config.STREAM_REPORT_FILE = config.pop("stream_report_file")
     _config.STORAGE_ENGINE = config.pop("storage_engine")
     _config.STORAGE_ENGINE_CACHE_SIZE = config.pop("storage_engine_cache_size_gb")
     _config.TAG_FILE = config.pop("tag_file")
+    _config.TAGS_CACHE_FILE = _expand_user(config.pop("tags_cache_file"))
+    _config.TEST_RUNTIMES_FILE = _expand_user(config.pop("test_runtimes_file"))
+    _config.TEST_SUITE_INDEX_FILE = _expand_user(config.pop("test_suite_index_file"))
+    _config.TRACE_FILE = _expand_user(config.pop("trace_file"))
+    _config.TRACE_SAMPLING_INTERVAL_MS = config.pop("trace_sampling_interval_ms")
     _config.TRANSPORT_LAYER = config.pop("transport_layer")
+    _config.USE_EVENT_LOOP = config.pop("use_event_loop")
 
     # Evergreen options.
     _config.EVERGREEN_BUILD_ID = config.pop("build_id")
@@ -681,6 +919,14 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     if benchmark_min_time is not None:
         _config.BENCHMARK_MIN_TIME = datetime.timedelta(seconds=benchmark_min_time)
     _config.BENCHMARK_REPETITIONS = config.pop("benchmark_repetitions")
+    _config.BENCHMARK_TARGET_CI_PCT = config.pop("benchmark_target_ci_pct")
+    benchmark_max_time = config.pop("benchmark_max_time_secs")
+    _config.BENCHMARK_MAX_TIME = _config.DEFAULT_BENCHMARK_MAX_TIME
+    if benchmark_max_time is not None:
+        _config.BENCHMARK_MAX_TIME = datetime.timedelta(seconds=benchmark_max_time)
+    _config.BENCHMARK_STORE = _expand_user(config.pop("benchmark_store"))
+    _config.BENCHMARK_BASELINE_REVISIONS = config.pop("benchmark_baseline_revisions")
+    _config.BENCHMARK_REGRESSION_ACTION = config.pop("benchmark_regression_action")
 
     # Config Dir options.
     _config.CONFIG_DIR = config.pop("config_dir")
@@ -1,6 +1,8 @@
 """Manage interactions with the report.json file."""
 
+import glob
 import json
+import os
 
 from . import config
 from .testing import report as _report
@@ -16,6 +18,42 @@ def write(suites):
     for suite in suites:
         reports.extend(suite.get_reports())
 
-    combined_report_dict = _report.TestReport.combine(*reports).as_dict()
+    combined_report = _report.TestReport.combine(*reports)
+    if config.STREAM_REPORT_FILE:
+        _write_from_streams(combined_report)
+        return
+
+    combined_report_dict = combined_report.as_dict()
     with open(config.REPORT_FILE, "w") as fp:
         json.dump(combined_report_dict, fp)
+
+
+def remove_streams():
+    """Remove the files streamed to by an earlier run with the same --reportFile, if any."""
+    for filename in _get_stream_filenames():
+        os.remove(filename)
+
+
+def _get_stream_filenames():
+    """Return the files the results of the tests run by each job are streamed to."""
+    return sorted(glob.glob(_report.get_stream_filename("*")))
+
+
+def _write_from_streams(combined_report):
+    """Write the report file from 'combined_report' one result at a time.
+
+    The tests that finished are read back from the stream files of each job rather than building
+    the whole report in memory.
+    """
+
+    separator = ""
+    with open(config.REPORT_FILE, "w") as fp:
+        fp.write('{"results": [')
+
+        for test_info in combined_report.iter_test_infos():
+            fp.write(separator + json.dumps(test_info.as_dict()))
+            separator = ", "
+
+        num_failures = (combined_report.num_failed + combined_report.num_errored +
+                        combined_report.num_interrupted)
+        fp.write('], "failures": {}}}'.format(num_failures))
@@ -19,6 +19,23 @@ from . import errors
 from . import utils
 from .utils import globstar
 from .utils import jscomment
+from .utils import tagscache
+
+# The TagsCache for --tagsCacheFile, which is read the first time it is needed.
+_TAGS_CACHE = None
+
+
+def _get_tags_cache():
+    """Return the TagsCache for --tagsCacheFile, or None if it wasn't specified."""
+
+    global _TAGS_CACHE  # pylint: disable=global-statement
+    if config.TAGS_CACHE_FILE is None:
+        return None
+
+    if _TAGS_CACHE is None or _TAGS_CACHE.filename != config.TAGS_CACHE_FILE:
+        _TAGS_CACHE = tagscache.TagsCache.from_file(config.TAGS_CACHE_FILE)
+    return _TAGS_CACHE
+
 
 ########################
 #  Test file explorer  #
@@ -47,6 +64,9 @@ class TestFileExplorer(object):
         Returns:
             A list of paths as a list(str).
         """
+        tags_cache = _get_tags_cache()
+        if tags_cache is not None:
+            return tags_cache.glob(pattern)
         return globstar.iglob(pattern)
 
     @staticmethod
@@ -57,6 +77,9 @@ class TestFileExplorer(object):
         Returns:
             A list of tags.
         """
+        tags_cache = _get_tags_cache()
+        if tags_cache is not None:
+            return tags_cache.get_tags(file_path)
         return jscomment.get_tags(file_path)
 
     @staticmethod
@@ -398,6 +421,17 @@ class _SelectorConfig(object):
         return None
 
 
+def _matches_any_path(test_file, paths):
+    """Return true if 'test_file' is one of 'paths' or matches one of its glob patterns."""
+    for path in paths:
+        if globstar.is_glob_pattern(path):
+            if globstar.match(test_file, path):
+                return True
+        elif os.path.normpath(path) == test_file:
+            return True
+    return False
+
+
 class _Selector(object):
     """Selection algorithm to select tests matching a selector configuration."""
 
@@ -439,6 +473,27 @@ class _Selector(object):
 
         return self.sort_tests(*test_list.get_tests())
 
+    def is_selected(self, selector_config, test_file):
+        """Return whether select() would select 'test_file' with the given configuration.
+
+        The test file is matched against the roots, include_files, and exclude_files patterns
+        instead of them being expanded, so only the tags of 'test_file' itself are read.
+        """
+
+        test_file = os.path.normpath(test_file)
+        if not self._test_file_explorer.isfile(test_file):
+            return False
+        if not _matches_any_path(test_file, selector_config.roots):
+            return False
+        # The include_files are applied last and take precedence over the exclude_files and tags.
+        if selector_config.include_files:
+            return _matches_any_path(test_file, selector_config.include_files)
+        if _matches_any_path(test_file, selector_config.exclude_files):
+            return False
+        if selector_config.tags_expression:
+            return selector_config.tags_expression(self.get_tags(test_file))
+        return True
+
     @staticmethod
     def sort_tests(tests, excluded):
         """Sort the tests before returning them."""
@@ -709,6 +764,20 @@ _SELECTOR_REGISTRY = {
     "cpp_libfuzzer_test": (_CppTestSelectorConfig, _CppTestSelector),
 }
 
+# The test kinds whose tests are the files matching their "roots" patterns, which
+# make_test_matcher() can check one test file at a time.
+FILE_SELECTOR_TEST_KINDS = frozenset([
+    "fsm_workload_test",
+    "genny_test",
+    "js_test",
+    "json_schema_test",
+    "mql_model_haskell_test",
+    "mql_model_mongod_test",
+    "multi_stmt_txn_passthrough",
+    "py_test",
+    "sdam_json_test",
+])
+
 
 def filter_tests(test_kind, selector_config, test_file_explorer=_DEFAULT_TEST_FILE_EXPLORER):
     """Filter the tests according to a specified configuration.
@@ -724,4 +793,26 @@ def filter_tests(test_kind, selector_config, test_file_explorer=_DEFAULT_TEST_FI
     selector_config_class, selector_class = _SELECTOR_REGISTRY[test_kind]
     selector = selector_class(test_file_explorer)
     selector_config = selector_config_class(**selector_config)
-    return selector.select(selector_config)
+    selected = selector.select(selector_config)
+
+    tags_cache = _get_tags_cache()
+    if tags_cache is not None:
+        tags_cache.save()
+
+    return selected
+
+
+def make_test_matcher(test_kind, selector_config, test_file_explorer=_DEFAULT_TEST_FILE_EXPLORER):
+    """Return a function indicating whether filter_tests() would select a given test file.
+
+    Args:
+        test_kind: the test kind, from FILE_SELECTOR_TEST_KINDS.
+        selector_config: a dict containing the selector configuration.
+        test_file_explorer: the TestFileExplorer to use.
+    """
+    if test_kind not in FILE_SELECTOR_TEST_KINDS:
+        raise ValueError("Tests of kind '{}' can't be matched one at a time".format(test_kind))
+    selector_config_class, selector_class = _SELECTOR_REGISTRY[test_kind]
+    selector = selector_class(test_file_explorer)
+    selector_config = selector_config_class(**selector_config)
+    return lambda test_file: selector.is_selected(selector_config, test_file)
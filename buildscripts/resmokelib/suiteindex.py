@@ -0,0 +1,263 @@
+"""On-disk index of the suites that run each test file.
+
+Finding the suites that run a test requires selecting the tests of every suite, which means
+expanding the "roots" glob patterns and reading the tags of every JS test for each suite. The index
+records the selector configuration and the selected tests of each suite along with the git revision
+they were selected at. When the index is updated, only the suites whose YAML file changed are
+selected again; the test files that changed since the recorded revision are checked against the
+selector configuration of the other suites one at a time.
+"""
+
+import hashlib
+import json
+import os
+import os.path
+import subprocess
+
+from . import config as _config
+from . import selector as _selector
+from . import utils
+from .testing import suite as _suite
+
+# Bumped whenever the format of the index file, or how the tests of a suite are selected, changes so
+# that older indexes are discarded.
+_VERSION = 1
+
+
+def _get_fingerprint(pathname):
+    """Return the SHA-1 of the contents of 'pathname', or None if it doesn't exist."""
+    try:
+        with open(pathname, "rb") as fp:
+            return hashlib.sha1(fp.read()).hexdigest()
+    except IOError:
+        return None
+
+
+def _run_git(args):
+    """Return the lines output by git, or None if it failed."""
+    try:
+        output = subprocess.check_output(["git"] + args, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode("utf-8").splitlines()
+
+
+def get_revision():
+    """Return the checked out git commit, or None if it can't be determined."""
+    lines = _run_git(["rev-parse", "HEAD"])
+    return lines[0].strip() if lines else None
+
+
+def get_changed_files(revision):
+    """Return the set of files that differ between 'revision' and the working tree.
+
+    Files that were added, modified, or deleted, whether or not they were committed, are returned
+    along with the untracked files. None is returned if git fails, e.g. because 'revision' is
+    unknown.
+    """
+
+    changed_files = _run_git(["diff", "--name-only", "--no-renames", revision, "--"])
+    untracked_files = _run_git(["ls-files", "--others", "--exclude-standard"])
+    if changed_files is None or untracked_files is None:
+        return None
+    return {os.path.normpath(path) for path in changed_files + untracked_files if path}
+
+
+def _get_selection_options():
+    """Return the command line options that affect which tests the suites select."""
+
+    def sorted_or_none(tags):
+        return sorted(tags) if tags is not None else None
+
+    return {
+        "exclude_with_any_tags": sorted_or_none(_config.EXCLUDE_WITH_ANY_TAGS),
+        "include_with_any_tags": sorted_or_none(_config.INCLUDE_WITH_ANY_TAGS),
+        "tag_file": _config.TAG_FILE,
+        "tag_file_fingerprint": _get_fingerprint(_config.TAG_FILE) if _config.TAG_FILE else None,
+    }
+
+
+class _MemoizingTestFileExplorer(_selector.TestFileExplorer):
+    """TestFileExplorer that reads the tags of each test file and the tag file only once.
+
+    Each changed test file is checked against the selector of every suite, which would otherwise
+    read its tags once per suite.
+    """
+
+    def __init__(self):
+        """Initialize the _MemoizingTestFileExplorer."""
+        _selector.TestFileExplorer.__init__(self)
+        self._jstest_tags = {}
+        self._tag_files = {}
+
+    def jstest_tags(self, file_path):
+        """Return the tags of the JavaScript test file 'file_path'."""
+        if file_path not in self._jstest_tags:
+            self._jstest_tags[file_path] = _selector.TestFileExplorer.jstest_tags(file_path)
+        return self._jstest_tags[file_path]
+
+    def parse_tag_file(self, test_kind):
+        """Return the tests associated with tags by the tag file."""
+        if test_kind not in self._tag_files:
+            self._tag_files[test_kind] = _selector.TestFileExplorer.parse_tag_file(test_kind)
+        return self._tag_files[test_kind]
+
+
+class SuiteIndex(object):
+    """Selector configuration and selected tests of each suite, as of a git revision."""
+
+    def __init__(self, filename, contents=None):
+        """Initialize the SuiteIndex, which is saved to 'filename'."""
+        self.filename = filename
+        contents = utils.default_if_none(contents, {})
+        self._revision = contents.get("revision")
+        self._options = contents.get("options")
+        # The files that differed from the revision when the index was last updated. They are
+        # checked again on the next update in case they were reverted since.
+        self._changed_files = contents.get("changed_files", [])
+        self._suites = contents.get("suites", {})
+        self._suites_by_test = None
+        self._modified = False
+
+    @classmethod
+    def from_file(cls, filename):
+        """Return the SuiteIndex read from 'filename'.
+
+        An empty index is returned if the file does not exist or was written by another version.
+        """
+
+        try:
+            with open(filename, "r") as fp:
+                contents = json.load(fp)
+        except (IOError, ValueError):
+            return cls(filename)
+
+        if contents.get("version") != _VERSION:
+            return cls(filename)
+
+        return cls(filename, contents)
+
+    def update(self, suite_names):
+        """Bring the index up to date with the YAML files of 'suite_names' and the working tree.
+
+        If the index was built at another revision, only the files changed since are checked, unless
+        the options affecting the tag matching changed, in which case the index is rebuilt.
+        """
+
+        revision = get_revision()
+        options = _get_selection_options()
+
+        changed_files = None
+        if revision is not None and self._revision is not None and options == self._options:
+            changed_files = get_changed_files(self._revision)
+        if changed_files is None:
+            # Every suite is selected again below.
+            self._suites = {}
+            changed_files = set()
+        else:
+            changed_files.update(self._changed_files)
+
+        test_file_explorer = _MemoizingTestFileExplorer()
+        suites = {}
+        for suite_name in suite_names:
+            pathname = _config.NAMED_SUITES[suite_name]  # pylint: disable=unsubscriptable-object
+            fingerprint = _get_fingerprint(pathname)
+            entry = self._suites.get(suite_name)
+            if entry is None or entry["fingerprint"] != fingerprint:
+                entry = self._index_suite(suite_name, pathname, fingerprint)
+                self._modified = True
+            elif entry["tests"] is not None and changed_files:
+                self._modified |= self._update_tests(entry, changed_files, test_file_explorer)
+            suites[suite_name] = entry
+
+        if set(suites) != set(self._suites):
+            self._modified = True
+        self._suites = suites
+        self._suites_by_test = None
+
+        if revision != self._revision or options != self._options:
+            self._modified = True
+            if revision is not None and revision != self._revision:
+                changed_files = utils.default_if_none(get_changed_files(revision), changed_files)
+        if sorted(changed_files) != self._changed_files:
+            self._modified = True
+        self._revision = revision
+        self._options = options
+        self._changed_files = sorted(changed_files)
+
+    @staticmethod
+    def _index_suite(suite_name, pathname, fingerprint):
+        suite_config = utils.load_yaml_file(pathname)
+        test_kind = suite_config.get("test_kind")
+        entry = {
+            "fingerprint": fingerprint, "test_kind": test_kind, "selector": None, "tests": None
+        }
+
+        # The tests of the other kinds are listed in files generated by the build or by running a
+        # binary, which changes without the revision changing.
+        if test_kind in _selector.FILE_SELECTOR_TEST_KINDS:
+            suite = _suite.Suite(suite_name, suite_config)
+            entry["selector"] = suite.get_selector_config()
+            entry["tests"] = [test for test in suite.tests if isinstance(test, str)]
+        return entry
+
+    @staticmethod
+    def _update_tests(entry, changed_files, test_file_explorer):
+        """Add or remove the changed files from the tests of the suite, return whether any were."""
+
+        is_selected = _selector.make_test_matcher(entry["test_kind"], entry["selector"],
+                                                  test_file_explorer)
+        tests = entry["tests"]
+        selected_tests = set(tests)
+        modified = False
+        for test_file in sorted(changed_files):
+            if is_selected(test_file):
+                if test_file not in selected_tests:
+                    tests.append(test_file)
+                    selected_tests.add(test_file)
+                    modified = True
+            elif test_file in selected_tests:
+                tests.remove(test_file)
+                selected_tests.discard(test_file)
+                modified = True
+        return modified
+
+    def get_test_kind(self, suite_name):
+        """Return the test kind of 'suite_name'."""
+        return self._suites[suite_name]["test_kind"]
+
+    def get_tests(self, suite_name):
+        """Return the tests of 'suite_name', or None if the tests of its kind aren't indexed."""
+        tests = self._suites[suite_name]["tests"]
+        return list(tests) if tests is not None else None
+
+    def get_suites(self, test_file):
+        """Return the names of the indexed suites that run 'test_file'."""
+        if self._suites_by_test is None:
+            self._suites_by_test = {}
+            for (suite_name, entry) in self._suites.items():
+                for test in entry["tests"] or []:
+                    self._suites_by_test.setdefault(test, []).append(suite_name)
+        return list(self._suites_by_test.get(os.path.normpath(test_file), []))
+
+    def save(self):
+        """Write the index to its file if it changed since it was read."""
+
+        if not self._modified:
+            return
+
+        contents = {
+            "version": _VERSION,
+            "revision": self._revision,
+            "options": self._options,
+            "changed_files": self._changed_files,
+            "suites": self._suites,
+        }
+
+        # Write to a temporary file first so that a concurrent reader or an interrupted write never
+        # observes a partially written index.
+        tmp_filename = "{}.{}.tmp".format(self.filename, os.getpid())
+        with open(tmp_filename, "w") as fp:
+            json.dump(contents, fp)
+        os.replace(tmp_filename, self.filename)
+        self._modified = False
@@ -6,6 +6,7 @@ import os
 
 from . import config as _config
 from . import errors
+from . import suiteindex
 from . import utils
 from .testing import suite as _suite
 
@@ -32,13 +33,23 @@ def get_named_suites_with_root_level_key(root_level_key):
     return suites_to_return
 
 
+def get_named_suites_by_test_kind():
+    """Return a dict of each test kind to the names of the suites running tests of that kind."""
+    suites_by_test_kind = collections.defaultdict(list)
+    for suite_name in get_named_suites():
+        suite_config = _get_suite_config(suite_name)
+        suites_by_test_kind[suite_config.get("test_kind")].append(suite_name)
+    return suites_by_test_kind
+
+
 def create_test_membership_map(fail_on_missing_selector=False, test_kind=None):
     """Return a dict keyed by test name containing all of the suites that will run that test.
 
     If 'test_kind' is specified, then only the mappings for that kind of test are returned. Multiple
     kinds of tests can be specified as an iterable (e.g. a tuple or list). This function parses the
     definition of every available test suite, which is an expensive operation. It is therefore
-    desirable for it to only ever be called once.
+    desirable for it to only ever be called once, or for --testSuiteIndexFile to be specified so that
+    only the suites and tests that changed since the index was last updated are parsed again.
     """
     if test_kind is not None:
         if isinstance(test_kind, str):
@@ -48,29 +59,46 @@ def create_test_membership_map(fail_on_missing_selector=False, test_kind=None):
 
     test_membership = collections.defaultdict(list)
     suite_names = get_named_suites()
+    suite_index = _get_suite_index(suite_names)
     for suite_name in suite_names:
-        try:
-            suite_config = _get_suite_config(suite_name)
-            if test_kind and suite_config.get("test_kind") not in test_kind:
+        tests = suite_index.get_tests(suite_name) if suite_index is not None else None
+        if tests is not None:
+            if test_kind and suite_index.get_test_kind(suite_name) not in test_kind:
                 continue
-            suite = _suite.Suite(suite_name, suite_config)
-        except IOError as err:
-            # We ignore errors from missing files referenced in the test suite's "selector"
-            # section. Certain test suites (e.g. unittests.yml) have a dedicated text file to
-            # capture the list of tests they run; the text file may not be available if the
-            # associated SCons target hasn't been built yet.
-            if err.filename in _config.EXTERNAL_SUITE_SELECTORS:
-                if not fail_on_missing_selector:
+        else:
+            try:
+                suite_config = _get_suite_config(suite_name)
+                if test_kind and suite_config.get("test_kind") not in test_kind:
                     continue
-            raise
-
-        for testfile in suite.tests:
+                tests = _suite.Suite(suite_name, suite_config).tests
+            except IOError as err:
+                # We ignore errors from missing files referenced in the test suite's "selector"
+                # section. Certain test suites (e.g. unittests.yml) have a dedicated text file to
+                # capture the list of tests they run; the text file may not be available if the
+                # associated SCons target hasn't been built yet.
+                if err.filename in _config.EXTERNAL_SUITE_SELECTORS:
+                    if not fail_on_missing_selector:
+                        continue
+                raise
+
+        for testfile in tests:
             if isinstance(testfile, (dict, list)):
                 continue
             test_membership[testfile].append(suite_name)
     return test_membership
 
 
+def _get_suite_index(suite_names):
+    """Return the SuiteIndex for --testSuiteIndexFile updated for 'suite_names', or None."""
+    if _config.TEST_SUITE_INDEX_FILE is None:
+        return None
+
+    suite_index = suiteindex.SuiteIndex.from_file(_config.TEST_SUITE_INDEX_FILE)
+    suite_index.update(suite_names)
+    suite_index.save()
+    return suite_index
+
+
 def get_suites(suite_files, test_files):
     """Retrieve the Suite instances based on suite configuration files and override parameters.
 
@@ -12,8 +12,12 @@ from . import report as _report
 from . import testcases
 from .. import config as _config
 from .. import errors
+from .. import testruntimes
+from .. import tracing
 from .. import utils
 from ..core import network
+from ..core import placement
+from .fixtures import pool as _fixture_pool
 from ..utils.queue import Queue
 
 
@@ -85,8 +89,22 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         :return: List of jobs.
         """
         n_jobs_to_start = self._num_jobs_to_start(self._suite, num_tests)
+        placement.assign(n_jobs_to_start, self.logger)
+        if self._reuse_fixtures():
+            # Pooled fixtures of another configuration must stop before new fixtures are created
+            # with the same ports.
+            _fixture_pool.teardown_mismatched(self.fixture_config, self.logger)
         return [self._make_job(job_num) for job_num in range(n_jobs_to_start)]
 
+    def _reuse_fixtures(self):
+        """Return True if the fixtures are handed to the next suite rather than torn down."""
+        if not _config.REUSE_FIXTURES:
+            return False
+
+        # Dropping the databases of a cluster resmoke.py didn't start would be destructive.
+        return (self.fixture_config is None
+                or self.fixture_config["class"] != fixtures.EXTERNAL_FIXTURE_CLASS)
+
     def run(self):
         """Execute the test suite.
 
@@ -114,8 +132,10 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                 # Have the Job threads destroy their fixture during the final repetition after they
                 # finish running their last test. This avoids having a large number of processes
                 # still running if an Evergreen task were to time out from a hang/deadlock being
-                # triggered.
-                teardown_flag = threading.Event() if num_repeat_suites == 1 else None
+                # triggered. Fixtures that are reused by the next suite are instead kept running.
+                teardown_flag = None
+                if num_repeat_suites == 1 and not self._reuse_fixtures():
+                    teardown_flag = threading.Event()
                 (report, interrupted) = self._run_tests(test_queue, setup_flag, teardown_flag)
 
                 self._suite.record_test_end(report)
@@ -124,8 +144,9 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                     self.logger.error("Setup of one of the job fixtures failed")
                     return_code = 2
                     return
-                # Remove the setup flag once the first suite ran.
-                setup_flag = None
+                # Remove the setup flag once the first suite ran. When fixtures are reused, each
+                # repetition instead starts by dropping the data left behind by the previous one.
+                setup_flag = threading.Event() if self._reuse_fixtures() else None
 
                 # If the user triggered a KeyboardInterrupt, then we should stop.
                 if interrupted:
@@ -143,8 +164,7 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                     if self._suite.options.fail_fast:
                         break
 
-                test_report = report.as_dict()
-                test_results_num = len(test_report["results"])
+                test_results_num = report.get_num_results()
                 # There should be at least as many tests results as expected number of tests.
                 if test_results_num < self.num_tests:
                     raise errors.ResmokeError(
@@ -157,7 +177,10 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                 num_repeat_suites -= 1
         finally:
             if not teardown_flag:
-                if not self._teardown_fixtures():
+                if self._reuse_fixtures() and return_code != 2:
+                    if not self._release_fixtures():
+                        return_code = 2
+                elif not self._teardown_fixtures():
                     return_code = 2
             self._suite.return_code = return_code
 
@@ -176,7 +199,7 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
             # Run each Job instance in its own thread.
             for job in self._jobs:
                 thr = threading.Thread(
-                    target=job, args=(test_queue, interrupt_flag), kwargs=dict(
+                    target=tracing.propagate(job), args=(test_queue, interrupt_flag), kwargs=dict(
                         setup_flag=setup_flag, teardown_flag=teardown_flag))
                 # Do not wait for tests to finish executing if interrupted by the user.
                 thr.daemon = True
@@ -233,6 +256,22 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                 success = False
         return success
 
+    def _release_fixtures(self):
+        """Add the fixtures that are still running to the fixture pool and tear down the others.
+
+        Returns true if all fixtures were either pooled or torn down successfully, and false
+        otherwise.
+        """
+        success = True
+        for job in self._jobs:
+            if job.manager.fixture_is_set_up and job.fixture.is_running():
+                _fixture_pool.release(self.fixture_config, job.fixture)
+            elif not job.manager.teardown_fixture(self.logger):
+                self.logger.warning("Teardown of %s of job %s was not successful", job.fixture,
+                                    job.manager.job_num)
+                success = False
+        return success
+
     def _make_fixture(self, job_num, job_logger):
         """Create a fixture for a job."""
 
@@ -270,13 +309,27 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         """
         job_logger = self.logger.new_job_logger(self._suite.test_kind, job_num)
 
-        fixture = self._make_fixture(job_num, job_logger)
+        fixture = None
+        if self._reuse_fixtures():
+            fixture = _fixture_pool.acquire(self.fixture_config, job_num)
+        fixture_is_set_up = fixture is not None
+        if fixture_is_set_up:
+            # The fixture keeps logging through the fixture logger of the suite that created it.
+            job_logger.info("Reusing %s from a previous suite.", fixture)
+            placement.pin_processes(fixture.pids(), job_num)
+        else:
+            fixture = self._make_fixture(job_num, job_logger)
         hooks = self._make_hooks(fixture)
 
-        report = _report.TestReport(job_logger, self._suite.options)
+        stream_filename = None
+        if _config.STREAM_REPORT_FILE:
+            stream_filename = _report.get_stream_filename(job_num)
+        report = _report.TestReport(job_logger, self._suite.options,
+                                    stream_filename=stream_filename)
 
         return _job.Job(job_num, job_logger, fixture, hooks, report, self.archival,
-                        self._suite.options, self.test_queue_logger)
+                        self._suite.options, self.test_queue_logger,
+                        fixture_is_set_up=fixture_is_set_up)
 
     def _num_times_to_repeat_tests(self):
         """
@@ -312,15 +365,29 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         Use a multi-consumer queue instead of a unittest.TestSuite so that the test cases can
         be dispatched to multiple threads.
 
+        If --testRuntimesFile was specified, then the queue_elements are ordered longest-first by
+        their historical runtimes. Because idle jobs take the next test from the shared queue, this
+        is the longest-processing-time-first schedule and prevents a slow test picked up last from
+        leaving a single job running after the others have finished.
+
         :return: Queue of testcases to run.
         """
-        queue = Queue()
-
-        # Put all the test cases in a queue.
+        queue_elems = []
         for _ in range(self._num_times_to_repeat_tests()):
             for test_name in self._suite.tests:
-                queue_elem = self._create_queue_elem_for_test_name(test_name)
-                queue.put(queue_elem)
+                queue_elems.append(self._create_queue_elem_for_test_name(test_name))
+
+        test_runtimes = testruntimes.load()
+        if test_runtimes is not None:
+            self.logger.info("Ordering %ss by their historical runtimes from %s, longest first.",
+                             self._suite.test_kind, _config.TEST_RUNTIMES_FILE)
+            queue_elems = test_runtimes.sort_longest_first(
+                queue_elems, key=lambda queue_elem: queue_elem.testcase.test_name)
+
+        # Put all the test cases in a queue.
+        queue = Queue()
+        for queue_elem in queue_elems:
+            queue.put(queue_elem)
 
         return queue
 
@@ -1,5 +1,6 @@
 """Interface of the different fixtures for executing JSTests against."""
 
+import concurrent.futures
 import os.path
 import time
 from enum import Enum
@@ -11,6 +12,7 @@ from ... import config
 from ... import errors
 from ... import logging
 from ... import multiversionconstants as multiversion
+from ... import tracing
 from ... import utils
 from ...utils import registry
 
@@ -38,9 +40,33 @@ def make_fixture(class_name, *args, **kwargs):
     return _FIXTURES[class_name](*args, **kwargs)
 
 
+def run_concurrently(functions):
+    """Call each of 'functions' in its own thread and wait for all of them to return.
+
+    Once all of them have returned, the exception raised by the first of 'functions' to fail is
+    re-raised. The processes started by 'functions' count towards the spans of the calling
+    thread.
+    """
+
+    if len(functions) <= 1:
+        for function in functions:
+            function()
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(functions)) as executor:
+        futures = [executor.submit(tracing.propagate(function)) for function in functions]
+
+    for future in futures:
+        future.result()
+
+
 class Fixture(object, metaclass=registry.make_registry_metaclass(_FIXTURES)):
     """Base class for all fixtures."""
 
+    # Messages logged by mongod and mongos once they are listening for connections, in the text and
+    # JSON log formats respectively.
+    _WAITING_FOR_CONNECTIONS_MESSAGES = ("waiting for connections", "Waiting for connections")
+
     # We explicitly set the 'REGISTERED_NAME' attribute so that PyLint realizes that the attribute
     # is defined for all subclasses of Fixture.
     REGISTERED_NAME = "Fixture"
@@ -71,6 +97,15 @@ class Fixture(object, metaclass=registry.make_registry_metaclass(_FIXTURES)):
         """Return any pids owned by this fixture."""
         raise NotImplementedError("pids must be implemented by Fixture subclasses %s" % self)
 
+    def assign_ports(self):
+        """Choose the ports of the fixture's processes without starting them.
+
+        setup() chooses any ports that weren't already. A fixture that sets up other fixtures
+        concurrently calls this on each of them in turn first, so that the ports they get don't
+        depend on the order their threads happen to run in.
+        """
+        pass
+
     def setup(self):
         """Create the fixture."""
         pass
@@ -112,6 +147,27 @@ class Fixture(object, metaclass=registry.make_registry_metaclass(_FIXTURES)):
         """Return true if the fixture is still operating and more tests and can be run."""
         return True
 
+    def clear_data(self):
+        """Drop all non-system databases so the fixture can be reused as if it were newly set up.
+
+        Raises:
+            errors.ServerFailure: If the databases could not be dropped.
+        """
+        self._drop_non_system_databases(self.mongo_client())
+
+    def _drop_non_system_databases(self, client):
+        """Drop every database other than the 'admin', 'config', and 'local' databases."""
+        try:
+            for db_name in client.list_database_names():
+                if db_name in ("admin", "config", "local"):
+                    continue
+                self.logger.info("Dropping database '%s'.", db_name)
+                client.drop_database(db_name)
+        except pymongo.errors.PyMongoError as err:
+            msg = "Failed to drop the databases of {}: {}".format(self, err)
+            self.logger.error(msg)
+            raise errors.ServerFailure(msg)
+
     def get_dbpath_prefix(self):
         """Return dbpath prefix."""
         return self._dbpath_prefix
@@ -224,6 +280,10 @@ class NoOpFixture(Fixture):
         """Return the mongo_client connection."""
         raise NotImplementedError("NoOpFixture does not support a mongo_client")
 
+    def clear_data(self):
+        """Do nothing since there is no data owned by the NoOpFixture."""
+        pass
+
     def get_internal_connection_string(self):
         """Return the internal connection string."""
         return None
@@ -0,0 +1,90 @@
+"""Pool of fixtures kept running after a suite finishes so that later suites can reuse them.
+
+A fixture is only handed to a later suite when it was created from the same fixture configuration
+and for the same job number, which guarantees it holds the ports the new job would have allocated.
+"""
+
+import json
+import threading
+
+from ... import errors
+from ...core import network
+
+_POOL_LOCK = threading.Lock()
+
+# Mapping of job number to a (fixture config key, fixture) pair.
+_POOL = {}  # type: ignore
+
+
+def _make_key(fixture_config):
+    """Return a hashable representation of the fixture section of a suite's YAML configuration."""
+    return json.dumps(fixture_config, sort_keys=True, default=str)
+
+
+def release(fixture_config, fixture):
+    """Add the running 'fixture' created from 'fixture_config' to the pool."""
+
+    with _POOL_LOCK:
+        if fixture.job_num in _POOL:
+            raise ValueError("A fixture for job {} is already pooled".format(fixture.job_num))
+
+        _POOL[fixture.job_num] = (_make_key(fixture_config), fixture)
+
+
+def acquire(fixture_config, job_num):
+    """Remove and return the pooled fixture of 'job_num' if it was created from 'fixture_config'.
+
+    Return None if there is no such fixture.
+    """
+
+    with _POOL_LOCK:
+        if job_num not in _POOL:
+            return None
+
+        (key, fixture) = _POOL[job_num]
+        if key != _make_key(fixture_config):
+            return None
+
+        del _POOL[job_num]
+        return fixture
+
+
+def teardown_mismatched(fixture_config, logger):
+    """Tear down the pooled fixtures that weren't created from 'fixture_config'.
+
+    This must be called before creating new fixtures so that they don't conflict with the ports of
+    a pooled fixture of the same job. Return True if all of the teardowns were successful.
+    """
+
+    key = _make_key(fixture_config)
+    with _POOL_LOCK:
+        job_nums = [job_num for (job_num, (fixture_key, _)) in _POOL.items() if fixture_key != key]
+        fixtures = [_POOL.pop(job_num)[1] for job_num in job_nums]
+
+    return _teardown(fixtures, logger)
+
+
+def teardown_all(logger):
+    """Tear down all of the pooled fixtures. Return True if all of the teardowns were successful."""
+
+    with _POOL_LOCK:
+        fixtures = [fixture for (_, fixture) in _POOL.values()]
+        _POOL.clear()
+
+    return _teardown(fixtures, logger)
+
+
+def _teardown(fixtures, logger):
+    """Tear down 'fixtures' and close their logging handlers."""
+
+    success = True
+    for fixture in fixtures:
+        try:
+            logger.info("Tearing down pooled %s.", fixture)
+            fixture.teardown(finished=True)
+            network.PortAllocator.release_ports(fixture.job_num)
+        except errors.ServerFailure as err:
+            logger.warning("Teardown of pooled %s was not successful: %s", fixture, err)
+            success = False
+
+    return success
@@ -22,6 +22,9 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
     # Error response codes copied from mongo/base/error_codes.err.
     _NODE_NOT_FOUND = 74
 
+    # How long a node may hold an awaitable isMaster request before responding without a change.
+    _AWAITABLE_IS_MASTER_TIMEOUT_MS = 1000
+
     def __init__(  # pylint: disable=too-many-arguments, too-many-locals
             self, logger, job_num, mongod_options=None, dbpath_prefix=None, preserve_dbpath=False,
             num_nodes=2, start_initial_sync_node=False, write_concern_majority_journal_default=None,
@@ -104,14 +107,29 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
         self.initial_sync_node = None
         self.initial_sync_node_idx = -1
 
-    def setup(self):  # pylint: disable=too-many-branches,too-many-statements
-        """Set up the replica set."""
+    def _create_nodes(self):
         self.replset_name = self.mongod_options.get("replSet", "rs")
         if not self.nodes:
             for i in range(self.num_nodes):
                 node = self._new_mongod(i, self.replset_name)
                 self.nodes.append(node)
 
+        if self.start_initial_sync_node and not self.initial_sync_node:
+            self.initial_sync_node_idx = len(self.nodes)
+            self.initial_sync_node = self._new_mongod(self.initial_sync_node_idx, self.replset_name)
+
+    def assign_ports(self):
+        """Choose the ports of the nodes of the replica set, in the order they are started in."""
+        self._create_nodes()
+        for node in self.nodes:
+            node.assign_ports()
+        if self.initial_sync_node:
+            self.initial_sync_node.assign_ports()
+
+    def setup(self):  # pylint: disable=too-many-branches,too-many-statements
+        """Set up the replica set."""
+        self._create_nodes()
+
         for i in range(self.num_nodes):
             if self.linear_chain and i > 0:
                 self.nodes[i].mongod_options["set_parameters"][
@@ -122,10 +140,6 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
             self.nodes[i].setup()
 
         if self.start_initial_sync_node:
-            if not self.initial_sync_node:
-                self.initial_sync_node_idx = len(self.nodes)
-                self.initial_sync_node = self._new_mongod(self.initial_sync_node_idx,
-                                                          self.replset_name)
             self.initial_sync_node.setup()
             self.initial_sync_node.await_ready()
 
@@ -291,12 +305,8 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
         # self.all_nodes_electable is True.
         primary = self.nodes[0]
         client = primary.mongo_client()
-        while True:
-            self.logger.info("Waiting for primary on port %d to be elected.", primary.port)
-            is_master = client.admin.command("isMaster")["ismaster"]
-            if is_master:
-                break
-            time.sleep(0.1)  # Wait a little bit before trying again.
+        self.logger.info("Waiting for primary on port %d to be elected.", primary.port)
+        self._await_is_master_field(client, "ismaster")
         self.logger.info("Primary on port %d successfully elected.", primary.port)
 
     def _await_secondaries(self):
@@ -309,15 +319,35 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
 
         for secondary in secondaries:
             client = secondary.mongo_client(read_preference=pymongo.ReadPreference.SECONDARY)
-            while True:
-                self.logger.info("Waiting for secondary on port %d to become available.",
-                                 secondary.port)
-                is_secondary = client.admin.command("isMaster")["secondary"]
-                if is_secondary:
-                    break
-                time.sleep(0.1)  # Wait a little bit before trying again.
+            self.logger.info("Waiting for secondary on port %d to become available.",
+                             secondary.port)
+            self._await_is_master_field(client, "secondary")
             self.logger.info("Secondary on port %d is now available.", secondary.port)
 
+    @staticmethod
+    def _await_is_master_field(client, field):
+        """Wait until the isMaster response of the node 'client' is connected to has 'field' true.
+
+        The awaitable isMaster protocol is used so the node responds as soon as its state changes
+        instead of us polling it. Nodes that don't return a topologyVersion, e.g. ones running an
+        older binary version, are polled instead.
+        """
+        cmd = {"isMaster": 1}
+        while True:
+            response = client.admin.command(cmd)
+            if response[field]:
+                return
+
+            topology_version = response.get("topologyVersion")
+            if topology_version is None:
+                time.sleep(0.1)  # Wait a little bit before trying again.
+                continue
+
+            cmd = {
+                "isMaster": 1, "topologyVersion": topology_version,
+                "maxAwaitTimeMS": ReplicaSetFixture._AWAITABLE_IS_MASTER_TIMEOUT_MS
+            }
+
     @staticmethod
     def auth(client, auth_options=None):
         """Auth a client connection."""
@@ -401,6 +431,13 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
         primary = self.nodes[0]
         primary.mongo_client().admin.command(cmd)
 
+    def clear_data(self):
+        """Drop all non-system databases and wait for the drops to be majority committed."""
+        client = self.get_primary().mongo_client()
+        self.auth(client, self.auth_options)
+        self._drop_non_system_databases(client)
+        self.await_last_op_committed()
+
     def _do_teardown(self, mode=None):
         self.logger.info("Stopping all members of the replica set...")
 
@@ -88,8 +88,6 @@ class ShardedClusterFixture(interface.Fixture):  # pylint: disable=too-many-inst
         if self.configsvr is None:
             self.configsvr = self._new_configsvr()
 
-        self.configsvr.setup()
-
         if not self.shards:
             for i in range(self.num_shards):
                 if self.num_rs_nodes_per_shard is None:
@@ -102,19 +100,23 @@ class ShardedClusterFixture(interface.Fixture):  # pylint: disable=too-many-inst
                     raise TypeError("num_rs_nodes_per_shard must be an integer or None")
                 self.shards.append(shard)
 
-        # Start up each of the shards
+        # The ports are chosen one fixture at a time, in the same order on every run, before the
+        # fixtures are set up at the same time.
+        self.configsvr.assign_ports()
         for shard in self.shards:
-            shard.setup()
+            shard.assign_ports()
+
+        # Start up the config server and each of the shards at the same time. Setting up a replica
+        # set waits for it to be initiated, so doing it one after another would make the cluster
+        # take as long as the sum of its replica sets to start rather than its slowest one.
+        interface.run_concurrently([self.configsvr.setup] + [shard.setup for shard in self.shards])
 
     def await_ready(self):
         """Block until the fixture can be used for testing."""
-        # Wait for the config server
-        if self.configsvr is not None:
-            self.configsvr.await_ready()
-
-        # Wait for each of the shards
-        for shard in self.shards:
-            shard.await_ready()
+        # Wait for the config server and each of the shards.
+        replica_sets = [self.configsvr] if self.configsvr is not None else []
+        replica_sets.extend(self.shards)
+        interface.run_concurrently([fixture.await_ready for fixture in replica_sets])
 
         # We call self._new_mongos() and mongos.setup() in self.await_ready() function
         # instead of self.setup() because mongos routers have to connect to a running cluster.
@@ -123,12 +125,11 @@ class ShardedClusterFixture(interface.Fixture):  # pylint: disable=too-many-inst
                 mongos = self._new_mongos(i, self.num_mongos)
                 self.mongos.append(mongos)
 
+        # Start up all of the mongos processes before waiting for any of them.
         for mongos in self.mongos:
-            # Start up the mongos.
             mongos.setup()
 
-            # Wait for the mongos.
-            mongos.await_ready()
+        interface.run_concurrently([mongos.await_ready for mongos in self.mongos])
 
         client = self.mongo_client()
         self._auth_to_db(client)
@@ -177,6 +178,16 @@ class ShardedClusterFixture(interface.Fixture):  # pylint: disable=too-many-inst
                                  password=self.auth_options["password"],
                                  mechanism=self.auth_options["authenticationMechanism"])
 
+    def clear_data(self):
+        """Drop all non-system databases and enable sharding again on the configured ones."""
+        client = self.mongo_client()
+        self._auth_to_db(client)
+        self._drop_non_system_databases(client)
+
+        for db_name in self.enable_sharding:
+            self.logger.info("Enabling sharding for '%s' database...", db_name)
+            client.admin.command({"enablesharding": db_name})
+
     def stop_balancer(self, timeout_ms=60000):
         """Stop the balancer."""
         client = self.mongo_client()
@@ -374,6 +385,7 @@ class _MongoSFixture(interface.Fixture):
         self.mongos = None
         self.port = None
         self._dbpath_prefix = dbpath_prefix
+        self._listening = None
 
     def setup(self):
         """Set up the sharded cluster."""
@@ -388,6 +400,10 @@ class _MongoSFixture(interface.Fixture):
 
         mongos = core.programs.mongos_program(self.logger, executable=self.mongos_executable,
                                               **self.mongos_options)
+        # The mongos doesn't log to stdout when it is given a logpath.
+        self._listening = None
+        if "logpath" not in self.mongos_options:
+            self._listening = mongos.watch_output(*self._WAITING_FOR_CONNECTIONS_MESSAGES)
         try:
             self.logger.info("Starting mongos on port %d...\n%s", self.port, mongos.as_command())
             mongos.start()
@@ -435,7 +451,7 @@ class _MongoSFixture(interface.Fixture):
                             self.port, standalone.MongoDFixture.AWAIT_READY_TIMEOUT_SECS))
 
                 self.logger.info("Waiting to connect to mongos on port %d.", self.port)
-                time.sleep(0.1)  # Wait a little bit before trying again.
+                standalone.await_listening(self._listening, remaining)
 
         self.logger.info("Successfully contacted the mongos on port %d.", self.port)
 
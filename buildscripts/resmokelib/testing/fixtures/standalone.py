@@ -14,6 +14,20 @@ from ... import errors
 from ... import utils
 
 
+def await_listening(listening, remaining):
+    """Wait for a process to log that it is listening for connections before trying to connect.
+
+    'listening' is the Event returned by Process.watch_output(), or None if the output of the
+    process isn't available. We fall back to sleeping a little bit between connection attempts
+    when the output isn't available or the process is already listening.
+    """
+    if listening is None or listening.is_set():
+        time.sleep(0.1)
+    else:
+        # Wake up periodically so the caller notices if the process exited.
+        listening.wait(min(remaining, 1.0))
+
+
 class MongoDFixture(interface.Fixture):
     """Fixture which provides JSTests with a standalone mongod to run against."""
 
@@ -49,11 +63,12 @@ class MongoDFixture(interface.Fixture):
 
         self.mongod = None
         self.port = None
+        self._listening = None
 
     def setup(self):
         """Set up the mongod."""
         if not self.preserve_dbpath and os.path.lexists(self._dbpath):
-            utils.rmtree(self._dbpath, ignore_errors=False)
+            core.dbpaths.clear(self._dbpath)
 
         try:
             os.makedirs(self._dbpath)
@@ -61,12 +76,14 @@ class MongoDFixture(interface.Fixture):
             # Directory already exists.
             pass
 
-        if "port" not in self.mongod_options:
-            self.mongod_options["port"] = core.network.PortAllocator.next_fixture_port(self.job_num)
-        self.port = self.mongod_options["port"]
+        self.assign_ports()
 
         mongod = core.programs.mongod_program(self.logger, executable=self.mongod_executable,
                                               **self.mongod_options)
+        # The mongod doesn't log to stdout when it is given a logpath.
+        self._listening = None
+        if "logpath" not in self.mongod_options:
+            self._listening = mongod.watch_output(*self._WAITING_FOR_CONNECTIONS_MESSAGES)
         try:
             self.logger.info("Starting mongod on port %d...\n%s", self.port, mongod.as_command())
             mongod.start()
@@ -78,6 +95,12 @@ class MongoDFixture(interface.Fixture):
 
         self.mongod = mongod
 
+    def assign_ports(self):
+        """Choose the port of the mongod."""
+        if "port" not in self.mongod_options:
+            self.mongod_options["port"] = core.network.PortAllocator.next_fixture_port(self.job_num)
+        self.port = self.mongod_options["port"]
+
     def pids(self):
         """:return: pids owned by this fixture if any."""
         out = [x.pid for x in [self.mongod] if x is not None]
@@ -113,7 +136,7 @@ class MongoDFixture(interface.Fixture):
                             self.port, MongoDFixture.AWAIT_READY_TIMEOUT_SECS))
 
                 self.logger.info("Waiting to connect to mongod on port %d.", self.port)
-                time.sleep(0.1)  # Wait a little bit before trying again.
+                await_listening(self._listening, remaining)
 
         self.logger.info("Successfully contacted the mongod on port %d.", self.port)
 
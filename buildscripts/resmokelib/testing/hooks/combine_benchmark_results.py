@@ -1,10 +1,16 @@
-"""Module for generating the test results file fed into the perf plugin."""
+"""Module for generating the test results file fed into the perf plugin.
+
+The results can also be recorded in the --benchmarkStore and compared with those of previous
+revisions to detect regressions.
+"""
 
 import collections
 import datetime
 import json
 
+from buildscripts.resmokelib import benchmarkstore
 from buildscripts.resmokelib import config as _config
+from buildscripts.resmokelib import errors
 from buildscripts.resmokelib.testing.hooks import interface
 
 
@@ -30,27 +36,43 @@ class CombineBenchmarkResults(interface.Hook):
         self.create_time = None
         self.end_time = None
 
+        # The store is only open between before_suite() and after_suite().
+        self.store = None
+        self.revision = None
+        if _config.BENCHMARK_STORE is not None:
+            self.revision = benchmarkstore.get_revision()
+
     @staticmethod
     def _strftime(time):
         return time.strftime("%Y-%m-%dT%H:%M:%SZ")
 
     def after_test(self, test, test_report):
         """Update test report."""
-        if self.report_file is None:
+        if self.report_file is None and self.store is None:
             return
 
         bm_report_path = test.report_name()
 
         with open(bm_report_path, "r") as report_file:
             report_dict = json.load(report_file)
+
+        if self.report_file is not None:
             self._parse_report(report_dict)
+        if self.store is not None:
+            self._check_for_regressions(test, report_dict)
 
     def before_suite(self, test_report):
-        """Set suite start time."""
+        """Set suite start time and open the benchmark store."""
         self.create_time = datetime.datetime.now()
+        if _config.BENCHMARK_STORE is not None:
+            self.store = benchmarkstore.BenchmarkStore(_config.BENCHMARK_STORE)
 
     def after_suite(self, test_report):
-        """Update test report."""
+        """Close the benchmark store and update test report."""
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
         if self.report_file is None:
             return
 
@@ -78,6 +100,46 @@ class CombineBenchmarkResults(interface.Hook):
 
         return perf_report
 
+    def _check_for_regressions(self, test, report_dict):
+        """Record the results in the store and compare them with those of previous revisions.
+
+        Raises a TestFailure for statistically significant regressions if
+        --benchmarkRegressionAction=fail was specified.
+        """
+
+        timings = collections.defaultdict(list)
+        for benchmark_res in report_dict["benchmarks"]:
+            bm_name_obj = _BenchmarkThreadsReport.parse_bm_name(benchmark_res["name"])
+            if bm_name_obj.statistic_type is not None:
+                continue
+            timings[(bm_name_obj.base_name, bm_name_obj.thread_count)].append(
+                (benchmark_res["cpu_time"], benchmark_res["real_time"]))
+
+        regressions = []
+        for ((base_name, thread_count), bm_timings) in sorted(timings.items()):
+            comparison = self.store.record_and_compare(self.revision, base_name, thread_count,
+                                                       bm_timings,
+                                                       _config.BENCHMARK_BASELINE_REVISIONS)
+            if comparison is None:
+                self.logger.info("Not enough results of %s with %s threads to compare with the"
+                                 " baseline.", base_name, thread_count)
+                continue
+
+            message = ("%s with %s threads: median cpu_time %.1f vs. %.1f for the baseline"
+                       " (%+.1f%%, sigma %.1f, p-value %.4f)" %
+                       (base_name, thread_count, comparison.current_median,
+                        comparison.baseline_median, comparison.relative_change * 100,
+                        comparison.baseline_sigma, comparison.p_value))
+            if comparison.is_regression:
+                self.logger.warning("Regression of %s", message)
+                regressions.append(base_name)
+            else:
+                self.logger.info("%s", message)
+
+        if regressions and _config.BENCHMARK_REGRESSION_ACTION == "fail":
+            raise errors.TestFailure("%s regressed: %s" % (test.short_name(),
+                                                           ", ".join(regressions)))
+
     def _parse_report(self, report_dict):
         context = report_dict["context"]
 
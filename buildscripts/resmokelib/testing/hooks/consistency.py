@@ -0,0 +1,330 @@
+"""Test hook for checking the dbhashes and validating the collections of a fixture in one pass.
+
+Unlike CheckReplDBHash and ValidateCollections, it doesn't start a mongo shell after each test. It
+connects to every node with pymongo, reusing the connections between tests, and checks all of the
+replica sets and nodes of the fixture concurrently.
+"""
+
+import concurrent.futures
+import time
+
+import pymongo
+import pymongo.errors
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing.fixtures import interface as fixture_interface
+from buildscripts.resmokelib.testing.fixtures import replicaset
+from buildscripts.resmokelib.testing.fixtures import replicaset_utils
+from buildscripts.resmokelib.testing.fixtures import shardedcluster
+from buildscripts.resmokelib.testing.fixtures import standalone
+from buildscripts.resmokelib.testing.hooks import interface
+
+
+class CheckDataConsistency(interface.Hook):
+    """Check dbhashes and run full validation after each test.
+
+    The dbhashes of all non-local databases must match between the primary and the secondaries of
+    every replica set in the fixture, and every collection must pass validation on every node.
+
+    If 'incremental' is true, only the collections written to since the previous check, according
+    to the oplog of each replica set's primary, are checked. The first check is always a full one.
+
+    If 'read_at_cluster_time' is true, the dbhashes of every node are read at the timestamp of the
+    primary's last write, which the secondaries are waited on to replicate, so that they are
+    compared at the same point even if something is still writing to the replica set. It is false
+    by default because storage engines such as ephemeralForTest and mmapv1 don't support reading at
+    a timestamp. The collections are validated at the latest point of each node since validation
+    checks every node on its own.
+    """
+
+    # The number of seconds to wait for the secondaries to replicate the primary's last write.
+    _AWAIT_REPLICATION_TIMEOUT_SECS = 10 * 60
+
+    # The databases that can't be read at a cluster time, as in run_check_repl_dbhash_background.js.
+    _NO_CLUSTER_TIME_DBS = frozenset(["admin", "config", "local"])
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, hook_logger, fixture, check_dbhash=True, validate=True, incremental=False,
+            read_at_cluster_time=False):
+        """Initialize CheckDataConsistency."""
+        description = "Check dbhashes and validate collections of all nodes"
+        interface.Hook.__init__(self, hook_logger, fixture, description)
+
+        if not (check_dbhash or validate):
+            raise ValueError("At least one of check_dbhash and validate must be true")
+
+        self._check_dbhash = check_dbhash
+        self._validate = validate
+        self._incremental = incremental
+        self._read_at_cluster_time = read_at_cluster_time
+
+        # Mapping of port to the pymongo.MongoClient connected to the node on that port.
+        self._clients = {}
+        # Mapping of replica set name to the timestamp of its primary's last write that was checked.
+        self._last_checked_ts = {}
+        # The threads that run the commands against the nodes, shared by every check.
+        self._executor = None
+
+    def after_test(self, test, test_report):
+        """Check the data of the fixture after 'test'."""
+        hook_test_case = CheckDataConsistencyTestCase.create_after_test(
+            self.logger.test_case_logger, test, self)
+        hook_test_case.configure(self.fixture)
+        try:
+            hook_test_case.run_dynamic_test(test_report)
+        except errors.TestFailure as err:
+            raise errors.ServerFailure(err.args[0])
+
+    def after_suite(self, test_report):
+        """Close the connections to the nodes of the fixture."""
+        for client in self._clients.values():
+            client.close()
+        self._clients = {}
+        self._last_checked_ts = {}
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def check(self, logger):
+        """Check every replica set and stand-alone node of the fixture concurrently."""
+
+        (replsets, standalones) = self._get_replsets_and_standalones(self.fixture)
+        if self._executor is None:
+            num_nodes = sum(len(rs.nodes) for rs in replsets) + len(standalones)
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(num_nodes, 1), thread_name_prefix="CheckDataConsistency")
+
+        checks = [lambda rs=rs: self._check_replset(logger, rs) for rs in replsets]
+        checks.extend(lambda node=node: self._check_standalone(logger, node)
+                      for node in standalones)
+        fixture_interface.run_concurrently(checks)
+
+    @classmethod
+    def _get_replsets_and_standalones(cls, fixture):
+        """Return the list of replica set fixtures and list of stand-alone fixtures of 'fixture'."""
+
+        if isinstance(fixture, replicaset.ReplicaSetFixture):
+            return ([fixture], [])
+
+        if isinstance(fixture, standalone.MongoDFixture):
+            return ([], [fixture])
+
+        if isinstance(fixture, shardedcluster.ShardedClusterFixture):
+            replsets = [fixture.configsvr]
+            standalones = []
+            for shard in fixture.shards:
+                (shard_replsets, shard_standalones) = cls._get_replsets_and_standalones(shard)
+                replsets.extend(shard_replsets)
+                standalones.extend(shard_standalones)
+            return (replsets, standalones)
+
+        raise errors.ServerFailure("CheckDataConsistency can't check the nodes of a {}".format(
+            fixture.__class__.__name__))
+
+    def _get_client(self, node, auth_options):
+        """Return the pooled client for 'node', which may read from a secondary."""
+        if node.port not in self._clients:
+            client = node.mongo_client(read_preference=pymongo.ReadPreference.SECONDARY_PREFERRED)
+            self._clients[node.port] = replicaset.ReplicaSetFixture.auth(client, auth_options)
+        return self._clients[node.port]
+
+    def _check_replset(self, logger, rs):
+        """Check the dbhashes and collections of the members of the replica set 'rs'."""
+
+        primary = rs.get_primary()
+        secondaries = [node for node in rs.nodes if node.port != primary.port]
+        clients = [self._get_client(node, rs.auth_options) for node in [primary] + secondaries]
+
+        primary_optime = replicaset_utils.get_last_optime(clients[0])
+        for (secondary, client) in zip(secondaries, clients[1:]):
+            self._await_optime(logger, rs, secondary, client, primary_optime)
+
+        namespaces = None
+        last_checked_ts = self._last_checked_ts.get(rs.replset_name)
+        if self._incremental and last_checked_ts is not None:
+            namespaces = self._get_written_namespaces(clients[0], last_checked_ts,
+                                                      primary_optime["ts"])
+            if not namespaces:
+                logger.info("Nothing was written to replica set '%s' since the last check.",
+                            rs.replset_name)
+                self._last_checked_ts[rs.replset_name] = primary_optime["ts"]
+                return
+
+        db_names = self._get_db_names(clients[0], namespaces)
+        if self._check_dbhash:
+            cluster_time = primary_optime["ts"] if self._read_at_cluster_time else None
+            self._check_dbhashes(logger, rs, [primary] + secondaries, clients, db_names, namespaces,
+                                 cluster_time)
+        if self._validate:
+            fixture_interface.run_concurrently([
+                lambda node=node, client=client: self._validate_node(logger, node, client, db_names,
+                                                                     namespaces)
+                for (node, client) in zip([primary] + secondaries, clients)
+            ])
+
+        self._last_checked_ts[rs.replset_name] = primary_optime["ts"]
+
+    def _check_standalone(self, logger, node):
+        """Validate the collections of the stand-alone 'node'."""
+        if not self._validate:
+            return
+
+        client = self._get_client(node, None)
+        self._validate_node(logger, node, client, self._get_db_names(client, None), None)
+
+    def _await_optime(  # pylint: disable=too-many-arguments
+            self, logger, rs, secondary, client, optime):
+        """Wait until 'secondary' has replicated up to 'optime'."""
+
+        deadline = time.time() + self._AWAIT_REPLICATION_TIMEOUT_SECS
+        while True:
+            secondary_optime = replicaset_utils.get_last_optime(client)
+            if secondary_optime["t"] > optime["t"] or (secondary_optime["t"] == optime["t"]
+                                                       and secondary_optime["ts"] >= optime["ts"]):
+                return
+
+            if time.time() >= deadline:
+                msg = ("Timed out waiting for the secondary on port {} of replica set '{}' to"
+                       " replicate up to {}; it is at {}").format(secondary.port, rs.replset_name,
+                                                                  optime, secondary_optime)
+                logger.error(msg)
+                raise errors.ServerFailure(msg)
+
+            time.sleep(0.1)
+
+    @staticmethod
+    def _get_written_namespaces(client, after_ts, until_ts):
+        """Return the namespaces written to between the 'after_ts' and 'until_ts' timestamps.
+
+        The result maps each database name to the set of collections written to, or to None if a
+        command was run against the database and all of its collections must be checked. None is
+        returned instead of a mapping if every database must be checked.
+        """
+
+        namespaces = {}
+        oplog = client.local["oplog.rs"]
+        query = {"ts": {"$gt": after_ts, "$lte": until_ts}, "op": {"$ne": "n"}}
+        for entry in oplog.find(query, projection={"ns": True, "op": True, "o": True}):
+            (db_name, coll_name) = entry["ns"].split(".", 1)
+            if entry["op"] == "c":
+                # Commands run against the admin database, such as applyOps or the commit of a
+                # transaction, may write to any database.
+                if db_name == "admin":
+                    return None
+                namespaces[db_name] = None
+
+                # A renameCollection command also writes to the database it renames the collection
+                # to, which may be another one.
+                target_ns = entry.get("o", {}).get("to")
+                if isinstance(target_ns, str):
+                    namespaces[target_ns.split(".", 1)[0]] = None
+            elif namespaces.get(db_name, set()) is not None:
+                namespaces.setdefault(db_name, set()).add(coll_name)
+
+        return namespaces
+
+    @staticmethod
+    def _get_db_names(client, namespaces):
+        """Return the names of the databases to check."""
+        if namespaces is not None:
+            return sorted(namespaces)
+        return [db_name for db_name in client.list_database_names() if db_name != "local"]
+
+    @staticmethod
+    def _make_collections_filter(db_name, namespaces):
+        """Return the list of collections of 'db_name' to check, or None to check all of them."""
+        if namespaces is None or namespaces[db_name] is None:
+            return None
+        return sorted(namespaces[db_name])
+
+    def _check_dbhashes(  # pylint: disable=too-many-arguments,too-many-locals
+            self, logger, rs, nodes, clients, db_names, namespaces, cluster_time=None):
+        """Compare the dbhashes of the secondaries of 'rs' to those of its primary.
+
+        The dbhashes are read at 'cluster_time' on every node, if specified.
+        """
+
+        for db_name in db_names:
+            cmd = {"dbHash": 1}
+            collections = self._make_collections_filter(db_name, namespaces)
+            if collections is not None:
+                cmd["collections"] = collections
+            if cluster_time is not None and db_name not in self._NO_CLUSTER_TIME_DBS:
+                cmd["$_internalReadAtClusterTime"] = cluster_time
+
+            responses = self._run_on_all(clients, db_name, cmd)
+            primary_response = responses[0]
+            capped = set(primary_response.get("capped", []))
+            for (node, response) in zip(nodes[1:], responses[1:]):
+                if response["md5"] == primary_response["md5"]:
+                    continue
+
+                primary_hashes = primary_response["collections"]
+                secondary_hashes = response["collections"]
+                mismatched = sorted(
+                    coll_name for coll_name in set(primary_hashes) | set(secondary_hashes)
+                    if coll_name not in capped
+                    and primary_hashes.get(coll_name) != secondary_hashes.get(coll_name))
+                if primary_response.get("uuids", {}) != response.get("uuids", {}):
+                    mismatched.append("(collection UUIDs)")
+
+                if not mismatched:
+                    # Capped collections may legitimately differ because the secondary deletes
+                    # documents to stay within the collection's size on its own.
+                    logger.info(
+                        "Only capped collections of database '%s' differ on the node on port"
+                        " %d of replica set '%s'.", db_name, node.port, rs.replset_name)
+                    continue
+
+                msg = ("The dbhash of database '{}' on the node on port {} of replica set '{}'"
+                       " doesn't match the primary's; these collections differ: {}").format(
+                           db_name, node.port, rs.replset_name, ", ".join(mismatched))
+                logger.error(msg)
+                raise errors.TestFailure(msg)
+
+    def _run_on_all(self, clients, db_name, cmd):
+        """Run 'cmd' against 'db_name' through each of 'clients' concurrently.
+
+        Return the list of responses, in the same order as 'clients'.
+        """
+
+        futures = [self._executor.submit(client[db_name].command, cmd) for client in clients]
+        concurrent.futures.wait(futures)
+        return [future.result() for future in futures]
+
+    def _validate_node(  # pylint: disable=too-many-arguments
+            self, logger, node, client, db_names, namespaces):
+        """Run full validation on each collection of 'db_names' on 'node'."""
+
+        for db_name in db_names:
+            collections = self._make_collections_filter(db_name, namespaces)
+            if collections is None:
+                collections = client[db_name].list_collection_names(filter={"type": "collection"})
+
+            for coll_name in collections:
+                try:
+                    response = client[db_name].command({"validate": coll_name, "full": True})
+                except pymongo.errors.OperationFailure as err:
+                    # The collection was dropped after the oplog was read.
+                    if err.code == 26:  # NamespaceNotFound
+                        continue
+                    raise
+
+                if not response["valid"]:
+                    msg = ("Collection {}.{} on the node on port {} failed validation: {}".format(
+                        db_name, coll_name, node.port, response.get("errors")))
+                    logger.error(msg)
+                    raise errors.TestFailure(msg)
+
+
+class CheckDataConsistencyTestCase(interface.DynamicTestCase):
+    """CheckDataConsistencyTestCase class."""
+
+    def run_test(self):
+        """Execute the data consistency checks."""
+        try:
+            self._hook.check(self.logger)
+        except pymongo.errors.PyMongoError as err:
+            self.logger.exception("Encountered an error while checking the data of the fixture.")
+            raise errors.ServerFailure("Failed to check the data of the fixture: {}".format(err))
@@ -8,6 +8,7 @@ import time
 
 import bson
 import pymongo.errors
+from pymongo.server_type import SERVER_TYPE
 
 from buildscripts.resmokelib import errors
 from buildscripts.resmokelib import utils
@@ -16,6 +17,17 @@ from buildscripts.resmokelib.testing.fixtures import replicaset
 from buildscripts.resmokelib.testing.fixtures import shardedcluster
 from buildscripts.resmokelib.testing.fixtures import interface as fixture_interface
 
+try:
+    from pymongo.monitoring import ServerListener as _ServerListener
+except ImportError:
+    # PyMongo versions older than 3.3 don't publish server monitoring events.
+    _ServerListener = None
+
+# PyMongo 3.11 is the first version to stream the state changes of servers supporting the awaitable
+# isMaster command. Older versions only learn of an election on their next heartbeat, which isn't
+# any sooner than polling the nodes for a primary, so the stepdown thread does that instead.
+_WATCH_PRIMARY = _ServerListener is not None and pymongo.version_tuple >= (3, 11)
+
 
 class ContinuousStepdown(interface.Hook):  # pylint: disable=too-many-instance-attributes
     """Regularly connect to replica sets and send a replSetStepDown command."""
@@ -320,9 +332,23 @@ class FileBasedStepdownLifecycle(object):
         return False
 
     def wait_for_stepdown_interval(self, timeout):
-        """Block for 'timeout' seconds, or until stop() is called."""
+        """Block for 'timeout' seconds, or until stop() is called or the "idle_request" file exists.
+
+        Returning as soon as the test requests the stepdown thread to become idle keeps the test
+        from waiting for the rest of the stepdown interval to receive the "idle_ack" file.
+        """
+        deadline = time.time() + timeout
         with self.__lock:
-            self.__cond.wait(timeout)
+            while not self.__should_stop:
+                if os.path.isfile(self.__stepdown_files.idle_request):
+                    return
+
+                remaining_secs = deadline - time.time()
+                if remaining_secs <= 0:
+                    return
+
+                # Wait a little bit before checking for the "idle_request" file again.
+                self.__cond.wait(min(remaining_secs, 0.1))
 
     def poll_for_idle_request(self):  # noqa: D205,D400
         """Return true if the stepdown thread should continue running stepdowns, or false if it
@@ -345,6 +371,120 @@ class FileBasedStepdownLifecycle(object):
         os.remove(self.__stepdown_files.permitted)
 
 
+class _PrimaryWatcher(_ServerListener or object):
+    """Track the primary of a replica set using the server monitoring events of PyMongo.
+
+    On PyMongo 3.11 and later, the MongoClient monitoring the replica set is told about elections
+    as they happen (servers supporting the awaitable isMaster command stream their state changes to
+    it), so waiting for a new primary takes as long as the election rather than a round of isMaster
+    polls.
+    """
+
+    def __init__(self, rs_fixture):
+        """Initialize the _PrimaryWatcher."""
+        self._rs_fixture = rs_fixture
+        self._client = None
+
+        self._cond = threading.Condition()
+        # Mapping of a port to the type of the server listening on it, e.g. SERVER_TYPE.RSPrimary.
+        self._server_types = {}
+        # The (port, electionId) of the current primary, or None if there isn't a known primary.
+        self._primary = None
+        self._max_election_id = None
+        # The (port, electionId) of the primary being stepped down, which await_primary() won't
+        # return.
+        self._stepped_down_primary = None
+
+    def start(self):
+        """Start monitoring the replica set."""
+        hosts = [node.get_internal_connection_string() for node in self._rs_fixture.nodes]
+        # The heartbeat frequency only matters for servers not supporting the awaitable isMaster
+        # command. 500 milliseconds is the lowest frequency PyMongo accepts.
+        self._client = pymongo.MongoClient(host=hosts, replicaset=self._rs_fixture.replset_name,
+                                           event_listeners=[self], heartbeatFrequencyMS=500,
+                                           connect=True)
+
+    def close(self):
+        """Stop monitoring the replica set."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def mark_stepping_down(self):
+        """Make await_primary() wait for a primary elected after the current one steps down."""
+        with self._cond:
+            self._stepped_down_primary = self._primary
+
+    def clear_stepping_down(self):
+        """Make await_primary() return the current primary again after a failed stepdown."""
+        with self._cond:
+            self._stepped_down_primary = None
+            self._cond.notify_all()
+
+    def await_primary(self, timeout_secs):
+        """Return the node that is primary, waiting up to 'timeout_secs' for one to be elected."""
+        with self._cond:
+            has_primary = self._wait_for(
+                lambda: self._primary is not None and self._primary != self._stepped_down_primary,
+                timeout_secs)
+            if has_primary:
+                port = self._primary[0]
+                for node in self._rs_fixture.nodes:
+                    if node.port == port:
+                        return node
+
+        msg = "Timed out while waiting for a primary for replica set '{}'.".format(
+            self._rs_fixture.replset_name)
+        self._rs_fixture.logger.error(msg)
+        raise errors.ServerFailure(msg)
+
+    def await_secondary(self, node, timeout_secs):
+        """Wait up to 'timeout_secs' for 'node' to be a secondary and return whether it is."""
+        with self._cond:
+            return self._wait_for(
+                lambda: self._server_types.get(node.port) == SERVER_TYPE.RSSecondary, timeout_secs)
+
+    def _wait_for(self, predicate, timeout_secs):
+        deadline = time.time() + timeout_secs
+        while not predicate():
+            remaining_secs = deadline - time.time()
+            if remaining_secs <= 0:
+                return False
+            self._cond.wait(remaining_secs)
+        return True
+
+    def opened(self, event):
+        """Handle a server being added to the topology."""
+        pass
+
+    def description_changed(self, event):
+        """Handle the result of a server's isMaster response changing."""
+        description = event.new_description
+        port = event.server_address[1]
+        with self._cond:
+            self._server_types[port] = description.server_type
+            if description.server_type == SERVER_TYPE.RSPrimary:
+                election_id = description.election_id
+                # A former primary that hasn't learned of the election yet still reports itself as
+                # primary with an older electionId.
+                if (election_id is None or self._max_election_id is None
+                        or election_id >= self._max_election_id):
+                    self._primary = (port, election_id)
+                    self._max_election_id = election_id
+            elif self._primary is not None and self._primary[0] == port:
+                self._primary = None
+            self._cond.notify_all()
+
+    def closed(self, event):
+        """Handle a server being removed from the topology."""
+        port = event.server_address[1]
+        with self._cond:
+            self._server_types.pop(port, None)
+            if self._primary is not None and self._primary[0] == port:
+                self._primary = None
+            self._cond.notify_all()
+
+
 class _StepdownThread(threading.Thread):  # pylint: disable=too-many-instance-attributes
     def __init__(  # pylint: disable=too-many-arguments
             self, logger, mongos_fixtures, rs_fixtures, stepdown_interval_secs, terminate, kill,
@@ -375,6 +515,21 @@ class _StepdownThread(threading.Thread):  # pylint: disable=too-many-instance-at
 
         self._step_up_stats = collections.Counter()
 
+        # Mapping of the replica set fixtures to the _PrimaryWatcher tracking their primary. Empty
+        # if PyMongo doesn't stream server monitoring events.
+        self._primary_watchers = {}
+        # Whether a stepdown happened since the mongoses last retargeted the primaries.
+        self._mongos_retarget_needed = True
+
+    def start(self):
+        """Start monitoring the replica sets and start the thread."""
+        if _WATCH_PRIMARY:
+            for rs_fixture in self._rs_fixtures:
+                watcher = _PrimaryWatcher(rs_fixture)
+                watcher.start()
+                self._primary_watchers[rs_fixture] = watcher
+        threading.Thread.start(self)
+
     def run(self):
         """Execute the thread."""
         if not self._rs_fixtures:
@@ -423,6 +578,9 @@ class _StepdownThread(threading.Thread):  # pylint: disable=too-many-instance-at
         # Unpause to allow the thread to finish.
         self.resume()
         self.join()
+        for watcher in self._primary_watchers.values():
+            watcher.close()
+        self._primary_watchers.clear()
 
     def pause(self):
         """Pause the thread."""
@@ -449,22 +607,29 @@ class _StepdownThread(threading.Thread):  # pylint: disable=too-many-instance-at
 
     def _await_primaries(self):
         for fixture in self._rs_fixtures:
-            fixture.get_primary()
+            self._get_primary(fixture)
+
+    def _get_primary(self, rs_fixture, timeout_secs=30):
+        watcher = self._primary_watchers.get(rs_fixture)
+        if watcher is None:
+            return rs_fixture.get_primary(timeout_secs=timeout_secs)
+        return watcher.await_primary(timeout_secs)
 
     def _step_down_all(self):
+        self._mongos_retarget_needed = True
         for rs_fixture in self._rs_fixtures:
             self._step_down(rs_fixture)
 
     # pylint: disable=R0912,R0915
     def _step_down(self, rs_fixture):
         try:
-            primary = rs_fixture.get_primary(timeout_secs=self._stepdown_interval_secs)
+            primary = self._get_primary(rs_fixture, timeout_secs=self._stepdown_interval_secs)
         except errors.ServerFailure:
             # We ignore the ServerFailure exception because it means a primary wasn't available.
             # We'll try again after self._stepdown_interval_secs seconds.
             return
 
-        secondaries = rs_fixture.get_secondaries()
+        secondaries = [node for node in rs_fixture.nodes if node.port != primary.port]
 
         # Check that the fixture is still running before stepping down or killing the primary.
         # This ensures we still detect some cases in which the fixture has already crashed.
@@ -473,6 +638,11 @@ class _StepdownThread(threading.Thread):  # pylint: disable=too-many-instance-at
                                        " ContinuousStepdown, but wasn't.".format(
                                            rs_fixture.replset_name))
 
+        watcher = self._primary_watchers.get(rs_fixture)
+        if watcher is not None:
+            # Whichever way the primary is stepped down, the next primary is elected in a new term.
+            watcher.mark_stepping_down()
+
         if self._terminate:
             should_kill = self._kill and random.choice([True, False])
             action = "Killing" if should_kill else "Terminating"
@@ -501,6 +671,9 @@ class _StepdownThread(threading.Thread):  # pylint: disable=too-many-instance-at
                 self.logger.exception(
                     "Error while stepping down the primary on port %d of replica set '%s'.",
                     primary.port, rs_fixture.replset_name)
+                if watcher is not None:
+                    # The primary is still primary, so it isn't the one to wait for an election of.
+                    watcher.clear_stepping_down()
                 raise
 
         # We have skipped stepping down the primary if we want to step up secondaries instead. Here,
@@ -567,17 +740,7 @@ class _StepdownThread(threading.Thread):  # pylint: disable=too-many-instance-at
             self.logger.info(
                 "Successfully stepped up the secondary on port %d of replica set '%s'.",
                 chosen.port, rs_fixture.replset_name)
-            while True:
-                try:
-                    client = primary.mongo_client()
-                    is_secondary = client.admin.command("isMaster")["secondary"]
-                    if is_secondary:
-                        break
-                except pymongo.errors.AutoReconnect:
-                    pass
-                self.logger.info("Waiting for primary on port %d of replica set '%s' to step down.",
-                                 primary.port, rs_fixture.replset_name)
-                time.sleep(0.2)  # Wait a little bit before trying again.
+            self._await_stepped_down(rs_fixture, primary)
             self.logger.info("Primary on port %d of replica set '%s' stepped down.", primary.port,
                              rs_fixture.replset_name)
 
@@ -608,13 +771,31 @@ class _StepdownThread(threading.Thread):  # pylint: disable=too-many-instance-at
                              chosen.get_internal_connection_string() if secondaries else "none")
         self._step_up_stats[key] += 1
 
+    def _await_stepped_down(self, rs_fixture, primary):
+        watcher = self._primary_watchers.get(rs_fixture)
+        while True:
+            if watcher is not None:
+                if watcher.await_secondary(primary, self._stepdown_interval_secs):
+                    return
+            else:
+                try:
+                    client = primary.mongo_client()
+                    is_secondary = client.admin.command("isMaster")["secondary"]
+                    if is_secondary:
+                        return
+                except pymongo.errors.AutoReconnect:
+                    pass
+                time.sleep(0.2)  # Wait a little bit before trying again.
+            self.logger.info("Waiting for primary on port %d of replica set '%s' to step down.",
+                             primary.port, rs_fixture.replset_name)
+
     def _do_wait_for_mongos_retarget(self):  # pylint: disable=too-many-branches
         """Run collStats on each collection in each database on each mongos.
 
         This is to ensure mongos can target the primary for each shard with data, including the
         config servers.
         """
-        if not self._should_wait_for_mongos_retarget:
+        if not self._should_wait_for_mongos_retarget or not self._mongos_retarget_needed:
             return
 
         for mongos_fixture in self._mongos_fixtures:
@@ -654,3 +835,6 @@ class _StepdownThread(threading.Thread):  # pylint: disable=too-many-instance-at
                 retarget_time = time.time() - start_time
                 self.logger.info("Finished waiting for mongos: %s to retarget db: %s, in %d ms",
                                  mongos_conn_str, db, retarget_time * 1000)
+
+        # The mongoses' routing tables can't go stale again until the next stepdown.
+        self._mongos_retarget_needed = False
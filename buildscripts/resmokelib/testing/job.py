@@ -8,6 +8,12 @@ from . import queue_element
 from . import testcases
 from .. import config
 from .. import errors
+from .. import tracing
+from ..core import dbpaths
+from ..core import network
+from ..core import process as _process
+from ..core import resourcemonitor
+from ..core import shellpool
 from ..testing.hooks import stepdown
 from ..testing.testcases import fixture as _fixture
 from ..utils import queue as _queue
@@ -18,16 +24,22 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
 
     def __init__(  # pylint: disable=too-many-arguments
             self, job_num, logger, fixture, hooks, report, archival, suite_options,
-            test_queue_logger):
-        """Initialize the job with the specified fixture and hooks."""
+            test_queue_logger, fixture_is_set_up=False):
+        """Initialize the job with the specified fixture and hooks.
+
+        'fixture_is_set_up' should be true if 'fixture' is already running because it was reused
+        from an earlier suite.
+        """
 
         self.logger = logger
         self.fixture = fixture
         self.hooks = hooks
+        self.job_num = job_num
         self.report = report
         self.archival = archival
         self.suite_options = suite_options
-        self.manager = FixtureTestCaseManager(test_queue_logger, self.fixture, job_num, self.report)
+        self.manager = FixtureTestCaseManager(test_queue_logger, self.fixture, job_num, self.report,
+                                              fixture_is_set_up=fixture_is_set_up)
 
         # Don't check fixture.is_running() when using the ContinuousStepdown hook, which kills
         # and restarts the primary. Even if the fixture is still running as expected, there is a
@@ -53,6 +65,12 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
         will be run before this method returns. If an error occurs
         while destroying the fixture, then the 'teardown_flag' will be set.
         """
+        _process.set_thread_job(self.job_num)
+        with tracing.span("job{}".format(self.job_num), "job"):
+            self._run_job(queue, interrupt_flag, setup_flag, teardown_flag)
+
+    def _run_job(self, queue, interrupt_flag, setup_flag, teardown_flag):
+        """Run the job. See __call__()."""
         setup_succeeded = True
         if setup_flag is not None:
             try:
@@ -163,10 +181,21 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
     def _execute_test(self, test):
         """Call the before/after test hooks and execute 'test'."""
 
+        resourcemonitor.set_test(self.job_num, test.short_name())
+        try:
+            with tracing.span(test.short_name(), "execute_test"):
+                self._execute_test_with_hooks(test)
+        finally:
+            resourcemonitor.set_test(self.job_num, None)
+
+    def _execute_test_with_hooks(self, test):
+        """Call the before/after test hooks and execute 'test'. See _execute_test()."""
+
         test.configure(self.fixture, config.NUM_CLIENTS_PER_FIXTURE)
         self._run_hooks_before_tests(test)
 
-        test(self.report)
+        with tracing.span(test.short_name(), "test"):
+            test(self.report)
         try:
             # We are intentionally only checking the individual 'test' status and not calling
             # report.wasSuccessful() here. It is possible that a thread running in the background as
@@ -185,6 +214,9 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
                 # Always fail fast if the fixture fails.
                 raise errors.StopExecution(
                     "%s not running after %s" % (self.fixture, test.short_description()))
+
+            if config.DBPATH_QUOTA_MB is not None:
+                self._check_dbpath_quota(test)
         finally:
             success = self.report.find_test_info(test).status == "pass"
             if self.archival:
@@ -193,11 +225,28 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
 
         self._run_hooks_after_tests(test)
 
+    def _check_dbpath_quota(self, test):
+        """Fail 'test' and stop the job if its data directories exceed --dbpathQuotaMB."""
+        job_dbpath_prefix = dbpaths.get_job_dbpath_prefix(self.job_num)
+        usage_mb = dbpaths.get_usage_mb(job_dbpath_prefix)
+        if usage_mb <= config.DBPATH_QUOTA_MB:
+            return
+
+        self.logger.error(
+            "%s marked as a failure because the data directories of job #%d in %s use %d MB,"
+            " which exceeds the --dbpathQuotaMB of %d MB.", test.short_description(),
+            self.job_num, job_dbpath_prefix, usage_mb, config.DBPATH_QUOTA_MB)
+        self.report.setFailure(test, return_code=2)
+        raise errors.StopExecution("Job #%d exceeded its dbpath quota after %s" %
+                                   (self.job_num, test.short_description()))
+
     def _run_hook(self, hook, hook_function, test):
         """Provide helper to run hook and archival."""
         try:
             success = False
-            hook_function(test, self.report)
+            with tracing.span("{}.{}".format(hook.REGISTERED_NAME, hook_function.__name__),
+                              "hook"):
+                hook_function(test, self.report)
             success = True
         finally:
             if self.archival:
@@ -302,7 +351,8 @@ TestResult = namedtuple('TestResult', ['test', 'hook', 'success'])
 class FixtureTestCaseManager:
     """Class that holds information needed to create new fixture setup/teardown test cases for a single job."""
 
-    def __init__(self, test_queue_logger, fixture, job_num, report):
+    def __init__(  # pylint: disable=too-many-arguments
+            self, test_queue_logger, fixture, job_num, report, fixture_is_set_up=False):
         """
         Initialize the test case manager.
 
@@ -310,26 +360,41 @@ class FixtureTestCaseManager:
         :param fixture: The fixture associated with this job.
         :param job_num: This job's unique identifier.
         :param report: Report object collecting test results.
+        :param fixture_is_set_up: Whether the fixture is already running.
         """
         self.test_queue_logger = test_queue_logger
         self.fixture = fixture
         self.job_num = job_num
         self.report = report
+        self.fixture_is_set_up = fixture_is_set_up
         self.times_set_up = 0  # Setups and kills may run multiple times.
+        self.times_reset = 0
 
     def setup_fixture(self, logger):
         """
         Run a test that sets up the job's fixture and waits for it to be ready.
 
+        If the fixture is already set up, then a test that drops its data is run instead.
+
         Return True if the setup was successful, False otherwise.
         """
-        test_case = _fixture.FixtureSetupTestCase(self.test_queue_logger, self.fixture,
-                                                  "job{}".format(self.job_num), self.times_set_up)
-        test_case(self.report)
+        if self.fixture_is_set_up:
+            test_case = _fixture.FixtureResetTestCase(self.test_queue_logger, self.fixture,
+                                                      "job{}".format(self.job_num),
+                                                      self.times_reset)
+            self.times_reset += 1
+        else:
+            test_case = _fixture.FixtureSetupTestCase(self.test_queue_logger, self.fixture,
+                                                      "job{}".format(self.job_num),
+                                                      self.times_set_up)
+
+        with tracing.span(test_case.short_name(), "fixture_setup"):
+            test_case(self.report)
         if self.report.find_test_info(test_case).status != "pass":
             logger.error("The setup of %s failed.", self.fixture)
             return False
 
+        self.fixture_is_set_up = True
         return True
 
     def teardown_fixture(self, logger, abort=False):
@@ -338,6 +403,7 @@ class FixtureTestCaseManager:
 
         Return True if the teardown was successful, False otherwise.
         """
+        self.fixture_is_set_up = False
         if abort:
             test_case = _fixture.FixtureAbortTestCase(self.test_queue_logger, self.fixture,
                                                       "job{}".format(self.job_num),
@@ -347,7 +413,17 @@ class FixtureTestCaseManager:
             test_case = _fixture.FixtureTeardownTestCase(self.test_queue_logger, self.fixture,
                                                          "job{}".format(self.job_num))
 
-        test_case(self.report)
+        try:
+            with tracing.span(test_case.short_name(), "fixture_teardown"):
+                test_case(self.report)
+        finally:
+            # The idle shells of the job were started for the tests of this suite and won't be used.
+            shellpool.ShellPool.stop_shells(self.job_num)
+            # The fixture isn't set up again once it has been torn down or aborted, so its leased
+            # ports are returned even if the teardown failed. A port a process is still listening
+            # on isn't leased again, since leasing checks that the port is free.
+            network.PortAllocator.release_ports(self.job_num)
+
         if self.report.find_test_info(test_case).status != "pass":
             logger.error("The teardown of %s failed.", self.fixture)
             return False
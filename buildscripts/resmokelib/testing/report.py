@@ -4,25 +4,42 @@ This is used to support additional test status and timing information for the re
 """
 
 import copy
+import json
+import os
 import threading
 import time
 import unittest
+import uuid
 
 from .. import config as _config
 from .. import logging
 
+# The counter of a TestReport for each test status.
+_STATUS_COUNTERS = {
+    "pass": "num_succeeded",
+    "fail": "num_failed",
+    "error": "num_errored",
+    "timeout": "num_interrupted",
+}
+
 
 # pylint: disable=attribute-defined-outside-init
 class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attributes
     """Record test status and timing information."""
 
-    def __init__(self, job_logger, suite_options):
-        """Initialize the TestReport with the buildlogger configuration."""
+    def __init__(self, job_logger, suite_options, stream_filename=None):
+        """Initialize the TestReport with the buildlogger configuration.
+
+        If 'stream_filename' is specified, then the result of each test is appended to that file as
+        soon as the test finishes (see get_stream_filename()). Only the counters and the tests that
+        are still running are then kept in memory; the other results are read back from the file.
+        """
 
         unittest.TestResult.__init__(self)
 
         self.job_logger = job_logger
         self.suite_options = suite_options
+        self.stream_filename = stream_filename
 
         self._lock = threading.Lock()
 
@@ -36,8 +53,13 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         failed or errored is more preferred over one that succeeded.
         This behavior is useful for when running multiple jobs that
         dynamically add a #dbhash# test case.
+
+        The tests that were streamed are not copied; the combined report reads them back from the
+        parts of the stream files that 'reports' cover.
         """
 
+        # pylint: disable=protected-access
+
         # TestReports that are used when running tests need a JobLogger but combined reports don't
         # use the logger.
         combined_report = cls(logging.loggers.EXECUTOR_LOGGER,
@@ -48,8 +70,13 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
             if not isinstance(report, TestReport):
                 raise TypeError("reports must be a list of TestReport instances")
 
-            with report._lock:  # pylint: disable=protected-access
+            with report._lock:
+                combined_report._stream_segments.extend(report._get_stream_segments())
+
                 for test_info in report.test_infos:
+                    if test_info.record_id is not None:
+                        continue
+
                     # If the user triggers a KeyboardInterrupt exception while a test is running,
                     # then it is possible for 'test_info' to be modified by a job thread later on.
                     # We make a shallow copy in order to ensure 'num_interrupted' is consistent with
@@ -58,6 +85,7 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
 
                     # TestReport.addXX() may not have been called.
                     if test_info.status is None or test_info.return_code is None:
+                        old_status = test_info.status
                         # Mark the test as having timed out if it was interrupted. It might have
                         # passed if the suite ran to completion, but we wouldn't know for sure.
                         #
@@ -69,6 +97,7 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
                         test_info.status = "timeout"
                         test_info.evergreen_status = "fail"
                         test_info.return_code = -2
+                        combined_report._update_counts(old_status, test_info.status)
 
                     # TestReport.stopTest() may not have been called.
                     if test_info.end_time is None:
@@ -78,12 +107,9 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
                     combined_report.test_infos.append(test_info)
 
                 combined_report.num_dynamic += report.num_dynamic
-
-        # Recompute number of success, failures, and errors.
-        combined_report.num_succeeded = len(combined_report.get_successful())
-        combined_report.num_failed = len(combined_report.get_failed())
-        combined_report.num_errored = len(combined_report.get_errored())
-        combined_report.num_interrupted = len(combined_report.get_interrupted())
+                for counter in _STATUS_COUNTERS.values():
+                    setattr(combined_report, counter,
+                            getattr(combined_report, counter) + getattr(report, counter))
 
         return combined_report
 
@@ -102,6 +128,10 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
             self.job_logger.info("Running %s...", basename)
 
         with self._lock:
+            if self.stream_filename is not None and not test.dynamic:
+                # The outcome of a test is only changed by the hooks that run after it, so the tests
+                # that were streamed aren't needed in memory once the next test starts.
+                self.test_infos = [info for info in self.test_infos if info.record_id is None]
             self.test_infos.append(test_info)
             if test.dynamic:
                 self.num_dynamic += 1
@@ -124,6 +154,8 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
             test_info.end_time = time.time()
             test_status = "no failures detected" if test_info.status == "pass" else "failed"
 
+        self._stream_result(test_info)
+
         time_taken = test_info.end_time - test_info.start_time
         self.job_logger.info("%s ran in %0.2f seconds: %s.", test.basename(), time_taken,
                              test_status)
@@ -161,16 +193,14 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
             if test_info.end_time is None:
                 raise ValueError("stopTest was not called on %s" % (test.basename()))
 
+            self._update_counts(test_info.status, "error")
+
             # We don't distinguish between test failures and Python errors in Evergreen.
             test_info.status = "error"
             test_info.evergreen_status = "fail"
             test_info.return_code = 2
 
-        # Recompute number of success, failures, and errors.
-        self.num_succeeded = len(self.get_successful())
-        self.num_failed = len(self.get_failed())
-        self.num_errored = len(self.get_errored())
-        self.num_interrupted = len(self.get_interrupted())
+        self._stream_result(test_info)
 
     def addFailure(self, test, err):  # pylint: disable=invalid-name
         """Call when a failureException was raised during the execution of 'test'."""
@@ -198,6 +228,8 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
             if test_info.end_time is None:
                 raise ValueError("stopTest was not called on %s" % (test.basename()))
 
+            self._update_counts(test_info.status, "fail")
+
             test_info.status = "fail"
             if test_info.dynamic:
                 # Dynamic tests are used for data consistency checks, so the failures are never
@@ -207,11 +239,7 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
                 test_info.evergreen_status = self.suite_options.report_failure_status
             test_info.return_code = return_code
 
-        # Recompute number of success, failures, and errors.
-        self.num_succeeded = len(self.get_successful())
-        self.num_failed = len(self.get_failed())
-        self.num_errored = len(self.get_errored())
-        self.num_interrupted = len(self.get_interrupted())
+        self._stream_result(test_info)
 
     def addSuccess(self, test):  # pylint: disable=invalid-name
         """Call when 'test' executed successfully."""
@@ -232,29 +260,41 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         with self._lock:
             return self.num_failed == self.num_errored == self.num_interrupted == 0
 
-    def get_successful(self):
-        """Return the status and timing information of the tests that executed successfully."""
+    def get_num_results(self):
+        """Return the number of tests that have an outcome."""
 
         with self._lock:
-            return [test_info for test_info in self.test_infos if test_info.status == "pass"]
+            return sum(getattr(self, counter) for counter in _STATUS_COUNTERS.values())
+
+    def get_successful(self):
+        """Return the status and timing information of the tests that executed successfully."""
+        return [test_info for test_info in self.iter_test_infos() if test_info.status == "pass"]
 
     def get_failed(self):
         """Return the status and timing information of tests that raised a failureException."""
-
-        with self._lock:
-            return [test_info for test_info in self.test_infos if test_info.status == "fail"]
+        return [test_info for test_info in self.iter_test_infos() if test_info.status == "fail"]
 
     def get_errored(self):
         """Return the status and timing information of tests that raised a non-failureException."""
-
-        with self._lock:
-            return [test_info for test_info in self.test_infos if test_info.status == "error"]
+        return [test_info for test_info in self.iter_test_infos() if test_info.status == "error"]
 
     def get_interrupted(self):
         """Return the status and timing information of tests that were execution interrupted."""
+        return [test_info for test_info in self.iter_test_infos() if test_info.status == "timeout"]
+
+    def iter_test_infos(self):
+        """Yield the status and timing information of each test, reading streamed tests back."""
 
         with self._lock:
-            return [test_info for test_info in self.test_infos if test_info.status == "timeout"]
+            stream_segments = self._get_stream_segments()
+            test_infos = [info for info in self.test_infos if info.record_id is None]
+
+        for (filename, start, end) in stream_segments:
+            for test_info in _read_stream_segment(filename, start, end):
+                yield test_info
+
+        for test_info in test_infos:
+            yield test_info
 
     def as_dict(self):
         """Return the test result information as a dictionary.
@@ -262,24 +302,8 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         Used to create the report.json file.
         """
 
-        results = []
+        results = [test_info.as_dict() for test_info in self.iter_test_infos()]
         with self._lock:
-            for test_info in self.test_infos:
-                result = {
-                    "test_file": test_info.test_file,
-                    "status": test_info.evergreen_status,
-                    "exit_code": test_info.return_code,
-                    "start": test_info.start_time,
-                    "end": test_info.end_time,
-                    "elapsed": test_info.end_time - test_info.start_time,
-                }
-
-                if test_info.url_endpoint is not None:
-                    result["url"] = test_info.url_endpoint
-                    result["url_raw"] = test_info.url_endpoint + "?raw=1"
-
-                results.append(result)
-
             return {
                 "results": results,
                 "failures": self.num_failed + self.num_errored + self.num_interrupted,
@@ -325,12 +349,64 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         with self._lock:
             self.test_infos = []
 
+            # The (filename, start offset, end offset) parts of stream files that were combined into
+            # this report.
+            self._stream_segments = []
+            # The offset in the stream file where the results of this report start.
+            self._stream_start = _get_stream_size(self.stream_filename)
+
             self.num_dynamic = 0
             self.num_succeeded = 0
             self.num_failed = 0
             self.num_errored = 0
             self.num_interrupted = 0
 
+    def _update_counts(self, old_status, new_status):
+        """Move a test from the counter of 'old_status' to the counter of 'new_status'."""
+
+        if old_status in _STATUS_COUNTERS:
+            counter = _STATUS_COUNTERS[old_status]
+            setattr(self, counter, getattr(self, counter) - 1)
+
+        counter = _STATUS_COUNTERS[new_status]
+        setattr(self, counter, getattr(self, counter) + 1)
+
+    def _get_stream_segments(self):
+        """Return the parts of stream files that hold the tests of this report that finished."""
+
+        stream_segments = list(self._stream_segments)
+        if self.stream_filename is not None:
+            stream_segments.append((self.stream_filename, self._stream_start,
+                                    _get_stream_size(self.stream_filename)))
+        return stream_segments
+
+    def _stream_result(self, test_info):
+        """Append the result of 'test_info' to the stream file, if there is one.
+
+        A test whose outcome is changed after it finished is appended again with the same record id
+        so that the last record of each test is the one that counts.
+        """
+
+        if self.stream_filename is None:
+            return
+
+        # The lock is held so that combine() never sees a test as streamed before its record is in
+        # the file.
+        with self._lock:
+            if test_info.record_id is None:
+                test_info.record_id = uuid.uuid4().hex
+
+            record = {
+                "id": test_info.record_id,
+                "status": test_info.status,
+                "result": test_info.as_dict(),
+            }
+
+            # The file is reopened for every test so that the results written so far are never left
+            # in a buffer of this process.
+            with open(self.stream_filename, "a") as fp:
+                fp.write(json.dumps(record) + "\n")
+
     def find_test_info(self, test):
         """Return the status and timing information associated with 'test'."""
 
@@ -362,6 +438,94 @@ class _TestInfo(object):  # pylint: disable=too-many-instance-attributes
         self.return_code = None
         self.url_endpoint = None
 
+        # Set once the test's result is appended to a stream file.
+        self.record_id = None
+
+    @classmethod
+    def from_stream_record(cls, record):
+        """Return the _TestInfo instance copied from a record of a stream file."""
+
+        result = record["result"]
+        test_file = result["test_file"]
+        # By convention, dynamic tests are named "<basename>:<hook name>".
+        test_info = cls(test_file, test_file, ":" in test_file)
+        test_info.url_endpoint = result.get("url")
+        test_info.status = record["status"]
+        test_info.evergreen_status = result["status"]
+        test_info.return_code = result["exit_code"]
+        test_info.start_time = result["start"]
+        test_info.end_time = result["end"]
+        test_info.record_id = record["id"]
+        return test_info
+
+    def as_dict(self):
+        """Return the result of the test as a dictionary in the format of the report.json file."""
+
+        result = {
+            "test_file": self.test_file,
+            "status": self.evergreen_status,
+            "exit_code": self.return_code,
+            "start": self.start_time,
+            "end": self.end_time,
+            "elapsed": self.end_time - self.start_time,
+        }
+
+        if self.url_endpoint is not None:
+            result["url"] = self.url_endpoint
+            result["url_raw"] = self.url_endpoint + "?raw=1"
+
+        return result
+
+
+def get_stream_filename(job_num):
+    """Return the file that the results of the tests run by 'job_num' are streamed to."""
+    return "{}.job{}.jsonl".format(_config.REPORT_FILE, job_num)
+
+
+def _get_stream_size(filename):
+    """Return the size of a stream file, which is 0 if nothing was streamed to it yet."""
+
+    if filename is None or not os.path.isfile(filename):
+        return 0
+    return os.path.getsize(filename)
+
+
+def _read_stream_records(filename, start, end):
+    """Yield the (offset, record) pairs of the test results between two offsets of a stream file."""
+
+    with open(filename, "rb") as fp:
+        fp.seek(start)
+        offset = start
+        while offset < end:
+            line = fp.readline()
+            if not line:
+                break
+            try:
+                record = json.loads(line.decode("utf-8"))
+            except ValueError:
+                # The last line is incomplete if resmoke.py was killed while writing it.
+                record = None
+            if record is not None:
+                yield (offset, record)
+            offset += len(line)
+
+
+def _read_stream_segment(filename, start, end):
+    """Yield the status and timing information of the tests between two offsets of a stream file."""
+
+    if end <= start:
+        return
+
+    # A test is streamed again if its outcome is changed after it finished, so only its last record
+    # is kept.
+    last_offsets = {}
+    for (offset, record) in _read_stream_records(filename, start, end):
+        last_offsets[record["id"]] = offset
+
+    for (offset, record) in _read_stream_records(filename, start, end):
+        if last_offsets[record["id"]] == offset:
+            yield _TestInfo.from_stream_record(record)
+
 
 def test_order(test_name):
     """
@@ -1,11 +1,27 @@
 """The unittest.TestCase for tests using a MongoDB vendored version of Google Benchmark."""
 
+import json
+import math
+import os
+import re
+import time
+
 from buildscripts.resmokelib import config as _config
 from buildscripts.resmokelib import core
 from buildscripts.resmokelib import parser
 from buildscripts.resmokelib import utils
 from buildscripts.resmokelib.testing.testcases import interface
 
+# The suffixes Google Benchmark appends to the names of the statistics it computes over repetitions.
+_AGGREGATE_SUFFIXES = ("_mean", "_median", "_stddev", "_cv")
+
+# The critical values of Student's t-distribution for a two-sided 95% confidence interval, indexed
+# by the degrees of freedom minus one. The normal distribution's value is used past the end.
+_T_CRITICAL_VALUES = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228, 2.201,
+                      2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086, 2.080, 2.074,
+                      2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+_Z_CRITICAL_VALUE = 1.96
+
 
 class BenchmarkTestCase(interface.ProcessTestCase):
     """A Benchmark test to execute."""
@@ -63,5 +79,91 @@ class BenchmarkTestCase(interface.ProcessTestCase):
         """Return report name."""
         return self.bm_executable + ".json"
 
-    def _make_process(self):
-        return core.programs.generic_program(self.logger, [self.bm_executable], **self.bm_options)
+    def run_test(self):
+        """Run the test, repeating the benchmarks until they converge if --benchmarkTargetCiPct."""
+        if _config.BENCHMARK_TARGET_CI_PCT is None or self.bm_options.get("benchmark_list_tests"):
+            interface.ProcessTestCase.run_test(self)
+            return
+
+        try:
+            self._run_adaptively()
+        except self.failureException:
+            raise
+        except:
+            self.logger.exception("Encountered an error running %s %s", self.test_kind,
+                                  self.basename())
+            raise
+
+    def _run_adaptively(self):
+        """Run the benchmarks in batches of repetitions until each one has converged.
+
+        Only the benchmarks that haven't converged yet are run again, by passing their names as
+        the --benchmark_filter. The runs of all batches are merged into the report file read by
+        the CombineBenchmarkResults hook.
+        """
+
+        batch_report_name = self.report_name() + ".batch"
+        deadline = time.time() + _config.BENCHMARK_MAX_TIME.total_seconds()
+        bm_options = dict(self.bm_options, benchmark_out=batch_report_name)
+        context = None
+        runs = {}
+        num_batches = 0
+
+        while True:
+            self._execute(self._make_process(bm_options))
+            num_batches += 1
+
+            with open(batch_report_name, "r") as report_file:
+                batch_report = json.load(report_file)
+            context = batch_report["context"] if context is None else context
+            for run in batch_report["benchmarks"]:
+                if run.get("run_type") == "aggregate" or run["name"].endswith(_AGGREGATE_SUFFIXES):
+                    continue
+                runs.setdefault(run["name"], []).append(run)
+
+            unconverged = sorted(name for (name, bm_runs) in runs.items()
+                                 if not _has_converged([run["cpu_time"] for run in bm_runs]))
+            if not unconverged or time.time() >= deadline:
+                break
+
+            self.logger.info("Running %d of %d benchmarks again because they haven't converged.",
+                             len(unconverged), len(runs))
+            bm_options["benchmark_filter"] = "^(%s)$" % "|".join(
+                re.escape(name) for name in unconverged)
+
+        os.remove(batch_report_name)
+        with open(self.report_name(), "w") as report_file:
+            json.dump({
+                "context": context,
+                "benchmarks": [run for name in sorted(runs) for run in runs[name]],
+            }, report_file)
+
+        if unconverged:
+            self.logger.warning(
+                "%d benchmarks didn't converge within %d batches: %s", len(unconverged),
+                num_batches, ", ".join(unconverged))
+        else:
+            self.logger.info("All %d benchmarks converged within %d batches.", len(runs),
+                             num_batches)
+
+    def _make_process(self, bm_options=None):
+        bm_options = utils.default_if_none(bm_options, self.bm_options)
+        return core.programs.generic_program(self.logger, [self.bm_executable], **bm_options)
+
+
+def _has_converged(timings):
+    """Return true if the 95% confidence interval of the mean of 'timings' is narrow enough.
+
+    The half-width of the interval must be at most --benchmarkTargetCiPct percent of the mean.
+    """
+
+    num_timings = len(timings)
+    if num_timings < 2:
+        return False
+
+    mean = sum(timings) / float(num_timings)
+    variance = sum((timing - mean)**2 for timing in timings) / (num_timings - 1)
+    critical_value = (_T_CRITICAL_VALUES[num_timings - 2]
+                      if num_timings - 2 < len(_T_CRITICAL_VALUES) else _Z_CRITICAL_VALUE)
+    half_width = critical_value * math.sqrt(variance / num_timings)
+    return mean > 0 and half_width / mean * 100 <= _config.BENCHMARK_TARGET_CI_PCT
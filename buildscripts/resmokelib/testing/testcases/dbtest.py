@@ -47,7 +47,7 @@ class DBTestCase(interface.ProcessTestCase):
         self._clear_dbpath()
 
     def _clear_dbpath(self):
-        utils.rmtree(self.dbtest_options["dbpath"], ignore_errors=True)
+        core.dbpaths.clear(self.dbtest_options["dbpath"], ignore_errors=True)
 
     def _make_process(self):
         return core.programs.dbtest_program(self.logger, executable=self.dbtest_executable,
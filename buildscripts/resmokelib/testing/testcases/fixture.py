@@ -49,6 +49,36 @@ class FixtureSetupTestCase(FixtureTestCase):
             raise
 
 
+class FixtureResetTestCase(FixtureTestCase):
+    """TestCase for resetting a fixture left running by a previous suite to a clean state."""
+
+    REGISTERED_NAME = registry.LEAVE_UNREGISTERED
+    PHASE = "reset"
+
+    def __init__(self, logger, fixture, job_name, times_reset):
+        """Initialize the FixtureResetTestCase."""
+        specific_phase = "{phase}_{times_reset}".format(phase=self.PHASE, times_reset=times_reset)
+        FixtureTestCase.__init__(self, logger, job_name, specific_phase)
+        self.fixture = fixture
+
+    def run_test(self):
+        """Drop the data of the fixture so tests run against it as if it were newly set up."""
+        try:
+            self.return_code = 2
+            self.logger.info("Resetting %s for reuse.", self.fixture)
+            if not self.fixture.is_running():
+                raise errors.ServerFailure("{} is not running".format(self.fixture))
+            self.fixture.clear_data()
+            self.logger.info("Finished resetting %s.", self.fixture)
+            self.return_code = 0
+        except errors.ServerFailure as err:
+            self.logger.error("An error occurred while resetting %s: %s", self.fixture, err)
+            raise
+        except:
+            self.logger.exception("An error occurred while resetting %s.", self.fixture)
+            raise
+
+
 class FixtureTeardownTestCase(FixtureTestCase):
     """TestCase for tearing down a fixture."""
 
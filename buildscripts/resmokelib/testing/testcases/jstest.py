@@ -74,7 +74,7 @@ class _SingleJSTestCase(interface.ProcessTestCase):
         global_vars["TestData"] = test_data
         self.shell_options["global_vars"] = global_vars
 
-        utils.rmtree(data_dir, ignore_errors=True)
+        core.dbpaths.clear(data_dir, ignore_errors=True)
 
         try:
             os.makedirs(data_dir)
@@ -112,7 +112,8 @@ class _SingleJSTestCase(interface.ProcessTestCase):
     def _make_process(self):
         return core.programs.mongo_shell_program(
             self.logger, executable=self.shell_executable, filename=self.js_filename,
-            connection_string=self.fixture.get_driver_connection_url(), **self.shell_options)
+            connection_string=self.fixture.get_driver_connection_url(),
+            job_num=self.fixture.job_num, **self.shell_options)
 
 
 class JSTestCase(interface.ProcessTestCase):
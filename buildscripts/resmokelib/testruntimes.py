@@ -0,0 +1,127 @@
+"""Manage the file of historical test runtimes used to schedule tests longest-first."""
+
+import json
+import os.path
+import re
+
+from . import config
+
+# The number of previous runs a test's runtime is averaged over. Capping it keeps the history
+# responsive to a test getting faster or slower over time.
+_MAX_RUNS_AVERAGED = 10
+
+# Matches the drive of an absolute Windows path, e.g. 'C:\'. It is followed by a path separator,
+# unlike the name of a dynamic test for a test whose basename is a single letter.
+_WINDOWS_DRIVE_RE = re.compile(r"^[A-Za-z]:[\\/]")
+
+
+def _is_dynamic_test(test_file):
+    """Return True if 'test_file' is the name of a dynamic test, such as one run by a hook.
+
+    By convention, dynamic tests are named "<basename>:<hook name>".
+    """
+    return ":" in _WINDOWS_DRIVE_RE.sub("", test_file, count=1)
+
+
+class TestRuntimes(object):
+    """Average runtime of each test, keyed by test file."""
+
+    def __init__(self, runtimes=None):
+        """Initialize the TestRuntimes with a dict of {test_file: {"elapsed", "num_runs"}}."""
+        self._runtimes = runtimes if runtimes is not None else {}
+        # Whether the runtimes were read from a report.json file, which is never written over.
+        self.from_report_file = False
+
+    @classmethod
+    def from_file(cls, filename):
+        """Return a TestRuntimes instance read from 'filename'.
+
+        The file may either be one previously written by dump() or a report.json file written by
+        --reportFile. An empty history is returned if the file does not exist.
+        """
+
+        if not os.path.isfile(filename):
+            return cls()
+
+        with open(filename, "r") as fp:
+            contents = json.load(fp)
+
+        if "results" in contents:
+            test_runtimes = cls()
+            test_runtimes.add_report_dict(contents)
+            test_runtimes.from_report_file = True
+            return test_runtimes
+
+        return cls(contents["tests"])
+
+    def dump(self, filename):
+        """Write the runtimes to 'filename'."""
+        with open(filename, "w") as fp:
+            json.dump({"tests": self._runtimes}, fp, indent=1, sort_keys=True)
+
+    def add_report_dict(self, report_dict):
+        """Add the runtimes of the passing tests from a dict generated by TestReport.as_dict()."""
+        for result in report_dict["results"]:
+            # Dynamic tests are never queued, so there is no point in keeping their runtimes around.
+            if _is_dynamic_test(result["test_file"]) or result["status"] != "pass":
+                continue
+            self.add_runtime(result["test_file"], result["elapsed"])
+
+    def add_runtime(self, test_file, elapsed):
+        """Fold a new observed runtime of 'test_file' into its average."""
+        entry = self._runtimes.setdefault(test_file, {"elapsed": 0.0, "num_runs": 0})
+        num_runs = min(entry["num_runs"], _MAX_RUNS_AVERAGED - 1)
+        entry["elapsed"] = (entry["elapsed"] * num_runs + elapsed) / (num_runs + 1)
+        entry["num_runs"] = num_runs + 1
+
+    def get_runtime(self, test_file, default=None):
+        """Return the average runtime of 'test_file', or 'default' if it has never run."""
+        entry = self._runtimes.get(test_file)
+        if entry is None:
+            return default
+        return entry["elapsed"]
+
+    def sort_longest_first(self, items, key=lambda item: item):
+        """Return 'items' sorted by decreasing historical runtime.
+
+        'key' maps an item to its test file. Tests without any history are estimated to take the
+        average runtime of the known tests among 'items'. The sort is stable so tests with equal
+        estimates keep their relative (possibly shuffled) order.
+        """
+
+        known = [self.get_runtime(key(item)) for item in items]
+        known = [runtime for runtime in known if runtime is not None]
+        estimate = sum(known) / len(known) if known else 0.0
+
+        return sorted(items, key=lambda item: self.get_runtime(key(item), estimate), reverse=True)
+
+
+def load():
+    """Return the TestRuntimes from --testRuntimesFile, or None if it wasn't specified."""
+
+    if config.TEST_RUNTIMES_FILE is None:
+        return None
+
+    return TestRuntimes.from_file(config.TEST_RUNTIMES_FILE)
+
+
+def write(suites):
+    """Add the runtimes of the tests that ran to --testRuntimesFile if it was specified.
+
+    A --testRuntimesFile that is a report.json file, including the --reportFile of this run, is
+    only read. Writing the runtimes over it would lose the report.
+    """
+
+    test_runtimes = load()
+    if test_runtimes is None or test_runtimes.from_report_file:
+        return
+
+    filename = os.path.abspath(config.TEST_RUNTIMES_FILE)
+    if config.REPORT_FILE is not None and os.path.abspath(config.REPORT_FILE) == filename:
+        return
+
+    for suite in suites:
+        for report in suite.get_reports():
+            test_runtimes.add_report_dict(report.as_dict())
+
+    test_runtimes.dump(filename)
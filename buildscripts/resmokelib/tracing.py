@@ -0,0 +1,250 @@
+"""Record where resmoke.py's own time goes as spans, and export them as Chrome trace events.
+
+The trace file written by --traceFile can be loaded in chrome://tracing or https://ui.perfetto.dev.
+Each span records its wall time, the CPU time of the thread that ran it, and the number of
+processes started during it, including by the threads it handed work to with propagate().
+"""
+
+import collections
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+from . import config
+
+# The Tracer recording spans, or None if --traceFile wasn't specified.
+_TRACER = None
+
+# The spans that are open in the current context, outermost first.
+_OPEN_SPANS = contextvars.ContextVar("open_spans", default=())
+
+# Serializes the updates to the process count of spans that are open in more than one thread.
+_NUM_PROCESSES_LOCK = threading.Lock()
+
+SpanSummary = collections.namedtuple(
+    "SpanSummary", ["num_spans", "wall_secs", "cpu_secs", "max_wall_secs", "num_processes"])
+
+
+class Span(object):
+    """A section of resmoke.py's work run by a single thread."""
+
+    __slots__ = ("name", "category", "thread_id", "start", "wall_secs", "cpu_secs", "num_processes",
+                 "_cpu_start")
+
+    def __init__(self, name, category):
+        """Initialize the Span and start timing it."""
+        self.name = name
+        self.category = category
+        self.thread_id = threading.get_ident()
+        self.start = time.time()
+        self.wall_secs = None
+        self.cpu_secs = None
+        self.num_processes = 0
+        self._cpu_start = time.thread_time()
+
+    def finish(self):
+        """Stop timing the span."""
+        self.wall_secs = time.time() - self.start
+        self.cpu_secs = time.thread_time() - self._cpu_start
+
+    @property
+    def end(self):
+        """Return the time the span finished."""
+        return self.start + self.wall_secs
+
+    def as_trace_event(self, pid):
+        """Return the span as a complete event of the Chrome trace event format."""
+        return {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": int(self.start * 1e6),
+            "dur": int(self.wall_secs * 1e6),
+            "pid": pid,
+            "tid": self.thread_id,
+            "args": {
+                "cpu_ms": round(self.cpu_secs * 1000, 3),
+                "processes_started": self.num_processes,
+            },
+        }
+
+
+class _Sampler(threading.Thread):
+    """Sample the stacks of every thread of resmoke.py at a fixed interval."""
+
+    def __init__(self, interval_secs):
+        """Initialize the _Sampler."""
+        threading.Thread.__init__(self, name="TraceSampler")
+        self.daemon = True
+        self._interval_secs = interval_secs
+        self._stop_event = threading.Event()
+        # Mapping of a thread name and its stack, outermost frame first, to its number of samples.
+        self.stack_counts = collections.Counter()
+
+    def run(self):
+        """Sample the stacks until stop() is called."""
+        own_thread_id = threading.get_ident()
+        while not self._stop_event.wait(self._interval_secs):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()  # pylint: disable=protected-access
+            for (thread_id, frame) in frames.items():
+                if thread_id == own_thread_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append("%s (%s:%d)" % (code.co_name, os.path.basename(code.co_filename),
+                                                 code.co_firstlineno))
+                    frame = frame.f_back
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                self.stack_counts[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        """Stop sampling and wait for the sampler to exit."""
+        self._stop_event.set()
+        self.join()
+
+    def write_folded(self, filename):
+        """Write the samples in the folded stack format read by flamegraph.pl and speedscope."""
+        with open(filename, "w") as fp:
+            for (stack, count) in sorted(self.stack_counts.items()):
+                fp.write("%s %d\n" % (";".join(stack), count))
+
+
+class Tracer(object):
+    """The spans recorded so far."""
+
+    def __init__(self, sampling_interval_secs=None):
+        """Initialize the Tracer, and start sampling if 'sampling_interval_secs' is given."""
+        self._lock = threading.Lock()
+        self._spans = []
+        self._thread_names = {}
+        self._sampler = None
+        if sampling_interval_secs:
+            self._sampler = _Sampler(sampling_interval_secs)
+            self._sampler.start()
+
+    def add_span(self, span):
+        """Record the finished 'span'."""
+        with self._lock:
+            self._spans.append(span)
+            if span.thread_id not in self._thread_names:
+                self._thread_names[span.thread_id] = threading.current_thread().name
+
+    def summarize(self, start=None, end=None):
+        """Return a dict of the SpanSummary of each category of span.
+
+        Only the spans that started after 'start' and finished before 'end' are summarized.
+        """
+
+        summaries = {}
+        with self._lock:
+            spans = list(self._spans)
+
+        for span in spans:
+            if (start is not None and span.start < start) or (end is not None and span.end > end):
+                continue
+            summary = summaries.get(span.category, SpanSummary(0, 0.0, 0.0, 0.0, 0))
+            summaries[span.category] = SpanSummary(
+                summary.num_spans + 1,
+                summary.wall_secs + span.wall_secs, summary.cpu_secs + span.cpu_secs,
+                max(summary.max_wall_secs,
+                    span.wall_secs), summary.num_processes + span.num_processes)
+        return summaries
+
+    def write(self, filename):
+        """Stop sampling and write the spans to 'filename' in the Chrome trace event format."""
+
+        pid = os.getpid()
+        with self._lock:
+            events = [{
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": thread_id,
+                "args": {"name": thread_name},
+            } for (thread_id, thread_name) in self._thread_names.items()]
+            events.extend(span.as_trace_event(pid) for span in self._spans)
+
+        with open(filename, "w") as fp:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fp)
+
+        if self._sampler is not None:
+            self._sampler.stop()
+            self._sampler.write_folded(filename + ".folded")
+
+
+def start():
+    """Start recording spans if --traceFile was specified."""
+    global _TRACER  # pylint: disable=global-statement
+    if config.TRACE_FILE and _TRACER is None:
+        sampling_interval_secs = None
+        if config.TRACE_SAMPLING_INTERVAL_MS:
+            sampling_interval_secs = config.TRACE_SAMPLING_INTERVAL_MS / 1000.0
+        _TRACER = Tracer(sampling_interval_secs)
+
+
+def is_enabled():
+    """Return true if spans are being recorded."""
+    return _TRACER is not None
+
+
+def process_started():
+    """Count a process started by the calling thread towards the spans open in its context."""
+    with _NUM_PROCESSES_LOCK:
+        for open_span in _OPEN_SPANS.get():
+            open_span.num_processes += 1
+
+
+def propagate(function):
+    """Return 'function' wrapped to run in another thread as part of the calling thread's spans.
+
+    The processes started by the other thread then count towards the spans that are open when
+    propagate() is called. Each function must be wrapped separately.
+    """
+    return functools.partial(contextvars.copy_context().run, function)
+
+
+@contextlib.contextmanager
+def span(name, category):
+    """Record the code run in the 'with' block as a span, and yield it.
+
+    None is yielded and nothing is recorded if spans aren't being recorded.
+    """
+
+    tracer = _TRACER
+    if tracer is None:
+        yield None
+        return
+
+    new_span = Span(name, category)
+    token = _OPEN_SPANS.set(_OPEN_SPANS.get() + (new_span, ))
+    try:
+        yield new_span
+    finally:
+        _OPEN_SPANS.reset(token)
+        new_span.finish()
+        tracer.add_span(new_span)
+
+
+def summarize(sb, suite_span):
+    """Append a summary of the spans that ran during 'suite_span' onto the string builder 'sb'."""
+
+    summaries = _TRACER.summarize(suite_span.start, suite_span.end)
+    sb.append("Time spent by resmoke.py, by span category:")
+    for (category, summary) in sorted(summaries.items()):
+        sb.append("    %s: %d spans, %0.2f seconds (%0.2f seconds CPU, longest %0.2f seconds),"
+                  " %d processes started" %
+                  (category, summary.num_spans, summary.wall_secs, summary.cpu_secs,
+                   summary.max_wall_secs, summary.num_processes))
+
+
+def write():
+    """Write the spans recorded to the --traceFile."""
+    if _TRACER is not None:
+        _TRACER.write(config.TRACE_FILE)
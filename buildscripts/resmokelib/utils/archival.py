@@ -2,6 +2,10 @@
 
 import queue
 import collections
+import concurrent.futures
+import gzip
+import hashlib
+import io
 import json
 import math
 import os
@@ -21,9 +25,31 @@ UploadArgs = collections.namedtuple("UploadArgs", [
     "delete_file"
 ])
 
+MultipartUploadArgs = collections.namedtuple(
+    "MultipartUploadArgs",
+    ["archival_file", "display_name", "upload", "s3_bucket", "s3_path", "on_complete"])
+
 ArchiveArgs = collections.namedtuple("ArchiveArgs",
                                      ["archival_file", "display_name", "remote_file"])
 
+# The URL archive files are linked from when no S3-compatible endpoint is specified.
+_DEFAULT_ENDPOINT_URL = "https://s3.amazonaws.com"
+
+# The name of the member of a streamed archive that lists the WiredTiger files left out of it. Each
+# file name is mapped to the remote file of the archive holding the same contents and the name of
+# the member in it.
+DEDUPLICATED_FILES_MEMBER = "deduplicated_files.json"
+
+# The size of the blocks _ParallelGzipWriter compresses to separate gzip members.
+_COMPRESS_BLOCK_SIZE = 1024 * 1024
+
+# The size of the parts of a multipart upload. S3 requires all parts but the last one to be at least
+# 5MB.
+_UPLOAD_PART_SIZE = 8 * 1024 * 1024
+
+# The number of parts uploaded at the same time.
+_UPLOAD_THREADS = 4
+
 
 def file_list_size(files):
     """Return size (in bytes) of all 'files' and their subdirectories."""
@@ -66,6 +92,25 @@ def free_space(path):
     return stat.f_bavail * stat.f_bsize
 
 
+def file_digest(file_name):
+    """Return the SHA-256 hex digest of the contents of 'file_name'."""
+    digest = hashlib.sha256()
+    with open(file_name, "rb") as fh:
+        for block in iter(lambda: fh.read(_COMPRESS_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _walk(path):
+    """Yield 'path' and, if it is a directory, the paths of its tree with directories first."""
+    yield path
+    if os.path.isdir(path) and not os.path.islink(path):
+        for root_dir, dir_names, file_names in os.walk(path):
+            dir_names.sort()
+            for name in dir_names + sorted(file_names):
+                yield os.path.join(root_dir, name)
+
+
 def remove_file(file_name):
     """Attempt to remove file. Return status and message."""
     try:
@@ -81,13 +126,112 @@ def remove_file(file_name):
     return status, message
 
 
+class _ParallelGzipWriter(object):
+    """File object that gzips the data written to it on several threads.
+
+    Each block of data is compressed to a separate gzip member. The members are written to 'fileobj'
+    in order, and their concatenation is a valid gzip file.
+    """
+
+    def __init__(self, fileobj, executor, max_pending):
+        """Initialize _ParallelGzipWriter."""
+        self._fileobj = fileobj
+        self._executor = executor
+        self._max_pending = max_pending
+        self._buffer = bytearray()
+        self._pending = collections.deque()
+
+    def write(self, data):
+        """Compress 'data' once a full block has been written."""
+        self._buffer += data
+        while len(self._buffer) >= _COMPRESS_BLOCK_SIZE:
+            self._compress(bytes(self._buffer[:_COMPRESS_BLOCK_SIZE]))
+            del self._buffer[:_COMPRESS_BLOCK_SIZE]
+        return len(data)
+
+    def _compress(self, block):
+        self._pending.append(self._executor.submit(gzip.compress, block))
+        # Wait for the oldest block so the blocks being compressed don't use unbounded memory.
+        while len(self._pending) > self._max_pending:
+            self._fileobj.write(self._pending.popleft().result())
+
+    def close(self):
+        """Compress the rest of the data and write all of it to 'fileobj'."""
+        if self._buffer:
+            self._compress(bytes(self._buffer))
+            self._buffer = bytearray()
+        while self._pending:
+            self._fileobj.write(self._pending.popleft().result())
+
+
+class _MultipartUpload(object):
+    """File object that uploads the data written to it to S3 in parts."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, s3_client, executor, s3_bucket, s3_path, content_type):
+        """Initialize _MultipartUpload and start the upload."""
+        self._s3_client = s3_client
+        self._executor = executor
+        self._s3_bucket = s3_bucket
+        self._s3_path = s3_path
+        self._buffer = bytearray()
+        self._parts = []
+        self.size = 0
+
+        response = s3_client.create_multipart_upload(Bucket=s3_bucket, Key=s3_path,
+                                                     ContentType=content_type, ACL="public-read")
+        self._upload_id = response["UploadId"]
+
+    def write(self, data):
+        """Upload 'data' once a full part has been written."""
+        self._buffer += data
+        self.size += len(data)
+        if len(self._buffer) >= _UPLOAD_PART_SIZE:
+            self._upload_part()
+        return len(data)
+
+    def _upload_part(self):
+        self._parts.append(
+            self._executor.submit(self._s3_client.upload_part, Bucket=self._s3_bucket,
+                                  Key=self._s3_path, UploadId=self._upload_id,
+                                  PartNumber=len(self._parts) + 1, Body=bytes(self._buffer)))
+        self._buffer = bytearray()
+        # Wait for the oldest part still uploading so the parts don't use unbounded memory.
+        if len(self._parts) > _UPLOAD_THREADS:
+            self._parts[-_UPLOAD_THREADS - 1].result()
+
+    def close(self):
+        """Upload the rest of the data as the last part."""
+        if self._buffer or not self._parts:
+            self._upload_part()
+
+    def complete(self):
+        """Wait for all of the parts to be uploaded and complete the upload."""
+        parts = [{"ETag": part.result()["ETag"], "PartNumber": part_number}
+                 for (part_number, part) in enumerate(self._parts, 1)]
+        self._s3_client.complete_multipart_upload(Bucket=self._s3_bucket, Key=self._s3_path,
+                                                  UploadId=self._upload_id,
+                                                  MultipartUpload={"Parts": parts})
+
+    def abort(self):
+        """Abort the upload, discarding the parts uploaded so far."""
+        concurrent.futures.wait(self._parts)
+        self._s3_client.abort_multipart_upload(Bucket=self._s3_bucket, Key=self._s3_path,
+                                               UploadId=self._upload_id)
+
+
 class Archival(object):  # pylint: disable=too-many-instance-attributes
     """Class to support file archival to S3."""
 
     def __init__(  # pylint: disable=too-many-arguments
             self, logger, archival_json_file="archive.json", limit_size_mb=0, limit_files=0,
-            s3_client=None):
-        """Initialize Archival."""
+            s3_client=None, endpoint_url=None, stream=False):
+        """Initialize Archival.
+
+        If 'stream' is true, then archives are compressed on several threads and streamed to S3 in
+        a multipart upload. WiredTiger files with the same contents as a file that was already
+        archived are listed in the DEDUPLICATED_FILES_MEMBER of the archive instead.
+        """
 
         self.archival_json_file = archival_json_file
         self.limit_size_mb = limit_size_mb
@@ -96,10 +240,21 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
         self.num_files = 0
         self.archive_time = 0
         self.logger = logger
+        self.stream = stream
 
         # Lock to control access from multiple threads.
         self._lock = threading.Lock()
 
+        # Mapping of the digest of each WiredTiger file in a streamed archive that was uploaded to
+        # the remote file of the archive and the name of the member in it.
+        self._archived_files = {}
+        if stream:
+            self._compress_threads = os.cpu_count() or 1
+            self._compress_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._compress_threads)
+            self._upload_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_UPLOAD_THREADS)
+
         # Start the worker thread to update the 'archival_json_file'.
         self._archive_file_queue = queue.Queue()
         self._archive_file_worker = threading.Thread(target=self._update_archive_file_wkr,
@@ -108,23 +263,25 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
         self._archive_file_worker.setDaemon(True)
         self._archive_file_worker.start()
         if not s3_client:
-            self.s3_client = self._get_s3_client()
+            self.s3_client = self._get_s3_client(endpoint_url)
         else:
             self.s3_client = s3_client
+        self._endpoint_url = (endpoint_url or _DEFAULT_ENDPOINT_URL).rstrip("/")
 
         # Start the worker thread which uploads the archive.
         self._upload_queue = queue.Queue()
         self._upload_worker = threading.Thread(
-            target=self._upload_to_s3_wkr, args=(self._upload_queue, self._archive_file_queue,
-                                                 logger, self.s3_client), name="upload_worker")
+            target=self._upload_to_s3_wkr,
+            args=(self._upload_queue, self._archive_file_queue, logger, self.s3_client,
+                  self._endpoint_url), name="upload_worker")
         self._upload_worker.setDaemon(True)
         self._upload_worker.start()
 
     @staticmethod
-    def _get_s3_client():
+    def _get_s3_client(endpoint_url=None):
         # Since boto3 is a 3rd party module, we import locally.
         import boto3
-        return boto3.client("s3")
+        return boto3.client("s3", endpoint_url=endpoint_url)
 
     def archive_files_to_s3(self, display_name, input_files, s3_bucket, s3_path):
         """Archive 'input_files' to 's3_bucket' and 's3_path'.
@@ -133,10 +290,19 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
         enforced after it has been exceeded, since it can only be calculated after the
         tar/gzip has been done.
 
+        A streamed archive is done without holding the lock, so that several jobs can archive
+        at the same time. The file limit is enforced by counting the archive up front, and the
+        size limit by reserving the uncompressed size of its files, an upper bound of the size of
+        the archive, until the size of the archive is known.
+
         Return status and message, where message contains information if status is non-0.
         """
 
         start_time = time.time()
+        reserved_size_mb = 0
+        if self.stream and self.limit_size_mb and input_files:
+            reserved_size_mb = int(math.ceil(float(file_list_size(input_files)) / (1024 * 1024)))
+
         with self._lock:
             if not input_files:
                 status = 1
@@ -147,6 +313,10 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
             elif self.limit_files and self.num_files >= self.limit_files:
                 status = 1
                 message = "Files not archived, {} file limit reached".format(self.limit_files)
+            elif self.stream:
+                status = 0
+                self.num_files += 1
+                self.size_mb += reserved_size_mb
             else:
                 status, message, file_size_mb = self._archive_files(display_name, input_files,
                                                                     s3_bucket, s3_path)
@@ -156,6 +326,15 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
                 self.size_mb += file_size_mb
                 self.archive_time += time.time() - start_time
 
+        if status == 0 and self.stream:
+            status, message, file_size_mb = self._stream_archive_files(
+                display_name, input_files, s3_bucket, s3_path)
+            with self._lock:
+                if status:
+                    self.num_files -= 1
+                self.size_mb += file_size_mb - reserved_size_mb
+                self.archive_time += time.time() - start_time
+
         return status, message
 
     @staticmethod
@@ -180,7 +359,8 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
             work_queue.task_done()
 
     @staticmethod
-    def _upload_to_s3_wkr(work_queue, archive_file_work_queue, logger, s3_client):
+    def _upload_to_s3_wkr(  # pylint: disable=too-many-arguments
+            work_queue, archive_file_work_queue, logger, s3_client, endpoint_url):
         """Worker thread: Upload to S3 from 'work_queue', dispatch to 'archive_file_work_queue'."""
         while True:
             upload_args = work_queue.get()
@@ -189,6 +369,18 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
                 work_queue.task_done()
                 archive_file_work_queue.put(None)
                 break
+
+            remote_file = "{}/{}/{}".format(endpoint_url, upload_args.s3_bucket,
+                                            upload_args.s3_path)
+            if isinstance(upload_args, MultipartUploadArgs):
+                if Archival._complete_multipart_upload(upload_args, logger):
+                    upload_args.on_complete(remote_file)
+                    archive_file_work_queue.put(
+                        ArchiveArgs(upload_args.archival_file, upload_args.display_name,
+                                    remote_file))
+                work_queue.task_done()
+                continue
+
             extra_args = {"ContentType": upload_args.content_type, "ACL": "public-read"}
             logger.debug("Uploading to S3 %s to bucket %s path %s", upload_args.local_file,
                          upload_args.s3_bucket, upload_args.s3_path)
@@ -207,14 +399,132 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
                 if status:
                     logger.error("Upload to S3 delete file error %s", message)
 
-            remote_file = "https://s3.amazonaws.com/{}/{}".format(upload_args.s3_bucket,
-                                                                  upload_args.s3_path)
             if upload_completed:
                 archive_file_work_queue.put(
                     ArchiveArgs(upload_args.archival_file, upload_args.display_name, remote_file))
 
             work_queue.task_done()
 
+    @staticmethod
+    def _complete_multipart_upload(upload_args, logger):
+        """Complete the multipart upload of 'upload_args'. Return True if it was successful."""
+        try:
+            upload_args.upload.complete()
+            logger.debug("Upload to S3 completed for %s to bucket %s path %s",
+                         upload_args.display_name, upload_args.s3_bucket, upload_args.s3_path)
+            return True
+        except Exception as err:  # pylint: disable=broad-except
+            logger.exception("Upload to S3 error %s", err)
+
+        try:
+            upload_args.upload.abort()
+        except Exception as err:  # pylint: disable=broad-except
+            logger.error("Upload to S3 abort error %s", err)
+        return False
+
+    def _stream_archive_files(self, display_name, input_files, s3_bucket, s3_path):
+        """
+        Stream 'input_files' as a tar/gzip to a multipart upload to 's3_path'.
+
+        The caller waits until all of the files have been read. The rest of the upload and the
+        subsequent update to 'archival_json_file' will be done asynchronously.
+
+        Returns status, message and size_mb of archive.
+        """
+
+        # Parameter 'input_files' can either be a string or list of strings.
+        if isinstance(input_files, str):
+            input_files = [input_files]
+
+        message = "Tar/gzip {} files: {}".format(display_name, input_files)
+
+        try:
+            upload = _MultipartUpload(self.s3_client, self._upload_executor, s3_bucket, s3_path,
+                                      "application/x-gzip")
+        except Exception as err:  # pylint: disable=broad-except
+            return 1, "Unable to start the upload to S3: {}".format(err), 0
+
+        try:
+            gzip_writer = _ParallelGzipWriter(upload, self._compress_executor,
+                                              2 * self._compress_threads)
+            with tarfile.open(fileobj=gzip_writer, mode="w|") as tar_handle:
+                message, added_files = self._add_files_to_stream(tar_handle, input_files,
+                                                                 message)
+            gzip_writer.close()
+            upload.close()
+        except Exception as err:  # pylint: disable=broad-except
+            try:
+                upload.abort()
+            except Exception as abort_err:  # pylint: disable=broad-except
+                self.logger.warning("Aborting the upload to S3 failed - %s", abort_err)
+            return 1, str(err), 0
+
+        def on_complete(remote_file):
+            with self._lock:
+                for (digest, name) in added_files.items():
+                    self._archived_files.setdefault(digest, {"archive": remote_file, "name": name})
+
+        # Round up the size of the archive.
+        size_mb = int(math.ceil(float(upload.size) / (1024 * 1024)))
+        self._upload_queue.put(
+            MultipartUploadArgs(self.archival_json_file, display_name, upload, s3_bucket, s3_path,
+                                on_complete))
+
+        return 0, message, size_mb
+
+    def _add_files_to_stream(self, tar_handle, input_files, message):
+        """Add 'input_files' to 'tar_handle', leaving out the WiredTiger files archived before.
+
+        A WiredTiger file with the same contents as one added earlier to the same archive is added
+        as a hard link to it.
+
+        Returns message and the mapping of the digest of each WiredTiger file added to its name.
+        """
+
+        with self._lock:
+            archived_files = dict(self._archived_files)
+        added_files = {}
+        deduplicated_files = {}
+
+        for input_file in input_files:
+            try:
+                for path in _walk(input_file):
+                    tarinfo = tar_handle.gettarinfo(path)
+                    if tarinfo is None:
+                        # Sockets and other unsupported file types aren't archived.
+                        continue
+                    if not tarinfo.isreg():
+                        tar_handle.addfile(tarinfo)
+                        continue
+
+                    if path.endswith(".wt"):
+                        digest = file_digest(path)
+                        if digest in added_files:
+                            tarinfo.type = tarfile.LNKTYPE
+                            tarinfo.linkname = added_files[digest]
+                            tarinfo.size = 0
+                            tar_handle.addfile(tarinfo)
+                            continue
+                        if digest in archived_files:
+                            deduplicated_files[tarinfo.name] = archived_files[digest]
+                            continue
+                        added_files[digest] = tarinfo.name
+
+                    with open(path, "rb") as fh:
+                        tar_handle.addfile(tarinfo, fh)
+            except (IOError, OSError, tarfile.TarError) as err:
+                message = "{}; Unable to add {} to archive file: {}".format(
+                    message, input_file, err)
+
+        if deduplicated_files:
+            data = json.dumps(deduplicated_files, indent=4, sort_keys=True).encode("utf-8")
+            tarinfo = tarfile.TarInfo(DEDUPLICATED_FILES_MEMBER)
+            tarinfo.size = len(data)
+            tarinfo.mtime = time.time()
+            tar_handle.addfile(tarinfo, io.BytesIO(data))
+
+        return message, added_files
+
     def _archive_files(self, display_name, input_files, s3_bucket, s3_path):
         """
         Gather 'input_files' into a single tar/gzip and archive to 's3_path'.
@@ -267,11 +577,11 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
 
     def check_thread(self, thread, expected_alive):
         """Check if the thread is still active."""
-        if thread.isAlive() and not expected_alive:
+        if thread.is_alive() and not expected_alive:
             self.logger.warning(
                 "The %s thread did not complete, some files might not have been uploaded"
                 " to S3 or archived to %s.", thread.name, self.archival_json_file)
-        elif not thread.isAlive() and expected_alive:
+        elif not thread.is_alive() and expected_alive:
             self.logger.warning(
                 "The %s thread is no longer running, some files might not have been uploaded"
                 " to S3 or archived to %s.", thread.name, self.archival_json_file)
@@ -289,6 +599,10 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
         self._archive_file_worker.join(timeout=timeout)
         self.check_thread(self._archive_file_worker, False)
 
+        if self.stream:
+            self._compress_executor.shutdown(wait=False)
+            self._upload_executor.shutdown(wait=False)
+
         self.logger.info("Total tar/gzip archive time is %0.2f seconds, for %d file(s) %d MB",
                          self.archive_time, self.num_files, self.size_mb)
 
@@ -1,5 +1,6 @@
 """Filename globbing utility."""
 
+import fnmatch
 import glob as _glob
 import os
 import os.path
@@ -70,6 +71,33 @@ def iglob(globbed_pathname):
                 yield pathname
 
 
+def match(pathname, globbed_pathname):
+    """Return true if 'pathname' matches the 'globbed_pathname' pattern, and false otherwise.
+
+    The pattern is interpreted as in iglob(), but no directories are listed, so neither 'pathname'
+    nor the directories it is in need to exist.
+    """
+
+    parts = _split_path(os.path.normpath(pathname))
+    pattern_parts = _canonicalize(_split_path(os.path.normpath(globbed_pathname)))
+    return _match_parts(parts, pattern_parts)
+
+
+def _match_parts(parts, pattern_parts):
+    """Return true if the path components 'parts' match the pattern components 'pattern_parts'."""
+
+    if not pattern_parts:
+        return not parts
+
+    if pattern_parts[0] == _GLOBSTAR:
+        # A globstar matches zero or more path components.
+        return any(
+            _match_parts(parts[i:], pattern_parts[1:]) for i in range(len(parts) + 1))
+
+    return (bool(parts) and fnmatch.fnmatchcase(parts[0], pattern_parts[0])
+            and _match_parts(parts[1:], pattern_parts[1:]))
+
+
 def _split_path(pathname):
     """Return 'pathname' as a list of path components."""
 
@@ -0,0 +1,85 @@
+"""On-disk cache of the tags parsed from the comments of JS test files.
+
+Parsing the tags of a test requires reading the whole file and loading its @tags as YAML. The
+cached tags of a file are reused for as long as its modification time and size are unchanged, so
+only the files that changed since the cache was last saved are parsed again.
+"""
+
+import json
+import os
+import os.path
+
+from . import globstar
+from . import jscomment
+
+# Bumped whenever the format of the cache file, or how tags are parsed, changes so that older
+# caches are discarded.
+_VERSION = 1
+
+
+class TagsCache(object):
+    """Tags of each JS test file, along with the modification time and size they were parsed at."""
+
+    def __init__(self, filename, entries=None):
+        """Initialize the TagsCache, which is saved to 'filename'."""
+        self.filename = filename
+        self._entries = entries if entries is not None else {}
+        self._globs = {}
+        self._modified = False
+
+    @classmethod
+    def from_file(cls, filename):
+        """Return the TagsCache read from 'filename'.
+
+        An empty cache is returned if the file does not exist or was written by another version.
+        """
+
+        try:
+            with open(filename, "r") as fp:
+                contents = json.load(fp)
+        except (IOError, ValueError):
+            return cls(filename)
+
+        if contents.get("version") != _VERSION:
+            return cls(filename)
+
+        return cls(filename, contents["files"])
+
+    def get_tags(self, pathname):
+        """Return the tags of 'pathname', only parsing it if it changed since it was cached."""
+
+        stat = os.stat(pathname)
+        entry = self._entries.get(pathname)
+        if entry is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry[
+                "size"] == stat.st_size:
+            return list(entry["tags"])
+
+        tags = jscomment.get_tags(pathname)
+        self._entries[pathname] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "tags": tags}
+        self._modified = True
+        return list(tags)
+
+    def glob(self, pattern):
+        """Return the list of pathnames matching 'pattern', see globstar.iglob().
+
+        Glob expansions are only remembered for the lifetime of the cache object since checking
+        whether any directory they traversed changed costs about as much as expanding them again.
+        """
+
+        if pattern not in self._globs:
+            self._globs[pattern] = list(globstar.iglob(pattern))
+        return list(self._globs[pattern])
+
+    def save(self):
+        """Write the cache to its file if any tags were parsed since it was read."""
+
+        if not self._modified:
+            return
+
+        # Write to a temporary file first so that a concurrent reader or an interrupted write never
+        # observes a partially written cache.
+        tmp_filename = "{}.{}.tmp".format(self.filename, os.getpid())
+        with open(tmp_filename, "w") as fp:
+            json.dump({"version": _VERSION, "files": self._entries}, fp)
+        os.replace(tmp_filename, self.filename)
+        self._modified = False
@@ -2,6 +2,8 @@
 
 import datetime
 import os
+import shutil
+import tempfile
 import unittest
 
 import buildscripts.ciconfig.evergreen as _evergreen
@@ -61,6 +63,125 @@ class TestEvergreenProjectConfig(unittest.TestCase):
         self.assertIn("amazon", self.conf.distro_names)
 
 
+    def test_get_task_names_by_suite(self):
+        self.assertEqual(["resmoke_task"], self.conf.get_task_names_by_suite("somesuite"))
+        self.assertEqual([], self.conf.get_task_names_by_suite("not_a_suite"))
+
+
+def _make_project_config(variant_tasks, display_tasks=None):
+    variant = {"name": "variant", "run_on": ["distro"], "tasks": variant_tasks}
+    if display_tasks is not None:
+        variant["display_tasks"] = display_tasks
+    return {
+        "tasks": [
+            {"name": "compile"},
+            {"name": "jsCore", "tags": ["jscore", "common"]},
+            {"name": "jsCore_compat", "tags": ["jscore", "compat"]},
+            {"name": "aggregation", "tags": ["aggregation", "common"]},
+            {
+                "name": "sharding_gen", "tags": ["sharding"],
+                "commands": [{"func": "generate resmoke tasks", "vars": {"resmoke_args": ""}}]
+            },
+        ],
+        "task_groups": [{"name": "tg_1", "tasks": ["compile"]}],
+        "buildvariants": [variant],
+    }  # yapf: disable
+
+
+class TestEvaluateProjectConfig(unittest.TestCase):
+    def _evaluate(self, variant_tasks, display_tasks=None):
+        config = _evergreen.evaluate_project_config(
+            _make_project_config(variant_tasks, display_tasks))
+        return _evergreen.EvergreenProjectConfig(config)
+
+    def test_tag_selectors(self):
+        conf = self._evaluate([{"name": ".jscore"}, {"name": ".common !.jscore"}])
+        self.assertEqual(["jsCore", "jsCore_compat", "aggregation"],
+                         conf.get_variant("variant").task_names)
+
+    def test_negated_selectors_and_names(self):
+        conf = self._evaluate([{"name": "!.jscore !compile"}])
+        self.assertEqual(["aggregation", "sharding_gen"], conf.get_variant("variant").task_names)
+
+        conf = self._evaluate([{"name": "* !.common"}])
+        self.assertEqual(["compile", "jsCore_compat", "sharding_gen"],
+                         conf.get_variant("variant").task_names)
+
+    def test_selected_tasks_keep_their_settings(self):
+        conf = self._evaluate([{"name": "jsCore", "distros": ["large"]},
+                               {"name": ".jscore", "distros": ["small"]}])
+        variant = conf.get_variant("variant")
+        self.assertEqual(["jsCore", "jsCore_compat"], variant.task_names)
+        self.assertEqual(["large"], variant.get_task("jsCore").run_on)
+        self.assertEqual(["small"], variant.get_task("jsCore_compat").run_on)
+
+    def test_task_groups_are_kept(self):
+        conf = self._evaluate([{"name": "tg_1"}, {"name": ".sharding"}])
+        self.assertEqual(["compile", "sharding_gen"], conf.get_variant("variant").task_names)
+
+    def test_display_task_selectors(self):
+        conf = self._evaluate([{"name": ".jscore"}], [{
+            "name": "display", "execution_tasks": ["jsCore", ".jscore"]
+        }])
+        self.assertEqual(["jsCore", "jsCore_compat"],
+                         conf.get_variant("variant").raw["display_tasks"][0]["execution_tasks"])
+
+    def test_matrix_is_not_supported(self):
+        config = _make_project_config([{"name": "compile"}])
+        config["axes"] = [{"id": "os", "values": [{"id": "linux"}]}]
+        with self.assertRaises(RuntimeError):
+            _evergreen.evaluate_project_config(config)
+
+    def test_indexes(self):
+        conf = self._evaluate([{"name": "*"}])
+        self.assertEqual(["jsCore", "aggregation"], conf.get_task_names_by_tag("common"))
+        self.assertEqual([], conf.get_task_names_by_tag("not_a_tag"))
+        self.assertEqual("sharding_gen", conf.get_task_by_generated_name("sharding").name)
+        self.assertIsNone(conf.get_task_by_generated_name("jsCore"))
+        self.assertEqual(["sharding_gen"], conf.get_task_names_by_suite("sharding"))
+
+
+class TestParseEvergreenFileCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.cache_dir = os.path.join(self.tmpdir, "cache")
+        self.config_file = os.path.join(self.tmpdir, "evergreen.yml")
+        shutil.copy(TEST_FILE_PATH, self.config_file)
+
+    def _parse(self):
+        return _evergreen.parse_evergreen_file(self.config_file, cache_dir=self.cache_dir)
+
+    def test_cached_config_is_used(self):
+        conf = self._parse()
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+        cached_conf = self._parse()
+        self.assertEqual(conf.raw, cached_conf.raw)
+        self.assertEqual(conf.indexes, cached_conf.indexes)
+        self.assertEqual(conf.variant_names, cached_conf.variant_names)
+        self.assertEqual(["resmoke_task"], cached_conf.get_task_names_by_suite("somesuite"))
+
+    def test_changed_file_is_evaluated_again(self):
+        self._parse()
+        with open(self.config_file, "a") as fstream:
+            fstream.write("\n# Changed.\n")
+        self._parse()
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+
+    def test_invalid_cache_entry_is_ignored(self):
+        self._parse()
+        for filename in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, filename), "w") as fstream:
+                fstream.write("{")
+        self.assertIn("ubuntu", self._parse().variant_names)
+
+    def test_failed_cache_write_leaves_no_files(self):
+        cache_file = os.path.join(self.cache_dir, "entry.json")
+        _evergreen._write_cache_file(cache_file, {"config": object()})
+        self.assertEqual([], os.listdir(self.cache_dir))
+
+
 class TestTask(unittest.TestCase):  # pylint: disable=too-many-public-methods
     """Unit tests for the Task class."""
 
@@ -0,0 +1,173 @@
+"""Unittests for buildscripts.patch_builds.change_impact.py"""
+import unittest
+
+import buildscripts.patch_builds.change_impact as under_test
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def _node(node_id, node_type, **properties):
+    properties["type"] = node_type
+    return {"id": node_id, "node": properties}
+
+
+def _edge(edge_type, from_node, to_nodes):
+    return {
+        "type": edge_type,
+        "from_node": {"id": from_node},
+        "to_node": [{"id": to_node} for to_node in to_nodes],
+    }
+
+
+# base.o is in libbase.a, which libdb.a (db.o) links against. util.o is linked directly into
+# db_test, and uses the symbols of db.o. net.o is in libnet.a, which only mongos links against.
+GRAPH_DATA = {
+    "nodes": [
+        _node("build/opt/mongo/base/base.o", under_test.NODE_FILE, _lib="build/opt/libbase.a"),
+        _node("build/opt/mongo/db/db.o", under_test.NODE_FILE, _lib="build/opt/libdb.a"),
+        _node("build/opt/mongo/db/util.o", under_test.NODE_FILE, _lib=None),
+        _node("build/opt/mongo/db/db_options_gen.o", under_test.NODE_FILE,
+              _lib="build/opt/libdb.a"),
+        _node("build/opt/mongo/net/net.o", under_test.NODE_FILE, _lib="build/opt/libnet.a"),
+        _node("build/opt/libbase.a", under_test.NODE_LIB),
+        _node("build/opt/libdb.a", under_test.NODE_LIB),
+        _node("build/opt/libnet.a", under_test.NODE_LIB),
+        _node("build/opt/mongo/base/base_test", under_test.NODE_EXE, contained_files=[]),
+        _node("build/opt/mongo/db/db_test", under_test.NODE_EXE,
+              contained_files=["build/opt/mongo/db/util.o"]),
+        _node("build/opt/mongo/s/mongos", under_test.NODE_EXE, contained_files=[]),
+    ],
+    "edges": [
+        _edge(under_test.LIB_LIB, "build/opt/libdb.a", ["build/opt/libbase.a"]),
+        _edge(under_test.FIL_FIL, "build/opt/mongo/db/util.o", ["build/opt/mongo/db/db.o"]),
+        _edge(under_test.EXE_LIB, "build/opt/mongo/base/base_test", ["build/opt/libbase.a"]),
+        _edge(under_test.EXE_LIB, "build/opt/mongo/s/mongos",
+              ["build/opt/libbase.a", "build/opt/libnet.a"]),
+    ],
+}
+
+TRACEFILE = """TN:core
+SF:/data/mci/src/src/mongo/db/db.cpp
+DA:1,0
+DA:2,3
+end_of_record
+SF:/data/mci/src/src/mongo/db/db.h
+DA:1,0
+end_of_record
+TN:sharding
+SF:/data/mci/src/src/mongo/net/net.cpp
+DA:1,5
+end_of_record
+TN:db_test
+SF:/data/mci/src/src/mongo/db/db.h
+DA:4,1
+end_of_record
+"""
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = under_test.DependencyGraph(GRAPH_DATA)
+
+    def test_library_dependents_are_impacted(self):
+        binaries = self.graph.find_impacted_binaries(["src/mongo/base/base.cpp"])
+        self.assertEqual(binaries, {"base_test", "mongos"})
+
+    def test_symbol_dependents_are_impacted(self):
+        binaries = self.graph.find_impacted_binaries(["src/mongo/db/db.cpp"])
+        self.assertEqual(binaries, {"db_test"})
+
+    def test_headers_have_no_objects(self):
+        self.assertEqual(self.graph.find_objects("src/mongo/net/net.h"), set())
+        self.assertEqual(self.graph.find_impacted_binaries(["src/mongo/net/net.h"]), set())
+
+    def test_idl_impacts_its_generated_source(self):
+        self.assertEqual(
+            self.graph.find_objects("src/mongo/db/db_options.idl"),
+            {"build/opt/mongo/db/db_options_gen.o"})
+
+    def test_unknown_file(self):
+        self.assertEqual(self.graph.find_objects("src/mongo/db/new.cpp"), set())
+        self.assertEqual(self.graph.find_impacted_binaries(["src/mongo/db/new.cpp"]), set())
+
+
+class TestCoverageMap(unittest.TestCase):
+    def setUp(self):
+        self.coverage_map = under_test.CoverageMap()
+        self.coverage_map.add_tracefile(TRACEFILE.splitlines(), "default")
+
+    def test_executed_files(self):
+        self.assertEqual(self.coverage_map.get_tests("src/mongo/db/db.cpp"), {"core"})
+        self.assertEqual(self.coverage_map.get_tests("src/mongo/db/db.h"), {"db_test"})
+
+    def test_instrumented_files_that_were_not_executed(self):
+        self.coverage_map.add_tracefile(["SF:src/mongo/db/unused.cpp", "DA:1,0", "end_of_record"],
+                                        "core")
+        self.assertEqual(self.coverage_map.get_tests("src/mongo/db/unused.cpp"), set())
+
+    def test_unknown_file(self):
+        self.assertIsNone(self.coverage_map.get_tests("src/mongo/db/new.cpp"))
+
+    def test_default_test_name(self):
+        self.coverage_map.add_tracefile(["SF:src/mongo/db/other.cpp", "DA:1,1", "end_of_record"],
+                                        "coverage")
+        self.assertEqual(self.coverage_map.get_tests("src/mongo/db/other.cpp"), {"coverage"})
+
+
+class TestFindImpactedTests(unittest.TestCase):
+    def setUp(self):
+        self.graph = under_test.DependencyGraph(GRAPH_DATA)
+        self.coverage_map = under_test.CoverageMap()
+        self.coverage_map.add_tracefile(TRACEFILE.splitlines(), "default")
+        self.binaries_by_suite = {
+            "unittests": ["build/install/bin/base_test", "build/install/bin/db_test"],
+        }
+        self.other_suites = ["core", "sharding"]
+
+    def _find_impacted_tests(self, changed_files, dependency_graph=None, coverage_map=None):
+        return under_test.find_impacted_tests(changed_files, self.binaries_by_suite,
+                                              self.other_suites, dependency_graph, coverage_map)
+
+    def test_non_cpp_files_impact_nothing(self):
+        impacted = self._find_impacted_tests(["jstests/core/a.js", "SConstruct"], self.graph,
+                                             self.coverage_map)
+        self.assertEqual(impacted, {})
+
+    def test_graph_and_coverage_are_combined(self):
+        impacted = self._find_impacted_tests(["src/mongo/db/db.h"], self.graph, self.coverage_map)
+        self.assertEqual(impacted, {"unittests": ["build/install/bin/db_test"]})
+
+        impacted = self._find_impacted_tests(["src/mongo/db/db.cpp", "src/mongo/net/net.cpp"],
+                                             self.graph, self.coverage_map)
+        self.assertEqual(impacted, {
+            "unittests": ["build/install/bin/db_test"],
+            "core": None,
+            "sharding": None,
+        })
+
+    def test_without_coverage_all_other_suites_are_impacted(self):
+        impacted = self._find_impacted_tests(["src/mongo/base/base.cpp"], self.graph)
+        self.assertEqual(impacted, {
+            "unittests": ["build/install/bin/base_test"],
+            "core": None,
+            "sharding": None,
+        })
+
+    def test_unknown_files_impact_everything(self):
+        impacted = self._find_impacted_tests(["src/mongo/db/new.cpp"], self.graph,
+                                             self.coverage_map)
+        self.assertEqual(
+            impacted, {
+                "unittests": ["build/install/bin/base_test", "build/install/bin/db_test"],
+                "core": None,
+                "sharding": None,
+            })
+
+    def test_headers_without_coverage_impact_everything(self):
+        impacted = self._find_impacted_tests(["src/mongo/net/net.h"], self.graph, self.coverage_map)
+        self.assertEqual(
+            impacted, {
+                "unittests": ["build/install/bin/base_test", "build/install/bin/db_test"],
+                "core": None,
+                "sharding": None,
+            })
@@ -0,0 +1,79 @@
+"""Unit tests for the buildscripts.resmokelib.core.dbpaths module."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.core import dbpaths
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestDbpaths(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.dbpath = os.path.join(self.temp_dir, "job0", "resmoke")
+        self.trash_dir = os.path.join(self.temp_dir, "job0" + dbpaths._TRASH_SUFFIX)
+
+        patcher = mock.patch.object(dbpaths.config, "DBPATH_PREFIX", self.temp_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make_files(self, path, sizes):
+        os.makedirs(path)
+        for (i, size) in enumerate(sizes):
+            with open(os.path.join(path, "file%d" % i), "wb") as fp:
+                fp.write(b"x" * size)
+
+    def test_clear(self):
+        self._make_files(self.dbpath, [10, 10])
+        dbpaths.clear(self.dbpath)
+        self.assertFalse(os.path.exists(self.dbpath))
+
+        dbpaths.wait_for_removals()
+        self.assertEqual(os.listdir(os.path.dirname(self.dbpath)), [])
+        self.assertEqual(os.listdir(self.trash_dir), [])
+
+        # Clearing a directory that doesn't exist is a no-op.
+        dbpaths.clear(self.dbpath)
+
+    def test_clear_moves_out_of_job_dir(self):
+        self._make_files(self.dbpath, [10])
+        with mock.patch.object(dbpaths, "_queue_removal") as queue_removal:
+            dbpaths.clear(self.dbpath)
+
+        # Archiving the data files of the job doesn't include the directory being deleted.
+        self.assertEqual(os.listdir(os.path.join(self.temp_dir, "job0")), [])
+        (removal_path, ) = queue_removal.call_args[0]
+        self.assertEqual(os.path.dirname(removal_path), self.trash_dir)
+
+    def test_clear_removes_leftovers(self):
+        leftover = os.path.join(self.trash_dir, "1.0.resmoke")
+        self._make_files(leftover, [10])
+        self._make_files(self.dbpath, [10])
+
+        dbpaths.clear(self.dbpath)
+        dbpaths.wait_for_removals()
+        self.assertEqual(os.listdir(self.trash_dir), [])
+
+    def test_clear_falls_back_to_rmtree(self):
+        self._make_files(self.dbpath, [10])
+        with mock.patch.object(dbpaths.os, "rename", side_effect=OSError("busy")):
+            dbpaths.clear(self.dbpath)
+        self.assertFalse(os.path.exists(self.dbpath))
+
+    def test_get_usage_mb(self):
+        self._make_files(self.dbpath, [1024 * 1024, 1024 * 1024])
+        # The directories being deleted use disk space until they are.
+        self._make_files(os.path.join(self.trash_dir, "1.0.resmoke"), [1024 * 1024])
+        usage_mb = dbpaths.get_usage_mb(os.path.dirname(self.dbpath))
+        self.assertGreaterEqual(usage_mb, 3)
+        self.assertLess(usage_mb, 4)
+
+    def test_get_job_dbpath_prefix(self):
+        self.assertEqual(dbpaths.get_job_dbpath_prefix(3), os.path.join(self.temp_dir, "job3"))
+
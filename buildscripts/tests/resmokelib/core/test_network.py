@@ -0,0 +1,95 @@
+"""Unit tests for buildscripts/resmokelib/core/network.py."""
+
+import socket
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import config
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.core import network
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestIsPortFree(unittest.TestCase):
+    def test_port_in_use(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind(("127.0.0.1", 0))
+            sock.listen(1)
+            self.assertFalse(network._is_port_free(sock.getsockname()[1]))
+        finally:
+            sock.close()
+
+
+class TestLeasePorts(unittest.TestCase):
+    BASE_PORT = 20000
+    MAX_PORT = 20600
+
+    def setUp(self):
+        self.busy_ports = set()
+
+        patchers = [
+            mock.patch.object(config, "LEASE_PORTS", True),
+            mock.patch.object(config, "BASE_PORT", self.BASE_PORT),
+            mock.patch.object(network.PortAllocator, "MAX_PORT", self.MAX_PORT),
+            mock.patch.object(network.PortAllocator, "_LEASED_PORTS", {}),
+            mock.patch.object(network.PortAllocator, "_TEST_PORT_RANGES", {}),
+            mock.patch.object(network, "_is_port_free", lambda port: port not in self.busy_ports),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_fixture_ports_skip_busy_and_leased_ports(self):
+        self.busy_ports.add(self.BASE_PORT)
+        self.assertEqual(network.PortAllocator.next_fixture_port(0), self.BASE_PORT + 1)
+        self.assertEqual(network.PortAllocator.next_fixture_port(1), self.BASE_PORT + 2)
+        self.assertEqual(network.PortAllocator.next_fixture_port(0), self.BASE_PORT + 3)
+
+    def test_fixture_ports_are_not_limited_per_fixture(self):
+        num_ports = network.PortAllocator._PORTS_PER_FIXTURE + 1
+        ports = [network.PortAllocator.next_fixture_port(0) for _ in range(num_ports)]
+        self.assertEqual(ports, list(range(self.BASE_PORT, self.BASE_PORT + num_ports)))
+
+    def test_test_ports_are_leased_from_the_top(self):
+        allocator = network.PortAllocator
+        num_test_ports = allocator._PORTS_PER_JOB - allocator._PORTS_PER_FIXTURE
+        self.busy_ports.add(self.MAX_PORT - 10)
+
+        self.assertEqual(allocator.max_test_port(0), self.MAX_PORT - 11)
+        self.assertEqual(allocator.min_test_port(0), self.MAX_PORT - 10 - num_test_ports)
+        self.assertEqual(allocator.max_test_port(1), self.MAX_PORT - 11 - num_test_ports)
+
+    def test_test_ports_skip_past_lowest_port_in_use(self):
+        allocator = network.PortAllocator
+        num_test_ports = allocator._PORTS_PER_JOB - allocator._PORTS_PER_FIXTURE
+        self.busy_ports.update([self.MAX_PORT - 20, self.MAX_PORT - 10])
+        probed_ports = []
+
+        def is_port_free(port):
+            probed_ports.append(port)
+            return port not in self.busy_ports
+
+        with mock.patch.object(network, "_is_port_free", is_port_free):
+            self.assertEqual(allocator.max_test_port(0), self.MAX_PORT - 21)
+        self.assertEqual(allocator.min_test_port(0), self.MAX_PORT - 20 - num_test_ports)
+        # The scan of the first range stops at the first port in use.
+        self.assertEqual(probed_ports.count(self.MAX_PORT - 10), 0)
+
+    def test_released_ports_are_leased_again(self):
+        port = network.PortAllocator.next_fixture_port(0)
+        max_port = network.PortAllocator.max_test_port(0)
+        network.PortAllocator.next_fixture_port(1)
+
+        network.PortAllocator.release_ports(0)
+        self.assertEqual(network.PortAllocator.next_fixture_port(2), port)
+        self.assertEqual(network.PortAllocator.max_test_port(2), max_port)
+
+    def test_exhausted_ports(self):
+        self.busy_ports.update(range(self.BASE_PORT, self.MAX_PORT + 1))
+        with self.assertRaises(errors.PortAllocationError):
+            network.PortAllocator.next_fixture_port(0)
+        with self.assertRaises(errors.PortAllocationError):
+            network.PortAllocator.min_test_port(0)
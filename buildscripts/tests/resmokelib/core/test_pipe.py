@@ -4,11 +4,15 @@ from __future__ import absolute_import
 
 import io
 import logging
+import os
+import sys
+import threading
 import unittest
 
 import mock
 
 from buildscripts.resmokelib.core import pipe as _pipe
+from buildscripts.resmokelib.logging import loggers
 
 # pylint: disable=missing-docstring
 
@@ -43,3 +47,176 @@ class TestLoggerPipe(unittest.TestCase):
     def test_escapes_null_bytes(self):
         calls = self._get_log_calls(b"a\0b")
         self.assertEqual(calls, [mock.call(self.LOG_LEVEL, u"a\\0b")])
+
+
+class TestLoggerPipeOutputEvents(unittest.TestCase):
+    @staticmethod
+    def _read_with_events(output, output_events):
+        logger = logging.Logger("for_testing")
+        logger.log = mock.MagicMock()
+
+        logger_pipe = _pipe.LoggerPipe(logger=logger, level=logging.INFO,
+                                       pipe_out=io.BytesIO(output), output_events=output_events)
+        logger_pipe.wait_until_started()
+        logger_pipe.wait_until_finished()
+
+    def test_sets_event_on_matching_line(self):
+        listening = threading.Event()
+        texts = ("waiting for connections", "Waiting for connections")
+        self._read_with_events(b"starting\nWaiting for connections on port 20000\n",
+                               [(texts, listening)])
+        self.assertTrue(listening.is_set())
+
+    def test_does_not_set_event_without_matching_line(self):
+        listening = threading.Event()
+        other = threading.Event()
+        self._read_with_events(b"starting\nshutting down\n", [(("waiting", ), listening),
+                                                                (("shutting", ), other)])
+        self.assertFalse(listening.is_set())
+        self.assertTrue(other.is_set())
+
+
+class _ChunkedPipe(io.BytesIO):
+    """Pipe that returns one of 'chunks' from each call to read1()."""
+
+    def __init__(self, chunks, before_read=None):
+        io.BytesIO.__init__(self)
+        self._chunks = list(chunks)
+        self._before_read = before_read if before_read is not None else lambda num_read: None
+        self._num_read = 0
+
+    def read1(self, size=-1):
+        self._before_read(self._num_read)
+        self._num_read += 1
+        return self._chunks.pop(0) if self._chunks else b""
+
+
+class TestLoggerPipeBatching(unittest.TestCase):
+    @staticmethod
+    def _read(pipe_out, **kwargs):
+        logger = logging.Logger("for_testing")
+        logger.log = mock.MagicMock()
+        logger.warning = mock.MagicMock()
+
+        logger_pipe = _pipe.LoggerPipe(logger=logger, level=logging.INFO, pipe_out=pipe_out,
+                                       **kwargs)
+        logger_pipe.wait_until_started()
+        logger_pipe.wait_until_finished()
+
+        return (logger, logger_pipe.get_counters())
+
+    def test_lines_split_across_chunks(self):
+        (logger, counters) = self._read(_ChunkedPipe([b"ab", b"c\nd", b"e\n\nf"]))
+        self.assertEqual(logger.log.call_args_list, [
+            mock.call(logging.INFO, u"abc"),
+            mock.call(logging.INFO, u"de"),
+            mock.call(logging.INFO, u""),
+            mock.call(logging.INFO, u"f"),
+        ])
+        self.assertEqual(counters, _pipe.PipeCounters(bytes_read=9, lines_logged=4,
+                                                      bytes_dropped=0))
+
+    def test_drops_output_when_buffer_full(self):
+        logging_started = threading.Event()
+        reading_finished = threading.Event()
+
+        def block_logging(level, line):  # pylint: disable=unused-argument
+            logging_started.set()
+            reading_finished.wait()
+
+        def before_read(num_read):
+            # Only read the second chunk once the first one is being logged, and don't let anything
+            # else be logged until all of the chunks have been read.
+            if num_read == 1:
+                logging_started.wait()
+            elif num_read == 4:
+                reading_finished.set()
+
+        logger = logging.Logger("for_testing")
+        logger.log = mock.MagicMock(side_effect=block_logging)
+        logger.warning = mock.MagicMock()
+        logger_pipe = _pipe.LoggerPipe(
+            logger=logger, level=logging.INFO,
+            pipe_out=_ChunkedPipe([b"a\n", b"b\n", b"c\n", b"d\n"], before_read=before_read),
+            buffer_size=2, drop_on_overflow=True)
+        logger_pipe.wait_until_started()
+        logger_pipe.wait_until_finished()
+
+        self.assertEqual(logger.log.call_args_list, [
+            mock.call(logging.INFO, u"a"),
+            mock.call(logging.INFO, u"b"),
+        ])
+        self.assertEqual(logger.warning.call_count, 1)
+        self.assertEqual(logger_pipe.get_counters(),
+                         _pipe.PipeCounters(bytes_read=8, lines_logged=2, bytes_dropped=4))
+
+    def test_chunk_logged_as_one_batch(self):
+        stream = mock.Mock()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
+        logger = loggers.BaseLogger("for_testing")
+        logger.propagate = False
+        logger.addHandler(handler)
+
+        logger_pipe = _pipe.LoggerPipe(logger=logger, level=logging.INFO,
+                                       pipe_out=_ChunkedPipe([b"a\nb\nc\n"]))
+        logger_pipe.wait_until_started()
+        logger_pipe.wait_until_finished()
+
+        stream.write.assert_called_once_with("[for_testing] a\n[for_testing] b\n[for_testing] c\n")
+
+    def test_logs_from_shared_workers(self):
+        thread_names = set()
+
+        def record_thread(level, line):  # pylint: disable=unused-argument
+            thread_names.add(threading.current_thread().name)
+
+        for _ in range(2):
+            logger = logging.Logger("for_testing")
+            logger.log = mock.MagicMock(side_effect=record_thread)
+            logger_pipe = _pipe.LoggerPipe(logger=logger, level=logging.INFO,
+                                           pipe_out=_ChunkedPipe([b"a\n", b"b\n"]))
+            logger_pipe.wait_until_started()
+            logger_pipe.wait_until_finished()
+            self.assertEqual(logger.log.call_count, 2)
+
+        self.assertTrue(thread_names)
+        for name in thread_names:
+            self.assertTrue(name.startswith("LoggerPipeWorker"), name)
+
+
+@unittest.skipIf(sys.platform == "win32", "Pipes can't be read asynchronously on Windows")
+class TestAsyncLoggerPipe(unittest.TestCase):
+    @staticmethod
+    def _read(output, output_events=None):
+        logger = logging.Logger("for_testing")
+        logger.log = mock.MagicMock()
+
+        (read_fd, write_fd) = os.pipe()
+        with os.fdopen(write_fd, "wb") as pipe_in:
+            pipe_in.write(output)
+
+        logger_pipe = _pipe.AsyncLoggerPipe(logger=logger, level=logging.INFO,
+                                            pipe_out=os.fdopen(read_fd, "rb"),
+                                            output_events=output_events)
+        logger_pipe.wait_until_started()
+        logger_pipe.wait_until_finished()
+
+        return (logger.log.call_args_list, logger_pipe.get_counters())
+
+    def test_logs_each_line(self):
+        (calls, counters) = self._read(b"a\r\nb\0\n\nc\x80")
+        self.assertEqual(calls, [
+            mock.call(logging.INFO, u"a"),
+            mock.call(logging.INFO, u"b\\0"),
+            mock.call(logging.INFO, u""),
+            mock.call(logging.INFO, u"c\ufffd"),
+        ])
+        self.assertEqual(counters, _pipe.PipeCounters(bytes_read=9, lines_logged=4,
+                                                      bytes_dropped=0))
+
+    def test_sets_event_on_matching_line(self):
+        listening = threading.Event()
+        self._read(b"starting\nwaiting for connections on port 20000\n",
+                   [(("waiting for connections", ), listening)])
+        self.assertTrue(listening.is_set())
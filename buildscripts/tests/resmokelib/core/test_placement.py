@@ -0,0 +1,105 @@
+"""Unit tests for the buildscripts.resmokelib.core.placement module."""
+
+import os
+import threading
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.core import placement
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestSplitCpus(unittest.TestCase):
+    def test_parse_cpu_list(self):
+        self.assertEqual(placement._parse_cpu_list("0-3,8,10-11\n"), {0, 1, 2, 3, 8, 10, 11})
+
+    def test_whole_nodes(self):
+        nodes = [[0, 1], [2, 3], [4, 5]]
+        self.assertEqual(placement.split_cpus(nodes, 1), [[0, 1, 2, 3, 4, 5]])
+        self.assertEqual(placement.split_cpus(nodes, 2), [[0, 1], [2, 3, 4, 5]])
+
+    def test_jobs_stay_within_nodes(self):
+        nodes = [list(range(0, 8)), list(range(8, 16))]
+        self.assertEqual(
+            placement.split_cpus(nodes, 3),
+            [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11, 12, 13, 14, 15]])
+        self.assertEqual(
+            placement.split_cpus(nodes, 4),
+            [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11], [12, 13, 14, 15]])
+
+    def test_uneven_nodes(self):
+        nodes = [[0], [1], list(range(2, 16))]
+        job_cpus = placement.split_cpus(nodes, 4)
+        self.assertEqual(len(job_cpus), 4)
+        self.assertEqual(job_cpus[:2], [[0], [1]])
+
+    def test_more_jobs_than_cpus(self):
+        self.assertEqual(placement.split_cpus([[0, 1]], 3), [[0], [1], [0]])
+
+
+@unittest.skipUnless(hasattr(os, "sched_setaffinity"), "Requires sched_setaffinity()")
+class TestPinChildren(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(placement._JOB_CPUS.clear)
+
+    def test_assign(self):
+        with mock.patch.object(placement.config, "PIN_JOBS", False):
+            placement.assign(2, mock.Mock())
+        self.assertIsNone(placement.get_cpus(0))
+
+        with mock.patch.object(placement.config, "PIN_JOBS", True):
+            placement.assign(2, mock.Mock())
+        self.assertEqual(len(placement._JOB_CPUS), 2)
+
+    def test_restores_affinity(self):
+        original_cpus = os.sched_getaffinity(0)
+        cpu = min(original_cpus)
+        placement._JOB_CPUS[0] = [cpu]
+
+        pinned = threading.Event()
+        other_thread_cpus = []
+
+        def record_affinity():
+            pinned.wait()
+            other_thread_cpus.append(os.sched_getaffinity(0))
+
+        other_thread = threading.Thread(target=record_affinity)
+        other_thread.start()
+        with placement.pin_children(0):
+            self.assertEqual(os.sched_getaffinity(0), {cpu})
+            pinned.set()
+            other_thread.join()
+
+        self.assertEqual(os.sched_getaffinity(0), original_cpus)
+        # The affinity is only set for the calling thread.
+        self.assertEqual(other_thread_cpus, [original_cpus])
+
+    def test_pin_processes(self):
+        original_cpus = os.sched_getaffinity(0)
+        cpu = min(original_cpus)
+        self.addCleanup(os.sched_setaffinity, 0, original_cpus)
+
+        started = threading.Event()
+        stop = threading.Event()
+        other_thread_cpus = []
+
+        def record_affinity():
+            started.set()
+            stop.wait()
+            other_thread_cpus.append(os.sched_getaffinity(0))
+
+        other_thread = threading.Thread(target=record_affinity)
+        other_thread.start()
+        started.wait()
+
+        placement._JOB_CPUS[0] = [cpu]
+        placement.pin_processes([os.getpid()], 0)
+        stop.set()
+        other_thread.join()
+        self.assertEqual(other_thread_cpus, [{cpu}])
+
+        placement._JOB_CPUS[0] = sorted(original_cpus)
+        placement.pin_processes([os.getpid()], 0)
+        self.assertEqual(os.sched_getaffinity(0), original_cpus)
@@ -0,0 +1,170 @@
+"""Unit tests for the buildscripts.resmokelib.core.resourcemonitor module."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.core import resourcemonitor
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class _FakeProcess(object):
+    def __init__(self, pid, logger_name, job_num=None):
+        self.pid = pid
+        self.args = ["/data/bin/mongod", "--port=20000"]
+        self.logger = mock.Mock(spec=["name"])
+        self.logger.name = logger_name
+        self.job_num = job_num
+
+
+class TestResourceMonitor(unittest.TestCase):
+    def setUp(self):
+        self.usages = {}
+        self.monitor = resourcemonitor.ResourceMonitor(1.0, read_usage=self.read_usage)
+
+    def read_usage(self, pid):
+        if pid not in self.usages:
+            raise IOError("No such process")
+        return self.usages[pid]
+
+    def set_usage(self, pid, cpu_ms, rss_kb, read_kb=0, write_kb=0):
+        self.usages[pid] = {
+            "cpu_ms": cpu_ms, "rss_kb": rss_kb, "hwm_kb": rss_kb, "read_kb": read_kb,
+            "write_kb": write_kb
+        }
+
+    def test_attributes_usage_to_tests(self):
+        mongod = _FakeProcess(100, "ReplicaSetFixture:job0:primary")
+        self.monitor.register(mongod, 0)
+
+        self.set_usage(100, cpu_ms=500, rss_kb=1000)
+        self.monitor.sample()
+
+        self.monitor.set_test(0, "test1")
+        self.set_usage(100, cpu_ms=800, rss_kb=3000, write_kb=50)
+        self.monitor.sample()
+
+        self.monitor.set_test(0, "test2")
+        self.set_usage(100, cpu_ms=900, rss_kb=2000, write_kb=60)
+        self.monitor.sample()
+
+        report = self.monitor.to_dict()
+        self.assertEqual(report["tests"], ["test1", "test2"])
+        self.assertEqual(report["samples"]["test"], [-1, 0, 1])
+        self.assertEqual(report["samples"]["rss_kb"], [1000, 3000, 2000])
+        self.assertEqual(report["processes"][0]["name"], "ReplicaSetFixture:job0:primary")
+        self.assertEqual(report["processes"][0]["program"], "mongod")
+
+        # The usage since the previous sample is charged to the test running when it is taken.
+        self.assertEqual(report["totals"]["test1"],
+                         {"cpu_ms": 300, "max_rss_kb": 3000, "read_kb": 0, "write_kb": 50})
+        self.assertEqual(report["totals"]["test2"],
+                         {"cpu_ms": 100, "max_rss_kb": 2000, "read_kb": 0, "write_kb": 10})
+
+    def test_skips_exited_processes(self):
+        shell = _FakeProcess(200, "js_test:test1")
+        self.monitor.register(shell, 0)
+        self.monitor.sample()
+
+        self.set_usage(200, cpu_ms=10, rss_kb=10)
+        self.monitor.unregister(shell)
+        self.monitor.sample()
+
+        report = self.monitor.to_dict()
+        self.assertEqual(report["samples"]["process"], [])
+        self.assertIn("end_ms", report["processes"][0])
+
+    def test_charges_first_sample_to_test(self):
+        shell = _FakeProcess(200, "js_test:test1")
+        self.monitor.register(shell, 0)
+        self.monitor.set_test(0, "test1")
+
+        # A process that exits within one interval is only sampled once.
+        self.set_usage(200, cpu_ms=40, rss_kb=100, read_kb=5, write_kb=7)
+        self.monitor.sample_process(shell)
+        self.monitor.unregister(shell)
+
+        self.assertEqual(self.monitor.to_dict()["totals"]["test1"],
+                         {"cpu_ms": 40, "max_rss_kb": 100, "read_kb": 5, "write_kb": 7})
+
+    def test_spills_samples_in_chunks(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        spill_filename = os.path.join(temp_dir, "resources.json.partial")
+        monitor = resourcemonitor.ResourceMonitor(1.0, read_usage=self.read_usage,
+                                                  spill_filename=spill_filename)
+        monitor.register(_FakeProcess(100, "MongoDFixture:job0"), 0)
+
+        with mock.patch.object(resourcemonitor, "_SAMPLES_PER_CHUNK", 2):
+            for cpu_ms in range(5):
+                self.set_usage(100, cpu_ms=cpu_ms, rss_kb=10)
+                monitor.sample()
+
+        self.assertEqual(len(monitor._columns["time_ms"]), 1)
+        with open(spill_filename) as fp:
+            self.assertEqual(len(fp.readlines()), 2)
+        report = monitor.to_dict()
+        self.assertEqual(report["samples"]["cpu_ms"], [0, 1, 2, 3, 4])
+
+        filename = os.path.join(temp_dir, "resources.json")
+        monitor.write(filename)
+        with open(filename) as fp:
+            self.assertEqual(json.load(fp), report)
+        self.assertFalse(os.path.exists(spill_filename))
+
+
+class TestModule(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+        patcher = mock.patch.multiple(resourcemonitor.config, RESOURCE_SAMPLE_INTERVAL_MS=60000,
+                                      REPORT_FILE=os.path.join(self.temp_dir, "report.json"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, resourcemonitor, "_MONITOR", None)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "Requires /proc")
+    def test_read_proc_usage(self):
+        usage = resourcemonitor.read_proc_usage(os.getpid())
+        self.assertGreater(usage["rss_kb"], 0)
+        self.assertGreaterEqual(usage["hwm_kb"], usage["rss_kb"])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "Requires /proc")
+    def test_writes_next_to_report_file(self):
+        resourcemonitor.start()
+        resourcemonitor.process_started(_FakeProcess(os.getpid(), "js_test:test1", 3))
+        resourcemonitor.process_started(_FakeProcess(os.getpid(), "MongoDFixture:job1", 1))
+        resourcemonitor.set_test(3, "test1")
+        resourcemonitor._MONITOR.sample()
+        resourcemonitor.write()
+
+        with open(os.path.join(self.temp_dir, "report.resources.json")) as fp:
+            report = json.load(fp)
+        self.assertEqual([info["job"] for info in report["processes"]], [3, 1])
+        self.assertEqual(report["samples"]["test"], [0, -1])
+        self.assertEqual(len(report["samples"]["time_ms"]), 2)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "Requires /proc")
+    def test_samples_exited_process_before_it_is_reaped(self):
+        resourcemonitor.start()
+        child = subprocess.Popen([sys.executable, "-c", "pass"])
+        shell = _FakeProcess(child.pid, "js_test:test1", 0)
+        resourcemonitor.process_started(shell)
+        resourcemonitor.set_test(0, "test1")
+
+        resourcemonitor.process_exiting(shell)
+        self.assertEqual(child.wait(), 0)
+        resourcemonitor.process_exited(shell)
+
+        report = resourcemonitor._MONITOR.to_dict()
+        self.assertEqual(report["samples"]["process"], [0])
+        self.assertIn("test1", report["totals"])
+        resourcemonitor._MONITOR.stop()
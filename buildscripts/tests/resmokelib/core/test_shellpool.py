@@ -0,0 +1,154 @@
+"""Unit tests for buildscripts/resmokelib/core/shellpool.py."""
+
+import logging
+import os
+import stat
+import threading
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.core import shellpool
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestMakeControlScript(unittest.TestCase):
+    def test_connects_before_eval(self):
+        script = shellpool.make_control_script(["mongo", "--retryWrites", "--nodb"],
+                                               "TestData = 1;", "mongodb://localhost:20000",
+                                               "jstests/core/test.js")
+        self.assertEqual(script.splitlines(), [
+            'db = connect("mongodb://localhost:20000");',
+            "db = db.getMongo().startSession().getDatabase(db.getName());",
+            "TestData = 1;",
+            'load("jstests/core/test.js");',
+        ])
+
+    def test_retry_writes_in_connection_string(self):
+        script = shellpool.make_control_script(
+            ["mongo", "--nodb"], "TestData = 1;",
+            "mongodb://localhost:20000/?replicaSet=rs&retryWrites=true", "jstests/core/test.js")
+        self.assertIn("db = db.getMongo().startSession().getDatabase(db.getName());",
+                      script.splitlines())
+
+    def test_nodb(self):
+        script = shellpool.make_control_script(["mongo", "--nodb"], "TestData = 1;", None,
+                                               "jstests/noPassthrough/test.js")
+        self.assertEqual(script.splitlines(),
+                         ["TestData = 1;", 'load("jstests/noPassthrough/test.js");'])
+
+    def test_is_poolable(self):
+        self.assertTrue(shellpool.is_poolable(["mongo", "--nodb"]))
+        self.assertFalse(shellpool.is_poolable(["mongo", "--username=user", "--nodb"]))
+        self.assertFalse(
+            shellpool.is_poolable(["mongo", "--authenticationDatabase=admin", "--password=pwd"]))
+
+
+class TestRedirectableLogger(unittest.TestCase):
+    def test_holds_output_until_redirected(self):
+        logger = mock.Mock()
+        shell_logger = shellpool._RedirectableLogger(mock.Mock())
+        shell_logger.log(logging.INFO, "before")
+        logger.log.assert_not_called()
+
+        shell_logger.redirect(logger)
+        shell_logger.log(logging.INFO, "after")
+        self.assertEqual(logger.log.call_args_list,
+                         [mock.call(logging.INFO, "before"),
+                          mock.call(logging.INFO, "after")])
+
+
+class TestShellPool(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(shellpool._process, "Process")
+        self.process_cls = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.process_cls.side_effect = self._make_process
+
+        self.addCleanup(shellpool.ShellPool._IDLE_SHELLS.clear)
+
+    def _make_process(self, *_args, **_kwargs):
+        return mock.Mock(pid=len(self.started), **{"poll.return_value": None})
+
+    @property
+    def started(self):
+        return self.process_cls.call_args_list
+
+    def _take_shell(self, shell_args):
+        return shellpool.ShellPool.take_shell(mock.Mock(), 0, shell_args, {})
+
+    def test_replaces_shell_taken(self):
+        shell = self._take_shell(["mongo", "--nodb"])
+        # The shell that runs the test and the one replacing it were both started.
+        self.assertEqual(len(self.started), 2)
+
+        next_shell = self._take_shell(["mongo", "--nodb"])
+        self.assertEqual(len(self.started), 3)
+        self.assertNotEqual(next_shell.process, shell.process)
+        self.assertNotEqual(next_shell.control_file, shell.control_file)
+
+    def test_reuses_shells_with_same_arguments(self):
+        self._take_shell(["mongo", "--nodb"])
+        idle_shell = shellpool.ShellPool._IDLE_SHELLS[0][0]
+
+        self._take_shell(["mongo", "--quiet", "--nodb"])
+        self.assertIn(idle_shell, shellpool.ShellPool._IDLE_SHELLS[0])
+
+        self.assertEqual(self._take_shell(["mongo", "--nodb"]), idle_shell)
+        self.assertNotIn(idle_shell, shellpool.ShellPool._IDLE_SHELLS[0])
+
+    def test_skips_exited_shells(self):
+        self._take_shell(["mongo", "--nodb"])
+        idle_shell = shellpool.ShellPool._IDLE_SHELLS[0][0]
+        idle_shell.process.poll.return_value = 1
+        idle_shell.process.wait.return_value = 1
+
+        self.assertNotEqual(self._take_shell(["mongo", "--nodb"]), idle_shell)
+
+    def test_stop_shells(self):
+        self._take_shell(["mongo", "--nodb"])
+        idle_shell = shellpool.ShellPool._IDLE_SHELLS[0][0]
+
+        shellpool.ShellPool.stop_shells(0)
+        idle_shell.process.stop.assert_called_once_with()
+        self.assertNotIn(0, shellpool.ShellPool._IDLE_SHELLS)
+
+    def test_idle_shell_blocks_on_signal_file(self):
+        self._take_shell(["mongo", "--nodb"])
+        idle_shell = shellpool.ShellPool._IDLE_SHELLS[0][0]
+
+        self.assertTrue(stat.S_ISFIFO(os.stat(idle_shell.signal_file).st_mode))
+        (args, _) = self.started[-1]
+        self.assertIn("cat(", args[1][2])
+        self.assertNotIn("sleep(", args[1][2])
+
+    def test_start_signals_idle_shell(self):
+        self._take_shell(["mongo", "--nodb"])
+        idle_shell = shellpool.ShellPool._IDLE_SHELLS[0][0]
+        signaled = []
+
+        def read_signal_file():
+            with open(idle_shell.signal_file, "rb") as fp:
+                signaled.append(fp.read())
+
+        reader = threading.Thread(target=read_signal_file)
+        reader.start()
+        pooled_shell = shellpool.PooledShell(
+            mock.Mock(env={}), 0, ["mongo", "--nodb"], "load('jstests/core/test.js');")
+        pooled_shell.start()
+        reader.join()
+
+        self.assertEqual(signaled, [b""])
+        with open(idle_shell.control_file, "r") as fp:
+            self.assertEqual(fp.read(), "load('jstests/core/test.js');")
+
+    def test_start_returns_if_idle_shell_exited(self):
+        self._take_shell(["mongo", "--nodb"])
+        idle_shell = shellpool.ShellPool._IDLE_SHELLS[0][0]
+        pooled_shell = shellpool.PooledShell(
+            mock.Mock(env={}), 0, ["mongo", "--nodb"], "load('jstests/core/test.js');")
+
+        with mock.patch.object(shellpool.ShellPool, "take_shell", return_value=idle_shell):
+            idle_shell.process.poll.return_value = 1
+            pooled_shell.start()
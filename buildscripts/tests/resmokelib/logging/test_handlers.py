@@ -0,0 +1,276 @@
+"""Unit tests for the buildscripts.resmokelib.logging.handlers module."""
+
+import gzip
+import http.server
+import json
+import logging
+import threading
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.logging import flush
+from buildscripts.resmokelib.logging import formatters
+from buildscripts.resmokelib.logging import handlers
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class _ListHandler(handlers.BufferedHandler):
+    def __init__(self, capacity):
+        handlers.BufferedHandler.__init__(self, capacity, interval_secs=10)
+        self.flushed = []
+
+    def process_record(self, record):
+        return record.getMessage()
+
+    def _flush_buffer_with_lock(self, buf, close_called):
+        self.flushed.append(buf)
+
+
+class TestBufferedHandler(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(handlers, "flush")
+        self.flush = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.flush.cancel.return_value = True
+
+    @staticmethod
+    def make_record(msg, created):
+        record = logging.LogRecord("test", logging.INFO, __file__, 0, msg, (), None)
+        record.created = created
+        return record
+
+    def test_merges_thread_buffers_in_order(self):
+        handler = _ListHandler(capacity=100)
+
+        handler.emit(self.make_record("first", 1.0))
+        thread = threading.Thread(target=handler.emit, args=(self.make_record("second", 2.0), ))
+        thread.start()
+        thread.join()
+        handler.emit(self.make_record("third", 3.0))
+
+        handler.flush()
+        self.assertEqual(handler.flushed, [["first", "second", "third"]])
+
+        # The buffers are empty after they have been flushed.
+        handler.flush()
+        self.assertEqual(len(handler.flushed), 1)
+
+    def test_flushes_early_when_full(self):
+        handler = _ListHandler(capacity=2)
+
+        handler.emit(self.make_record("first", 1.0))
+        self.flush.flush_after.assert_called_once_with(handler, delay=10)
+
+        handler.emit(self.make_record("second", 2.0))
+        self.flush.flush_after.assert_called_with(handler, delay=0.0)
+        self.assertEqual(self.flush.flush_after.call_count, 2)
+
+        # The early flush is only scheduled once.
+        handler.emit(self.make_record("third", 3.0))
+        self.assertEqual(self.flush.flush_after.call_count, 2)
+
+    def test_capacity_counts_all_threads(self):
+        handler = _ListHandler(capacity=2)
+
+        handler.emit(self.make_record("first", 1.0))
+        thread = threading.Thread(target=handler.emit, args=(self.make_record("second", 2.0), ))
+        thread.start()
+        thread.join()
+        self.flush.flush_after.assert_called_with(handler, delay=0.0)
+
+        # The records flushed no longer count towards the capacity.
+        handler.flush()
+        self.flush.flush_after.reset_mock()
+        handler.emit(self.make_record("third", 3.0))
+        self.flush.flush_after.assert_not_called()
+
+    def test_discards_buffers_of_exited_threads(self):
+        handler = _ListHandler(capacity=100)
+
+        threads = [
+            threading.Thread(target=handler.emit, args=(self.make_record(str(i), float(i)), ))
+            for i in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        handler.emit(self.make_record("main", 10.0))
+        self.assertEqual(len(handler._BufferedHandler__thread_buffers), 6)
+
+        handler.flush()
+        self.assertEqual(handler.flushed, [["0", "1", "2", "3", "4", "main"]])
+        self.assertEqual(len(handler._BufferedHandler__thread_buffers), 1)
+
+    def test_concurrent_flushes_post_in_order(self):
+        handler = _ListHandler(capacity=100)
+        processing = threading.Event()
+        resume = threading.Event()
+        process_records = handler.process_records
+
+        def block_first_flush(records):
+            if not processing.is_set():
+                processing.set()
+                resume.wait()
+            return process_records(records)
+
+        handler.process_records = block_first_flush
+        handler.emit(self.make_record("first", 1.0))
+        flusher = threading.Thread(target=handler.flush)
+        flusher.start()
+        processing.wait()
+
+        handler.emit(self.make_record("second", 2.0))
+        closer = threading.Thread(target=handler.close)
+        closer.start()
+        # Give close() the chance to swap out and post the second record before the first one.
+        closer.join(0.1)
+        resume.set()
+        flusher.join()
+        closer.join()
+
+        self.assertEqual(handler.flushed, [["first"], ["second"]])
+
+    def test_message_computed_on_emit(self):
+        handler = _ListHandler(capacity=100)
+        args = {"value": 1}
+        record = logging.LogRecord("test", logging.INFO, __file__, 0, "%(value)d", (args, ), None)
+
+        handler.emit(record)
+        args["value"] = 2
+        handler.close()
+
+        self.assertEqual(record.message, "1")
+
+
+class _MockServerHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):  # pylint: disable=invalid-name
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        self.server.requests.append((self.path, json.loads(body.decode("utf-8"))))
+
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class TestHandleBatch(unittest.TestCase):
+    @staticmethod
+    def make_records(*msgs):
+        return [
+            logging.LogRecord("test", logging.INFO, __file__, 0, msg, (), None) for msg in msgs
+        ]
+
+    def test_buffered_handler(self):
+        handler = _ListHandler(capacity=100)
+        handler.emit_batch = mock.Mock()
+        records = self.make_records("first", "second")
+
+        handlers.handle_batch(handler, records)
+        handler.emit_batch.assert_called_once_with(records)
+
+    def test_stream_handler(self):
+        stream = mock.Mock()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(formatters.ISO8601Formatter(fmt="%(message)s"))
+
+        handlers.handle_batch(handler, self.make_records("first", "second"))
+        stream.write.assert_called_once_with("first\nsecond\n")
+
+    def test_records_below_level_are_skipped(self):
+        stream = mock.Mock()
+        handler = logging.StreamHandler(stream)
+        handler.setLevel(logging.WARNING)
+
+        handlers.handle_batch(handler, self.make_records("first"))
+        stream.write.assert_not_called()
+
+    def test_other_handlers(self):
+        handler = mock.Mock(spec=logging.Handler)
+        records = self.make_records("first", "second")
+
+        handlers.handle_batch(handler, records)
+        self.assertEqual(handler.handle.call_args_list, [mock.call(record) for record in records])
+
+
+class TestHTTPHandler(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.HTTPServer(("localhost", 0), _MockServerHandler)
+        self.server.requests = []
+        self.server.statuses = []
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.url_root = "http://localhost:%d" % self.server.server_address[1]
+
+        patcher = mock.patch.object(handlers, "_BACKOFF_SECS", 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_gzipped_post(self):
+        handler = handlers.HTTPHandler(self.url_root, "user", "password", compress=True)
+        handler.post("/build/1", data=[[1.0, "line"]])
+        self.assertEqual(self.server.requests, [("/build/1/", [[1.0, "line"]])])
+
+    def test_retries_server_errors(self):
+        self.server.statuses = [503, 500]
+        handler = handlers.HTTPHandler(self.url_root, "user", "password", retry_attempts=2)
+        handler.post("/build/1", data=[[1.0, "line"]])
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_stops_retrying(self):
+        self.server.statuses = [503, 503]
+        handler = handlers.HTTPHandler(self.url_root, "user", "password", retry_attempts=1)
+        with self.assertRaises(handlers.requests.HTTPError):
+            handler.post("/build/1", data=[[1.0, "line"]])
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_shares_session(self):
+        handler = handlers.HTTPHandler(self.url_root, "user", "password")
+        other_handler = handlers.HTTPHandler(self.url_root, "other_user", "password")
+        self.assertIs(handler.session, other_handler.session)
+
+
+class TestFormatBatch(unittest.TestCase):
+    def test_same_as_format(self):
+        formatter = formatters.ISO8601Formatter(fmt="[%(name)s] %(asctime)s %(message)s")
+        records = []
+        for (i, created) in enumerate([1000.25, 1000.5, 1001.75]):
+            record = logging.LogRecord("test", logging.INFO, __file__, 0, "line %d", (i, ), None)
+            record.created = created
+            record.msecs = (created - int(created)) * 1000
+            records.append(record)
+
+        self.assertEqual(formatter.format_batch(records),
+                         [formatter.format(record) for record in records])
+
+
+class TestFlushThread(unittest.TestCase):
+    def test_runs_actions_and_records_stats(self):
+        flush_thread = flush._FlushThread()
+        flush_thread.start()
+
+        ran = threading.Event()
+        flush_thread.submit(ran.set, 0.0)
+        cancelled = flush_thread.submit(ran.clear, 60.0)
+        self.assertTrue(flush_thread.cancel_event(cancelled))
+
+        flush_thread.signal_shutdown()
+        flush_thread.await_shutdown()
+        flush_thread.join()
+
+        self.assertTrue(ran.is_set())
+        stats = flush_thread.get_stats()
+        self.assertEqual(stats.num_actions, 1)
+        self.assertEqual(stats.queue_depth, 0)
@@ -0,0 +1,65 @@
+"""Unit tests for buildscripts/resmokelib/benchmarkstore.py."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from buildscripts.resmokelib import benchmarkstore
+
+# pylint: disable=missing-docstring
+
+
+class TestStatistics(unittest.TestCase):
+    def test_median(self):
+        self.assertEqual(benchmarkstore.median([3, 1, 2]), 2)
+        self.assertEqual(benchmarkstore.median([4, 1, 2, 3]), 2.5)
+
+    def test_median_absolute_deviation(self):
+        self.assertEqual(benchmarkstore.median_absolute_deviation([1, 1, 2, 2, 4, 6, 9]), 1)
+
+    def test_mann_whitney_p_value(self):
+        baseline = [100, 101, 99, 100, 102, 98]
+        self.assertLess(benchmarkstore.mann_whitney_p_value([110, 111, 112], baseline), 0.05)
+        self.assertGreater(benchmarkstore.mann_whitney_p_value([99, 100, 101], baseline), 0.05)
+        # Only a slowdown is significant.
+        self.assertGreater(benchmarkstore.mann_whitney_p_value([80, 81, 82], baseline), 0.5)
+        self.assertEqual(benchmarkstore.mann_whitney_p_value([1, 1], [1, 1, 1]), 1.0)
+
+    def test_compare(self):
+        baseline = [100, 101, 99, 100, 102, 98]
+        comparison = benchmarkstore.compare("BM_Insert", "1", [110, 111, 112], baseline)
+        self.assertTrue(comparison.is_regression)
+        self.assertAlmostEqual(comparison.relative_change, 0.11)
+
+        # A significant slowdown that is too small to be reported.
+        comparison = benchmarkstore.compare("BM_Insert", "1", [102, 103, 103], baseline)
+        self.assertFalse(comparison.is_regression)
+
+
+class TestBenchmarkStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.store = benchmarkstore.BenchmarkStore(os.path.join(self.temp_dir, "benchmarks.db"))
+        self.addCleanup(self.store.close)
+
+    def test_baseline_window(self):
+        for (revision, cpu_time) in [("a", 10), ("b", 20), ("c", 30)]:
+            self.store.record(revision, "BM_Insert", "1", [(cpu_time, cpu_time)] * 2)
+        self.store.record("c", "BM_Insert", "2", [(1000, 1000)])
+
+        baseline = self.store.get_baseline("BM_Insert", "1", "d", 2)
+        self.assertEqual(sorted(baseline), [20, 20, 30, 30])
+
+        # The results of the current revision are never part of its baseline.
+        baseline = self.store.get_baseline("BM_Insert", "1", "c", 2)
+        self.assertEqual(sorted(baseline), [10, 10, 20, 20])
+
+    def test_record_and_compare(self):
+        timings = [(100, 100), (101, 101), (99, 99)]
+        self.assertIsNone(self.store.record_and_compare("a", "BM_Insert", "1", timings, 5))
+
+        comparison = self.store.record_and_compare("b", "BM_Insert", "1", [(120, 120)] * 3, 5)
+        self.assertTrue(comparison.is_regression)
+        self.assertEqual(comparison.baseline_median, 100)
@@ -2,6 +2,8 @@
 
 import unittest
 
+import mock
+
 from buildscripts.resmokelib import parser as _parser
 
 # pylint: disable=missing-docstring
@@ -245,3 +247,13 @@ class TestLocalCommandLine(unittest.TestCase):
         ])
 
         self.assertEqual(cmdline, ["--suites=my_suite", "--storageEngine=my_storage_engine"])
+
+
+class TestIsOnTmpfs(unittest.TestCase):
+    def test_is_on_tmpfs(self):
+        mounts = "/dev/sda1 / ext4 rw 0 0\ntmpfs /dev/shm tmpfs rw 0 0\n"
+        with mock.patch("builtins.open", mock.mock_open(read_data=mounts)):
+            self.assertTrue(_parser._is_on_tmpfs("/dev/shm"))
+            self.assertTrue(_parser._is_on_tmpfs("/dev/shm/resmoke"))
+            self.assertFalse(_parser._is_on_tmpfs("/dev"))
+            self.assertFalse(_parser._is_on_tmpfs("/data/db"))
@@ -0,0 +1,129 @@
+"""Unit tests for buildscripts/resmokelib/reportfile.py."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import config
+from buildscripts.resmokelib import reportfile
+from buildscripts.resmokelib.testing import report as _report
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def _make_test_info(test_file, status):
+    test_info = _report._TestInfo(test_file, test_file, False)
+    test_info.status = status
+    test_info.evergreen_status = status
+    test_info.return_code = 0 if status == "pass" else 1
+    test_info.start_time = 0.0
+    test_info.end_time = 1.0
+    return test_info
+
+
+class TestStreamReportFile(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+        self.report_file = os.path.join(self.tmpdir, "report.json")
+        patcher = mock.patch.object(config, "REPORT_FILE", self.report_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _make_report(job_num):
+        return _report.TestReport(mock.Mock(), mock.Mock(),
+                                  stream_filename=_report.get_stream_filename(job_num))
+
+    def _read_report(self):
+        with open(self.report_file, "r") as fp:
+            return json.load(fp)
+
+    def test_merges_streams_of_each_job(self):
+        report0 = self._make_report(0)
+        report0._stream_result(_make_test_info("passed.js", "pass"))
+        report0.num_succeeded = 1
+        report1 = self._make_report(1)
+        report1._stream_result(_make_test_info("failed.js", "fail"))
+        report1.num_failed = 1
+
+        reportfile._write_from_streams(_report.TestReport.combine(report0, report1))
+
+        report = self._read_report()
+        self.assertEqual([result["test_file"] for result in report["results"]],
+                         ["passed.js", "failed.js"])
+        self.assertEqual(report["failures"], 1)
+
+    def test_keeps_last_record_of_a_test(self):
+        report = self._make_report(0)
+        test_info = _make_test_info("set_failure.js", "pass")
+        report._stream_result(test_info)
+        test_info.status = test_info.evergreen_status = "fail"
+        report._stream_result(test_info)
+        report.num_failed = 1
+
+        reportfile._write_from_streams(_report.TestReport.combine(report))
+
+        report = self._read_report()
+        self.assertEqual(len(report["results"]), 1)
+        self.assertEqual(report["results"][0]["status"], "fail")
+        self.assertEqual(report["failures"], 1)
+
+    def test_includes_unfinished_tests_and_skips_incomplete_lines(self):
+        report = self._make_report(0)
+        report._stream_result(_make_test_info("passed.js", "pass"))
+        report.num_succeeded = 1
+        with open(_report.get_stream_filename(0), "a") as fp:
+            fp.write('{"id": "abc", "fai')
+        report.test_infos.append(_report._TestInfo("interrupted.js", "interrupted.js", False))
+        report.test_infos[-1].start_time = 0.0
+
+        reportfile._write_from_streams(_report.TestReport.combine(report))
+
+        report = self._read_report()
+        self.assertEqual([result["test_file"] for result in report["results"]],
+                         ["passed.js", "interrupted.js"])
+        self.assertEqual(report["results"][1]["status"], "fail")
+        self.assertEqual(report["failures"], 1)
+
+    def test_only_reads_results_since_reset(self):
+        report = self._make_report(0)
+        report._stream_result(_make_test_info("first_execution.js", "pass"))
+        report.reset()
+        report._stream_result(_make_test_info("second_execution.js", "pass"))
+
+        self.assertEqual([test_info.test_file for test_info in report.iter_test_infos()],
+                         ["second_execution.js"])
+
+    def test_keeps_only_unfinished_tests_in_memory(self):
+        job_logger = mock.Mock()
+        job_logger.new_test_logger.return_value.url_endpoint = None
+        report = _report.TestReport(job_logger, mock.Mock(report_failure_status="fail"),
+                                    stream_filename=_report.get_stream_filename(0))
+
+        tests = []
+        for test_name in ["first.js", "second.js"]:
+            test = mock.Mock(test_name=test_name, dynamic=False, return_code=0)
+            test.id.return_value = test_name
+            test.logger.handlers = []
+            tests.append(test)
+
+        report.startTest(tests[0])
+        report.addSuccess(tests[0])
+        report.stopTest(tests[0])
+        report.setFailure(tests[0])
+        report.startTest(tests[1])
+
+        self.assertEqual([test_info.test_id for test_info in report.test_infos], ["second.js"])
+        self.assertEqual((report.num_succeeded, report.num_failed), (0, 1))
+        self.assertEqual([test_info.test_file for test_info in report.get_failed()], ["first.js"])
+
+    def test_remove_streams(self):
+        self._make_report(0)._stream_result(_make_test_info("passed.js", "pass"))
+        reportfile.remove_streams()
+        self.assertEqual(os.listdir(self.tmpdir), [])
@@ -603,3 +603,48 @@ class TestFilterTests(unittest.TestCase):
         selected, excluded = selector.filter_tests("db_test", config, self.test_file_explorer)
         self.assertEqual(["dbtestB"], selected)
         self.assertEqual(["dbtestA", "dbtestC"], excluded)
+
+
+class TestMakeTestMatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.test_file_explorer = MockTestFileExplorer()
+
+    def assert_matches_filter_tests(self, test_kind, config):
+        selected, _ = selector.filter_tests(test_kind, config, self.test_file_explorer)
+        is_selected = selector.make_test_matcher(test_kind, config, self.test_file_explorer)
+        matched = [test for test in self.test_file_explorer.files if is_selected(test)]
+        self.assertEqual(sorted(selected), matched)
+
+    def test_roots_and_tags(self):
+        roots = ["dir/subdir1/*.js", "dir/subdir2/*.js", "dir/subdir3/a/*.js"]
+        self.assert_matches_filter_tests("js_test", {"roots": roots})
+        self.assert_matches_filter_tests("js_test", {"roots": roots, "include_tags": "tag1"})
+        self.assert_matches_filter_tests("js_test", {"roots": roots, "exclude_tags": "tagA"})
+        self.assert_matches_filter_tests("js_test",
+                                         {"roots": roots, "exclude_with_any_tags": ["tag2"]})
+
+    def test_globstar_roots(self):
+        self.assert_matches_filter_tests("js_test", {"roots": ["dir/**/*.js"]})
+        self.assertTrue(
+            selector.make_test_matcher("js_test", {"roots": ["dir/**/*.js"]},
+                                       self.test_file_explorer)("dir/subdir3/a/test3a1.js"))
+
+    def test_exclude_and_include_files(self):
+        roots = ["dir/subdir1/*.js", "dir/subdir2/*.js", "dir/subdir3/a/*.js"]
+        self.assert_matches_filter_tests(
+            "js_test", {"roots": roots, "exclude_files": ["dir/subdir1/test11.js"]})
+        self.assert_matches_filter_tests(
+            "js_test",
+            {"roots": roots, "include_files": ["dir/subdir1/*.js"], "exclude_tags": "tag1"})
+        self.assert_matches_filter_tests(
+            "json_schema_test", {"roots": ["dir/subdir1/*.js"], "exclude_files": ["dir/subdir1/*1.js"]})
+
+    def test_missing_file(self):
+        is_selected = selector.make_test_matcher("js_test", {"roots": ["dir/**/*.js"]},
+                                                 self.test_file_explorer)
+        self.assertFalse(is_selected("dir/subdir1/deleted.js"))
+
+    def test_unsupported_test_kind(self):
+        with self.assertRaises(ValueError):
+            selector.make_test_matcher("db_test", {"binary": "dbtest"})
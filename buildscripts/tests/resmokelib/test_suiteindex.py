@@ -0,0 +1,132 @@
+"""Unit tests for the buildscripts.resmokelib.suiteindex module."""
+
+import os
+import os.path
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import config
+from buildscripts.resmokelib import suiteindex
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestSuiteIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.tmpdir)
+
+        self.index_file = os.path.join(self.tmpdir, "suite_index.json")
+        self.suites = {}
+        patcher = mock.patch.multiple(config, NAMED_SUITES=self.suites, TAG_FILE=None,
+                                      INCLUDE_WITH_ANY_TAGS=None, EXCLUDE_WITH_ANY_TAGS=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self._git("init", "-q")
+        self._write_test("jstests/core/a.js", [])
+        self._write_test("jstests/core/b.js", ["slow"])
+        self._write_suite("core", "js_test", {"roots": ["jstests/core/**/*.js"]})
+        self._write_suite("fast", "js_test", {
+            "roots": ["jstests/core/*.js"],
+            "exclude_with_any_tags": ["slow"],
+        })
+        self._write_suite("unittests", "cpp_unit_test", {"root": "build/unittests.txt"})
+        self._commit()
+
+    def _git(self, *args):
+        subprocess.check_call(["git", "-c", "user.name=resmoke", "-c", "user.email=resmoke@test"] +
+                              list(args), stdout=subprocess.DEVNULL)
+
+    def _commit(self):
+        self._git("add", "-A")
+        self._git("commit", "-q", "-m", "commit")
+
+    def _write_test(self, path, tags):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fp:
+            fp.write("/**\n * @tags: [%s]\n */\n" % ", ".join(tags))
+
+    def _write_suite(self, name, test_kind, selector):
+        path = os.path.join(self.tmpdir, "suites", name + ".yml")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fp:
+            fp.write("test_kind: %s\nselector: %r\n" % (test_kind, selector))
+        self.suites[name] = path
+
+    def _update(self):
+        """Update the index in its file and return it along with the suites selected again."""
+
+        index = suiteindex.SuiteIndex.from_file(self.index_file)
+        with mock.patch.object(suiteindex._suite, "Suite",
+                               wraps=suiteindex._suite.Suite) as suite_class:
+            index.update(sorted(self.suites))
+        index.save()
+        return (index, sorted(call[0][0] for call in suite_class.call_args_list))
+
+    def test_build(self):
+        (index, selected_suites) = self._update()
+        self.assertEqual(selected_suites, ["core", "fast"])
+        self.assertEqual(index.get_suites("jstests/core/a.js"), ["core", "fast"])
+        self.assertEqual(index.get_suites("jstests/core/b.js"), ["core"])
+        self.assertEqual(index.get_test_kind("unittests"), "cpp_unit_test")
+        self.assertIsNone(index.get_tests("unittests"))
+
+    def test_unchanged(self):
+        self._update()
+        (index, selected_suites) = self._update()
+        self.assertEqual(selected_suites, [])
+        self.assertEqual(index.get_suites("jstests/core/a.js"), ["core", "fast"])
+
+    def test_changed_tests_are_checked_one_at_a_time(self):
+        self._update()
+
+        self._write_test("jstests/core/a.js", ["slow"])
+        self._write_test("jstests/core/sub/c.js", [])
+        self._commit()
+        os.remove("jstests/core/b.js")
+
+        (index, selected_suites) = self._update()
+        self.assertEqual(selected_suites, [])
+        self.assertEqual(index.get_suites("jstests/core/a.js"), ["core"])
+        self.assertEqual(index.get_suites("jstests/core/b.js"), [])
+        self.assertEqual(index.get_suites("jstests/core/sub/c.js"), ["core"])
+
+    def test_reverted_changes_are_checked_again(self):
+        self._update()
+
+        self._write_test("jstests/core/a.js", ["slow"])
+        (index, _) = self._update()
+        self.assertEqual(index.get_suites("jstests/core/a.js"), ["core"])
+
+        self._git("checkout", "--", "jstests/core/a.js")
+        (index, _) = self._update()
+        self.assertEqual(index.get_suites("jstests/core/a.js"), ["core", "fast"])
+
+    def test_changed_suite_is_selected_again(self):
+        self._update()
+
+        self._write_suite("fast", "js_test", {"roots": ["jstests/core/*.js"]})
+        (index, selected_suites) = self._update()
+        self.assertEqual(selected_suites, ["fast"])
+        self.assertEqual(index.get_suites("jstests/core/b.js"), ["core", "fast"])
+
+    def test_changed_options_rebuild_the_index(self):
+        self._update()
+
+        with mock.patch.object(config, "EXCLUDE_WITH_ANY_TAGS", ["slow"]):
+            (index, selected_suites) = self._update()
+        self.assertEqual(selected_suites, ["core", "fast"])
+        self.assertEqual(index.get_suites("jstests/core/b.js"), [])
+
+    def test_ignores_other_versions(self):
+        with open(self.index_file, "w") as fp:
+            fp.write('{"version": 0, "suites": {"core": {}}}')
+        (_, selected_suites) = self._update()
+        self.assertEqual(selected_suites, ["core", "fast"])
@@ -50,3 +50,35 @@ class TestSuitesConfig(unittest.TestCase):
             test_kind=("fsm_workload_test", "js_test"))
         self.assertEqual(membership_map, dict(test1=all_suites, test2=all_suites))
         self.assertEqual(mock_suite_class.call_count, 2)
+
+    @mock.patch(RESMOKELIB + ".suiteindex.SuiteIndex")
+    @mock.patch(RESMOKELIB + ".testing.suite.Suite")
+    @mock.patch(RESMOKELIB + ".suitesconfig.get_named_suites")
+    def test_suites_in_index_are_not_selected(self, mock_get_named_suites, mock_suite_class,
+                                              mock_suite_index_class):
+        mock_get_named_suites.return_value = ["core", "unittests"]
+        suite_index = mock_suite_index_class.from_file.return_value
+        suite_index.get_tests.side_effect = lambda name: ["test1"] if name == "core" else None
+        suite_index.get_test_kind.return_value = "js_test"
+        mock_suite_class.return_value.tests = ["test2"]
+
+        with mock.patch(RESMOKELIB + ".config.TEST_SUITE_INDEX_FILE", "index.json"), \
+             mock.patch(RESMOKELIB + ".suitesconfig._get_suite_config",
+                        return_value={"test_kind": "cpp_unit_test"}):
+            membership_map = suitesconfig.create_test_membership_map()
+        self.assertEqual(membership_map, dict(test1=["core"], test2=["unittests"]))
+        self.assertEqual(mock_suite_class.call_count, 1)
+        suite_index.update.assert_called_once_with(["core", "unittests"])
+        suite_index.save.assert_called_once_with()
+
+    @mock.patch(RESMOKELIB + ".suitesconfig.get_named_suites")
+    def test_named_suites_by_test_kind(self, mock_get_named_suites):
+        mock_get_named_suites.return_value = ["core", "integration_tests_standalone", "unittests"]
+
+        suites_by_test_kind = suitesconfig.get_named_suites_by_test_kind()
+        self.assertEqual(
+            suites_by_test_kind, {
+                "js_test": ["core"],
+                "cpp_integration_test": ["integration_tests_standalone"],
+                "cpp_unit_test": ["unittests"],
+            })
@@ -0,0 +1,133 @@
+"""Unit tests for buildscripts/resmokelib/testruntimes.py."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import testruntimes as under_test
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def report_dict(*results):
+    return {
+        "failures": 0, "results": [{
+            "test_file": test_file, "status": status, "elapsed": elapsed
+        } for (test_file, status, elapsed) in results]
+    }
+
+
+class TestTestRuntimes(unittest.TestCase):
+    def test_add_runtime_averages_runs(self):
+        test_runtimes = under_test.TestRuntimes()
+        test_runtimes.add_runtime("test1.js", 10)
+        test_runtimes.add_runtime("test1.js", 20)
+
+        self.assertEqual(15, test_runtimes.get_runtime("test1.js"))
+
+    def test_add_runtime_only_averages_recent_runs(self):
+        test_runtimes = under_test.TestRuntimes()
+        for _ in range(100):
+            test_runtimes.add_runtime("test1.js", 1)
+        test_runtimes.add_runtime("test1.js", 1 + under_test._MAX_RUNS_AVERAGED)
+
+        self.assertEqual(2, test_runtimes.get_runtime("test1.js"))
+
+    def test_get_runtime_of_unknown_test(self):
+        test_runtimes = under_test.TestRuntimes()
+
+        self.assertIsNone(test_runtimes.get_runtime("test1.js"))
+        self.assertEqual(5, test_runtimes.get_runtime("test1.js", 5))
+
+    def test_add_report_dict_skips_dynamic_and_failed_tests(self):
+        test_runtimes = under_test.TestRuntimes()
+        test_runtimes.add_report_dict(
+            report_dict(("test1.js", "pass", 3), ("test1:CheckReplDBHash", "pass", 1),
+                        ("test2.js", "fail", 7)))
+
+        self.assertEqual(3, test_runtimes.get_runtime("test1.js"))
+        self.assertIsNone(test_runtimes.get_runtime("test1:CheckReplDBHash"))
+        self.assertIsNone(test_runtimes.get_runtime("test2.js"))
+
+    def test_add_report_dict_keeps_windows_paths(self):
+        test_runtimes = under_test.TestRuntimes()
+        test_runtimes.add_report_dict(
+            report_dict(("C:\\data\\test1.js", "pass", 3), ("c:/data/test2.js", "pass", 5),
+                        ("a:CheckReplDBHash", "pass", 1)))
+
+        self.assertEqual(3, test_runtimes.get_runtime("C:\\data\\test1.js"))
+        self.assertEqual(5, test_runtimes.get_runtime("c:/data/test2.js"))
+        self.assertIsNone(test_runtimes.get_runtime("a:CheckReplDBHash"))
+
+    def test_sort_longest_first(self):
+        test_runtimes = under_test.TestRuntimes()
+        test_runtimes.add_runtime("short.js", 1)
+        test_runtimes.add_runtime("long.js", 100)
+        test_runtimes.add_runtime("medium.js", 30)
+
+        self.assertEqual(["long.js", "unknown.js", "medium.js", "short.js"],
+                         test_runtimes.sort_longest_first(
+                             ["short.js", "unknown.js", "medium.js", "long.js"]))
+
+    def test_sort_longest_first_without_history_keeps_order(self):
+        test_runtimes = under_test.TestRuntimes()
+        tests = ["b.js", "a.js", "c.js"]
+
+        self.assertEqual(tests, test_runtimes.sort_longest_first(tests))
+
+
+class TestTestRuntimesFile(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, "runtimes.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_missing_file_is_empty_history(self):
+        test_runtimes = under_test.TestRuntimes.from_file(self.filename)
+
+        self.assertIsNone(test_runtimes.get_runtime("test1.js"))
+
+    def test_dump_and_load(self):
+        test_runtimes = under_test.TestRuntimes()
+        test_runtimes.add_runtime("test1.js", 12)
+        test_runtimes.dump(self.filename)
+
+        test_runtimes = under_test.TestRuntimes.from_file(self.filename)
+        self.assertEqual(12, test_runtimes.get_runtime("test1.js"))
+
+    def test_load_report_file(self):
+        with open(self.filename, "w") as fp:
+            json.dump(report_dict(("test1.js", "pass", 4), ("test1.js", "pass", 6)), fp)
+
+        test_runtimes = under_test.TestRuntimes.from_file(self.filename)
+        self.assertEqual(5, test_runtimes.get_runtime("test1.js"))
+
+    def test_write_leaves_report_file(self):
+        report = report_dict(("test1.js", "pass", 4))
+        with open(self.filename, "w") as fp:
+            json.dump(report, fp)
+
+        suite = mock.Mock()
+        suite.get_reports.return_value = [mock.Mock(**{"as_dict.return_value": report})]
+        with mock.patch.object(under_test.config, "TEST_RUNTIMES_FILE", self.filename):
+            under_test.write([suite])
+
+        with open(self.filename) as fp:
+            self.assertEqual(report, json.load(fp))
+
+    def test_write_adds_runtimes(self):
+        suite = mock.Mock()
+        suite.get_reports.return_value = [
+            mock.Mock(**{"as_dict.return_value": report_dict(("test1.js", "pass", 4))})
+        ]
+        with mock.patch.object(under_test.config, "TEST_RUNTIMES_FILE", self.filename):
+            under_test.write([suite])
+
+        test_runtimes = under_test.TestRuntimes.from_file(self.filename)
+        self.assertEqual(4, test_runtimes.get_runtime("test1.js"))
@@ -0,0 +1,86 @@
+"""Unit tests for buildscripts/resmokelib/tracing.py."""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import tracing
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.trace_file = os.path.join(self.temp_dir, "trace.json")
+
+        patcher = mock.patch.multiple(tracing.config, TRACE_FILE=self.trace_file,
+                                      TRACE_SAMPLING_INTERVAL_MS=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, tracing, "_TRACER", None)
+
+    def test_disabled(self):
+        with tracing.span("suite", "suite") as span:
+            self.assertIsNone(span)
+        self.assertFalse(tracing.is_enabled())
+
+    def test_spans(self):
+        tracing.start()
+        with tracing.span("suite", "suite") as suite_span:
+            with tracing.span("job0", "job"):
+                tracing.process_started()
+                tracing.process_started()
+            with tracing.span("test", "test"):
+                pass
+
+        self.assertEqual(suite_span.num_processes, 2)
+        summaries = tracing._TRACER.summarize(suite_span.start, suite_span.end)
+        self.assertEqual(sorted(summaries), ["job", "suite", "test"])
+        self.assertEqual(summaries["job"].num_spans, 1)
+        self.assertEqual(summaries["job"].num_processes, 2)
+
+        sb = []
+        tracing.summarize(sb, suite_span)
+        self.assertEqual(len(sb), 4)
+
+        tracing.write()
+        with open(self.trace_file) as fp:
+            events = json.load(fp)["traceEvents"]
+        self.assertEqual([event["name"] for event in events if event["ph"] == "X"],
+                         ["job0", "test", "suite"])
+        self.assertEqual(events[0]["ph"], "M")
+
+    def test_propagates_spans_to_other_threads(self):
+        tracing.start()
+        with tracing.span("setup", "fixture_setup") as setup_span:
+            threads = [
+                threading.Thread(target=tracing.propagate(tracing.process_started))
+                for _ in range(3)
+            ]
+            # A thread started without propagate() isn't part of the span.
+            threads.append(threading.Thread(target=tracing.process_started))
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(setup_span.num_processes, 3)
+
+    def test_sampling(self):
+        tracing.config.TRACE_SAMPLING_INTERVAL_MS = 1
+        tracing.start()
+        with tracing.span("suite", "suite"):
+            time.sleep(0.05)
+        tracing.write()
+
+        with open(self.trace_file + ".folded") as fp:
+            lines = fp.readlines()
+        self.assertTrue(any("test_sampling" in line for line in lines))
@@ -54,3 +54,20 @@ class UnitTestFixture(interface.Fixture):  # pylint: disable=abstract-method
     def _do_teardown(self, mode=None):
         if self._should_raise:
             raise errors.ServerFailure(self.ERROR_MESSAGE)
+
+
+class TestRunConcurrently(unittest.TestCase):
+    def test_calls_all_functions(self):
+        called = []
+        interface.run_concurrently([lambda: called.append(1), lambda: called.append(2)])
+        self.assertEqual([1, 2], sorted(called))
+
+    def test_reraises_after_all_functions_return(self):
+        called = []
+
+        def fail():
+            raise errors.ServerFailure("setup failed")
+
+        with self.assertRaises(errors.ServerFailure):
+            interface.run_concurrently([fail, lambda: called.append(1)])
+        self.assertEqual([1], called)
@@ -0,0 +1,70 @@
+"""Unit tests for the resmokelib.testing.fixtures.pool module."""
+import logging
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing.fixtures import pool
+
+# pylint: disable=missing-docstring
+
+CONFIG = {"class": "ReplicaSetFixture", "num_nodes": 3}
+OTHER_CONFIG = {"class": "ReplicaSetFixture", "num_nodes": 2}
+
+
+def mock_fixture(job_num):
+    fixture = mock.Mock()
+    fixture.job_num = job_num
+    return fixture
+
+
+class TestFixturePool(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("pool_unittest")
+        pool.teardown_all(self.logger)
+
+    def tearDown(self):
+        pool.teardown_all(self.logger)
+
+    def test_acquire_from_empty_pool(self):
+        self.assertIsNone(pool.acquire(CONFIG, 0))
+
+    def test_acquire_same_config_and_job(self):
+        fixture = mock_fixture(0)
+        pool.release(CONFIG, fixture)
+
+        self.assertIsNone(pool.acquire(CONFIG, 1))
+        self.assertIsNone(pool.acquire(OTHER_CONFIG, 0))
+        self.assertIs(fixture, pool.acquire({"num_nodes": 3, "class": "ReplicaSetFixture"}, 0))
+        self.assertIsNone(pool.acquire(CONFIG, 0))
+
+    def test_release_twice_for_same_job(self):
+        pool.release(CONFIG, mock_fixture(0))
+        with self.assertRaises(ValueError):
+            pool.release(CONFIG, mock_fixture(0))
+
+    def test_teardown_mismatched(self):
+        fixture = mock_fixture(0)
+        other_fixture = mock_fixture(1)
+        pool.release(CONFIG, fixture)
+        pool.release(OTHER_CONFIG, other_fixture)
+
+        self.assertTrue(pool.teardown_mismatched(CONFIG, self.logger))
+
+        fixture.teardown.assert_not_called()
+        other_fixture.teardown.assert_called_once_with(finished=True)
+        self.assertIs(fixture, pool.acquire(CONFIG, 0))
+        self.assertIsNone(pool.acquire(OTHER_CONFIG, 1))
+
+    def test_teardown_all_failure(self):
+        fixture = mock_fixture(0)
+        fixture.teardown.side_effect = errors.ServerFailure("teardown failed")
+        ok_fixture = mock_fixture(1)
+        pool.release(CONFIG, fixture)
+        pool.release(CONFIG, ok_fixture)
+
+        self.assertFalse(pool.teardown_all(self.logger))
+
+        ok_fixture.teardown.assert_called_once_with(finished=True)
+        self.assertIsNone(pool.acquire(CONFIG, 0))
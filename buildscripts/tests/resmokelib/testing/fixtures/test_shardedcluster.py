@@ -0,0 +1,31 @@
+"""Unit tests for the resmokelib.testing.fixtures.shardedcluster module."""
+import logging
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing.fixtures import shardedcluster
+
+# pylint: disable=missing-docstring
+
+
+class TestShardedClusterFixture(unittest.TestCase):
+    def test_assigns_ports_in_order_before_setup(self):
+        fixture = shardedcluster.ShardedClusterFixture(
+            logging.getLogger("fixture_unittests"), 0, mongod_options={})
+        calls = []
+
+        def mock_replica_set(name):
+            replica_set = mock.Mock()
+            replica_set.assign_ports.side_effect = lambda: calls.append(("assign_ports", name))
+            replica_set.setup.side_effect = lambda: calls.append(("setup", name))
+            return replica_set
+
+        fixture.configsvr = mock_replica_set("configsvr")
+        fixture.shards = [mock_replica_set("shard0"), mock_replica_set("shard1")]
+        fixture.setup()
+
+        self.assertEqual(calls[:3], [("assign_ports", "configsvr"), ("assign_ports", "shard0"),
+                                     ("assign_ports", "shard1")])
+        self.assertEqual(
+            sorted(calls[3:]), [("setup", "configsvr"), ("setup", "shard0"), ("setup", "shard1")])
@@ -148,3 +148,51 @@ class TestBenchmarkThreadsReport(CombineBenchmarkResultsFixture):
         self.assertEqual(len(list(report.keys())), 1)
         self.assertIn("1", list(report.keys()))
         self.assertNotIn("1_mean", list(report.keys()))
+
+
+class TestCheckForRegressions(unittest.TestCase):
+    @mock.patch("buildscripts.resmokelib.testing.hooks.interface.Hook", autospec=True)
+    def setUp(self, MockHook):  # pylint: disable=arguments-differ,unused-argument
+        self.cbr_hook = cbr.CombineBenchmarkResults(None, None)
+        self.cbr_hook.logger = mock.Mock()
+        self.cbr_hook.store = mock.Mock()
+        self.cbr_hook.revision = "abc123"
+
+        self.test = mock.Mock()
+        self.test.short_name.return_value = "lock_manager_bm"
+
+    def _check(self, is_regression):
+        comparison = mock.Mock(is_regression=is_regression, current_median=1.0, baseline_median=1.0,
+                               relative_change=0.0, baseline_sigma=0.0, p_value=1.0)
+        self.cbr_hook.store.record_and_compare.return_value = comparison
+        self.cbr_hook._check_for_regressions(self.test, _BM_FULL_REPORT)
+
+    def test_records_each_benchmark(self):
+        with mock.patch.object(cbr._config, "BENCHMARK_REGRESSION_ACTION", "fail"):
+            self._check(is_regression=False)
+
+        calls = self.cbr_hook.store.record_and_compare.call_args_list
+        self.assertEqual([call[0][:3] for call in calls],
+                         [("abc123", "BM_Name1/arg1/arg with space", "1"),
+                          ("abc123", "BM_Name2", "10")])
+        self.assertEqual(calls[0][0][3], [(1303, 1202), (1305, 1204)])
+
+    def test_regression_action(self):
+        with mock.patch.object(cbr._config, "BENCHMARK_REGRESSION_ACTION", "warn"):
+            self._check(is_regression=True)
+        self.assertTrue(self.cbr_hook.logger.warning.called)
+
+        with mock.patch.object(cbr._config, "BENCHMARK_REGRESSION_ACTION", "fail"):
+            with self.assertRaises(cbr.errors.TestFailure):
+                self._check(is_regression=True)
+
+    def test_store_is_closed_after_suite(self):
+        self.cbr_hook.report_file = None
+        with mock.patch.object(cbr._config, "BENCHMARK_STORE", "benchmarks.db"), \
+             mock.patch.object(cbr.benchmarkstore, "BenchmarkStore") as store_cls:
+            self.cbr_hook.before_suite(None)
+            self.assertIs(self.cbr_hook.store, store_cls.return_value)
+            self.cbr_hook.after_suite(None)
+
+        store_cls.return_value.close.assert_called_once_with()
+        self.assertIsNone(self.cbr_hook.store)
@@ -0,0 +1,118 @@
+"""Unit tests for buildscripts/resmokelib/testing/hooks/consistency.py."""
+
+import concurrent.futures
+import unittest
+
+import bson
+import mock
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.logging import loggers
+from buildscripts.resmokelib.testing.hooks import consistency as _consistency
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def _make_hook(**kwargs):
+    return _consistency.CheckDataConsistency(mock.Mock(spec=loggers.HookLogger), mock.Mock(),
+                                             **kwargs)
+
+
+def _make_client(dbhash_response):
+    client = mock.MagicMock()
+    client.__getitem__.return_value.command.return_value = dbhash_response
+    return client
+
+
+class TestGetWrittenNamespaces(unittest.TestCase):
+    @staticmethod
+    def _get_written_namespaces(entries):
+        client = mock.MagicMock()
+        client.local.__getitem__.return_value.find.return_value = entries
+        return _consistency.CheckDataConsistency._get_written_namespaces(
+            client, bson.Timestamp(1, 0), bson.Timestamp(2, 0))
+
+    def test_crud_ops(self):
+        namespaces = self._get_written_namespaces([
+            {"ns": "test.coll1", "op": "i"},
+            {"ns": "test.coll2", "op": "u"},
+            {"ns": "other.coll.with.dots", "op": "d"},
+        ])
+        self.assertEqual(namespaces, {"test": {"coll1", "coll2"}, "other": {"coll.with.dots"}})
+
+    def test_command_checks_whole_database(self):
+        namespaces = self._get_written_namespaces([
+            {"ns": "test.coll1", "op": "i"},
+            {"ns": "test.$cmd", "op": "c"},
+            {"ns": "test.coll2", "op": "i"},
+        ])
+        self.assertEqual(namespaces, {"test": None})
+
+    def test_rename_checks_target_database(self):
+        namespaces = self._get_written_namespaces([
+            {"ns": "test.$cmd", "op": "c", "o": {"renameCollection": "test.a", "to": "other.b"}},
+            {"ns": "third.coll", "op": "i", "o": {"_id": 1, "to": "ignored.coll"}},
+        ])
+        self.assertEqual(namespaces, {"test": None, "other": None, "third": {"coll"}})
+
+    def test_admin_command_checks_everything(self):
+        namespaces = self._get_written_namespaces([
+            {"ns": "test.coll1", "op": "i"},
+            {"ns": "admin.$cmd", "op": "c"},
+        ])
+        self.assertIsNone(namespaces)
+
+
+class TestCheckDBHashes(unittest.TestCase):
+    PRIMARY_RESPONSE = {
+        "md5": "a",
+        "collections": {"coll": "1", "capped": "2"},
+        "capped": ["capped"],
+        "uuids": {},
+    }
+
+    def _check_dbhashes(self, secondary_response, db_names=None, cluster_time=None):
+        hook = _make_hook()
+        hook._executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(hook._executor.shutdown)
+        nodes = [mock.Mock(port=20000), mock.Mock(port=20001)]
+        clients = [_make_client(self.PRIMARY_RESPONSE), _make_client(secondary_response)]
+        hook._check_dbhashes(mock.Mock(), mock.Mock(replset_name="rs"), nodes, clients,
+                             db_names or ["test"], None, cluster_time)
+        return clients
+
+    def test_matching_dbhashes(self):
+        self._check_dbhashes(self.PRIMARY_RESPONSE)
+
+    def test_reads_at_cluster_time(self):
+        cluster_time = bson.Timestamp(2, 0)
+        clients = self._check_dbhashes(self.PRIMARY_RESPONSE, ["test", "admin"], cluster_time)
+        for client in clients:
+            self.assertEqual(client.__getitem__.return_value.command.call_args_list, [
+                mock.call({"dbHash": 1, "$_internalReadAtClusterTime": cluster_time}),
+                mock.call({"dbHash": 1}),
+            ])
+
+    def test_mismatched_collection(self):
+        with self.assertRaisesRegex(errors.TestFailure, "port 20001.*coll"):
+            self._check_dbhashes({
+                "md5": "b",
+                "collections": {"coll": "3", "capped": "2"},
+                "capped": ["capped"],
+                "uuids": {},
+            })
+
+    def test_mismatched_capped_collection_is_ignored(self):
+        self._check_dbhashes({
+            "md5": "b",
+            "collections": {"coll": "1", "capped": "3"},
+            "capped": ["capped"],
+            "uuids": {},
+        })
+
+    def test_reads_latest_by_default(self):
+        self.assertFalse(_make_hook()._read_at_cluster_time)
+
+    def test_requires_a_check(self):
+        with self.assertRaises(ValueError):
+            _make_hook(check_dbhash=False, validate=False)
@@ -1,10 +1,15 @@
 """Unit tests for buildscripts/resmokelib/testing/hooks/stepdown.py."""
 
 import os
+import threading
+import time
 import unittest
 
 import mock
+import pymongo.errors
+from pymongo.server_type import SERVER_TYPE
 
+from buildscripts.resmokelib import errors
 from buildscripts.resmokelib.testing.hooks import stepdown as _stepdown
 
 # pylint: disable=missing-docstring
@@ -138,3 +143,93 @@ class TestFileBasedStepdownLifecycle(unittest.TestCase):
 
         self.assertFalse(lifecycle.wait_for_stepdown_permitted())
         self.assertTrue(cond.wait.called)
+
+    @mock.patch("os.path")
+    def test_stepdown_interval_ends_when_idle_request_file_exists(self, mock_os_path):
+        lifecycle = _stepdown.FileBasedStepdownLifecycle(self.STEPDOWN_FILES)
+        lifecycle.mark_test_started()
+
+        mock_os_path.isfile.side_effect = lambda filename: filename == "idle_request"
+
+        start = time.time()
+        lifecycle.wait_for_stepdown_interval(60)
+        self.assertLess(time.time() - start, 30)
+        self.assertTrue(lifecycle.poll_for_idle_request())
+
+
+def _description_changed(port, server_type, election_id=None):
+    return mock.Mock(
+        server_address=("localhost", port), new_description=mock.Mock(server_type=server_type,
+                                                                      election_id=election_id))
+
+
+@unittest.skipIf(_stepdown._ServerListener is None, "Requires server monitoring events")
+class TestPrimaryWatcher(unittest.TestCase):
+    def setUp(self):
+        self.nodes = [mock.Mock(port=port) for port in (20000, 20001, 20002)]
+        rs_fixture = mock.Mock(nodes=self.nodes, replset_name="rs")
+        self.watcher = _stepdown._PrimaryWatcher(rs_fixture)
+
+    def test_await_primary(self):
+        self.watcher.description_changed(_description_changed(20001, SERVER_TYPE.RSPrimary, 1))
+        self.assertIs(self.watcher.await_primary(0), self.nodes[1])
+
+    def test_await_primary_times_out(self):
+        self.watcher.description_changed(_description_changed(20000, SERVER_TYPE.RSSecondary))
+        with self.assertRaises(errors.ServerFailure):
+            self.watcher.await_primary(0)
+
+    def test_await_primary_waits_for_new_election(self):
+        self.watcher.description_changed(_description_changed(20000, SERVER_TYPE.RSPrimary, 1))
+        self.watcher.mark_stepping_down()
+        with self.assertRaises(errors.ServerFailure):
+            self.watcher.await_primary(0)
+
+        timer = threading.Timer(0.1, self.watcher.description_changed,
+                                [_description_changed(20002, SERVER_TYPE.RSPrimary, 2)])
+        timer.start()
+        self.addCleanup(timer.join)
+        self.assertIs(self.watcher.await_primary(30), self.nodes[2])
+
+        # The former primary reporting itself as primary before learning of the election is
+        # ignored.
+        self.watcher.description_changed(_description_changed(20000, SERVER_TYPE.RSPrimary, 1))
+        self.assertIs(self.watcher.await_primary(0), self.nodes[2])
+
+    def test_await_primary_after_failed_stepdown(self):
+        self.watcher.description_changed(_description_changed(20000, SERVER_TYPE.RSPrimary, 1))
+        self.watcher.mark_stepping_down()
+        self.watcher.clear_stepping_down()
+        self.assertIs(self.watcher.await_primary(0), self.nodes[0])
+
+    def test_primary_unknown_after_closed(self):
+        self.watcher.description_changed(_description_changed(20000, SERVER_TYPE.RSPrimary, 1))
+        self.watcher.closed(mock.Mock(server_address=("localhost", 20000)))
+        with self.assertRaises(errors.ServerFailure):
+            self.watcher.await_primary(0)
+
+    def test_await_secondary(self):
+        self.assertFalse(self.watcher.await_secondary(self.nodes[0], 0))
+        self.watcher.description_changed(_description_changed(20000, SERVER_TYPE.RSSecondary))
+        self.assertTrue(self.watcher.await_secondary(self.nodes[0], 0))
+
+
+class TestStepdownThread(unittest.TestCase):
+    def test_failed_stepdown_clears_stepping_down(self):
+        primary = mock.Mock(port=20000)
+        primary.mongo_client.return_value.admin.command.side_effect = (
+            pymongo.errors.OperationFailure("not primary"))
+        rs_fixture = mock.Mock(nodes=[primary], replset_name="rs")
+        rs_fixtures = [rs_fixture]
+        thread = _stepdown._StepdownThread(
+            logger=mock.Mock(), mongos_fixtures=[], rs_fixtures=rs_fixtures,
+            stepdown_interval_secs=8, terminate=False, kill=False, stepdown_lifecycle=mock.Mock(),
+            wait_for_mongos_retarget=False, stepdown_via_heartbeats=False)
+        watcher = mock.Mock()
+        watcher.await_primary.return_value = primary
+        thread._primary_watchers[rs_fixture] = watcher  # pylint: disable=protected-access
+
+        with self.assertRaises(pymongo.errors.OperationFailure):
+            thread._step_down(rs_fixture)  # pylint: disable=protected-access
+        watcher.mark_stepping_down.assert_called_once_with()
+        watcher.clear_stepping_down.assert_called_once_with()
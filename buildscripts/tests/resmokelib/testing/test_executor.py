@@ -4,6 +4,7 @@ import unittest
 
 import mock
 
+from buildscripts.resmokelib import testruntimes
 from buildscripts.resmokelib.testing import executor
 from buildscripts.resmokelib.testing import queue_element
 
@@ -91,6 +92,32 @@ class TestCreateJobs(unittest.TestCase):
         self.assertEqual(num_jobs, self.ut_executor._make_job.call_count)
 
 
+class TestReuseFixtures(unittest.TestCase):
+    def setUp(self):
+        self.ut_executor = UnitTestExecutor(mock_suite(1), None)
+
+    @mock.patch(ns("_config"))
+    def test_disabled(self, config_mock):
+        config_mock.REUSE_FIXTURES = False
+        self.ut_executor.fixture_config = {"class": "ReplicaSetFixture"}
+
+        self.assertFalse(self.ut_executor._reuse_fixtures())
+
+    @mock.patch(ns("_config"))
+    def test_enabled(self, config_mock):
+        config_mock.REUSE_FIXTURES = True
+        self.ut_executor.fixture_config = {"class": "ReplicaSetFixture"}
+
+        self.assertTrue(self.ut_executor._reuse_fixtures())
+
+    @mock.patch(ns("_config"))
+    def test_never_reuses_external_fixture(self, config_mock):
+        config_mock.REUSE_FIXTURES = True
+        self.ut_executor.fixture_config = {"class": "ExternalFixture"}
+
+        self.assertFalse(self.ut_executor._reuse_fixtures())
+
+
 class TestNumTimesToRepeatTests(unittest.TestCase):
     def test_default(self):
         num_tests = 1
@@ -144,6 +171,27 @@ class TestMakeTestQueue(unittest.TestCase):
             element = test_queue.get()
             self.assertIn(element, self.suite.tests)
 
+    @mock.patch(ns("testruntimes.load"))
+    def test_longest_first_with_test_runtimes(self, load_mock):
+        test_runtimes = testruntimes.TestRuntimes()
+        for (i, test_name) in enumerate(self.suite.tests):
+            test_runtimes.add_runtime(test_name, i)
+        load_mock.return_value = test_runtimes
+        self.ut_executor._create_queue_elem_for_test_name = mock_queue_elem
+
+        test_queue = self.ut_executor._make_test_queue()
+        test_names = []
+        while not test_queue.empty():
+            test_names.append(test_queue.get().testcase.test_name)
+
+        self.assertEqual(list(reversed(self.suite.tests)), test_names)
+
+
+def mock_queue_elem(test_name):
+    queue_elem = mock.MagicMock()
+    queue_elem.testcase.test_name = test_name
+    return queue_elem
+
 
 class UnitTestExecutor(executor.TestSuiteExecutor):
     def __init__(self, suite, config):  # pylint: disable=super-init-not-called
@@ -295,3 +295,9 @@ class TestNoOpFixtureSetupAndTeardown(unittest.TestCase):
     def test_teardown_called_for_noop_fixture(self):
         self.assertTrue(self.__job_object.manager.teardown_fixture(self.logger))
         self.__noop_fixture.teardown.assert_called_once_with(finished=True)
+
+    @mock.patch("buildscripts.resmokelib.core.network.PortAllocator.release_ports")
+    def test_failed_abort_releases_ports(self, release_ports):
+        self.__job_object.report.find_test_info().status = "fail"
+        self.assertFalse(self.__job_object.manager.teardown_fixture(self.logger, abort=True))
+        release_ports.assert_called_once_with(0)
@@ -0,0 +1,85 @@
+"""Unit tests for the buildscripts.resmokelib.testing.testcases.benchmark_test module."""
+
+import datetime
+import json
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing.testcases import benchmark_test
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def _make_run(name, cpu_time):
+    return {"name": name, "iterations": 100, "real_time": cpu_time, "cpu_time": cpu_time}
+
+
+class TestAdaptiveRepetitions(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+        patcher = mock.patch.multiple(benchmark_test._config, BENCHMARK_TARGET_CI_PCT=12.0,
+                                      BENCHMARK_MAX_TIME=datetime.timedelta(minutes=10))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        with mock.patch.object(benchmark_test.parser, "validate_benchmark_options"):
+            self.test_case = benchmark_test.BenchmarkTestCase(
+                logging.getLogger("benchmark_test"), os.path.join(self.temp_dir, "bm"))
+        self.test_case.bm_options = {
+            "benchmark_out": self.test_case.report_name(), "benchmark_repetitions": 3
+        }
+
+        # The timings of each batch of repetitions of each benchmark.
+        self.batches = {
+            "BM_Stable": [[100, 100, 100]],
+            "BM_Noisy": [[100, 150, 80], [120, 90, 110], [101, 102, 99], [100, 101, 99]],
+        }
+        self.filters = []
+
+        patcher = mock.patch.object(self.test_case, "_execute", side_effect=self._execute)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _execute(self, process):
+        bm_filter = next(
+            (arg.split("=", 1)[1] for arg in process.args if arg.startswith("--benchmark_filter")),
+            None)
+        self.filters.append(bm_filter)
+
+        benchmarks = []
+        for (name, batches) in sorted(self.batches.items()):
+            if bm_filter is not None and name not in bm_filter:
+                continue
+            timings = batches.pop(0)
+            benchmarks.extend(_make_run(name, timing) for timing in timings)
+            benchmarks.append(_make_run(name + "_mean", sum(timings) / len(timings)))
+
+        with open(self.test_case.report_name() + ".batch", "w") as report_file:
+            json.dump({"context": {"num_cpus": 8}, "benchmarks": benchmarks}, report_file)
+
+    def test_reruns_unconverged_benchmarks(self):
+        self.test_case.run_test()
+
+        self.assertEqual(self.filters, [None, "^(BM_Noisy)$", "^(BM_Noisy)$", "^(BM_Noisy)$"])
+        with open(self.test_case.report_name()) as report_file:
+            report = json.load(report_file)
+        names = [run["name"] for run in report["benchmarks"]]
+        self.assertEqual(names, ["BM_Noisy"] * 12 + ["BM_Stable"] * 3)
+        self.assertFalse(os.path.exists(self.test_case.report_name() + ".batch"))
+
+    def test_stops_at_deadline(self):
+        benchmark_test._config.BENCHMARK_MAX_TIME = datetime.timedelta(0)
+        self.test_case.run_test()
+        self.assertEqual(self.filters, [None])
+
+    def test_has_converged(self):
+        self.assertFalse(benchmark_test._has_converged([100]))
+        self.assertTrue(benchmark_test._has_converged([100, 100.1, 99.9]))
+        self.assertFalse(benchmark_test._has_converged([100, 150, 80]))
@@ -1,12 +1,17 @@
 """ Unit tests for archival. """
 
+import io
+import json
 import logging
 import os
 import random
 import shutil
 import tempfile
+import tarfile
 import unittest
 
+import mock
+
 from buildscripts.resmokelib.utils import archival
 
 # pylint: disable=missing-docstring,protected-access
@@ -35,6 +40,33 @@ class MockS3Client(object):
         self.logger.info("MockS3Client delete_object %s %s", args, kwargs)
 
 
+class LocalS3Client(object):
+    """ Class to stand in for an S3-compatible endpoint, keeping the uploaded files in memory. """
+
+    def __init__(self):
+        self.objects = {}
+        self._uploads = {}
+
+    def create_multipart_upload(self, Bucket, Key, **_kwargs):  # pylint: disable=invalid-name
+        upload_id = str(len(self._uploads))
+        self._uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(  # pylint: disable=invalid-name,too-many-arguments
+            self, Bucket, Key, UploadId, PartNumber, Body):
+        self._uploads[UploadId][PartNumber] = Body
+        return {"ETag": str(PartNumber)}
+
+    def complete_multipart_upload(  # pylint: disable=invalid-name
+            self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self._uploads.pop(UploadId)
+        self.objects[(Bucket, Key)] = b"".join(
+            parts[part["PartNumber"]] for part in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):  # pylint: disable=invalid-name
+        del self._uploads[UploadId]
+
+
 class ArchivalTestCase(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -235,3 +267,95 @@ class ArchivalLimitTests(ArchivalTestCase):
         status, message = self.archive.archive_files_to_s3(display_name, temp_file, self.bucket,
                                                            s3_path)
         self.assertEqual(1, status, message)
+
+
+class ArchivalStreamTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.s3_client = LocalS3Client()
+        self.archive = archival.Archival(logging.getLogger(), os.path.join(
+            self.temp_dir, "archive.json"), s3_client=self.s3_client,
+                                         endpoint_url="http://localhost:9000/", stream=True)
+        self.addCleanup(self.archive.exit)
+        self.dbpath = os.path.join(self.temp_dir, "db")
+        os.mkdir(self.dbpath)
+
+    def write_file(self, name, contents):
+        with open(os.path.join(self.dbpath, name), "wb") as fh:
+            fh.write(contents)
+
+    def archive_dbpath(self, s3_path):
+        status, message = self.archive.archive_files_to_s3("Unittest", self.dbpath, _BUCKET,
+                                                           s3_path)
+        self.assertEqual(0, status, message)
+        self.archive._upload_queue.join()
+        data = self.s3_client.objects[(_BUCKET, s3_path)]
+        return tarfile.open(fileobj=io.BytesIO(data), mode="r:gz")
+
+    def member_name(self, name):
+        return os.path.join(self.dbpath, name).lstrip("/")
+
+    def test_archive(self):
+        contents = os.urandom(10 * 1024)
+        self.write_file("collection-0.wt", contents)
+        self.write_file("mongod.lock", b"")
+
+        # Compress the archive in several blocks.
+        with mock.patch.object(archival, "_COMPRESS_BLOCK_SIZE", 1024):
+            tar_handle = self.archive_dbpath("unittest/archive.tgz")
+
+        with tar_handle:
+            self.assertEqual(
+                tar_handle.extractfile(self.member_name("collection-0.wt")).read(), contents)
+            self.assertIn(self.member_name("mongod.lock"), tar_handle.getnames())
+        self.assertEqual(1, self.archive.files_archived_num())
+
+        with open(os.path.join(self.temp_dir, "archive.json")) as fh:
+            self.assertEqual(
+                json.load(fh)[0]["link"],
+                "http://localhost:9000/{}/unittest/archive.tgz".format(_BUCKET))
+
+    def test_deduplicates_wiredtiger_files(self):
+        self.write_file("collection-0.wt", b"unchanged")
+        self.write_file("collection-1.wt", b"unchanged")
+        self.write_file("collection-2.wt", b"before")
+
+        with self.archive_dbpath("unittest/first.tgz") as tar_handle:
+            # Identical files in the same archive are hard links to the first one.
+            link = tar_handle.getmember(self.member_name("collection-1.wt"))
+            self.assertTrue(link.islnk())
+            self.assertEqual(link.linkname, self.member_name("collection-0.wt"))
+
+        self.write_file("collection-2.wt", b"after")
+        with self.archive_dbpath("unittest/second.tgz") as tar_handle:
+            names = tar_handle.getnames()
+            self.assertNotIn(self.member_name("collection-0.wt"), names)
+            self.assertIn(self.member_name("collection-2.wt"), names)
+            deduplicated = json.load(tar_handle.extractfile(archival.DEDUPLICATED_FILES_MEMBER))
+
+        self.assertEqual(
+            deduplicated[self.member_name("collection-0.wt")], {
+                "archive": "http://localhost:9000/{}/unittest/first.tgz".format(_BUCKET),
+                "name": self.member_name("collection-0.wt")
+            })
+
+    def test_concurrent_archives_reserve_size(self):
+        self.archive.limit_size_mb = 1
+        self.write_file("collection.wt", os.urandom(1024 * 1024 + 1))
+        concurrent_results = []
+
+        def stream_archive_files(*_args):
+            # Another job archiving while this archive is streamed sees the size reserved for it.
+            concurrent_results.append(
+                self.archive.archive_files_to_s3("Unittest", self.dbpath, _BUCKET, "other.tgz"))
+            return 0, "", 0
+
+        with mock.patch.object(self.archive, "_stream_archive_files",
+                               side_effect=stream_archive_files):
+            status, message = self.archive.archive_files_to_s3("Unittest", self.dbpath, _BUCKET,
+                                                               "first.tgz")
+        self.assertEqual(0, status, message)
+        self.assertEqual(concurrent_results[0][0], 1)
+        # The reservation is replaced by the size of the archive once it is known.
+        self.assertEqual(self.archive.size_mb, 0)
@@ -0,0 +1,64 @@
+"""Unit tests for buildscripts/resmokelib/utils/tagscache.py."""
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.utils import jscomment
+from buildscripts.resmokelib.utils import tagscache
+
+# pylint: disable=missing-docstring
+
+
+class TestTagsCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+        self.cache_file = os.path.join(self.tmpdir, "tags_cache.json")
+        self.test_file = os.path.join(self.tmpdir, "test.js")
+        self._write_test("/**\n * @tags: [tag1, tag2]\n */\n")
+
+    def _write_test(self, contents):
+        with open(self.test_file, "w") as fp:
+            fp.write(contents)
+
+    def _get_tags(self):
+        """Return the tags of the test and whether they had to be parsed."""
+
+        cache = tagscache.TagsCache.from_file(self.cache_file)
+        with mock.patch.object(jscomment, "get_tags", wraps=jscomment.get_tags) as get_tags:
+            tags = cache.get_tags(self.test_file)
+        cache.save()
+        return (tags, get_tags.called)
+
+    def test_reuses_tags_of_unchanged_file(self):
+        self.assertEqual(self._get_tags(), (["tag1", "tag2"], True))
+        self.assertEqual(self._get_tags(), (["tag1", "tag2"], False))
+
+    def test_parses_tags_of_changed_file(self):
+        self._get_tags()
+        self._write_test("/**\n * @tags: [tag3]\n */\n")
+        self.assertEqual(self._get_tags(), (["tag3"], True))
+
+    def test_ignores_invalid_cache_file(self):
+        with open(self.cache_file, "w") as fp:
+            fp.write("{")
+        self.assertEqual(self._get_tags(), (["tag1", "tag2"], True))
+
+    def test_save_without_changes_does_not_write(self):
+        tagscache.TagsCache(self.cache_file).save()
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_glob(self):
+        cache = tagscache.TagsCache(self.cache_file)
+        pattern = os.path.join(self.tmpdir, "*.js")
+        self.assertEqual(cache.glob(pattern), [self.test_file])
+
+        # Glob expansions are remembered for the lifetime of the cache.
+        os.remove(self.test_file)
+        self.assertEqual(cache.glob(pattern), [self.test_file])
@@ -7,6 +7,7 @@ import datetime
 import os
 import sys
 import subprocess
+import tempfile
 import unittest
 
 from math import ceil
@@ -422,6 +423,29 @@ class TestGetTaskRuntimeHistory(unittest.TestCase):
                                                       "variant1")
         self.assertEqual(result, [])
 
+    def test__get_task_runtime_history_from_file(self):  # pylint: disable=invalid-name
+        evergreen_api = Mock()
+        evergreen_api.test_stats_by_project.return_value = [
+            Mock(
+                test_file="dir/test2.js",
+                date=datetime.datetime.utcnow().strftime("%Y-%m-%d"),
+                num_pass=1,
+                avg_duration_pass=10.1,
+            )
+        ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            history_file = os.path.join(tmpdir, "history.sqlite")
+            result = under_test._get_task_runtime_history(evergreen_api, "project1", "task1",
+                                                          "variant1", history_file)
+            self.assertEqual(result, [("dir/test2.js", 10.1)])
+            self.assertEqual(evergreen_api.test_stats_by_project.call_args[1]["group_num_days"], 1)
+
+            # The stored history is used without the Evergreen API.
+            result = under_test._get_task_runtime_history(None, "project1", "task1", "variant1",
+                                                          history_file)
+            self.assertEqual(result, [("dir/test2.js", 10.1)])
+
 
 class TestGetTaskName(unittest.TestCase):
     def test__get_task_name(self):
@@ -515,7 +539,7 @@ class TestCreateGenerateTasksConfig(unittest.TestCase):
     @unittest.skipIf(sys.platform.startswith("win"), "not supported on windows")
     def test_no_tasks_given(self):
         evg_config = Configuration()
-        gen_config = MagicMock(run_build_variant="variant")
+        gen_config = MagicMock(run_build_variant="variant", runtime_history_file=None)
         repeat_config = MagicMock()
 
         evg_project_config = get_evergreen_config("etc/evergreen.yml")
@@ -532,7 +556,7 @@ class TestCreateGenerateTasksConfig(unittest.TestCase):
         n_tests = 1
         resmoke_options = "options for resmoke"
         evg_config = Configuration()
-        gen_config = MagicMock(run_build_variant="variant", distro=None)
+        gen_config = MagicMock(run_build_variant="variant", distro=None, runtime_history_file=None)
         repeat_config = MagicMock()
         repeat_config.generate_resmoke_options.return_value = resmoke_options
         tests_by_task = create_tests_by_task_mock(n_tasks, n_tests)
@@ -555,7 +579,7 @@ class TestCreateGenerateTasksConfig(unittest.TestCase):
         n_tasks = 3
         n_tests = 5
         evg_config = Configuration()
-        gen_config = MagicMock(run_build_variant="variant", distro=None)
+        gen_config = MagicMock(run_build_variant="variant", distro=None, runtime_history_file=None)
         repeat_config = MagicMock()
         tests_by_task = create_tests_by_task_mock(n_tasks, n_tests)
 
@@ -572,7 +596,7 @@ class TestCreateGenerateTasksConfig(unittest.TestCase):
         n_tasks = 1
         n_tests = 1
         evg_config = Configuration()
-        gen_config = MagicMock(run_build_variant="variant", distro=None)
+        gen_config = MagicMock(run_build_variant="variant", distro=None, runtime_history_file=None)
         repeat_config = MagicMock()
         tests_by_task = create_tests_by_task_mock(n_tasks, n_tests)
         first_task = "task_0"
@@ -595,7 +619,7 @@ class TestCreateMultiversionGenerateTasksConfig(unittest.TestCase):
         evg_config = Configuration()
         gen_config = MagicMock(run_build_variant="variant", fallback_num_sub_suites=1,
                                project="project", build_variant="build_variant", task_id="task_id",
-                               target_resmoke_time=60)
+                               target_resmoke_time=60, runtime_history_file=None)
         evg_api = MagicMock()
         evg_config = under_test.create_multiversion_generate_tasks_config(
             evg_config, {}, evg_api, gen_config)
@@ -608,7 +632,7 @@ class TestCreateMultiversionGenerateTasksConfig(unittest.TestCase):
         evg_config = Configuration()
         gen_config = MagicMock(run_build_variant="variant", fallback_num_sub_suites=1,
                                project="project", build_variant="build_variant", task_id="task_id",
-                               target_resmoke_time=60)
+                               target_resmoke_time=60, runtime_history_file=None)
         evg_api = MagicMock()
 
         # Create a tests_by_tasks dict that doesn't contain any multiversion suites.
@@ -626,7 +650,7 @@ class TestCreateMultiversionGenerateTasksConfig(unittest.TestCase):
         evg_config = Configuration()
         gen_config = MagicMock(run_build_variant="variant", fallback_num_sub_suites=1,
                                project="project", build_variant="build_variant", task_id="task_id",
-                               target_resmoke_time=60)
+                               target_resmoke_time=60, runtime_history_file=None)
         evg_api = MagicMock()
 
         tests_by_task = create_multiversion_tests_by_task_mock(n_tasks, n_tests)
@@ -642,7 +666,7 @@ class TestCreateMultiversionGenerateTasksConfig(unittest.TestCase):
         evg_config = Configuration()
         gen_config = MagicMock(run_build_variant="variant", fallback_num_sub_suites=1,
                                project="project", build_variant="build_variant", task_id="task_id",
-                               target_resmoke_time=60)
+                               target_resmoke_time=60, runtime_history_file=None)
         evg_api = MagicMock()
 
         tests_by_task = create_multiversion_tests_by_task_mock(n_tasks, n_tests)
@@ -660,7 +684,7 @@ class TestCreateMultiversionGenerateTasksConfig(unittest.TestCase):
         evg_config = Configuration()
         gen_config = MagicMock(run_build_variant="variant", fallback_num_sub_suites=1,
                                project="project", build_variant="build_variant", task_id="task_id",
-                               target_resmoke_time=60)
+                               target_resmoke_time=60, runtime_history_file=None)
         evg_api = MagicMock()
 
         tests_by_task = create_multiversion_tests_by_task_mock(n_tasks, n_tests)
@@ -676,7 +700,7 @@ class TestCreateMultiversionGenerateTasksConfig(unittest.TestCase):
         evg_config = Configuration()
         gen_config = MagicMock(run_build_variant="variant", fallback_num_sub_suites=1,
                                project="project", build_variant="build_variant", task_id="task_id",
-                               target_resmoke_time=60)
+                               target_resmoke_time=60, runtime_history_file=None)
         evg_api = MagicMock()
 
         tests_by_task = create_multiversion_tests_by_task_mock(n_tasks, n_tests)
@@ -694,7 +718,7 @@ class TestCreateGenerateTasksFile(unittest.TestCase):
     @patch("buildscripts.burn_in_tests.create_generate_tasks_config")
     def test_gen_tasks_configuration_is_returned(self, gen_tasks_config_mock):
         evg_api = MagicMock()
-        gen_config = MagicMock(use_multiversion=False)
+        gen_config = MagicMock(use_multiversion=False, runtime_history_file=None)
         repeat_config = MagicMock()
         tests_by_task = MagicMock()
 
@@ -719,7 +743,7 @@ class TestCreateGenerateTasksFile(unittest.TestCase):
         evg_api = MagicMock()
         gen_config = MagicMock(run_build_variant="variant", project="project",
                                build_variant="build_variant", task_id="task_id",
-                               use_multiversion=True)
+                               use_multiversion=True, runtime_history_file=None)
         repeat_config = MagicMock()
         tests_by_task = MagicMock()
 
@@ -752,7 +776,7 @@ class TestCreateGenerateTasksFile(unittest.TestCase):
     @patch("buildscripts.burn_in_tests.create_generate_tasks_config")
     def test_cap_on_task_generate(self, gen_tasks_config_mock, exit_mock):
         evg_api = MagicMock()
-        gen_config = MagicMock(use_multiversion=False)
+        gen_config = MagicMock(use_multiversion=False, runtime_history_file=None)
         repeat_config = MagicMock()
         tests_by_task = MagicMock()
 
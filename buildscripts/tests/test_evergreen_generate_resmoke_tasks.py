@@ -321,38 +321,47 @@ class TestConfigOptions(unittest.TestCase):
         self.assertIsInstance(config_options.number, int)
 
 
-class DivideRemainingTestsAmongSuitesTest(unittest.TestCase):
+class BalanceTestsTest(unittest.TestCase):
     @staticmethod
-    def generate_tests_runtimes(n_tests):
-        tests_runtimes = []
-        # Iterating backwards so the list is sorted by descending runtimes
-        for idx in range(n_tests - 1, -1, -1):
-            name = "test_{0}".format(idx)
-            tests_runtimes.append((name, 2 * idx))
+    def get_runtimes(groups):
+        return sorted(sum(runtime for _, runtime in group) for group in groups)
 
-        return tests_runtimes
+    def test_each_group_gets_one_test(self):
+        tests_runtimes = [("test_2", 4), ("test_1", 2), ("test_0", 0)]
 
-    def test_each_suite_gets_one_test(self):
-        suites = [under_test.Suite(f"suite_{i}") for i in range(3)]
-        tests_runtimes = self.generate_tests_runtimes(3)
+        groups = under_test._balance_tests(tests_runtimes, 3, None)
 
-        under_test.divide_remaining_tests_among_suites(tests_runtimes, suites)
+        self.assertEqual(len(groups), 3)
+        for group in groups:
+            self.assertEqual(len(group), 1)
 
-        for suite in suites:
-            self.assertEqual(suite.get_test_count(), 1)
+    def test_longest_group_is_refined(self):
+        # Placing the longest tests first gives groups of 7 + 4 + 4 and 6 + 5, which moving and
+        # swapping tests balances to 13 and 13.
+        tests_runtimes = [("test_7", 7), ("test_6", 6), ("test_5", 5), ("test_4a", 4),
+                          ("test_4b", 4)]
 
-    def test_each_suite_gets_at_least_one_test(self):
-        suites = [under_test.Suite(f"suite_{i}") for i in range(3)]
-        tests_runtimes = self.generate_tests_runtimes(5)
+        groups = under_test._balance_tests(tests_runtimes, 2, None)
 
-        under_test.divide_remaining_tests_among_suites(tests_runtimes, suites)
+        self.assertEqual(self.get_runtimes(groups), [13, 13])
 
-        total_tests = 0
-        for suite in suites:
-            total_tests += suite.get_test_count()
-            self.assertGreaterEqual(suite.get_test_count(), 1)
+    def test_refinement_improves_placement(self):
+        tests_runtimes = [("test_a", 3), ("test_b", 3), ("test_c", 2), ("test_d", 2),
+                          ("test_e", 2)]
 
-        self.assertEqual(total_tests, len(tests_runtimes))
+        groups = under_test._place_tests(tests_runtimes, 2, None)
+        self.assertEqual(self.get_runtimes(groups), [5, 7])
+
+        under_test._refine_placement(groups, None)
+        self.assertEqual(self.get_runtimes(groups), [6, 6])
+
+    def test_max_tests_per_suite_is_respected(self):
+        tests_runtimes = [("test_10", 10)] + [(f"test_{i}", 1) for i in range(5)]
+
+        groups = under_test._balance_tests(tests_runtimes, 2, 3)
+
+        self.assertEqual(sorted(len(group) for group in groups), [3, 3])
+        self.assertEqual(self.get_runtimes(groups), [3, 12])
 
 
 class DivideTestsIntoSuitesByMaxtimeTest(unittest.TestCase):
@@ -443,6 +452,54 @@ class DivideTestsIntoSuitesByMaxtimeTest(unittest.TestCase):
 
         self.assertEqual(len(suites), max_suites)
 
+    def test_tests_are_balanced_among_max_suites(self):
+        max_time = 5
+        max_suites = 2
+        tests_runtimes = [
+            ("test1", 3),
+            ("test2", 3),
+            ("test3", 2),
+            ("test4", 2),
+            ("test5", 2),
+        ]
+
+        suites = under_test.divide_tests_into_suites("suite_name", tests_runtimes, max_time,
+                                                     max_suites=max_suites)
+
+        self.assertEqual([suite.get_runtime() for suite in suites], [6, 6])
+
+    def test_suites_are_added_until_longest_suite_fits(self):
+        max_time = 10
+        tests_runtimes = [
+            ("test1", 6),
+            ("test2", 5),
+            ("test3", 5),
+            ("test4", 4),
+        ]
+
+        suites = under_test.divide_tests_into_suites("suite_name", tests_runtimes, max_time)
+
+        self.assertEqual(len(suites), 2)
+        self.assertEqual(sorted(suite.get_runtime() for suite in suites), [10, 10])
+
+    def test_suite_overhead_is_counted_towards_max_time(self):
+        max_time = 20
+        tests_runtimes = [
+            ("test1", 5),
+            ("test2", 4),
+            ("test3", 3),
+        ]
+
+        suites = under_test.divide_tests_into_suites("suite_name", tests_runtimes, max_time,
+                                                     suite_overhead_seconds=10)
+
+        self.assertEqual(len(suites), 2)
+        self.assertEqual(sorted(suite.get_runtime() for suite in suites), [5, 7])
+
+    def test_no_tests(self):
+        suites = under_test.divide_tests_into_suites("suite_name", [], 10)
+        self.assertEqual(suites, [])
+
 
 class SuiteTest(unittest.TestCase):
     def test_adding_tests_increases_count_and_runtime(self):
@@ -746,6 +803,7 @@ class GenerateSubSuitesTest(unittest.TestCase):
         options.target_resmoke_time = 10
         options.fallback_num_sub_suites = 2
         options.max_tests_per_suite = None
+        options.test_runtime_history_file = None
         return options
 
     @staticmethod
@@ -773,6 +831,62 @@ class GenerateSubSuitesTest(unittest.TestCase):
             for suite in suites:
                 self.assertEqual(10, len(suite.tests))
 
+    def test_calculate_suites_adds_runtime_margin(self):
+        evg = MagicMock()
+        # test1.js has the same average runtime as test0.js, but a standard deviation of 30s.
+        evg.test_stats_by_project.return_value = [
+            tst_stat_mock("test0.js", 60, 1),
+            tst_stat_mock("test0.js", 60, 1),
+            tst_stat_mock("test1.js", 30, 1),
+            tst_stat_mock("test1.js", 90, 1),
+        ]
+        config_options = self.get_mock_options()
+        config_options.max_sub_suites = 1000
+
+        gen_sub_suites = under_test.GenerateSubSuites(evg, config_options)
+
+        with patch("os.path.exists") as exists_mock, patch(ns("suitesconfig")) as suitesconfig_mock:
+            exists_mock.return_value = True
+            suitesconfig_mock.get_suite.return_value.tests = ["test0.js", "test1.js"]
+            suites = gen_sub_suites.calculate_suites_from_evg_stats(
+                evg.test_stats_by_project.return_value, 180)
+
+            self.assertEqual(1, len(suites))
+            self.assertEqual(60 + 90, suites[0].get_runtime())
+
+    def test_calculate_suites_from_runtime_history(self):
+        evg = MagicMock()
+        evg.test_stats_by_project.return_value = [
+            tst_stat_mock(f"test{i}.js", 60, 1) for i in range(10)
+        ]
+        for stat in evg.test_stats_by_project.return_value:
+            stat.date = "2018-07-14"
+        start_date = _DATE - datetime.timedelta(days=14)
+        config_options = self.get_mock_options()
+        config_options.max_sub_suites = 1000
+        config_options.project = "project"
+        config_options.task = "task"
+        config_options.variant = "variant"
+
+        with TemporaryDirectory() as tmpdir:
+            config_options.test_runtime_history_file = os.path.join(tmpdir, "history.sqlite")
+            gen_sub_suites = under_test.GenerateSubSuites(evg, config_options)
+
+            with patch("os.path.exists") as exists_mock, \
+                    patch(ns("suitesconfig")) as suitesconfig_mock:
+                exists_mock.return_value = True
+                suitesconfig_mock.get_suite.return_value.tests = \
+                    [stat.test_file for stat in evg.test_stats_by_project.return_value]
+                suites = gen_sub_suites.calculate_suites(start_date, _DATE)
+                self.assertEqual(1, len(suites))
+                self.assertEqual(1, evg.test_stats_by_project.call_args[1]["group_num_days"])
+
+                # The stored history is used when Evergreen is unavailable.
+                mock_test_stats_unavailable(evg)
+                suites = gen_sub_suites.calculate_suites(start_date, _DATE)
+                self.assertEqual(1, len(suites))
+                self.assertEqual(10, len(gen_sub_suites.test_list))
+
     def test_calculate_suites_fallback(self):
         n_tests = 100
         evg = mock_test_stats_unavailable(MagicMock())
@@ -0,0 +1,91 @@
+"""Unit tests for the util.runtime_history module."""
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests
+from mock import Mock
+
+import buildscripts.util.runtime_history as under_test
+
+# pylint: disable=missing-docstring
+
+_END_DATE = datetime.date(2019, 7, 15)
+
+
+def _make_evg_result(test_file, date, num_pass, duration):
+    return Mock(test_file=test_file, date=date.strftime("%Y-%m-%d"), num_pass=num_pass,
+                avg_duration_pass=duration)
+
+
+def _days_ago(days):
+    return _END_DATE - datetime.timedelta(days=days)
+
+
+class TestRuntimeHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.history_file = os.path.join(self.tmpdir, "cache", "history.sqlite")
+        self.evg_api = Mock()
+
+    def _get_test_stats(self, evg_api, end_date=_END_DATE):
+        return under_test.get_test_stats(evg_api, self.history_file, "project", "task", "variant",
+                                         end_date, 14)
+
+    def _get_after_date(self):
+        return self.evg_api.test_stats_by_project.call_args[1]["after_date"]
+
+    def test_sync_is_incremental(self):
+        self.evg_api.test_stats_by_project.return_value = [
+            _make_evg_result("dir/test1.js", _days_ago(5), 2, 10),
+            _make_evg_result("dir/test1.js", _days_ago(1), 1, 20),
+        ]
+        test_stats = self._get_test_stats(self.evg_api)
+        self.assertEqual(self._get_after_date(), "2019-07-01")
+        self.assertEqual([(stat.date, stat.avg_duration_pass) for stat in test_stats],
+                         [(_days_ago(5), 10), (_days_ago(1), 20)])
+
+        # The days since the last sync are fetched again, and replace the stored statistics.
+        self.evg_api.test_stats_by_project.return_value = [
+            _make_evg_result("dir/test1.js", _days_ago(1), 2, 25),
+            _make_evg_result("dir/test1.js", _days_ago(0), 1, 30),
+        ]
+        test_stats = self._get_test_stats(self.evg_api, _END_DATE + datetime.timedelta(days=2))
+        self.assertEqual(self._get_after_date(), "2019-07-14")
+        self.assertEqual([(stat.date, stat.avg_duration_pass) for stat in test_stats],
+                         [(_days_ago(5), 10), (_days_ago(1), 25), (_days_ago(0), 30)])
+
+    def test_recent_runs_weigh_more(self):
+        self.evg_api.test_stats_by_project.return_value = [
+            _make_evg_result("dir/test1.js", _days_ago(2 * under_test.RUNTIME_HALF_LIFE_DAYS), 4,
+                             10),
+            _make_evg_result("dir/test1.js", _days_ago(0), 4, 20),
+        ]
+        test_stats = self._get_test_stats(self.evg_api)
+        self.assertEqual([stat.num_pass for stat in test_stats], [1, 4])
+
+    def test_stored_history_is_used_offline(self):
+        self.evg_api.test_stats_by_project.return_value = [
+            _make_evg_result("dir/test1.js", _days_ago(1), 1, 20),
+        ]
+        self._get_test_stats(self.evg_api)
+
+        self.evg_api.test_stats_by_project.side_effect = requests.ConnectionError()
+        self.assertEqual(len(self._get_test_stats(self.evg_api)), 1)
+        self.assertEqual(len(self._get_test_stats(None)), 1)
+
+    def test_sync_errors_are_raised_without_stored_history(self):
+        self.evg_api.test_stats_by_project.side_effect = requests.ConnectionError()
+        with self.assertRaises(requests.ConnectionError):
+            self._get_test_stats(self.evg_api)
+
+    def test_longer_lookback_syncs_everything(self):
+        self.evg_api.test_stats_by_project.return_value = []
+        self._get_test_stats(self.evg_api)
+        under_test.get_test_stats(self.evg_api, self.history_file, "project", "task", "variant",
+                                  _END_DATE, 28)
+        self.assertEqual(self._get_after_date(), "2019-06-17")
@@ -81,6 +81,40 @@ class TestTestStats(unittest.TestCase):
         ]
         self.assertEqual(expected_runtimes, test_stats.get_tests_runtimes())
 
+    def test_variances(self):
+        evg_results = [
+            self._make_evg_result("dir/test1.js", 1, 10),
+            self._make_evg_result("dir/test1.js", 1, 20),
+            self._make_evg_result("dir/test2.js", 2, 30),
+            self._make_evg_result("test2:CheckReplDBHash", 1, 2),
+            self._make_evg_result("test2:CheckReplDBHash", 1, 4),
+        ]
+        test_stats = teststats_utils.TestStats(evg_results)
+        self.assertEqual({"dir/test1.js": 25, "dir/test2.js": 1},
+                         test_stats.get_tests_runtime_variances())
+
+    def test_fixtures(self):
+        evg_results = [
+            self._make_evg_result("dir/test1.js", 1, 10),
+            self._make_evg_result("job0_fixture_setup_0", 2, 20),
+            self._make_evg_result("job1_fixture_setup_0", 2, 30),
+            self._make_evg_result("job1_fixture_setup_1", 1, 100),
+            self._make_evg_result("job0_fixture_teardown", 4, 5),
+        ]
+        test_stats = teststats_utils.TestStats(evg_results)
+        expected_runtimes = [
+            teststats_utils.TestRuntime(test_name="dir/test1.js", runtime=10),
+        ]
+        self.assertEqual(expected_runtimes, test_stats.get_tests_runtimes())
+        self.assertEqual(30, test_stats.get_fixture_runtime())
+
+    def test_no_fixtures(self):
+        evg_results = [
+            self._make_evg_result("dir/test1.js", 1, 10),
+        ]
+        test_stats = teststats_utils.TestStats(evg_results)
+        self.assertEqual(0, test_stats.get_fixture_runtime())
+
     @staticmethod
     def _make_evg_result(test_file="dir/test1.js", num_pass=0, duration=0):
         return Mock(
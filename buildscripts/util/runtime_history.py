@@ -0,0 +1,197 @@
+"""Local store of the test statistics Evergreen reports for a task.
+
+The statistics of each day are downloaded once and kept in a SQLite database, so later syncs only
+download the days since the previous one and the history remains available when Evergreen can't be
+reached.
+"""
+
+from collections import namedtuple
+import datetime
+import os
+import sqlite3
+
+import requests
+import structlog
+
+LOGGER = structlog.getLogger(__name__)
+
+# Bumped whenever the schema of the database changes so that older databases are discarded.
+_SCHEMA_VERSION = 1
+# Number of days, up to the last sync, whose statistics are downloaded again on the next sync since
+# Evergreen keeps updating the statistics of the most recent days.
+RESYNC_DAYS = 1
+# Number of days after which the runs of a test count half as much towards its runtime.
+RUNTIME_HALF_LIFE_DAYS = 3
+
+# Statistics of a test or hook on a given day. When returned by RuntimeHistory.get_test_stats(),
+# 'num_pass' is the number of passing runs weighted by how recent they are.
+StoredTestStats = namedtuple("StoredTestStats",
+                             ["test_file", "date", "num_pass", "avg_duration_pass"])
+
+
+def _to_date(value):
+    """Return 'value', a date, a datetime, or a 'YYYY-MM-DD' string, as a date."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+class RuntimeHistory(object):
+    """Test statistics of Evergreen tasks stored in the SQLite database 'filename'."""
+
+    def __init__(self, filename):
+        """Open the database, creating it if it doesn't exist."""
+        dirname = os.path.dirname(filename)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        self._conn = sqlite3.connect(filename, timeout=60)
+        with self._conn:
+            (version, ) = self._conn.execute("PRAGMA user_version").fetchone()
+            if version != _SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS test_stats")
+                self._conn.execute("DROP TABLE IF EXISTS syncs")
+                self._conn.execute("PRAGMA user_version = {}".format(_SCHEMA_VERSION))
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS test_stats (
+                    project TEXT, variant TEXT, task TEXT, test_file TEXT, date TEXT,
+                    num_pass INTEGER, avg_duration_pass REAL,
+                    PRIMARY KEY (project, variant, task, test_file, date))""")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS syncs (
+                    project TEXT, variant TEXT, task TEXT, synced_from TEXT, synced_until TEXT,
+                    PRIMARY KEY (project, variant, task))""")
+
+    def __enter__(self):
+        """Return the history."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the database."""
+        self.close()
+
+    def close(self):
+        """Close the database."""
+        self._conn.close()
+
+    def _get_synced_range(self, project, task, variant):
+        """Return the first and last days synced for the task, or None if it never was."""
+        row = self._conn.execute(
+            "SELECT synced_from, synced_until FROM syncs WHERE project = ? AND variant = ? AND"
+            " task = ?", (project, variant, task)).fetchone()
+        if row is None:
+            return None
+        return (_to_date(row[0]), _to_date(row[1]))
+
+    def has_history(self, project, task, variant):
+        """Return whether the statistics of the task were ever synced."""
+        return self._get_synced_range(project, task, variant) is not None
+
+    def sync(self, evg_api, project, task, variant, end_date, lookback_days):
+        # pylint: disable=too-many-arguments
+        """
+        Download the statistics of the task from Evergreen for the days not already stored.
+
+        Statistics older than the lookback period are deleted.
+
+        :param evg_api: Evergreen API.
+        :param project: Project name.
+        :param task: Task name.
+        :param variant: Variant name.
+        :param end_date: Last day to sync.
+        :param lookback_days: Number of days before 'end_date' to keep statistics for.
+        """
+        end_date = _to_date(end_date)
+        start_date = end_date - datetime.timedelta(days=lookback_days)
+        after_date = start_date
+        synced_range = self._get_synced_range(project, task, variant)
+        if synced_range is not None and synced_range[0] <= start_date <= synced_range[1]:
+            after_date = max(start_date, synced_range[1] - datetime.timedelta(days=RESYNC_DAYS))
+
+        LOGGER.debug("Syncing test runtime history", project=project, task=task, variant=variant,
+                     after_date=after_date, end_date=end_date)
+        data = evg_api.test_stats_by_project(project, after_date=after_date.strftime("%Y-%m-%d"),
+                                             before_date=end_date.strftime("%Y-%m-%d"),
+                                             tasks=[task], variants=[variant], group_by="test",
+                                             group_num_days=1)
+
+        key = (project, variant, task)
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM test_stats WHERE project = ? AND variant = ? AND task = ? AND"
+                " (date < ? OR date >= ?)", key + (start_date.isoformat(), after_date.isoformat()))
+            self._conn.executemany("INSERT OR REPLACE INTO test_stats VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                   [
+                                       key + (stat.test_file, _to_date(stat.date).isoformat(),
+                                              stat.num_pass, stat.avg_duration_pass)
+                                       for stat in data
+                                   ])
+            self._conn.execute("INSERT OR REPLACE INTO syncs VALUES (?, ?, ?, ?, ?)",
+                               key + (start_date.isoformat(), end_date.isoformat()))
+
+    def get_test_stats(self, project, task, variant, end_date, lookback_days,
+                       half_life_days=RUNTIME_HALF_LIFE_DAYS):
+        # pylint: disable=too-many-arguments
+        """
+        Return the stored daily statistics of the task, weighted by how recent they are.
+
+        The passing runs of each day count half as much every 'half_life_days' before 'end_date'.
+
+        :param project: Project name.
+        :param task: Task name.
+        :param variant: Variant name.
+        :param end_date: Last day to return statistics for.
+        :param lookback_days: Number of days before 'end_date' to return statistics for.
+        :param half_life_days: Number of days after which runs count half as much, or None to
+            weigh all the days equally.
+        :return: List of StoredTestStats.
+        """
+        end_date = _to_date(end_date)
+        start_date = end_date - datetime.timedelta(days=lookback_days)
+        rows = self._conn.execute(
+            "SELECT test_file, date, num_pass, avg_duration_pass FROM test_stats WHERE"
+            " project = ? AND variant = ? AND task = ? AND date >= ? AND date <= ?"
+            " ORDER BY date, test_file",
+            (project, variant, task, start_date.isoformat(), end_date.isoformat()))
+
+        test_stats = []
+        for (test_file, date, num_pass, avg_duration_pass) in rows:
+            date = _to_date(date)
+            weight = 1
+            if half_life_days:
+                weight = 0.5**((end_date - date).days / half_life_days)
+            test_stats.append(
+                StoredTestStats(test_file=test_file, date=date, num_pass=num_pass * weight,
+                                avg_duration_pass=avg_duration_pass))
+        return test_stats
+
+
+def get_test_stats(evg_api, history_file, project, task, variant, end_date, lookback_days):
+    # pylint: disable=too-many-arguments
+    """
+    Sync the statistics of the task stored in 'history_file' and return them.
+
+    The stored statistics are returned as is if Evergreen can't be reached, or if 'evg_api' is None,
+    as long as the task was synced before.
+
+    :param evg_api: Evergreen API, or None to only use the stored statistics.
+    :param history_file: SQLite database to store the statistics in.
+    :param project: Project name.
+    :param task: Task name.
+    :param variant: Variant name.
+    :param end_date: Last day to return statistics for.
+    :param lookback_days: Number of days before 'end_date' to return statistics for.
+    :return: List of StoredTestStats weighted by how recent they are.
+    """
+    with RuntimeHistory(history_file) as history:
+        if evg_api is not None:
+            try:
+                history.sync(evg_api, project, task, variant, end_date, lookback_days)
+            except requests.RequestException as err:
+                if not history.has_history(project, task, variant):
+                    raise
+                LOGGER.warning("Could not sync the test runtime history, using the stored history",
+                               project=project, task=task, variant=variant, error=str(err))
+        return history.get_test_stats(project, task, variant, end_date, lookback_days)
@@ -2,10 +2,18 @@
 
 from collections import defaultdict
 from collections import namedtuple
+import re
+
 import buildscripts.util.testname as testname  # pylint: disable=wrong-import-position
 
 TestRuntime = namedtuple('TestRuntime', ['test_name', 'runtime'])
 
+# Matches the names resmoke reports the setup, reset, teardown, and abort of the fixture of a job
+# under, e.g. 'job0_fixture_setup_0'.
+_FIXTURE_TEST_RE = re.compile(r"^job\d+_fixture_(?P<phase>[a-z]+(_\d+)?)$")
+# The phases every job runs once: setting up its fixture for the first time and tearing it down.
+_FIXTURE_PHASES = ("setup_0", "teardown")
+
 
 def normalize_test_name(test_name):
     """Normalize test names that may have been run on windows or unix."""
@@ -22,6 +30,8 @@ class TestStats(object):
         # Mapping from 'test_name:hook_name' to
         #       {'test_name': {'hook_name': {"num_run": X, "duration": Y}}}
         self._hook_runtime_by_test = defaultdict(lambda: defaultdict(dict))
+        # Mapping from fixture phase to {"num_run": X, "duration": Y} for all the jobs
+        self._runtime_by_fixture_phase = defaultdict(dict)
 
         for doc in evg_test_stats_results:
             self._add_stats(doc)
@@ -31,8 +41,12 @@ class TestStats(object):
         test_file = testname.normalize_test_file(test_stats.test_file)
         duration = test_stats.avg_duration_pass
         num_run = test_stats.num_pass
+        fixture_match = _FIXTURE_TEST_RE.match(test_file)
         is_hook = testname.is_resmoke_hook(test_file)
-        if is_hook:
+        if fixture_match:
+            runtime_info = self._runtime_by_fixture_phase[fixture_match.group("phase")]
+            self._add_runtime_info(runtime_info, duration, num_run)
+        elif is_hook:
             self._add_test_hook_stats(test_file, duration, num_run)
         else:
             self._add_test_stats(test_file, duration, num_run)
@@ -52,12 +66,21 @@ class TestStats(object):
     def _add_runtime_info(runtime_info, duration, num_run):
         if not runtime_info:
             runtime_info["duration"] = duration
+            runtime_info["squared_duration"] = duration * duration
             runtime_info["num_run"] = num_run
         else:
             runtime_info["duration"] = TestStats._average(
                 runtime_info["duration"], runtime_info["num_run"], duration, num_run)
+            runtime_info["squared_duration"] = TestStats._average(
+                runtime_info["squared_duration"], runtime_info["num_run"], duration * duration,
+                num_run)
             runtime_info["num_run"] += num_run
 
+    @staticmethod
+    def _variance(runtime_info):
+        """Compute the variance of the average durations added to the runtime info."""
+        return max(runtime_info["squared_duration"] - runtime_info["duration"]**2, 0)
+
     @staticmethod
     def _average(value_a, num_a, value_b, num_b):
         """Compute a weighted average of 2 values with associated numbers."""
@@ -78,3 +101,24 @@ class TestStats(object):
             test = TestRuntime(test_name=normalize_test_name(test_file), runtime=duration)
             tests.append(test)
         return sorted(tests, key=lambda x: x.runtime, reverse=True)
+
+    def get_tests_runtime_variances(self):
+        """
+        Return a dict of test_file to the variance of its runtime in secs^2.
+
+        The variance is that of the average runtimes reported for the test, e.g. for each day, and
+        includes the variance of its hooks.
+        """
+        variances = {}
+        for test_file, runtime_info in list(self._runtime_by_test.items()):
+            variance = self._variance(runtime_info)
+            test_name = testname.get_short_name_from_test_file(test_file)
+            for _, hook_runtime_info in self._hook_runtime_by_test[test_name].items():
+                variance += self._variance(hook_runtime_info)
+            variances[normalize_test_name(test_file)] = variance
+        return variances
+
+    def get_fixture_runtime(self):
+        """Return the runtime in secs a job spends setting up and tearing down its fixture."""
+        return sum(self._runtime_by_fixture_phase[phase].get("duration", 0)
+                   for phase in _FIXTURE_PHASES)